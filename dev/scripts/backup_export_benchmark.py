@@ -0,0 +1,182 @@
+"""
+Benchmarks exporting the database into a backup, comparing the previous implementation (loading every table
+into a dict and writing it as a single json string) against streaming the tables into the zip as NDJSON.
+Each export runs in its own process, so its peak RSS isn't affected by the other exports or by seeding.
+
+usage: `python dev/scripts/backup_export_benchmark.py [database url]` (defaults to a temporary SQLite database)
+"""
+
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from zipfile import ZipFile
+
+from rich.console import Console
+from rich.table import Table
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import Session, sessionmaker
+
+from mealie.db.models._model_base import SqlAlchemyBase
+from mealie.db.models._model_utils.seeded_random import register_sqlite_functions
+from mealie.db.models.group.group import Group
+from mealie.db.models.household.household import Household
+from mealie.db.models.recipe.ingredient import RecipeIngredientModel
+from mealie.db.models.recipe.instruction import RecipeInstruction
+from mealie.db.models.recipe.recipe import RecipeModel
+from mealie.db.models.users.users import User
+from mealie.services.backups_v2.alchemy_exporter import AlchemyExporter
+from mealie.services.backups_v2.backup_file import BackupContents
+
+console = Console()
+
+RECIPES = 20_000
+INGREDIENTS_PER_RECIPE = 10
+INSTRUCTIONS_PER_RECIPE = 5
+SEED_BATCH_SIZE = 1000
+
+METHODS = ["previous", "streaming"]
+
+
+def get_session(db_url: str) -> Session:
+    engine = create_engine(db_url)
+    if "sqlite" in db_url:
+        event.listen(engine, "connect", register_sqlite_functions)
+
+    SqlAlchemyBase.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autoflush=False)()
+
+
+def seed(session: Session) -> None:
+    """Creates recipes with their ingredients and instructions with core inserts"""
+
+    group_id, household_id, user_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    group_name = f"benchmark-{uuid.uuid4()}"
+    session.execute(insert(Group), [{"id": group_id, "name": group_name, "slug": group_name}])
+    session.execute(
+        insert(Household), [{"id": household_id, "group_id": group_id, "name": "household", "slug": "household"}]
+    )
+    session.execute(
+        insert(User),
+        [
+            {
+                "id": user_id,
+                "group_id": group_id,
+                "household_id": household_id,
+                "full_name": "benchmark",
+                "username": "benchmark",
+                "email": "benchmark@example.com",
+                "password": "benchmark",
+            }
+        ],
+    )
+
+    for start in range(0, RECIPES, SEED_BATCH_SIZE):
+        recipes, ingredients, instructions = [], [], []
+        for r in range(start, min(start + SEED_BATCH_SIZE, RECIPES)):
+            recipe_id = uuid.uuid4()
+            name = f"recipe-{r}"
+            recipes.append(
+                {
+                    "id": recipe_id,
+                    "group_id": group_id,
+                    "user_id": user_id,
+                    "name": name,
+                    "name_normalized": name,
+                    "slug": name,
+                    "description": "A recipe with a description that's about as long as a real one. " * 3,
+                }
+            )
+            for i in range(INGREDIENTS_PER_RECIPE):
+                note = f"{i + 1} cups of ingredient number {i} for recipe {r}"
+                ingredients.append(
+                    {"recipe_id": recipe_id, "position": i, "note": note, "original_text": note, "quantity": i + 1}
+                )
+            for i in range(INSTRUCTIONS_PER_RECIPE):
+                instructions.append(
+                    {
+                        "id": uuid.uuid4(),
+                        "recipe_id": recipe_id,
+                        "position": i,
+                        "text": f"Step {i + 1}: mix everything together and wait for a while before continuing. " * 2,
+                    }
+                )
+
+        session.execute(insert(RecipeModel), recipes)
+        session.execute(insert(RecipeIngredientModel), ingredients)
+        session.execute(insert(RecipeInstruction), instructions)
+
+    session.commit()
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def export(method: str, db_url: str, backup_file: Path) -> None:
+    """Runs a single export and prints its results as json, called in a separate process"""
+
+    exporter = AlchemyExporter(db_url)
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+
+    with ZipFile(backup_file, "w") as zip_file:
+        if method == "previous":
+            zip_file.writestr("database.json", json.dumps(exporter.dump()))
+        else:
+            with zip_file.open(BackupContents.database_ndjson, "w", force_zip64=True) as database_file:
+                exporter.dump_ndjson(database_file)
+
+    elapsed = time.perf_counter() - start
+    sys.stdout.write(json.dumps({"time": elapsed, "rss_before": rss_before, "peak_rss": peak_rss_mb()}) + "\n")
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == "--export":
+        _, _, method, db_url, backup_file = sys.argv
+        export(method, db_url, Path(backup_file))
+        return
+
+    temp_dir = Path(tempfile.mkdtemp())
+    db_url = sys.argv[1] if len(sys.argv) > 1 else f"sqlite:///{temp_dir / 'backup_export_benchmark.db'}"
+
+    rows = RECIPES * (1 + INGREDIENTS_PER_RECIPE + INSTRUCTIONS_PER_RECIPE)
+    console.print(f"Creating {RECIPES} recipes ({rows} rows)...")
+    seed(get_session(db_url))
+
+    tbl = Table(title=f"Backup export, {rows} rows")
+    tbl.add_column("Method", style="cyan", no_wrap=True)
+    tbl.add_column("Time", justify="right", style="green")
+    tbl.add_column("RSS Before Export", justify="right")
+    tbl.add_column("Peak RSS", justify="right", style="magenta")
+    tbl.add_column("Backup Size", justify="right")
+
+    for method in METHODS:
+        console.print(f"Exporting with the {method} implementation...")
+        backup_file = temp_dir / f"{method}.zip"
+        output = subprocess.run(
+            [sys.executable, __file__, "--export", method, db_url, str(backup_file)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+
+        tbl.add_row(
+            method,
+            f"{round(result['time'], 2)}s",
+            f"{result['rss_before']:.0f} MB",
+            f"{result['peak_rss']:.0f} MB",
+            f"{backup_file.stat().st_size / 1024 / 1024:.0f} MB",
+        )
+
+    console.print(tbl)
+
+
+if __name__ == "__main__":
+    main()
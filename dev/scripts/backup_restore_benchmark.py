@@ -0,0 +1,192 @@
+"""
+Benchmarks restoring the database from a backup, comparing loading every table into a dict before restoring it
+against streaming the tables from the backup file while they're restored. Each restore runs in its own process,
+so its peak RSS isn't affected by the other restores or by seeding.
+
+Restores run against the database Mealie is configured to use, so the benchmark sets `DATA_DIR` to a temporary
+directory to restore into a temporary SQLite database.
+
+usage: `python dev/scripts/backup_restore_benchmark.py`
+"""
+
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from zipfile import ZipFile
+
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+
+RECIPES = 20_000
+INGREDIENTS_PER_RECIPE = 10
+INSTRUCTIONS_PER_RECIPE = 5
+SEED_BATCH_SIZE = 1000
+
+METHODS = ["dict", "streaming"]
+
+
+def seed(backup_file: Path) -> None:
+    """Creates recipes with their ingredients and instructions with core inserts, and backs up the database"""
+
+    from sqlalchemy import insert
+
+    from mealie.core.config import get_app_settings
+    from mealie.db.db_setup import session_context
+    from mealie.db.init_db import main as init_db
+    from mealie.db.models.group.group import Group
+    from mealie.db.models.household.household import Household
+    from mealie.db.models.recipe.ingredient import RecipeIngredientModel
+    from mealie.db.models.recipe.instruction import RecipeInstruction
+    from mealie.db.models.recipe.recipe import RecipeModel
+    from mealie.db.models.users.users import User
+    from mealie.services.backups_v2.alchemy_exporter import AlchemyExporter
+    from mealie.services.backups_v2.backup_file import BackupContents
+
+    init_db()
+
+    group_id, household_id, user_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    group_name = f"benchmark-{uuid.uuid4()}"
+
+    with session_context() as session:
+        session.execute(insert(Group), [{"id": group_id, "name": group_name, "slug": group_name}])
+        session.execute(
+            insert(Household), [{"id": household_id, "group_id": group_id, "name": "household", "slug": "household"}]
+        )
+        session.execute(
+            insert(User),
+            [
+                {
+                    "id": user_id,
+                    "group_id": group_id,
+                    "household_id": household_id,
+                    "full_name": "benchmark",
+                    "username": "benchmark",
+                    "email": "benchmark@example.com",
+                    "password": "benchmark",
+                }
+            ],
+        )
+
+        for start in range(0, RECIPES, SEED_BATCH_SIZE):
+            recipes, ingredients, instructions = [], [], []
+            for r in range(start, min(start + SEED_BATCH_SIZE, RECIPES)):
+                recipe_id = uuid.uuid4()
+                name = f"recipe-{r}"
+                recipes.append(
+                    {
+                        "id": recipe_id,
+                        "group_id": group_id,
+                        "user_id": user_id,
+                        "name": name,
+                        "name_normalized": name,
+                        "slug": name,
+                        "description": "A recipe with a description that's about as long as a real one. " * 3,
+                    }
+                )
+                for i in range(INGREDIENTS_PER_RECIPE):
+                    note = f"{i + 1} cups of ingredient number {i} for recipe {r}"
+                    ingredients.append(
+                        {"recipe_id": recipe_id, "position": i, "note": note, "original_text": note, "quantity": i + 1}
+                    )
+                for i in range(INSTRUCTIONS_PER_RECIPE):
+                    instructions.append(
+                        {
+                            "id": uuid.uuid4(),
+                            "recipe_id": recipe_id,
+                            "position": i,
+                            "text": f"Step {i + 1}: mix everything together and wait for a while before continuing. "
+                            * 2,
+                        }
+                    )
+
+            session.execute(insert(RecipeModel), recipes)
+            session.execute(insert(RecipeIngredientModel), ingredients)
+            session.execute(insert(RecipeInstruction), instructions)
+
+        session.commit()
+
+    exporter = AlchemyExporter(get_app_settings().DB_URL)
+    with ZipFile(backup_file, "w") as zip_file:
+        with zip_file.open(BackupContents.database_ndjson, "w", force_zip64=True) as database_file:
+            exporter.dump_ndjson(database_file)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def restore(method: str, backup_file: Path) -> None:
+    """Runs a single restore and prints its results as json, called in a separate process"""
+
+    from mealie.core.config import get_app_settings
+    from mealie.services.backups_v2.alchemy_exporter import AlchemyExporter
+    from mealie.services.backups_v2.backup_file import BackupFile
+
+    exporter = AlchemyExporter(get_app_settings().DB_URL)
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+
+    with BackupFile(backup_file) as contents:
+        exporter.drop_all()
+        exporter.restore(contents.read_tables() if method == "dict" else contents)
+
+    elapsed = time.perf_counter() - start
+    sys.stdout.write(json.dumps({"time": elapsed, "rss_before": rss_before, "peak_rss": peak_rss_mb()}) + "\n")
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == "--seed":
+        seed(Path(sys.argv[2]))
+        return
+
+    if len(sys.argv) > 2 and sys.argv[1] == "--restore":
+        _, _, method, backup_file = sys.argv
+        restore(method, Path(backup_file))
+        return
+
+    temp_dir = Path(tempfile.mkdtemp())
+    backup_file = temp_dir / "backup.zip"
+    env = {**os.environ, "PRODUCTION": "True", "DATA_DIR": str(temp_dir / "data"), "DB_ENGINE": "sqlite"}
+
+    rows = RECIPES * (1 + INGREDIENTS_PER_RECIPE + INSTRUCTIONS_PER_RECIPE)
+    console.print(f"Creating {RECIPES} recipes ({rows} rows)...")
+    subprocess.run([sys.executable, __file__, "--seed", str(backup_file)], check=True, env=env, capture_output=True)
+
+    tbl = Table(title=f"Backup restore, {rows} rows")
+    tbl.add_column("Method", style="cyan", no_wrap=True)
+    tbl.add_column("Time", justify="right", style="green")
+    tbl.add_column("RSS Before Restore", justify="right")
+    tbl.add_column("Peak RSS", justify="right", style="magenta")
+
+    for method in METHODS:
+        console.print(f"Restoring with the {method} method...")
+        output = subprocess.run(
+            [sys.executable, __file__, "--restore", method, str(backup_file)],
+            check=True,
+            capture_output=True,
+            text=True,
+            env=env,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+
+        tbl.add_row(
+            method,
+            f"{round(result['time'], 2)}s",
+            f"{result['rss_before']:.0f} MB",
+            f"{result['peak_rss']:.0f} MB",
+        )
+
+    console.print(tbl)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmarks creating foods and units with `create_many`, comparing the bulk insert path against the regular
+ORM path and the previous behavior of refreshing every created row.
+
+usage: `python dev/scripts/bulk_create_benchmark.py [database url]` (defaults to a temporary SQLite database)
+"""
+
+import sys
+import tempfile
+import time
+import uuid
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from pydantic import BaseModel
+from rich.console import Console
+from rich.table import Table
+from sqlalchemy import create_engine, delete, event
+from sqlalchemy.orm import Session, sessionmaker
+
+from mealie.db.models._model_base import SqlAlchemyBase
+from mealie.db.models._model_utils.seeded_random import register_sqlite_functions
+from mealie.db.models.recipe.ingredient import IngredientFoodModel, IngredientUnitModel
+from mealie.repos.repository_factory import AllRepositories
+from mealie.repos.repository_generic import RepositoryGeneric
+from mealie.schema.recipe.recipe_ingredient import SaveIngredientFood, SaveIngredientUnit
+from mealie.schema.user.user import GroupBase
+
+console = Console()
+
+SIZE = 10_000
+
+
+@dataclass(slots=True)
+class Result:
+    name: str
+    method: str
+    time: float
+    statements: int
+
+
+def get_session(db_url: str) -> Session:
+    engine = create_engine(db_url)
+    if "sqlite" in db_url:
+        event.listen(engine, "connect", register_sqlite_functions)
+
+    SqlAlchemyBase.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autoflush=False)()
+
+
+def create_many_with_refresh(repo: RepositoryGeneric, data: list[BaseModel]) -> list:
+    """The previous implementation: add everything, commit, then refresh each row"""
+
+    new_documents = [repo.model(session=repo.session, **document.model_dump()) for document in data]
+    repo.session.add_all(new_documents)
+    repo.session.commit()
+
+    for created_document in new_documents:
+        repo.session.refresh(created_document)
+
+    return [repo.schema.model_validate(x) for x in new_documents]
+
+
+def time_create(session: Session, name: str, method: str, create: Callable[..., list], *args, **kwargs) -> Result:
+    statements = 0
+
+    def count_statements(*args):
+        nonlocal statements
+        statements += 1
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", count_statements)
+    start = time.perf_counter()
+    try:
+        created = create(*args, **kwargs)
+    finally:
+        elapsed = time.perf_counter() - start
+        event.remove(engine, "before_cursor_execute", count_statements)
+
+    assert len(created) == SIZE
+    session.execute(delete(IngredientFoodModel))
+    session.execute(delete(IngredientUnitModel))
+    session.commit()
+
+    return Result(name, method, elapsed, statements)
+
+
+def main():
+    if len(sys.argv) > 1:
+        db_url = sys.argv[1]
+    else:
+        db_url = f"sqlite:///{Path(tempfile.mkdtemp()) / 'bulk_create_benchmark.db'}"
+
+    session = get_session(db_url)
+    group = AllRepositories(session, group_id=None, household_id=None).groups.create(
+        GroupBase(name=f"benchmark-{uuid.uuid4()}")
+    )
+    repos = AllRepositories(session, group_id=group.id, household_id=None)
+
+    foods = [SaveIngredientFood(group_id=group.id, name=f"food-{i}", plural_name=f"foods-{i}") for i in range(SIZE)]
+    units = [SaveIngredientUnit(group_id=group.id, name=f"unit-{i}", abbreviation=f"u{i}") for i in range(SIZE)]
+
+    results: list[Result] = []
+    for name, repo, data in [("Foods", repos.ingredient_foods, foods), ("Units", repos.ingredient_units, units)]:
+        console.print(f"Creating {SIZE} {name.lower()}...")
+        results.append(time_create(session, name, "refresh per row", create_many_with_refresh, repo, data))
+        results.append(time_create(session, name, "create_many", repo.create_many, data))
+        results.append(time_create(session, name, "create_many(bulk=True)", repo.create_many, data, bulk=True))
+
+    tbl = Table(title=f"create_many, {SIZE} rows")
+    tbl.add_column("Model", style="cyan", no_wrap=True)
+    tbl.add_column("Method", style="cyan")
+    tbl.add_column("Time", justify="right", style="green")
+    tbl.add_column("Statements", justify="right", style="magenta")
+
+    for result in results:
+        tbl.add_row(result.name, result.method, f"{round(result.time, 2)}s", str(result.statements))
+
+    console.print(tbl)
+
+
+if __name__ == "__main__":
+    main()
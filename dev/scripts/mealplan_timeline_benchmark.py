@@ -0,0 +1,293 @@
+"""
+Benchmarks the daily task that creates timeline events from today's meal plans, comparing the previous
+implementation (a series of queries per household and per meal plan) against the set-based implementation.
+
+usage: `python dev/scripts/mealplan_timeline_benchmark.py [database url]` (defaults to a temporary SQLite database)
+"""
+
+import sys
+import tempfile
+import time
+import uuid
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from datetime import time as dt_time
+from pathlib import Path
+
+from dateutil.tz import tzlocal
+from pydantic import UUID4
+from rich.console import Console
+from rich.table import Table
+from sqlalchemy import create_engine, delete, event, func, insert, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from mealie.db.models._model_base import SqlAlchemyBase
+from mealie.db.models._model_utils.seeded_random import register_sqlite_functions
+from mealie.db.models.group.group import Group
+from mealie.db.models.household.events import EventBusOutboxModel
+from mealie.db.models.household.household import Household
+from mealie.db.models.household.household_to_recipe import HouseholdToRecipe
+from mealie.db.models.household.mealplan import GroupMealPlan
+from mealie.db.models.recipe.recipe import RecipeModel
+from mealie.db.models.recipe.recipe_timeline import RecipeTimelineEvent
+from mealie.db.models.users.users import User
+from mealie.repos.all_repositories import get_repositories
+from mealie.schema.household.household import HouseholdRecipeUpdate
+from mealie.schema.meal_plan.new_meal import PlanEntryType
+from mealie.schema.recipe.recipe import RecipeSummary
+from mealie.schema.recipe.recipe_timeline_events import RecipeTimelineEventCreate, TimelineEventType
+from mealie.schema.response.pagination import PaginationQuery
+from mealie.schema.user.user import DEFAULT_INTEGRATION_ID
+from mealie.services.event_bus_service.event_bus_service import EventBusService
+from mealie.services.event_bus_service.event_types import (
+    EventOperation,
+    EventRecipeData,
+    EventRecipeTimelineEventData,
+    EventTypes,
+)
+from mealie.services.household_services.household_service import HouseholdService
+from mealie.services.scheduler.tasks.create_timeline_events import _create_mealplan_timeline_events
+
+console = Console()
+
+GROUPS = 10
+HOUSEHOLDS_PER_GROUP = 100
+RECIPES_PER_HOUSEHOLD = 2
+PLANS_PER_HOUSEHOLD = 3
+
+
+@dataclass(slots=True)
+class Result:
+    method: str
+    time: float
+    statements: int
+    events: int
+
+
+def get_session(db_url: str) -> Session:
+    engine = create_engine(db_url)
+    if "sqlite" in db_url:
+        event.listen(engine, "connect", register_sqlite_functions)
+
+    SqlAlchemyBase.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autoflush=False)()
+
+
+def seed(session: Session) -> None:
+    """Creates the households, their users, and today's meal plans with core inserts"""
+
+    today = datetime.now(tz=tzlocal()).date()
+    entry_types = [PlanEntryType.breakfast, PlanEntryType.lunch, PlanEntryType.dinner, PlanEntryType.side]
+
+    groups, households, users, recipes, plans = [], [], [], [], []
+    for g in range(GROUPS):
+        group_id = uuid.uuid4()
+        group_name = f"benchmark-{uuid.uuid4()}"
+        groups.append({"id": group_id, "name": group_name, "slug": group_name})
+
+        for h in range(HOUSEHOLDS_PER_GROUP):
+            household_id, user_id = uuid.uuid4(), uuid.uuid4()
+            households.append(
+                {"id": household_id, "group_id": group_id, "name": f"household-{h}", "slug": f"household-{h}"}
+            )
+            users.append(
+                {
+                    "id": user_id,
+                    "group_id": group_id,
+                    "household_id": household_id,
+                    "full_name": f"user-{g}-{h}",
+                    "username": f"user-{g}-{h}",
+                    "email": f"user-{g}-{h}@example.com",
+                    "password": "benchmark",
+                }
+            )
+
+            # each household plans its own recipes, some of them more than once
+            recipe_ids = [uuid.uuid4() for _ in range(RECIPES_PER_HOUSEHOLD)]
+            for r, recipe_id in enumerate(recipe_ids):
+                name = f"recipe-{g}-{h}-{r}"
+                recipes.append(
+                    {
+                        "id": recipe_id,
+                        "group_id": group_id,
+                        "user_id": user_id,
+                        "name": name,
+                        "name_normalized": name,
+                        "slug": name,
+                    }
+                )
+
+            for p in range(PLANS_PER_HOUSEHOLD):
+                plans.append(
+                    {
+                        "date": today,
+                        "entry_type": entry_types[p % len(entry_types)].value,
+                        "title": "",
+                        "text": "",
+                        "recipe_id": recipe_ids[p % RECIPES_PER_HOUSEHOLD],
+                        "group_id": group_id,
+                        "user_id": user_id,
+                    }
+                )
+
+    for model, rows in [
+        (Group, groups),
+        (Household, households),
+        (User, users),
+        (RecipeModel, recipes),
+        (GroupMealPlan, plans),
+    ]:
+        session.execute(insert(model), rows)
+    session.commit()
+
+
+def reset(session: Session) -> None:
+    session.execute(delete(RecipeTimelineEvent))
+    session.execute(delete(HouseholdToRecipe))
+    session.execute(delete(EventBusOutboxModel))
+    session.execute(update(RecipeModel).values(last_made=None))
+    session.commit()
+
+
+def create_events_per_household(session: Session, event_time: datetime) -> None:
+    """The previous implementation: loop over every group and household, then over each meal plan"""
+
+    for group in get_repositories(session).groups.page_all(PaginationQuery(page=1, per_page=-1)).items:
+        group_repos = get_repositories(session, group_id=group.id)
+        for household in group_repos.households.page_all(PaginationQuery(page=1, per_page=-1)).items:
+            _create_events_for_household(event_time, session, group.id, household.id)
+
+
+def _create_events_for_household(event_time: datetime, session: Session, group_id: UUID4, household_id: UUID4):
+    repos = get_repositories(session, group_id=group_id, household_id=household_id)
+    household_service = HouseholdService(group_id, household_id, repos)
+    event_bus_service = EventBusService(session=session)
+
+    timeline_events_to_create: list[RecipeTimelineEventCreate] = []
+    recipes_to_update: dict[UUID4, RecipeSummary] = {}
+    recipe_id_to_slug_map: dict[UUID4, str] = {}
+
+    for mealplan in repos.meals.get_today(tz=tzlocal()):
+        if not (mealplan.recipe and mealplan.user_id):
+            continue
+
+        user = repos.users.get_one(mealplan.user_id)
+        if not user:
+            continue
+
+        if mealplan.entry_type == PlanEntryType.side:
+            event_subject = f"{user.full_name} made this as a side"
+        else:
+            event_subject = f"{user.full_name} made this for {mealplan.entry_type.value}"
+
+        query_start_time = datetime.combine(datetime.now(UTC).date(), dt_time.min)
+        query_end_time = query_start_time + timedelta(days=1)
+        query = PaginationQuery(
+            query_filter=(
+                f'recipe_id = "{mealplan.recipe_id}" '
+                f'AND timestamp >= "{query_start_time.isoformat()}" '
+                f'AND timestamp < "{query_end_time.isoformat()}" '
+                f'AND subject = "{event_subject}"'
+            )
+        )
+        if repos.recipe_timeline_events.page_all(pagination=query).items:
+            continue
+
+        household_to_recipe = household_service.get_household_recipe(mealplan.recipe.slug)
+        last_made = household_to_recipe.last_made if household_to_recipe else None
+        if (not last_made or last_made.date() < event_time.date()) and mealplan.recipe_id not in recipes_to_update:
+            recipes_to_update[mealplan.recipe_id] = mealplan.recipe
+
+        timeline_events_to_create.append(
+            RecipeTimelineEventCreate(
+                user_id=user.id,
+                subject=event_subject,
+                event_type=TimelineEventType.info,
+                timestamp=event_time,
+                recipe_id=mealplan.recipe_id,
+            )
+        )
+        recipe_id_to_slug_map[mealplan.recipe_id] = mealplan.recipe.slug
+
+    for timeline_event in timeline_events_to_create:
+        new_event = repos.recipe_timeline_events.create(timeline_event)
+        event_bus_service.dispatch(
+            integration_id=DEFAULT_INTEGRATION_ID,
+            group_id=group_id,
+            household_id=household_id,
+            event_type=EventTypes.recipe_updated,
+            document_data=EventRecipeTimelineEventData(
+                operation=EventOperation.create,
+                recipe_slug=recipe_id_to_slug_map[new_event.recipe_id],
+                recipe_timeline_event_id=new_event.id,
+            ),
+        )
+
+    for recipe in recipes_to_update.values():
+        household_service.set_household_recipe(recipe.slug, HouseholdRecipeUpdate(last_made=event_time))
+        repos.recipes.patch(recipe.slug, {"last_made": event_time})
+        event_bus_service.dispatch(
+            integration_id=DEFAULT_INTEGRATION_ID,
+            group_id=group_id,
+            household_id=household_id,
+            event_type=EventTypes.recipe_updated,
+            document_data=EventRecipeData(operation=EventOperation.update, recipe_slug=recipe.slug),
+        )
+
+
+def time_task(session: Session, method: str, task: Callable[[], None]) -> Result:
+    statements = 0
+
+    def count_statements(*args):
+        nonlocal statements
+        statements += 1
+
+    reset(session)
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", count_statements)
+    start = time.perf_counter()
+    try:
+        task()
+    finally:
+        elapsed = time.perf_counter() - start
+        event.remove(engine, "before_cursor_execute", count_statements)
+
+    events = session.scalar(select(func.count()).select_from(RecipeTimelineEvent)) or 0
+    return Result(method, elapsed, statements, events)
+
+
+def main():
+    if len(sys.argv) > 1:
+        db_url = sys.argv[1]
+    else:
+        db_url = f"sqlite:///{Path(tempfile.mkdtemp()) / 'mealplan_timeline_benchmark.db'}"
+
+    session = get_session(db_url)
+    households = GROUPS * HOUSEHOLDS_PER_GROUP
+
+    console.print(f"Creating {households} households with {PLANS_PER_HOUSEHOLD} meal plans each...")
+    seed(session)
+
+    event_time = datetime.now(UTC)
+    today = datetime.now(tz=tzlocal()).date()
+    results = [
+        time_task(session, "per household", lambda: create_events_per_household(session, event_time)),
+        time_task(session, "set-based", lambda: _create_mealplan_timeline_events(session, event_time, today)),
+    ]
+    reset(session)
+
+    tbl = Table(title=f"Meal plan timeline events, {households} households")
+    tbl.add_column("Method", style="cyan", no_wrap=True)
+    tbl.add_column("Time", justify="right", style="green")
+    tbl.add_column("Statements", justify="right", style="magenta")
+    tbl.add_column("Events", justify="right")
+
+    for result in results:
+        tbl.add_row(result.method, f"{round(result.time, 2)}s", str(result.statements), str(result.events))
+
+    console.print(tbl)
+
+
+if __name__ == "__main__":
+    main()
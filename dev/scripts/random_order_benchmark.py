@@ -0,0 +1,140 @@
+"""
+Benchmarks paging through foods with `orderBy=random` at increasing table sizes, comparing the seeded hash ordering
+against the previous approach of shuffling every id in Python and sorting with a `CASE` statement.
+
+usage: `python dev/scripts/random_order_benchmark.py [database url]` (defaults to a temporary SQLite database)
+"""
+
+import math
+import random
+import sys
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+
+from rich.console import Console
+from rich.table import Table
+from sqlalchemy import case, create_engine, delete, event, insert
+from sqlalchemy.orm import Session, sessionmaker
+
+from mealie.db.models._model_base import SqlAlchemyBase
+from mealie.db.models._model_utils.seeded_random import register_sqlite_functions
+from mealie.db.models.recipe.ingredient import IngredientFoodModel
+from mealie.repos.repository_factory import AllRepositories
+from mealie.schema.response.pagination import PaginationQuery
+from mealie.schema.user.user import GroupBase
+
+console = Console()
+
+TABLE_SIZES = [1_000, 10_000, 50_000, 100_000]
+PAGES = [1, 5, 25]
+PER_PAGE = 50
+RUNS = 5
+# sorting by a CASE with an entry per row is quadratic on SQLite, so the old approach is only timed on smaller tables
+SHUFFLED_MAX_SIZE = 10_000
+
+
+@dataclass(slots=True)
+class Result:
+    page: int
+    seeded: float
+    shuffled: float
+
+
+def get_session(db_url: str) -> Session:
+    engine = create_engine(db_url)
+    if "sqlite" in db_url:
+        event.listen(engine, "connect", register_sqlite_functions)
+
+    SqlAlchemyBase.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autoflush=False)()
+
+
+def populate(session: Session, group_id: uuid.UUID, size: int) -> None:
+    session.execute(delete(IngredientFoodModel))
+    rows = [{"id": uuid.uuid4(), "group_id": group_id, "name": f"food-{i}", "description": ""} for i in range(size)]
+    for i in range(0, len(rows), 5_000):
+        session.execute(insert(IngredientFoodModel), rows[i : i + 5_000])
+    session.commit()
+
+
+def time_seeded(repos: AllRepositories, page: int, seed: str) -> float:
+    start = time.perf_counter()
+    repos.ingredient_foods.page_all(
+        PaginationQuery(page=page, per_page=PER_PAGE, order_by="random", pagination_seed=seed, skip_count=True)
+    )
+    return time.perf_counter() - start
+
+
+def time_shuffled(repos: AllRepositories, page: int, seed: str) -> float:
+    """The previous implementation: load every id, shuffle them in Python, and sort with a giant CASE statement"""
+
+    repo = repos.ingredient_foods
+    start = time.perf_counter()
+
+    query = repo._query()
+    all_ids = repo.session.execute(query.with_only_columns(repo.model.id)).scalars().all()
+    order = list(range(len(all_ids)))
+    random.seed(seed)
+    random.shuffle(order)
+    query = query.order_by(case(dict(zip(all_ids, order, strict=True)), value=repo.model.id))
+    repo.session.execute(query.offset((page - 1) * PER_PAGE).limit(PER_PAGE)).unique().scalars().all()
+
+    return time.perf_counter() - start
+
+
+def average(fn, repos: AllRepositories, page: int) -> float:
+    return sum(fn(repos, page, str(uuid.uuid4())) for _ in range(RUNS)) / RUNS
+
+
+def main():
+    if len(sys.argv) > 1:
+        db_url = sys.argv[1]
+    else:
+        db_url = f"sqlite:///{Path(tempfile.mkdtemp()) / 'random_order_benchmark.db'}"
+
+    session = get_session(db_url)
+    group = AllRepositories(session, group_id=None, household_id=None).groups.create(
+        GroupBase(name=f"benchmark-{uuid.uuid4()}")
+    )
+    repos = AllRepositories(session, group_id=group.id, household_id=None)
+    results: list[tuple[int, list[Result]]] = []
+    for size in TABLE_SIZES:
+        console.print(f"Populating {size} foods...")
+        populate(session, group.id, size)
+        results.append(
+            (
+                size,
+                [
+                    Result(
+                        page,
+                        average(time_seeded, repos, page),
+                        average(time_shuffled, repos, page) if size <= SHUFFLED_MAX_SIZE else math.nan,
+                    )
+                    for page in PAGES
+                ],
+            )
+        )
+
+    tbl = Table(title=f"orderBy=random, perPage={PER_PAGE}, average of {RUNS} runs")
+    tbl.add_column("Foods", justify="right", style="cyan", no_wrap=True)
+    tbl.add_column("Page", justify="right", style="cyan")
+    tbl.add_column("Seeded Hash", justify="right", style="green")
+    tbl.add_column("Shuffled Ids", justify="right", style="magenta")
+
+    for size, size_results in results:
+        for result in size_results:
+            tbl.add_row(
+                str(size),
+                str(result.page),
+                f"{round(result.seeded * 1000, 1)}ms",
+                "-" if math.isnan(result.shuffled) else f"{round(result.shuffled * 1000, 1)}ms",
+            )
+
+    console.print(tbl)
+
+
+if __name__ == "__main__":
+    main()
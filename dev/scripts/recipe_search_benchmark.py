@@ -0,0 +1,271 @@
+"""
+Benchmarks recipe search over a synthetic dataset, comparing the current single statement search against the previous
+approach of loading every matching ingredient id into Python and binding them back into the recipe query.
+
+usage: `python dev/scripts/recipe_search_benchmark.py [database url]` (defaults to a temporary SQLite database)
+
+On Postgres, unquoted searches use the fuzzy (trigram) search and quoted searches use the tokenized search.
+"""
+
+import random
+import sys
+import tempfile
+import time
+import uuid
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from rich.console import Console
+from rich.table import Table
+from sqlalchemy import Select, create_engine, desc, event, func, insert, or_, select, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from mealie.db.models._model_base import SqlAlchemyBase
+from mealie.db.models._model_utils.seeded_random import register_sqlite_functions
+from mealie.db.models.recipe.ingredient import RecipeIngredientModel
+from mealie.db.models.recipe.recipe import RecipeModel
+from mealie.repos.repository_factory import AllRepositories
+from mealie.schema._mealie import SearchType
+from mealie.schema.recipe.recipe import Recipe
+from mealie.schema.response.query_search import SearchFilter
+from mealie.schema.user.user import GroupBase
+
+console = Console()
+
+RECIPES = 50_000
+INGREDIENTS_PER_RECIPE = 6
+PER_PAGE = 50
+RUNS = 5
+SEARCHES = ["salt", "chicken soup", "saffron", '"salt"', '"chicken soup"', '"saffron"']
+
+# binding thousands of ingredient ids makes each previous search take minutes on SQLite at this size, so there the
+# previous approach is only timed for rare ingredients
+SQLITE_MATERIALIZED_SEARCHES = ["saffron", '"saffron"']
+
+# "salt" is in almost every recipe, "saffron" is rare
+COMMON_INGREDIENTS = ["salt", "pepper", "olive oil", "butter", "garlic", "onion"]
+INGREDIENTS = ["chicken", "beef", "rice", "potato", "carrot", "tomato", "lentils", "flour", "sugar", "milk"]
+RARE_INGREDIENTS = ["saffron", "sumac", "yuzu"]
+DISHES = ["soup", "stew", "salad", "curry", "pie", "roast", "bake", "stir fry", "noodles", "tacos"]
+
+# the trigram indexes used by the fuzzy search are created by migrations, not by `create_all`
+POSTGRES_TRIGRAM_INDEXES = {
+    "ix_recipes_name_normalized_gin": ("recipes", "name_normalized"),
+    "ix_recipes_description_normalized_gin": ("recipes", "description_normalized"),
+    "ix_recipes_ingredients_note_normalized_gin": ("recipes_ingredients", "note_normalized"),
+    "ix_recipes_ingredients_original_text_normalized_gin": ("recipes_ingredients", "original_text_normalized"),
+}
+
+
+@dataclass(slots=True)
+class Result:
+    search: str
+    search_type: SearchType
+    matches: int
+    single_statement: float
+    materialized_ids: float | None
+    materialized_params: int | None
+
+
+def get_session(db_url: str) -> Session:
+    engine = create_engine(db_url)
+    if "sqlite" in db_url:
+        event.listen(engine, "connect", register_sqlite_functions)
+
+    SqlAlchemyBase.metadata.create_all(engine)
+    if "sqlite" not in db_url:
+        with engine.begin() as conn:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            for index, (table, column) in POSTGRES_TRIGRAM_INDEXES.items():
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS {index} ON {table} USING gin ({column} gin_trgm_ops)"))
+
+    return sessionmaker(bind=engine, autoflush=False)()
+
+
+def populate(session: Session, group_id: uuid.UUID) -> None:
+    rng = random.Random(RECIPES)
+    recipes: list[dict] = []
+    ingredients: list[dict] = []
+    for i in range(RECIPES):
+        recipe_id = uuid.uuid4()
+        name = f"{rng.choice(INGREDIENTS)} {rng.choice(DISHES)} {i}"
+        recipes.append(
+            {
+                "id": recipe_id,
+                "group_id": group_id,
+                "name": name,
+                "name_normalized": name,
+                "description_normalized": f"a {rng.choice(DISHES)} with {rng.choice(INGREDIENTS)}",
+                "slug": f"recipe-{i}",
+            }
+        )
+
+        notes = rng.sample(COMMON_INGREDIENTS, 3) + rng.sample(INGREDIENTS, INGREDIENTS_PER_RECIPE - 3)
+        if rng.random() < 0.01:
+            notes[-1] = rng.choice(RARE_INGREDIENTS)
+
+        for position, note in enumerate(notes):
+            note = f"{rng.randint(1, 4)} cups {note}"
+            ingredients.append(
+                {
+                    "recipe_id": recipe_id,
+                    "position": position,
+                    "note": note,
+                    "note_normalized": note,
+                    "original_text_normalized": note,
+                }
+            )
+
+    for i in range(0, len(recipes), 5_000):
+        session.execute(insert(RecipeModel), recipes[i : i + 5_000])
+    for i in range(0, len(ingredients), 5_000):
+        session.execute(insert(RecipeIngredientModel), ingredients[i : i + 5_000])
+    session.commit()
+
+    if session.get_bind().name == "postgresql":
+        # otherwise autovacuum processes the new rows while the first searches are timed, and they are planned as if
+        # the tables were empty
+        with session.get_bind().connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM ANALYZE"))
+
+
+def materialized_ids_search(query: Select, session: Session, search_filter: SearchFilter) -> Select:
+    """The previous implementation: load every matching ingredient id, then bind them into the recipe query"""
+
+    search, search_list = search_filter.search, search_filter.search_list
+    if search_filter.search_type is SearchType.fuzzy:
+        ingredient_ids = (
+            session.execute(
+                select(RecipeIngredientModel.id).filter(
+                    or_(
+                        RecipeIngredientModel.note_normalized.op("%>")(search),
+                        RecipeIngredientModel.original_text_normalized.op("%>")(search),
+                    )
+                )
+            )
+            .scalars()
+            .all()
+        )
+
+        session.execute(text(f"set pg_trgm.word_similarity_threshold = {Recipe._fuzzy_similarity_threshold};"))
+        return query.filter(
+            or_(
+                RecipeModel.name_normalized.op("%>")(search),
+                RecipeModel.description_normalized.op("%>")(search),
+                RecipeModel.recipe_ingredient.any(RecipeIngredientModel.id.in_(ingredient_ids)),
+            )
+        ).order_by(func.least(RecipeModel.name_normalized.op("<->>")(search)))
+
+    ingredient_ids = (
+        session.execute(
+            select(RecipeIngredientModel.id).filter(
+                or_(
+                    *[RecipeIngredientModel.note_normalized.like(f"%{ns}%") for ns in search_list],
+                    *[RecipeIngredientModel.original_text_normalized.like(f"%{ns}%") for ns in search_list],
+                )
+            )
+        )
+        .scalars()
+        .all()
+    )
+
+    return query.filter(
+        or_(
+            *[RecipeModel.name_normalized.like(f"%{ns}%") for ns in search_list],
+            *[RecipeModel.description_normalized.like(f"%{ns}%") for ns in search_list],
+            RecipeModel.recipe_ingredient.any(RecipeIngredientModel.id.in_(ingredient_ids)),
+        )
+    ).order_by(desc(RecipeModel.name_normalized.like(f"%{search}%")))
+
+
+def single_statement_search(query: Select, session: Session, search_filter: SearchFilter) -> Select:
+    return search_filter.filter_query_by_search(query, Recipe, RecipeModel)
+
+
+def time_search(
+    session: Session, group_id: uuid.UUID, search: str, fn: Callable[[Select, Session, SearchFilter], Select]
+) -> tuple[float, int, int]:
+    """Runs a search like `page_all` does (count, then the first page) and returns the time, matches, and params"""
+
+    params = 0
+
+    def count_params(conn, cursor, statement, parameters, *args):
+        nonlocal params
+        params += len(parameters) if isinstance(parameters, list | tuple | dict) else 0
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", count_params)
+    start = time.perf_counter()
+    try:
+        search_filter = SearchFilter(session, search, normalize_characters=True)
+        query = fn(select(RecipeModel.id).filter(RecipeModel.group_id == group_id), session, search_filter)
+        matches = session.scalar(select(func.count()).select_from(query.order_by(None).subquery())) or 0
+        session.execute(query.limit(PER_PAGE)).scalars().all()
+    finally:
+        elapsed = time.perf_counter() - start
+        event.remove(engine, "before_cursor_execute", count_params)
+
+    return elapsed, matches, params
+
+
+def average(session: Session, group_id: uuid.UUID, search: str, fn) -> tuple[float, int, int]:
+    time_search(session, group_id, search, fn)  # warm up the connection and the database caches
+    runs = [time_search(session, group_id, search, fn) for _ in range(RUNS)]
+    return sum(run[0] for run in runs) / RUNS, runs[0][1], runs[0][2]
+
+
+def main():
+    if len(sys.argv) > 1:
+        db_url = sys.argv[1]
+    else:
+        db_url = f"sqlite:///{Path(tempfile.mkdtemp()) / 'recipe_search_benchmark.db'}"
+
+    session = get_session(db_url)
+    group = AllRepositories(session, group_id=None, household_id=None).groups.create(
+        GroupBase(name=f"benchmark-{uuid.uuid4()}")
+    )
+
+    console.print(f"Populating {RECIPES} recipes with {INGREDIENTS_PER_RECIPE} ingredients each...")
+    populate(session, group.id)
+
+    results: list[Result] = []
+    for search in SEARCHES:
+        search_type = SearchFilter(session, search).search_type
+        single_time, matches, _ = average(session, group.id, search, single_statement_search)
+        if "sqlite" in db_url and search not in SQLITE_MATERIALIZED_SEARCHES:
+            results.append(Result(search, search_type, matches, single_time, None, None))
+            continue
+
+        materialized_time, materialized_matches, materialized_params = average(
+            session, group.id, search, materialized_ids_search
+        )
+        if matches != materialized_matches:
+            # the full-text search matches whole words (or prefixes), while the previous search matched any substring
+            console.print(f"[yellow]{search}: {matches} matches, previously {materialized_matches}[/yellow]")
+
+        results.append(Result(search, search_type, matches, single_time, materialized_time, materialized_params))
+
+    tbl = Table(title=f"{RECIPES} recipes, perPage={PER_PAGE}, average of {RUNS} runs")
+    tbl.add_column("Search", style="cyan", no_wrap=True)
+    tbl.add_column("Type", style="cyan")
+    tbl.add_column("Matches", justify="right")
+    tbl.add_column("Single Statement", justify="right", style="green")
+    tbl.add_column("Materialized Ids", justify="right", style="magenta")
+    tbl.add_column("Materialized Params", justify="right", style="magenta")
+
+    for result in results:
+        tbl.add_row(
+            result.search,
+            result.search_type.value,
+            str(result.matches),
+            f"{round(result.single_statement * 1000, 1)}ms",
+            "-" if result.materialized_ids is None else f"{round(result.materialized_ids * 1000, 1)}ms",
+            "-" if result.materialized_params is None else str(result.materialized_params),
+        )
+
+    console.print(tbl)
+
+
+if __name__ == "__main__":
+    main()
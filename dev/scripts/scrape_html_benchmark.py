@@ -0,0 +1,145 @@
+"""
+Benchmarks reading large recipe pages in `safe_scrape_html`, comparing the previous implementation
+(appending 1 KB chunks to a bytes object) against the bytearray buffer, with and without stopping once
+the page's JSON-LD recipe data has been read.
+
+usage: `python dev/scripts/scrape_html_benchmark.py`
+"""
+
+import asyncio
+import json
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+import httpx
+from rich.console import Console
+from rich.table import Table
+
+from mealie.services.scraper.scraper_strategies import _detect_encoding, _read_html
+
+console = Console()
+
+PAGE_SIZES_MB = [1, 5, 20]
+NETWORK_CHUNK_SIZE = 16 * 1024
+"""Size of the chunks the fake site sends, roughly what's read from a socket at a time"""
+MAX_SIZE = 100 * 1024 * 1024
+RUNS = 3
+
+
+@dataclass(slots=True)
+class Result:
+    method: str
+    page_size: int
+    time: float
+    peak_memory: int
+    html_size: int
+
+
+def fixture_page(size: int) -> bytes:
+    """A recipe page with its JSON-LD in the head, padded with markup to about `size` bytes"""
+
+    ld_json = {
+        "@context": "https://schema.org",
+        "@type": "Recipe",
+        "name": "Benchmark Recipe",
+        "recipeIngredient": ["1 cup flour", "2 eggs"],
+        "recipeInstructions": [{"@type": "HowToStep", "text": "Mix everything together"}],
+    }
+    head = (
+        '<!DOCTYPE html><html><head><meta charset="utf-8">'
+        "<script>window.analytics = {};</script>"
+        f'<script type="application/ld+json">{json.dumps(ld_json)}</script>'
+        "</head><body>"
+    ).encode()
+    paragraph = "<p>Crème brûlée, a paragraph of text that makes the page larger.</p>\n".encode()
+    return head + paragraph * (size // len(paragraph)) + b"</body></html>"
+
+
+def get_client(page: bytes) -> httpx.AsyncClient:
+    async def stream_page():
+        for i in range(0, len(page), NETWORK_CHUNK_SIZE):
+            yield page[i : i + NETWORK_CHUNK_SIZE]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, headers={"Content-Type": "text/html"}, content=stream_page())
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+async def read_previous(response: httpx.Response) -> str:
+    """The previous implementation"""
+
+    html_bytes = b""
+    async for chunk in response.aiter_bytes(chunk_size=1024):
+        html_bytes += chunk
+
+    return str(html_bytes, response.encoding or "utf-8", errors="replace")
+
+
+async def read_streaming(response: httpx.Response) -> str:
+    html_bytes, _ = await _read_html(response, MAX_SIZE)
+    return html_bytes.decode(_detect_encoding(html_bytes, response.charset_encoding), errors="replace")
+
+
+async def read_streaming_stop_at_recipe(response: httpx.Response) -> str:
+    html_bytes, _ = await _read_html(response, MAX_SIZE, stop_at_recipe_data=True)
+    return html_bytes.decode(_detect_encoding(html_bytes, response.charset_encoding), errors="replace")
+
+
+async def time_read(method: str, page: bytes, read: Callable[[httpx.Response], Awaitable[str]]) -> Result:
+    times: list[float] = []
+    peak_memory = 0
+    html = ""
+
+    for _ in range(RUNS):
+        async with get_client(page) as client:
+            tracemalloc.start()
+            start = time.perf_counter()
+            async with client.stream("GET", "https://example.com/recipe") as response:
+                html = await read(response)
+            times.append(time.perf_counter() - start)
+            peak_memory = max(peak_memory, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+    return Result(method, len(page), min(times), peak_memory, len(html))
+
+
+async def run() -> list[Result]:
+    results: list[Result] = []
+    for size_mb in PAGE_SIZES_MB:
+        page = fixture_page(size_mb * 1024 * 1024)
+        console.print(f"Reading a {size_mb} MB page...")
+
+        results.append(await time_read("previous", page, read_previous))
+        results.append(await time_read("bytearray", page, read_streaming))
+        results.append(await time_read("bytearray, stop at recipe", page, read_streaming_stop_at_recipe))
+
+    return results
+
+
+def main():
+    results = asyncio.run(run())
+
+    tbl = Table(title="Reading scraped pages")
+    tbl.add_column("Page Size", justify="right", style="cyan")
+    tbl.add_column("Method", style="cyan", no_wrap=True)
+    tbl.add_column("Time", justify="right", style="green")
+    tbl.add_column("Peak Memory", justify="right", style="magenta")
+    tbl.add_column("HTML Read", justify="right")
+
+    for result in results:
+        tbl.add_row(
+            f"{result.page_size / 1024 / 1024:.0f} MB",
+            result.method,
+            f"{result.time * 1000:.1f}ms",
+            f"{result.peak_memory / 1024 / 1024:.1f} MB",
+            f"{result.html_size / 1024:.0f} KB",
+        )
+
+    console.print(tbl)
+
+
+if __name__ == "__main__":
+    main()
@@ -21,6 +21,7 @@ export interface PaginationData<T> {
   per_page: number;
   total: number;
   total_pages: number;
+  total_is_approximate?: boolean;
   items: T[];
 }
 
@@ -5,8 +5,10 @@
 /* Do not modify it by hand - just update the pydantic models and then re-run the script
 */
 
+export type CountStrategy = "exact" | "cached" | "approximate";
 export type OrderByNullPosition = "first" | "last";
 export type OrderDirection = "asc" | "desc";
+export type PaginationMode = "offset" | "cursor";
 export type LogicalOperator = "AND" | "OR";
 export type RelationalKeyword = "IS" | "IS NOT" | "IN" | "NOT IN" | "CONTAINS ALL" | "LIKE" | "NOT LIKE";
 export type RelationalOperator = "=" | "<>" | ">" | "<" | ">=" | "<=";
@@ -27,6 +29,10 @@ export interface PaginationQuery {
   paginationSeed?: string | null;
   page?: number;
   perPage?: number;
+  paginationMode?: PaginationMode;
+  cursor?: string | null;
+  skipCount?: boolean;
+  countStrategy?: CountStrategy;
 }
 export interface QueryFilterJSON {
   parts?: QueryFilterJSONPart[];
@@ -6,6 +6,11 @@ from alembic import context
 import mealie.db.models._all_models  # noqa: F401
 from mealie.core.config import get_app_settings
 from mealie.db.models._model_base import SqlAlchemyBase
+from mealie.db.models.recipe.full_text_search import (
+    SEARCH_VECTOR_COLUMN,
+    SEARCH_VECTOR_INDEXES,
+    is_full_text_search_table,
+)
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -50,6 +55,16 @@ def include_object(object: Any, name: str, type_: str, reflected: bool, compare_
     ):
         return False
 
+    # skip the full-text search tables, columns, and indexes; they are defined manually so alembic doesn't see them
+    # see: revision e4c1a9b27f35
+    if compare_to is None:
+        if type_ == "table" and is_full_text_search_table(name):
+            return False
+        if type_ == "column" and name == SEARCH_VECTOR_COLUMN:
+            return False
+        if type_ == "index" and name in SEARCH_VECTOR_INDEXES:
+            return False
+
     return True
 
 
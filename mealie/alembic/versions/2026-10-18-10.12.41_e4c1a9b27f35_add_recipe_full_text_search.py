@@ -0,0 +1,141 @@
+"""add recipe full text search
+
+Revision ID: e4c1a9b27f35
+Revises: 7cf3054cbbcc
+Create Date: 2026-10-18 10:12:41.337125
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e4c1a9b27f35"
+down_revision: str | None = "7cf3054cbbcc"
+branch_labels: str | tuple[str, ...] | None = None
+depends_on: str | tuple[str, ...] | None = None
+
+RECIPE_COLUMNS = ["name_normalized", "description_normalized"]
+INGREDIENT_COLUMNS = ["note_normalized", "original_text_normalized"]
+
+
+def get_db_type():
+    return op.get_context().dialect.name
+
+
+def sqlite_recipe_index_upgrade():
+    # recipes have GUID primary keys, so the index is keyed on a rowid assigned in a separate table, since VACUUM may
+    # renumber the implicit rowids of the recipes table
+    cols = ", ".join(RECIPE_COLUMNS)
+    new_values = ", ".join(f"new.{col}" for col in RECIPE_COLUMNS)
+    set_new_values = ", ".join(f"{col} = new.{col}" for col in RECIPE_COLUMNS)
+    recipe_values = ", ".join(f"recipes.{col}" for col in RECIPE_COLUMNS)
+
+    op.execute(
+        "CREATE TABLE IF NOT EXISTS recipes_fts_ids (rowid INTEGER PRIMARY KEY, recipe_id CHAR(32) NOT NULL UNIQUE)"
+    )
+    op.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS recipes_fts USING fts5({cols})")
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS recipes_fts_insert AFTER INSERT ON recipes BEGIN "
+        "INSERT INTO recipes_fts_ids (recipe_id) VALUES (new.id); "
+        f"INSERT INTO recipes_fts (rowid, {cols}) VALUES "
+        f"((SELECT rowid FROM recipes_fts_ids WHERE recipe_id = new.id), {new_values}); END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS recipes_fts_delete AFTER DELETE ON recipes BEGIN "
+        "DELETE FROM recipes_fts WHERE rowid = (SELECT rowid FROM recipes_fts_ids WHERE recipe_id = old.id); "
+        "DELETE FROM recipes_fts_ids WHERE recipe_id = old.id; END"
+    )
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS recipes_fts_update AFTER UPDATE OF {cols} ON recipes BEGIN "
+        f"UPDATE recipes_fts SET {set_new_values} "
+        "WHERE rowid = (SELECT rowid FROM recipes_fts_ids WHERE recipe_id = new.id); END"
+    )
+
+    # index the existing rows
+    op.execute("INSERT INTO recipes_fts_ids (recipe_id) SELECT id FROM recipes")
+    op.execute(
+        f"INSERT INTO recipes_fts (rowid, {cols}) SELECT recipes_fts_ids.rowid, {recipe_values} "
+        "FROM recipes JOIN recipes_fts_ids ON recipes_fts_ids.recipe_id = recipes.id"
+    )
+
+
+def sqlite_ingredient_index_upgrade():
+    # ingredients have integer primary keys, which are aliases for their rowids, so the index reads its content from
+    # the ingredients table
+    cols = ", ".join(INGREDIENT_COLUMNS)
+    new_values = ", ".join(f"new.{col}" for col in INGREDIENT_COLUMNS)
+    old_values = ", ".join(f"old.{col}" for col in INGREDIENT_COLUMNS)
+
+    fts_table = "recipes_ingredients_fts"
+    insert_new = f"INSERT INTO {fts_table} (rowid, {cols}) VALUES (new.rowid, {new_values});"
+    delete_old = f"INSERT INTO {fts_table} ({fts_table}, rowid, {cols}) VALUES ('delete', old.rowid, {old_values});"
+
+    op.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5({cols}, content='recipes_ingredients')")
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {fts_table}_insert AFTER INSERT ON recipes_ingredients BEGIN {insert_new} END"
+    )
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {fts_table}_delete AFTER DELETE ON recipes_ingredients BEGIN {delete_old} END"
+    )
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {fts_table}_update AFTER UPDATE OF {cols} ON recipes_ingredients "
+        f"BEGIN {delete_old} {insert_new} END"
+    )
+
+    # index the existing rows
+    op.execute(f"INSERT INTO {fts_table} ({fts_table}) VALUES ('rebuild')")
+
+
+def sqlite_upgrade():
+    sqlite_recipe_index_upgrade()
+    sqlite_ingredient_index_upgrade()
+
+
+def sqlite_downgrade():
+    for fts_table in ["recipes_fts", "recipes_ingredients_fts"]:
+        for action in ["insert", "delete", "update"]:
+            op.execute(f"DROP TRIGGER IF EXISTS {fts_table}_{action}")
+
+        op.execute(f"DROP TABLE IF EXISTS {fts_table}")
+
+    op.execute("DROP TABLE IF EXISTS recipes_fts_ids")
+
+
+def postgres_upgrade():
+    op.execute(
+        "ALTER TABLE recipes ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('simple', coalesce(name_normalized, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(description_normalized, '')), 'B')) STORED"
+    )
+    op.execute(
+        "ALTER TABLE recipes_ingredients ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "to_tsvector('simple', coalesce(note_normalized, '') || ' ' || coalesce(original_text_normalized, ''))"
+        ") STORED"
+    )
+
+    op.create_index("ix_recipes_search_vector", "recipes", ["search_vector"], postgresql_using="gin")
+    op.create_index(
+        "ix_recipes_ingredients_search_vector", "recipes_ingredients", ["search_vector"], postgresql_using="gin"
+    )
+
+
+def postgres_downgrade():
+    op.drop_index("ix_recipes_ingredients_search_vector", table_name="recipes_ingredients")
+    op.drop_index("ix_recipes_search_vector", table_name="recipes")
+
+    op.drop_column("recipes_ingredients", "search_vector")
+    op.drop_column("recipes", "search_vector")
+
+
+def upgrade():
+    if get_db_type() == "postgresql":
+        postgres_upgrade()
+    else:
+        sqlite_upgrade()
+
+
+def downgrade():
+    if get_db_type() == "postgresql":
+        postgres_downgrade()
+    else:
+        sqlite_downgrade()
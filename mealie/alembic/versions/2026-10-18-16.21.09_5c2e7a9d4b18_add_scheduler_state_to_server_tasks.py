@@ -0,0 +1,51 @@
+"""add scheduler state to server tasks
+
+Revision ID: 5c2e7a9d4b18
+Revises: 3b8d5f0e9a61
+Create Date: 2026-10-18 16:21:09.274631
+
+"""
+
+import sqlalchemy as sa
+
+import mealie.db.migration_types
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5c2e7a9d4b18"
+down_revision: str | None = "3b8d5f0e9a61"
+branch_labels: str | tuple[str, ...] | None = None
+depends_on: str | tuple[str, ...] | None = None
+
+
+def upgrade():
+    # server tasks were deprecated and nothing reads the old rows; task names are unique from now on
+    op.execute("DELETE FROM server_tasks")
+
+    with op.batch_alter_table("server_tasks") as batch_op:
+        batch_op.add_column(sa.Column("schedule", sa.String(), nullable=True))
+        batch_op.add_column(sa.Column("next_run_at", sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column("last_started_at", sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column("last_duration", sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column("run_count", sa.Integer(), nullable=False))
+        batch_op.add_column(sa.Column("failure_count", sa.Integer(), nullable=False))
+        batch_op.add_column(sa.Column("lease_id", mealie.db.migration_types.GUID(), nullable=True))
+        batch_op.add_column(sa.Column("leased_until", sa.DateTime(), nullable=True))
+        batch_op.alter_column("group_id", existing_type=mealie.db.migration_types.GUID(), nullable=True)
+        batch_op.create_index(batch_op.f("ix_server_tasks_name"), ["name"], unique=True)
+
+
+def downgrade():
+    op.execute("DELETE FROM server_tasks WHERE group_id IS NULL")
+
+    with op.batch_alter_table("server_tasks") as batch_op:
+        batch_op.drop_index(batch_op.f("ix_server_tasks_name"))
+        batch_op.alter_column("group_id", existing_type=mealie.db.migration_types.GUID(), nullable=False)
+        batch_op.drop_column("leased_until")
+        batch_op.drop_column("lease_id")
+        batch_op.drop_column("failure_count")
+        batch_op.drop_column("run_count")
+        batch_op.drop_column("last_duration")
+        batch_op.drop_column("last_started_at")
+        batch_op.drop_column("next_run_at")
+        batch_op.drop_column("schedule")
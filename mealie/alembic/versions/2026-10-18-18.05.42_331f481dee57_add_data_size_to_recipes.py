@@ -0,0 +1,28 @@
+"""add data size to recipes
+
+Revision ID: 331f481dee57
+Revises: 5c2e7a9d4b18
+Create Date: 2026-10-18 18:05:42.518204
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "331f481dee57"
+down_revision: str | None = "5c2e7a9d4b18"
+branch_labels: str | tuple[str, ...] | None = None
+depends_on: str | tuple[str, ...] | None = None
+
+
+def upgrade():
+    # existing recipes are measured the first time their group's storage is calculated
+    with op.batch_alter_table("recipes") as batch_op:
+        batch_op.add_column(sa.Column("data_size", sa.BigInteger(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("recipes") as batch_op:
+        batch_op.drop_column("data_size")
@@ -20,10 +20,13 @@ from starlette.middleware.sessions import SessionMiddleware
 from mealie.core.config import get_app_settings
 from mealie.core.root_logger import get_logger
 from mealie.core.settings.static import APP_VERSION
+from mealie.pkgs.safehttp import http_clients
 from mealie.routes import router, spa, utility_routes
 from mealie.routes.handlers import register_debug_handler
 from mealie.routes.media import media_router
-from mealie.services.scheduler import SchedulerRegistry, SchedulerService, tasks
+from mealie.services.event_bus_service.event_bus_worker import event_bus_worker
+from mealie.services.recipe.recipe_data_service import shutdown_image_process_pool
+from mealie.services.scheduler import MINUTELY_SCHEDULE, SchedulerRegistry, scheduler_service, tasks
 
 settings = get_app_settings()
 
@@ -65,7 +68,9 @@ async def lifespan_fn(_: FastAPI) -> AsyncGenerator[None, None]:
     init_db.main()
     logger.info("end: database initialization")
 
+    await http_clients.start()
     await start_scheduler()
+    event_bus_worker.start()
 
     logger.info("-----SYSTEM STARTUP-----")
     logger.info("------APP SETTINGS------")
@@ -93,6 +98,10 @@ async def lifespan_fn(_: FastAPI) -> AsyncGenerator[None, None]:
 
     yield
 
+    await scheduler_service.stop()
+    await event_bus_worker.stop()
+    await http_clients.close()
+    shutdown_image_process_pool()
     logger.info("-----SYSTEM SHUTDOWN----- \n")
 
 
@@ -125,16 +134,17 @@ register_debug_handler(app)
 async def start_scheduler():
     SchedulerRegistry.register_daily(
         tasks.purge_expired_tokens,
+        tasks.purge_failed_events,
         tasks.purge_group_registration,
         tasks.purge_password_reset_tokens,
         tasks.purge_group_data_exports,
         tasks.create_mealplan_timeline_events,
         tasks.delete_old_checked_list_items,
+        tasks.reconcile_storage_stats,
     )
 
-    SchedulerRegistry.register_minutely(
-        tasks.post_group_webhooks,
-    )
+    # webhooks are posted for the meal plans since the previous run, which may have been on another server process
+    SchedulerRegistry.register(tasks.post_group_webhooks, MINUTELY_SCHEDULE, last_run_arg="start_dt")
 
     SchedulerRegistry.register_hourly(
         tasks.locked_user_reset,
@@ -142,7 +152,7 @@ async def start_scheduler():
 
     SchedulerRegistry.print_jobs()
 
-    await SchedulerService.start()
+    scheduler_service.start()
 
 
 def api_routers():
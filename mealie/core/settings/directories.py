@@ -5,11 +5,13 @@ class AppDirectories:
     def __init__(self, data_dir: Path) -> None:
         self.DATA_DIR = data_dir
         self.BACKUP_DIR = data_dir.joinpath("backups")
+        self.BACKUP_CHUNKS_DIR = self.BACKUP_DIR.joinpath(".chunks")
         self.USER_DIR = data_dir.joinpath("users")
         self.RECIPE_DATA_DIR = data_dir.joinpath("recipes")
         self.TEMPLATE_DIR = data_dir.joinpath("templates")
 
         self.GROUPS_DIR = self.DATA_DIR.joinpath("groups")
+        self.CACHE_DIR = data_dir.joinpath(".cache")
 
         # Deprecated
         self._TEMP_DIR = data_dir.joinpath(".temp")
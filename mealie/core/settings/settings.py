@@ -190,6 +190,71 @@ class AppSettings(AppLoggingSettings):
     def REDOC_URL(self) -> str | None:
         return "/redoc" if self.API_DOCS else None
 
+    # ===============================================
+    # Event Bus Configuration
+
+    EVENT_BUS_WORKERS: int = 4
+    """Number of threads delivering events to notifiers and webhooks"""
+    EVENT_BUS_BATCH_SIZE: int = 50
+    """Maximum number of queued events delivered at a time"""
+    EVENT_BUS_MAX_ATTEMPTS: int = 8
+    """Number of times delivering an event is attempted before it's marked as failed"""
+    EVENT_BUS_DESTINATION_CONCURRENCY: int = 2
+    """Maximum number of events delivered to the same host at the same time"""
+
+    # ===============================================
+    # Scheduler Configuration
+
+    SCHEDULER_CONCURRENCY: int = 4
+    """Maximum number of scheduled tasks run at the same time"""
+
+    # ===============================================
+    # Bulk Import Configuration
+
+    BULK_IMPORT_CONCURRENCY: int = 10
+    """Maximum number of recipes scraped at the same time during a bulk URL import"""
+    BULK_IMPORT_DOMAIN_CONCURRENCY: int = 2
+    """Maximum number of pages fetched from the same domain at the same time during a bulk URL import"""
+
+    # ===============================================
+    # Image Processing Configuration
+
+    IMAGE_PROCESSING_WORKERS: int = 2
+    """Number of processes used to convert and resize uploaded and scraped images"""
+
+    # ===============================================
+    # Scraper Configuration
+
+    SCRAPER_MAX_HTML_SIZE_MB: int = 10
+    """Maximum size of a scraped page, larger pages are cut off at this size"""
+    SCRAPER_STOP_AT_RECIPE_DATA: bool = False
+    """
+    Stop downloading a page once its JSON-LD recipe data has been read. This makes large pages faster to import,
+    but scrapers for specific sites may need the rest of the page.
+    """
+
+    SCRAPER_CACHE_SIZE_MB: int = 100
+    """Maximum size of the on-disk cache of scraped pages and recipes, set to 0 to disable the cache"""
+    SCRAPER_CACHE_TTL_MINUTES: int = 60
+    """How long a scraped page is used before checking with the site whether it changed"""
+
+    # ===============================================
+    # Backup Configuration
+
+    BACKUP_INCREMENTAL: bool = False
+    """
+    Store the data directory's files once in a shared store in the backups directory, instead of in every backup.
+    Incremental backups can only be restored on the server that created them.
+    """
+    BACKUP_RESTORE_WORKERS: int = 8
+    """Number of threads writing the data directory's files while restoring a backup"""
+
+    # ===============================================
+    # Storage Statistics Configuration
+
+    STORAGE_STATS_WORKERS: int = 8
+    """Number of threads measuring the data directory when its storage statistics are reconciled"""
+
     # ===============================================
     # Database Configuration
 
@@ -0,0 +1,26 @@
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from mealie.core import root_logger
+from mealie.db.models.recipe.full_text_search import rebuild_sqlite_indexes, sqlite_trigger_names
+
+logger = root_logger.get_logger("init_db")
+
+
+def fix_recipe_search_index(session: Session):
+    """
+    On SQLite, migrations that alter the recipe or ingredient tables recreate them, which drops the triggers that
+    keep the full-text search indexes up to date; when that happens, recreate the triggers and rebuild the indexes
+    """
+
+    if session.get_bind().name != "sqlite":
+        return
+
+    existing_triggers = set(session.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'")).scalars())
+    if existing_triggers.issuperset(sqlite_trigger_names()):
+        logger.debug("Recipe search index triggers exist; skipping fix")
+        return
+
+    logger.info("Recipe search index triggers are missing; rebuilding the recipe search index")
+    rebuild_sqlite_indexes(session)
+    session.commit()
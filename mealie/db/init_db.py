@@ -13,6 +13,7 @@ from mealie.core.config import get_app_settings
 from mealie.db.db_setup import session_context
 from mealie.db.fixes.fix_group_with_no_name import fix_group_with_no_name
 from mealie.db.fixes.fix_migration_data import fix_migration_data
+from mealie.db.fixes.fix_recipe_search_index import fix_recipe_search_index
 from mealie.db.fixes.fix_slug_foods import fix_slug_food_names
 from mealie.repos.all_repositories import get_repositories
 from mealie.repos.repository_factory import AllRepositories
@@ -126,6 +127,7 @@ def main():
                 safe_try(lambda: fix_migration_data(session))
                 safe_try(lambda: fix_slug_food_names(db))
                 safe_try(lambda: fix_group_with_no_name(session))
+                safe_try(lambda: fix_recipe_search_index(session))
 
         else:
             logger.info("Database contains no users, initializing...")
@@ -1,16 +1,23 @@
+from collections.abc import Iterable
 from functools import wraps
+from typing import Any
 from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict, Field
-from sqlalchemy import select
-from sqlalchemy.orm import MANYTOMANY, MANYTOONE, ONETOMANY, Session
+from sqlalchemy import event, inspect, select
+from sqlalchemy.exc import MultipleResultsFound
+from sqlalchemy.orm import MANYTOMANY, MANYTOONE, ONETOMANY, ORMExecuteState, Session
 from sqlalchemy.orm.mapper import Mapper
 from sqlalchemy.orm.relationships import RelationshipProperty
 from sqlalchemy.sql.base import ColumnCollection
 
 from .._model_base import SqlAlchemyBase
+from .guid import GUID
 from .helpers import safe_call
 
+IDENTITY_CACHE_KEY = "auto_init_identity_cache"
+LOOKUP_BATCH_SIZE = 500
+
 
 def _default_exclusion() -> set[str]:
     return {"id"}
@@ -66,6 +73,127 @@ def get_lookup_attr(relation_cls: type[SqlAlchemyBase]) -> str:
     return get_attr
 
 
+def _get_identity_cache(session: Session, relation_cls: type[SqlAlchemyBase], get_attr: str) -> dict[Any, Any]:
+    """
+    Returns the cache of rows already looked up by `get_attr` during this transaction. It's cleared when the
+    transaction ends or a bulk update/delete is executed, see `_clear_identity_cache`.
+    """
+    cache: dict[tuple[type[SqlAlchemyBase], str], dict[Any, Any]] = session.info.setdefault(IDENTITY_CACHE_KEY, {})
+    return cache.setdefault((relation_cls, get_attr), {})
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _clear_identity_cache(session: Session):
+    session.info.pop(IDENTITY_CACHE_KEY, None)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _clear_identity_cache_on_bulk_write(orm_execute_state: ORMExecuteState):
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        _clear_identity_cache(orm_execute_state.session)
+
+
+def normalize_lookup_key(relation_cls: type[SqlAlchemyBase], get_attr: str, value: Any) -> Any:
+    """Converts a lookup value to the type it's loaded as, so it can be compared to the values of loaded rows"""
+
+    if value is None or isinstance(value, UUID):
+        return value
+
+    column = relation_cls.__table__.columns.get(get_attr)
+    if column is not None and isinstance(column.type, GUID):
+        return UUID(str(value))
+
+    return value
+
+
+def _get_lookup_value(value: Any, get_attr: str) -> Any:
+    if isinstance(value, dict):
+        return value.get(get_attr)
+    if isinstance(value, str | int | UUID):
+        return value
+
+    return None
+
+
+def _is_cached_instance_valid(
+    instance: SqlAlchemyBase, relation_cls: type[SqlAlchemyBase], get_attr: str, key: Any
+) -> bool:
+    state = inspect(instance)
+    if state.deleted or state.was_deleted or state.detached or get_attr in state.unloaded:
+        return False
+
+    return normalize_lookup_key(relation_cls, get_attr, getattr(instance, get_attr)) == key
+
+
+def get_existing_instances(
+    session: Session, relation_cls: type[SqlAlchemyBase], get_attr: str, values: Iterable[Any]
+) -> dict[Any, SqlAlchemyBase]:
+    """
+    Looks up the rows of `relation_cls` whose `get_attr` matches any of the values, using a single `IN` query
+    (per `LOOKUP_BATCH_SIZE` values) for the values that aren't already in the session's identity cache.
+
+    Returns a dict of the found instances keyed by their normalized lookup value; values without a matching
+    row are missing from the dict.
+    """
+
+    cache = _get_identity_cache(session, relation_cls, get_attr)
+    found: dict[Any, SqlAlchemyBase] = {}
+    missing: dict[Any, None] = {}  # used as an ordered set
+
+    for value in values:
+        key = normalize_lookup_key(relation_cls, get_attr, value)
+        if key is None or key in found or key in missing:
+            continue
+
+        instance = cache.get(key)
+        if instance is not None and _is_cached_instance_valid(instance, relation_cls, get_attr, key):
+            found[key] = instance
+        else:
+            missing[key] = None
+
+    missing_keys = list(missing)
+
+    lookup_column = getattr(relation_cls, get_attr)
+    for i in range(0, len(missing_keys), LOOKUP_BATCH_SIZE):
+        stmt = select(relation_cls).where(lookup_column.in_(missing_keys[i : i + LOOKUP_BATCH_SIZE]))
+        queried: dict[Any, SqlAlchemyBase] = {}
+        for instance in session.execute(stmt).unique().scalars():
+            key = normalize_lookup_key(relation_cls, get_attr, getattr(instance, get_attr))
+            if key in queried:
+                raise MultipleResultsFound(f"Multiple rows were found for {relation_cls.__name__}.{get_attr}={key}")
+
+            queried[key] = instance
+
+        found.update(queried)
+        cache.update(queried)
+
+    return found
+
+
+def prefetch_relationships(session: Session, cls: type[SqlAlchemyBase], all_elements: Iterable[Any]) -> None:
+    """
+    Resolves the many-to-one relationships of every element that's about to be initialized as `cls` with one query
+    per relationship, so each `auto_init` call finds them in the identity cache instead of querying one at a time.
+    """
+
+    elements = [elem for elem in all_elements if isinstance(elem, dict)]
+    if not elements:
+        return
+
+    exclude = _get_config(cls).exclude
+    prop: RelationshipProperty
+    for key, prop in cls.__mapper__.relationships.items():
+        if key in exclude or prop.direction != MANYTOONE or prop.uselist:
+            continue
+
+        relation_cls: type[SqlAlchemyBase] = prop.mapper.entity
+        get_attr = get_lookup_attr(relation_cls)
+        values = [_get_lookup_value(elem.get(key), get_attr) for elem in elements]
+        if any(value is not None for value in values):
+            get_existing_instances(session, relation_cls, get_attr, values)
+
+
 def handle_many_to_many(session, get_attr, relation_cls, all_elements: list[dict]):
     """
     Proxy call to `handle_one_to_many_list` for many-to-many relationships. Because functionally, they do the same
@@ -77,14 +205,15 @@ def handle_one_to_many_list(
     session: Session, get_attr, relation_cls: type[SqlAlchemyBase], all_elements: list[dict] | list[str]
 ):
     elems_to_create: list[dict] = []
-    updated_elems: list[dict] = []
+    updated_elems: list[SqlAlchemyBase | None] = []
 
     cfg = _get_config(relation_cls)
 
-    for elem in all_elements:
-        elem_id = elem.get(get_attr, None) if isinstance(elem, dict) else elem
-        stmt = select(relation_cls).filter_by(**{get_attr: elem_id})
-        existing_elem = session.execute(stmt).scalars().one_or_none()
+    elem_ids = [elem.get(get_attr, None) if isinstance(elem, dict) else elem for elem in all_elements]
+    existing_elems = get_existing_instances(session, relation_cls, get_attr, elem_ids)
+
+    for elem, elem_id in zip(all_elements, elem_ids, strict=True):
+        existing_elem = existing_elems.get(normalize_lookup_key(relation_cls, get_attr, elem_id))
 
         if existing_elem is None and isinstance(elem, dict):
             elems_to_create.append(elem)
@@ -97,6 +226,7 @@ def handle_one_to_many_list(
 
         updated_elems.append(existing_elem)
 
+    prefetch_relationships(session, relation_cls, elems_to_create)
     new_elems = [safe_call(relation_cls, elem.copy(), session=session) for elem in elems_to_create]
     return new_elems + updated_elems
 
@@ -175,9 +305,8 @@ def auto_init():  # sourcery no-metrics
                                 raise ValueError(f"Expected 'id' to be provided for {key}")
 
                         if isinstance(val, str | int | UUID):
-                            stmt = select(relation_cls).filter_by(**{get_attr: val})
-                            instance = session.execute(stmt).scalars().one_or_none()
-                            setattr(self, key, instance)
+                            instances = get_existing_instances(session, relation_cls, get_attr, [val])
+                            setattr(self, key, instances.get(normalize_lookup_key(relation_cls, get_attr, val)))
                         else:
                             # If the value is not of the type defined above we assume that it isn't a valid id
                             # and try a different approach.
@@ -0,0 +1,45 @@
+import hashlib
+import sqlite3
+
+from sqlalchemy import String
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import GenericFunction
+
+SQLITE_FUNCTION_NAME = "mealie_seeded_random"
+
+
+class seeded_random(GenericFunction):
+    """
+    A deterministic pseudo-random sort key for a row: the md5 hash of the row's id and a seed.
+
+    The same seed always produces the same order (so it's stable across pages), while every seed produces
+    a different one. Both databases hash the same 32 character hex representation of the id, so SQLite and
+    Postgres return the same order for the same seed.
+
+    usage: `select(Model).order_by(seeded_random(Model.id, seed))`
+    """
+
+    type = String()
+    inherit_cache = True
+
+
+@compiles(seeded_random, "postgresql")
+def _compile_seeded_random_postgres(element: seeded_random, compiler, **kw):
+    id_col, seed = element.clauses
+    return f"md5(replace(CAST({compiler.process(id_col, **kw)} AS TEXT), '-', '') || {compiler.process(seed, **kw)})"
+
+
+@compiles(seeded_random, "sqlite")
+def _compile_seeded_random_sqlite(element: seeded_random, compiler, **kw):
+    return f"{SQLITE_FUNCTION_NAME}({compiler.process(element.clauses, **kw)})"
+
+
+def _sqlite_seeded_random(value: str | None, seed: str | None) -> str:
+    return hashlib.md5(f"{value or ''}{seed or ''}".encode(), usedforsecurity=False).hexdigest()
+
+
+def register_sqlite_functions(dbapi_connection, _) -> None:
+    """Registers the functions SQLite doesn't provide natively; meant to be attached to an engine's `connect` event"""
+
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.create_function(SQLITE_FUNCTION_NAME, 2, _sqlite_seeded_random, deterministic=True)
@@ -1,5 +1,5 @@
 from .cookbook import CookBook
-from .events import GroupEventNotifierModel, GroupEventNotifierOptionsModel
+from .events import EventBusOutboxModel, GroupEventNotifierModel, GroupEventNotifierOptionsModel
 from .household import Household
 from .household_to_recipe import HouseholdToRecipe
 from .invite_tokens import GroupInviteToken
@@ -18,6 +18,7 @@ from .webhooks import GroupWebhooksModel
 
 __all__ = [
     "CookBook",
+    "EventBusOutboxModel",
     "GroupEventNotifierModel",
     "GroupEventNotifierOptionsModel",
     "GroupInviteToken",
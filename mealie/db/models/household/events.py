@@ -1,10 +1,12 @@
-from typing import TYPE_CHECKING, Optional
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Optional
 
-from sqlalchemy import Boolean, ForeignKey, String, orm
+from sqlalchemy import JSON, Boolean, ForeignKey, Index, Integer, String, orm
 from sqlalchemy.orm import Mapped, mapped_column
 
 from .._model_base import BaseMixins, SqlAlchemyBase
 from .._model_utils.auto_init import auto_init
+from .._model_utils.datetime import NaiveDateTime, get_utc_now
 from .._model_utils.guid import GUID
 
 if TYPE_CHECKING:
@@ -75,3 +77,35 @@ class GroupEventNotifierModel(SqlAlchemyBase, BaseMixins):
     @auto_init()
     def __init__(self, **_) -> None:
         pass
+
+
+class EventBusOutboxModel(SqlAlchemyBase):
+    """
+    Events waiting to be delivered to the event bus listeners. Rows are deleted once every destination received
+    the event, or marked as failed once they run out of attempts.
+    """
+
+    __tablename__ = "event_bus_outbox"
+    __table_args__ = (Index("ix_event_bus_outbox_failed_next_attempt_at", "failed", "next_attempt_at"),)
+
+    id: Mapped[GUID] = mapped_column(GUID, primary_key=True, default=GUID.generate)
+
+    # not foreign keys, so pending events don't prevent deleting their group or household
+    group_id: Mapped[GUID] = mapped_column(GUID, nullable=False)
+    household_id: Mapped[GUID | None] = mapped_column(GUID)
+
+    event_type: Mapped[str] = mapped_column(String, nullable=False)
+    document_data_type: Mapped[str | None] = mapped_column(String)
+    payload: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
+
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    next_attempt_at: Mapped[datetime] = mapped_column(NaiveDateTime, default=get_utc_now, nullable=False)
+    failed: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    last_error: Mapped[str | None] = mapped_column(String)
+
+    # hashes of the destinations that already received the event, which are skipped when it's retried
+    delivered_destinations: Mapped[list[str]] = mapped_column(JSON, default=list, nullable=False)
+
+    # set while a worker is delivering the event; expired leases are claimed again
+    lease_id: Mapped[GUID | None] = mapped_column(GUID, index=True)
+    leased_until: Mapped[datetime | None] = mapped_column(NaiveDateTime)
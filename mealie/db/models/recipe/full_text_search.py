@@ -0,0 +1,265 @@
+"""
+Full-text search indexes for recipe names, descriptions, and ingredients.
+
+SQLite uses FTS5 tables kept up to date by triggers. The ingredient index reads its content from the ingredient table,
+keyed on the integer primary key; recipes have GUID primary keys, so their index is keyed on a rowid assigned in a
+separate table, since `VACUUM` may renumber the implicit rowids of the recipe table. Postgres uses generated tsvector
+columns with GIN indexes. Both index the `*_normalized` columns, which are kept up to date by the SQLAlchemy events on
+the models, so search terms are normalized the same way as the indexed text.
+
+The indexes only match whole words and word prefixes, so every term is also matched as a substring (e.g. "mato" in
+"tomato", or part of a transliterated word from a script written without spaces); the indexes rank the results.
+"""
+
+import re
+
+import sqlalchemy as sa
+from sqlalchemy import DDL, event
+from sqlalchemy.orm import Session
+
+from .._model_utils.guid import GUID
+from .ingredient import RecipeIngredientModel
+from .recipe import RecipeModel
+
+RECIPES_FTS_TABLE = "recipes_fts"
+RECIPES_FTS_IDS_TABLE = "recipes_fts_ids"
+INGREDIENTS_FTS_TABLE = "recipes_ingredients_fts"
+FULL_TEXT_SEARCH_TABLES = [RECIPES_FTS_TABLE, RECIPES_FTS_IDS_TABLE, INGREDIENTS_FTS_TABLE]
+SEARCH_VECTOR_COLUMN = "search_vector"
+SEARCH_VECTOR_INDEXES = ["ix_recipes_search_vector", "ix_recipes_ingredients_search_vector"]
+
+# FTS5 keeps each index in a few shadow tables named after it, e.g. `recipes_fts_data`
+_FTS5_SHADOW_TABLE_SUFFIXES = ["_data", "_idx", "_docsize", "_config", "_content"]
+
+_RECIPE_COLUMNS = ["name_normalized", "description_normalized"]
+_INGREDIENT_COLUMNS = ["note_normalized", "original_text_normalized"]
+
+# bm25 weights for the name and description columns
+_SQLITE_RANK_WEIGHTS = (10.0, 1.0)
+
+_words_regex = re.compile(r"[^\W_]+")
+
+
+def is_full_text_search_table(name: str) -> bool:
+    """
+    Whether `name` is one of the full-text search tables (or the FTS5 shadow tables), which aren't part of the ORM
+    metadata
+    """
+
+    for fts_table in FULL_TEXT_SEARCH_TABLES:
+        if name == fts_table or name in [f"{fts_table}{suffix}" for suffix in _FTS5_SHADOW_TABLE_SUFFIXES]:
+            return True
+
+    return False
+
+
+def _sqlite_recipe_index_statements() -> list[str]:
+    table = RecipeModel.__tablename__
+    cols = ", ".join(_RECIPE_COLUMNS)
+    new_values = ", ".join(f"new.{col}" for col in _RECIPE_COLUMNS)
+    set_new_values = ", ".join(f"{col} = new.{col}" for col in _RECIPE_COLUMNS)
+
+    def fts_rowid(recipe: str) -> str:
+        return f"(SELECT rowid FROM {RECIPES_FTS_IDS_TABLE} WHERE recipe_id = {recipe}.id)"
+
+    return [
+        # `rowid INTEGER PRIMARY KEY` is an alias for the rowid, which makes it stable
+        f"CREATE TABLE IF NOT EXISTS {RECIPES_FTS_IDS_TABLE} "
+        "(rowid INTEGER PRIMARY KEY, recipe_id CHAR(32) NOT NULL UNIQUE)",
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {RECIPES_FTS_TABLE} USING fts5({cols})",
+        f"CREATE TRIGGER IF NOT EXISTS {RECIPES_FTS_TABLE}_insert AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {RECIPES_FTS_IDS_TABLE} (recipe_id) VALUES (new.id); "
+        f"INSERT INTO {RECIPES_FTS_TABLE} (rowid, {cols}) VALUES ({fts_rowid('new')}, {new_values}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {RECIPES_FTS_TABLE}_delete AFTER DELETE ON {table} BEGIN "
+        f"DELETE FROM {RECIPES_FTS_TABLE} WHERE rowid = {fts_rowid('old')}; "
+        f"DELETE FROM {RECIPES_FTS_IDS_TABLE} WHERE recipe_id = old.id; END",
+        f"CREATE TRIGGER IF NOT EXISTS {RECIPES_FTS_TABLE}_update AFTER UPDATE OF {cols} ON {table} BEGIN "
+        f"UPDATE {RECIPES_FTS_TABLE} SET {set_new_values} WHERE rowid = {fts_rowid('new')}; END",
+    ]
+
+
+def _sqlite_ingredient_index_statements() -> list[str]:
+    # ingredients have integer primary keys, which are aliases for their rowids, so the rowids are stable
+    table = RecipeIngredientModel.__tablename__
+    fts_table = INGREDIENTS_FTS_TABLE
+    cols = ", ".join(_INGREDIENT_COLUMNS)
+    new_values = ", ".join(f"new.{col}" for col in _INGREDIENT_COLUMNS)
+    old_values = ", ".join(f"old.{col}" for col in _INGREDIENT_COLUMNS)
+
+    insert_new = f"INSERT INTO {fts_table} (rowid, {cols}) VALUES (new.rowid, {new_values});"
+    delete_old = f"INSERT INTO {fts_table} ({fts_table}, rowid, {cols}) VALUES ('delete', old.rowid, {old_values});"
+
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5({cols}, content='{table}')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts_table}_insert AFTER INSERT ON {table} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts_table}_delete AFTER DELETE ON {table} BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts_table}_update AFTER UPDATE OF {cols} ON {table} "
+        f"BEGIN {delete_old} {insert_new} END",
+    ]
+
+
+def sqlite_trigger_names() -> list[str]:
+    return [
+        f"{fts_table}_{action}"
+        for fts_table in [RECIPES_FTS_TABLE, INGREDIENTS_FTS_TABLE]
+        for action in ["insert", "delete", "update"]
+    ]
+
+
+def rebuild_sqlite_indexes(session: Session) -> None:
+    """
+    Creates any missing FTS5 tables and triggers, and rebuilds the indexes from the recipe and ingredient tables,
+    e.g. after a migration recreated those tables (which drops their triggers)
+    """
+
+    for statement in _sqlite_recipe_index_statements() + _sqlite_ingredient_index_statements():
+        session.execute(sa.text(statement))
+
+    cols = ", ".join(_RECIPE_COLUMNS)
+    recipe_values = ", ".join(f"recipes.{col}" for col in _RECIPE_COLUMNS)
+    for statement in [
+        f"DELETE FROM {RECIPES_FTS_TABLE}",
+        f"DELETE FROM {RECIPES_FTS_IDS_TABLE}",
+        f"INSERT INTO {RECIPES_FTS_IDS_TABLE} (recipe_id) SELECT id FROM {RecipeModel.__tablename__}",
+        f"INSERT INTO {RECIPES_FTS_TABLE} (rowid, {cols}) SELECT ids.rowid, {recipe_values} "
+        f"FROM {RecipeModel.__tablename__} recipes JOIN {RECIPES_FTS_IDS_TABLE} ids ON ids.recipe_id = recipes.id",
+        f"INSERT INTO {INGREDIENTS_FTS_TABLE} ({INGREDIENTS_FTS_TABLE}) VALUES ('rebuild')",
+    ]:
+        session.execute(sa.text(statement))
+
+
+def _register_create_events() -> None:
+    """Creates the indexes along with their tables, for databases created with `metadata.create_all`"""
+
+    tables = {model.__tablename__: model.__table__ for model in [RecipeModel, RecipeIngredientModel]}
+    sqlite_statements = {
+        RecipeModel.__tablename__: _sqlite_recipe_index_statements(),
+        RecipeIngredientModel.__tablename__: _sqlite_ingredient_index_statements(),
+    }
+    for table, statements in sqlite_statements.items():
+        for statement in statements:
+            event.listen(tables[table], "after_create", DDL(statement).execute_if(dialect="sqlite"))
+
+    postgres_statements = {
+        RecipeModel.__tablename__: [
+            f"ALTER TABLE recipes ADD COLUMN {SEARCH_VECTOR_COLUMN} tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('simple', coalesce(name_normalized, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(description_normalized, '')), 'B')) STORED",
+            f"CREATE INDEX {SEARCH_VECTOR_INDEXES[0]} ON recipes USING gin ({SEARCH_VECTOR_COLUMN})",
+        ],
+        RecipeIngredientModel.__tablename__: [
+            f"ALTER TABLE recipes_ingredients ADD COLUMN {SEARCH_VECTOR_COLUMN} tsvector GENERATED ALWAYS AS ("
+            "to_tsvector('simple', coalesce(note_normalized, '') || ' ' || coalesce(original_text_normalized, ''))"
+            ") STORED",
+            f"CREATE INDEX {SEARCH_VECTOR_INDEXES[1]} ON recipes_ingredients USING gin ({SEARCH_VECTOR_COLUMN})",
+        ],
+    }
+    for table, statements in postgres_statements.items():
+        for statement in statements:
+            event.listen(tables[table], "after_create", DDL(statement).execute_if(dialect="postgresql"))
+
+
+_register_create_events()
+
+
+def _search_phrases(search_list: list[str]) -> list[tuple[str, list[str]]]:
+    """Splits each search term into its words, matching how the indexes tokenize text"""
+
+    phrases = [(term, _words_regex.findall(term)) for term in search_list]
+    return [(term, words) for term, words in phrases if words]
+
+
+def _sqlite_match_query(phrases: list[list[str]]) -> str:
+    # any phrase can match; the last word of each phrase is a prefix, e.g. `"animal slo" *`
+    return " OR ".join(f'"{" ".join(words)}" *' for words in phrases)
+
+
+def _postgres_tsquery(phrases: list[list[str]]) -> str:
+    # any phrase can match; the last word of each phrase is a prefix, e.g. `(animal <-> slo:*)`
+    return " | ".join(f"({' <-> '.join([*words[:-1], f'{words[-1]}:*'])})" for words in phrases)
+
+
+def _postgres_vectors() -> tuple[sa.ColumnElement, sa.ColumnElement]:
+    return (
+        sa.literal_column(f"{RecipeModel.__tablename__}.{SEARCH_VECTOR_COLUMN}"),
+        sa.literal_column(f"{RecipeIngredientModel.__tablename__}.{SEARCH_VECTOR_COLUMN}"),
+    )
+
+
+def _sqlite_ingredient_matches(match_query: str) -> sa.Select:
+    ingredients_fts = sa.table(INGREDIENTS_FTS_TABLE, sa.column("rowid"))
+    return sa.select(RecipeIngredientModel.recipe_id).where(
+        sa.literal_column(f"{RecipeIngredientModel.__tablename__}.rowid").in_(
+            sa.select(ingredients_fts.c.rowid).where(sa.literal_column(INGREDIENTS_FTS_TABLE).op("MATCH")(match_query))
+        )
+    )
+
+
+def _substring_match(term: str) -> sa.ColumnElement[bool]:
+    """Whether a recipe's name, description, or ingredients contain the term anywhere, e.g. in the middle of a word"""
+
+    ingredient_matches = sa.select(RecipeIngredientModel.recipe_id).where(
+        sa.or_(
+            RecipeIngredientModel.note_normalized.like(f"%{term}%"),
+            RecipeIngredientModel.original_text_normalized.like(f"%{term}%"),
+        )
+    )
+    return sa.or_(
+        RecipeModel.name_normalized.like(f"%{term}%"),
+        RecipeModel.description_normalized.like(f"%{term}%"),
+        RecipeModel.id.in_(ingredient_matches),
+    )
+
+
+def filter_query_by_full_text_search(query: sa.Select, session: Session, search: str, search_list: list[str]):
+    """
+    Filters a recipe query to recipes whose name, description, or ingredients match any of the search terms,
+    ordered by exact name matches first, then by rank (name matches rank above description matches).
+
+    Terms are matched as words or word prefixes using the full-text search indexes, and as substrings (e.g. the
+    middle of a word), which scans the recipes; only recipes that match the indexes are ranked.
+    """
+
+    phrases = _search_phrases(search_list)
+    if not phrases:
+        return query.filter(sa.false())
+
+    word_phrases = [words for _, words in phrases]
+    substring_matches = [_substring_match(term) for term, _ in phrases]
+    name_match = sa.desc(RecipeModel.name_normalized.like(f"%{search}%"))
+
+    if session.get_bind().name == "postgresql":
+        tsquery = sa.func.to_tsquery(sa.literal_column("'simple'"), _postgres_tsquery(word_phrases))
+        recipe_vector, ingredient_vector = _postgres_vectors()
+
+        ingredient_matches = sa.select(RecipeIngredientModel.recipe_id).where(ingredient_vector.op("@@")(tsquery))
+        return query.filter(
+            sa.or_(recipe_vector.op("@@")(tsquery), RecipeModel.id.in_(ingredient_matches), *substring_matches)
+        ).order_by(name_match, sa.desc(sa.func.ts_rank(recipe_vector, tsquery)))
+
+    match_query = _sqlite_match_query(word_phrases)
+    recipes_fts = sa.table(RECIPES_FTS_TABLE, sa.column("rowid"))
+    recipe_ids = sa.table(RECIPES_FTS_IDS_TABLE, sa.column("rowid"), sa.column("recipe_id", GUID))
+
+    ranked_recipes = (
+        sa.select(
+            recipe_ids.c.recipe_id,
+            sa.func.bm25(sa.literal_column(RECIPES_FTS_TABLE), *_SQLITE_RANK_WEIGHTS).label("rank"),
+        )
+        .join(recipes_fts, recipes_fts.c.rowid == recipe_ids.c.rowid)
+        .where(sa.literal_column(RECIPES_FTS_TABLE).op("MATCH")(match_query))
+        .subquery()
+    )
+
+    # bm25 scores are negative, and lower is better
+    return (
+        query.outerjoin(ranked_recipes, ranked_recipes.c.recipe_id == RecipeModel.id)
+        .filter(
+            sa.or_(
+                ranked_recipes.c.recipe_id.is_not(None),
+                RecipeModel.id.in_(_sqlite_ingredient_matches(match_query)),
+                *substring_matches,
+            )
+        )
+        .order_by(name_match, sa.nulls_last(ranked_recipes.c.rank.asc()))
+    )
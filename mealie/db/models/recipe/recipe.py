@@ -11,7 +11,7 @@ from sqlalchemy.orm import Mapped, mapped_column, validates
 from sqlalchemy.orm.attributes import get_history
 from sqlalchemy.orm.session import object_session
 
-from mealie.db.models._model_utils.auto_init import auto_init
+from mealie.db.models._model_utils.auto_init import auto_init, prefetch_relationships
 from mealie.db.models._model_utils.datetime import NaiveDateTime, get_utc_today
 from mealie.db.models._model_utils.guid import GUID
 
@@ -143,6 +143,9 @@ class RecipeModel(SqlAlchemyBase, BaseMixins):
         "Household", secondary=HouseholdToRecipe.__tablename__, back_populates="made_recipes"
     )
 
+    # Size in bytes of the recipe's images and assets, None until it's measured
+    data_size: Mapped[int | None] = mapped_column(sa.BigInteger)
+
     # Shopping List Refs
     shopping_list_refs: Mapped[list["ShoppingListRecipeReference"]] = orm.relationship(
         "ShoppingListRecipeReference",
@@ -202,6 +205,7 @@ class RecipeModel(SqlAlchemyBase, BaseMixins):
             self.recipe_instructions = [RecipeInstruction(**step, session=session) for step in recipe_instructions]
 
         if recipe_ingredient is not None:
+            prefetch_relationships(session, RecipeIngredientModel, recipe_ingredient)
             self.recipe_ingredient = [RecipeIngredientModel(**ingr, session=session) for ingr in recipe_ingredient]
 
         if assets:
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey, String, orm
+from sqlalchemy import Float, ForeignKey, Integer, String, orm
 from sqlalchemy.orm import Mapped, mapped_column
 
 from mealie.db.models._model_base import BaseMixins, SqlAlchemyBase
@@ -15,15 +15,27 @@ if TYPE_CHECKING:
 
 
 class ServerTaskModel(SqlAlchemyBase, BaseMixins):
-    # Server Tasks are deprecated, but the table still exists in the database
+    """The state of a task run by the scheduler, shared by every server process"""
 
     __tablename__ = "server_tasks"
-    name: Mapped[str] = mapped_column(String, nullable=False)
+    name: Mapped[str] = mapped_column(String, nullable=False, unique=True, index=True)
     completed_date: Mapped[datetime] = mapped_column(NaiveDateTime, nullable=True)
     status: Mapped[str] = mapped_column(String, nullable=False)
     log: Mapped[str] = mapped_column(String, nullable=True)
 
-    group_id: Mapped[GUID] = mapped_column(GUID, ForeignKey("groups.id"), nullable=False, index=True)
+    schedule: Mapped[str | None] = mapped_column(String, nullable=True)
+    next_run_at: Mapped[datetime | None] = mapped_column(NaiveDateTime, nullable=True)
+    last_started_at: Mapped[datetime | None] = mapped_column(NaiveDateTime, nullable=True)
+    last_duration: Mapped[float | None] = mapped_column(Float, nullable=True)
+    run_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    failure_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    # the process running the task holds a lease, so other processes don't run it at the same time
+    lease_id: Mapped[GUID | None] = mapped_column(GUID, nullable=True)
+    leased_until: Mapped[datetime | None] = mapped_column(NaiveDateTime, nullable=True)
+
+    # scheduled tasks are server-wide; only deprecated tasks belong to a group
+    group_id: Mapped[GUID | None] = mapped_column(GUID, ForeignKey("groups.id"), nullable=True, index=True)
     group: Mapped["Group"] = orm.relationship("Group", back_populates="server_tasks")
 
     @auto_init()
@@ -1 +1,2 @@
 from .cache_key import *
+from .query_cache import *
@@ -0,0 +1,159 @@
+"""
+An in-process cache for the results of database queries, invalidated when the tables they read from are written to.
+"""
+
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable
+from dataclasses import dataclass, replace
+
+import sqlalchemy as sa
+from sqlalchemy import event, orm
+from sqlalchemy.sql.util import find_tables
+
+__all__ = ["QueryCache", "QueryCacheStats"]
+
+
+@dataclass(slots=True)
+class QueryCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0  # entries dropped to stay under `max_entries`
+    invalidations: int = 0  # entries dropped because a table they read from was written to
+    size: int = 0
+
+
+class QueryCache[T]:
+    """
+    In-process LRU cache of query results. Each entry is registered under every table its query reads from,
+    and is dropped as soon as one of those tables is written to (see the session listeners below). The TTL
+    covers writes made by other processes, which this cache can't see.
+    """
+
+    def __init__(self, ttl_seconds: float = 300, max_entries: int = 1024) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, tuple[float, T, frozenset[str]]] = OrderedDict()
+        self._keys_by_table: dict[str, set[Hashable]] = {}
+        self._stats = QueryCacheStats()
+
+        _caches.add(self)
+
+    @staticmethod
+    def tables_for_query(query: sa.Select) -> frozenset[str]:
+        # ORM joins are only resolved into the final FROM list, so we need to inspect both
+        elements = [query, *query.get_final_froms()]
+        return frozenset(
+            table.name
+            for element in elements
+            for table in find_tables(element, include_joins=True)
+            if isinstance(table, sa.Table)
+        )
+
+    def get(self, key: Hashable) -> T | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats.misses += 1
+                return None
+
+            expires_at, value, _ = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                self._stats.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: T, tables: frozenset[str]) -> None:
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value, tables)
+            for table in tables:
+                self._keys_by_table.setdefault(table, set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._stats.evictions += 1
+
+    def invalidate(self, tables: Iterable[str]) -> None:
+        with self._lock:
+            for table in tables:
+                for key in list(self._keys_by_table.pop(table, ())):
+                    if key in self._entries:
+                        self._remove(key)
+                        self._stats.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_table.clear()
+
+    def stats(self) -> QueryCacheStats:
+        with self._lock:
+            return replace(self._stats, size=len(self._entries))
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+
+        for table in entry[2]:
+            keys = self._keys_by_table.get(table)
+            if keys is None:
+                continue
+
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_table[table]
+
+
+_caches: weakref.WeakSet[QueryCache] = weakref.WeakSet()
+
+_WRITTEN_TABLES_KEY = "query_cache_written_tables"
+
+
+def _record_written_tables(session: orm.Session, tables: Iterable[str]) -> None:
+    tables = set(tables)
+    if not tables:
+        return
+
+    # invalidate right away so this session doesn't read stale results, and again on commit in case
+    # another session cached results from before the commit
+    for cache in list(_caches):
+        cache.invalidate(tables)
+    session.info.setdefault(_WRITTEN_TABLES_KEY, set()).update(tables)
+
+
+@event.listens_for(orm.Session, "after_flush")
+def _record_flushed_tables(session: orm.Session, _):
+    tables: set[str] = set()
+    for instance in [*session.new, *session.dirty, *session.deleted]:
+        tables.update(table.name for table in sa.inspect(instance).mapper.tables if isinstance(table, sa.Table))
+
+    _record_written_tables(session, tables)
+
+
+@event.listens_for(orm.Session, "do_orm_execute")
+def _record_bulk_statement_tables(orm_execute_state: orm.ORMExecuteState):
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+
+    table = getattr(orm_execute_state.statement, "table", None)
+    if isinstance(table, sa.Table):
+        _record_written_tables(orm_execute_state.session, [table.name])
+
+
+@event.listens_for(orm.Session, "after_commit")
+@event.listens_for(orm.Session, "after_rollback")
+def _invalidate_written_tables(session: orm.Session):
+    tables = session.info.pop(_WRITTEN_TABLES_KEY, None)
+    if tables:
+        for cache in list(_caches):
+            cache.invalidate(tables)
@@ -1,3 +1,4 @@
+import io
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from logging import Logger
@@ -108,7 +109,18 @@ class PillowMinifier(ABCMinifier):
             )
         )
 
+    @staticmethod
+    def _encode(img: Image.Image, image_format: ImageFormat, quality: int = 100) -> bytes:
+        buffer = io.BytesIO()
+        img.save(buffer, image_format.format, quality=quality)
+        return buffer.getvalue()
+
     def minify(self, image_file: Path, force=True):
+        """
+        Creates the original, miniature, and tiny WebP images next to `image_file`. The source image
+        is only decoded once, and every rendition is derived from the same in-memory image.
+        """
+
         if not image_file.exists():
             raise FileNotFoundError(f"{image_file.name} does not exist")
 
@@ -120,33 +132,30 @@ class PillowMinifier(ABCMinifier):
             self._logger.info(f"{image_file.name} already minified")
             return
 
-        success = False
+        renditions = {org_dest: self._opts.original, min_dest: self._opts.miniature, tiny_dest: self._opts.tiny}
+        if not force:
+            renditions = {dest: enabled and not dest.exists() for dest, enabled in renditions.items()}
 
-        if self._opts.original:
-            if not force and org_dest.exists():
-                self._logger.info(f"{image_file.name} already minified")
-            else:
-                PillowMinifier.to_webp(image_file, org_dest, quality=70)
-                success = True
+        if not any(renditions.values()):
+            return
+
+        with Image.open(image_file) as src:
+            img = ImageOps.exif_transpose(src)
+            if img.mode not in WEBP.modes:
+                img = img.convert(WEBP.modes[0])
+
+            # the original and the miniature are the same image, so it's only encoded once
+            if renditions[org_dest] or renditions[min_dest]:
+                webp = self._encode(img, WEBP, quality=70)
+                for dest in [org_dest, min_dest]:
+                    if renditions[dest]:
+                        dest.write_bytes(webp)
 
-        if self._opts.miniature:
-            if not force and min_dest.exists():
-                self._logger.info(f"{image_file.name} already minified")
-            else:
-                PillowMinifier.to_webp(image_file, min_dest, quality=70)
                 self._logger.info(f"{image_file.name} minified")
-                success = True
-
-        if self._opts.tiny:
-            if not force and tiny_dest.exists():
-                self._logger.info(f"{image_file.name} already minified")
-            else:
-                img = Image.open(image_file)
-                img = ImageOps.exif_transpose(img)
-                tiny_image = PillowMinifier.crop_center(img)
-                tiny_image.save(tiny_dest, WEBP.format, quality=70)
+
+            if renditions[tiny_dest]:
+                PillowMinifier.crop_center(img).save(tiny_dest, WEBP.format, quality=70)
                 self._logger.info("Tiny image saved")
-                success = True
 
-        if self._purge and success:
+        if self._purge:
             self.purge(image_file)
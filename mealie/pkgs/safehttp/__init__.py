@@ -1,7 +1,15 @@
+from .clients import ClientPurpose, HTTPClientManager, http_clients
+from .dns import DNSCache, DNSCacheStats, dns_cache
 from .transport import AsyncSafeTransport, ForcedTimeoutException, InvalidDomainError
 
 __all__ = [
     "AsyncSafeTransport",
+    "ClientPurpose",
+    "DNSCache",
+    "DNSCacheStats",
     "ForcedTimeoutException",
+    "HTTPClientManager",
     "InvalidDomainError",
+    "dns_cache",
+    "http_clients",
 ]
@@ -0,0 +1,137 @@
+"""
+Application-lifetime HTTP clients, shared by all outbound requests so connections are kept alive and reused instead of
+paying for DNS resolution, TCP, and TLS setup on every request.
+
+Clients are keyed by purpose, each with its own connection limits. The async clients are bound to the event loop that
+started them (the app's, see `lifespan_fn`); callers on any other event loop (e.g. `asyncio.run` in a migration) get a
+short-lived client with the same configuration instead.
+
+The clients are shared by every user and group, so they never store cookies, which would otherwise be sent along with
+other users' requests.
+"""
+
+import asyncio
+import threading
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from enum import Enum
+from http.cookiejar import CookieJar
+
+import httpx
+
+from .transport import AsyncSafeTransport
+
+
+class NoCookieJar(CookieJar):
+    """A cookie jar that never stores cookies, so the cookies a site sets aren't sent on any later request"""
+
+    def extract_cookies(self, response, request) -> None:
+        pass
+
+    def set_cookie(self, cookie) -> None:
+        pass
+
+
+class ClientPurpose(Enum):
+    scraper = "scraper"
+    images = "images"
+    webhooks = "webhooks"
+
+
+@dataclass(slots=True, frozen=True)
+class ClientConfig:
+    limits: httpx.Limits
+    safe: bool
+    """Whether requests go through `AsyncSafeTransport`, which refuses to connect to private addresses"""
+    follow_redirects: bool = False
+
+
+CLIENT_CONFIGS: dict[ClientPurpose, ClientConfig] = {
+    ClientPurpose.scraper: ClientConfig(
+        httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30), safe=True
+    ),
+    ClientPurpose.images: ClientConfig(
+        httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30), safe=True
+    ),
+    # webhooks are configured by the household, and are often on the local network (e.g. Home Assistant)
+    ClientPurpose.webhooks: ClientConfig(
+        httpx.Limits(max_connections=10, max_keepalive_connections=5, keepalive_expiry=60),
+        safe=False,
+        follow_redirects=True,
+    ),
+}
+
+
+class HTTPClientManager:
+    def __init__(self, configs: dict[ClientPurpose, ClientConfig] | None = None) -> None:
+        self.configs = configs or CLIENT_CONFIGS
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._async_clients: dict[ClientPurpose, httpx.AsyncClient] = {}
+        self._clients: dict[ClientPurpose, httpx.Client] = {}
+        self._lock = threading.Lock()
+
+    def _new_async_client(self, purpose: ClientPurpose) -> httpx.AsyncClient:
+        config = self.configs[purpose]
+        transport: httpx.AsyncBaseTransport
+        if config.safe:
+            transport = AsyncSafeTransport(limits=config.limits)
+        else:
+            transport = httpx.AsyncHTTPTransport(limits=config.limits)
+
+        return httpx.AsyncClient(transport=transport, cookies=NoCookieJar(), follow_redirects=config.follow_redirects)
+
+    async def start(self) -> None:
+        """Creates the shared async clients on the running event loop"""
+
+        await self.close()
+
+        self._loop = asyncio.get_running_loop()
+        self._async_clients = {purpose: self._new_async_client(purpose) for purpose in self.configs}
+
+    async def close(self) -> None:
+        async_clients, self._async_clients = self._async_clients, {}
+        for async_client in async_clients.values():
+            await async_client.aclose()
+
+        with self._lock:
+            clients, self._clients = self._clients, {}
+        for client in clients.values():
+            client.close()
+
+        self._loop = None
+
+    @asynccontextmanager
+    async def async_client(self, purpose: ClientPurpose) -> AsyncGenerator[httpx.AsyncClient, None]:
+        """
+        The shared async client for `purpose`, or a short-lived one if the shared clients aren't started
+        or belong to a different event loop
+        """
+
+        shared_client = self._async_clients.get(purpose)
+        if shared_client is not None and asyncio.get_running_loop() is self._loop:
+            yield shared_client
+            return
+
+        async with self._new_async_client(purpose) as client:
+            yield client
+
+    def client(self, purpose: ClientPurpose) -> httpx.Client:
+        """The shared synchronous client for `purpose`, which is safe to use from multiple threads"""
+
+        config = self.configs[purpose]
+        if config.safe:
+            raise ValueError(f"{purpose.name} requests must use the async client, which checks the destination")
+
+        with self._lock:
+            if (client := self._clients.get(purpose)) is None:
+                client = httpx.Client(
+                    limits=config.limits, cookies=NoCookieJar(), follow_redirects=config.follow_redirects
+                )
+                self._clients[purpose] = client
+
+        return client
+
+
+http_clients = HTTPClientManager()
@@ -0,0 +1,125 @@
+import asyncio
+import ipaddress
+import socket
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, replace
+
+IPAddress = ipaddress.IPv4Address | ipaddress.IPv6Address
+Resolver = Callable[[str], Awaitable[list[str]]]
+
+
+async def system_resolver(host: str) -> list[str]:
+    """Resolves `host` with the system resolver, in the event loop's thread pool instead of blocking the loop"""
+
+    infos = await asyncio.get_running_loop().getaddrinfo(host, None, type=socket.SOCK_STREAM)
+    return list(dict.fromkeys(str(info[4][0]) for info in infos))
+
+
+@dataclass(slots=True)
+class DNSCacheStats:
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0  # misses that waited on a lookup already in flight for the same host
+    errors: int = 0
+    evictions: int = 0  # entries dropped to stay under `max_entries`
+    size: int = 0
+
+
+class DNSCache:
+    """
+    In-process LRU cache of hostname resolutions. Concurrent lookups of the same host on an event loop share a single
+    resolver call, and failed lookups aren't cached.
+    """
+
+    def __init__(self, resolver: Resolver = system_resolver, ttl_seconds: float = 300, max_entries: int = 1024) -> None:
+        self.resolver = resolver
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, tuple[IPAddress, ...]]] = OrderedDict()
+        self._pending: dict[tuple[asyncio.AbstractEventLoop, str], asyncio.Future[tuple[IPAddress, ...]]] = {}
+        self._stats = DNSCacheStats()
+
+    def _get(self, host: str) -> tuple[IPAddress, ...] | None:
+        with self._lock:
+            entry = self._entries.get(host)
+            if entry is None:
+                return None
+
+            expires_at, addresses = entry
+            if expires_at <= time.monotonic():
+                del self._entries[host]
+                return None
+
+            self._entries.move_to_end(host)
+            self._stats.hits += 1
+            return addresses
+
+    def _set(self, host: str, addresses: tuple[IPAddress, ...]) -> None:
+        with self._lock:
+            self._entries[host] = (time.monotonic() + self.ttl_seconds, addresses)
+            self._entries.move_to_end(host)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats.evictions += 1
+
+    async def _lookup(self, host: str) -> tuple[IPAddress, ...]:
+        try:
+            addresses = tuple(ipaddress.ip_address(address) for address in await self.resolver(host))
+            if not addresses:
+                raise socket.gaierror(socket.EAI_NONAME, f"no addresses found for {host}")
+        except Exception:
+            with self._lock:
+                self._stats.errors += 1
+            raise
+
+        self._set(host, addresses)
+        return addresses
+
+    async def resolve(self, host: str) -> tuple[IPAddress, ...]:
+        """The addresses `host` resolves to; IP addresses are returned as-is"""
+
+        try:
+            return (ipaddress.ip_address(host),)
+        except ValueError:
+            pass
+
+        host = host.lower()
+        if (addresses := self._get(host)) is not None:
+            return addresses
+
+        key = (asyncio.get_running_loop(), host)
+        with self._lock:
+            self._stats.misses += 1
+            pending = self._pending.get(key)
+            if pending is not None:
+                self._stats.coalesced += 1
+
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.ensure_future(self._lookup(host))
+        with self._lock:
+            self._pending[key] = future
+        try:
+            return await asyncio.shield(future)
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> DNSCacheStats:
+        with self._lock:
+            return replace(self._stats, size=len(self._entries))
+
+
+dns_cache = DNSCache()
+"""Shared by every `AsyncSafeTransport`, so short-lived clients benefit from earlier lookups too"""
@@ -1,9 +1,14 @@
-import ipaddress
+import contextlib
 import logging
-import socket
+import ssl
+from collections.abc import AsyncIterable, AsyncIterator, Generator, Iterable
 
+import httpcore
 import httpx
 
+from .dns import DNSCache, IPAddress
+from .dns import dns_cache as default_dns_cache
+
 
 class ForcedTimeoutException(Exception):
     """
@@ -21,58 +26,189 @@ class InvalidDomainError(Exception):
     ...
 
 
-class AsyncSafeTransport(httpx.AsyncBaseTransport):
+class _ValidatedNetworkBackend(httpcore.AsyncNetworkBackend):
     """
-    A wrapper around the httpx transport class that enforces a timeout value
-    and that the request is not made to a local IP address.
+    Opens connections to the addresses validated by the transport, rather than letting the default backend resolve
+    the host again (which could return a different, private address). TLS still uses the requested hostname.
     """
 
-    timeout: int = 15
-
-    def __init__(self, log: logging.Logger | None = None, **kwargs):
-        self.timeout = kwargs.pop("timeout", self.timeout)
-        self._wrapper = httpx.AsyncHTTPTransport(**kwargs)
-        self._log = log
+    def __init__(self, transport: "AsyncSafeTransport", backend: httpcore.AsyncNetworkBackend) -> None:
+        self.transport = transport
+        self.backend = backend
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: float | None = None,
+        local_address: str | None = None,
+        socket_options: Iterable[httpcore.SOCKET_OPTION] | None = None,
+    ) -> httpcore.AsyncNetworkStream:
+        addresses = await self.transport.validate_host(host)
+
+        error: httpcore.ConnectError | None = None
+        for address in addresses:
+            try:
+                return await self.backend.connect_tcp(
+                    str(address), port, timeout=timeout, local_address=local_address, socket_options=socket_options
+                )
+            except httpcore.ConnectError as e:
+                error = e
+
+        assert error is not None
+        raise error
+
+    async def connect_unix_socket(
+        self, path: str, timeout: float | None = None, socket_options: Iterable[httpcore.SOCKET_OPTION] | None = None
+    ) -> httpcore.AsyncNetworkStream:
+        return await self.backend.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self.backend.sleep(seconds)
+
+
+# httpcore errors and the httpx errors they're raised as, so callers only need to handle httpx errors;
+# more specific errors are listed after the errors they subclass
+_HTTPCORE_ERRORS: list[tuple[type[Exception], type[httpx.HTTPError]]] = [
+    (httpcore.TimeoutException, httpx.TimeoutException),
+    (httpcore.ConnectTimeout, httpx.ConnectTimeout),
+    (httpcore.ReadTimeout, httpx.ReadTimeout),
+    (httpcore.WriteTimeout, httpx.WriteTimeout),
+    (httpcore.PoolTimeout, httpx.PoolTimeout),
+    (httpcore.NetworkError, httpx.NetworkError),
+    (httpcore.ConnectError, httpx.ConnectError),
+    (httpcore.ReadError, httpx.ReadError),
+    (httpcore.WriteError, httpx.WriteError),
+    (httpcore.ProxyError, httpx.ProxyError),
+    (httpcore.UnsupportedProtocol, httpx.UnsupportedProtocol),
+    (httpcore.ProtocolError, httpx.ProtocolError),
+    (httpcore.LocalProtocolError, httpx.LocalProtocolError),
+    (httpcore.RemoteProtocolError, httpx.RemoteProtocolError),
+]
+
+
+@contextlib.contextmanager
+def _map_httpcore_errors() -> Generator[None, None, None]:
+    try:
+        yield
+    except Exception as e:
+        mapped_error: type[httpx.HTTPError] | None = None
+        for httpcore_error, httpx_error in _HTTPCORE_ERRORS:
+            if isinstance(e, httpcore_error) and (mapped_error is None or issubclass(httpx_error, mapped_error)):
+                mapped_error = httpx_error
+
+        if mapped_error is None:
+            raise
+
+        raise mapped_error(str(e)) from e
+
+
+class _ResponseStream(httpx.AsyncByteStream):
+    def __init__(self, stream: AsyncIterable[bytes]) -> None:
+        self.stream = stream
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        with _map_httpcore_errors():
+            async for part in self.stream:
+                yield part
+
+    async def aclose(self) -> None:
+        if hasattr(self.stream, "aclose"):
+            await self.stream.aclose()
 
-    async def handle_async_request(self, request) -> httpx.Response:
-        # override timeout value for _all_ requests
-        request.extensions["timeout"] = httpx.Timeout(self.timeout, pool=self.timeout).as_dict()
 
-        # validate the request is not attempting to connect to a local IP
-        # This is a security measure to prevent SSRF attacks
+class AsyncSafeTransport(httpx.AsyncBaseTransport):
+    """
+    An httpx transport that enforces a timeout value and that the request is not made to a local IP address.
 
-        ip: ipaddress.IPv4Address | ipaddress.IPv6Address | None = None
+    Hostnames are resolved through a shared `DNSCache`, and connections are made to the addresses that were validated.
+    httpx's own transport doesn't accept a network backend, so this transport sends requests through its own httpcore
+    connection pool, the same way httpx's transport does.
+    """
 
-        netloc = request.url.netloc.decode()
-        if ":" in netloc:  # Either an IP, or a hostname:port combo
-            netloc_parts = netloc.split(":")
+    timeout: int = 15
 
-            netloc = netloc_parts[0]
+    def __init__(
+        self,
+        log: logging.Logger | None = None,
+        dns_cache: DNSCache | None = None,
+        network_backend: httpcore.AsyncNetworkBackend | None = None,
+        *,
+        timeout: int | None = None,
+        limits: httpx.Limits | None = None,
+        verify: ssl.SSLContext | str | bool = True,
+        http1: bool = True,
+        http2: bool = False,
+        retries: int = 0,
+    ):
+        self.timeout = timeout or self.timeout
+        self.dns_cache = dns_cache or default_dns_cache
+        self._log = log
 
-            try:
-                ip = ipaddress.ip_address(netloc)
-            except ValueError:
+        limits = limits or httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=httpx.create_ssl_context(verify=verify),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            http1=http1,
+            http2=http2,
+            retries=retries,
+            network_backend=_ValidatedNetworkBackend(self, network_backend or httpcore.AnyIOBackend()),
+        )
+
+    async def validate_host(self, host: str) -> tuple[IPAddress, ...]:
+        """
+        Resolves `host`, and raises `InvalidDomainError` if any of its addresses are local.
+        This is a security measure to prevent SSRF attacks
+        """
+
+        if self._log:
+            self._log.debug(f"resolving IP for domain: {host}")
+
+        addresses = await self.dns_cache.resolve(host)
+
+        if self._log:
+            self._log.debug(f"resolved IP for domain: {host} -> {', '.join(map(str, addresses))}")
+
+        for ip in addresses:
+            if ip.is_private:
                 if self._log:
-                    self._log.debug(f"failed to parse ip for {netloc=} falling back to domain resolution")
-                pass
+                    self._log.warning(f"invalid request on local resource: {host} -> {ip}")
+                raise InvalidDomainError(f"invalid request on local resource: {host} -> {ip}")
 
-        # Request is a domain or a hostname.
-        if not ip:
-            if self._log:
-                self._log.debug(f"resolving IP for domain: {netloc}")
+        return addresses
 
-            ip_str = socket.gethostbyname(netloc)
-            ip = ipaddress.ip_address(ip_str)
-
-            if self._log:
-                self._log.debug(f"resolved IP for domain: {netloc} -> {ip}")
-
-        if ip.is_private:
-            if self._log:
-                self._log.warning(f"invalid request on local resource: {request.url} -> {ip}")
-            raise InvalidDomainError(f"invalid request on local resource: {request.url} -> {ip}")
+    async def handle_async_request(self, request) -> httpx.Response:
+        # override timeout value for _all_ requests
+        request.extensions["timeout"] = httpx.Timeout(self.timeout, pool=self.timeout).as_dict()
 
-        return await self._wrapper.handle_async_request(request)
+        # validate the request is not attempting to connect to a local IP before sending it; new connections are
+        # validated again by the network backend, which usually hits the cache
+        await self.validate_host(request.url.host)
+
+        pool_request = httpcore.Request(
+            method=request.method,
+            url=httpcore.URL(
+                scheme=request.url.raw_scheme,
+                host=request.url.raw_host,
+                port=request.url.port,
+                target=request.url.raw_path,
+            ),
+            headers=request.headers.raw,
+            content=request.stream,
+            extensions=request.extensions,
+        )
+        with _map_httpcore_errors():
+            response = await self._pool.handle_async_request(pool_request)
+
+        assert isinstance(response.stream, AsyncIterable)
+        return httpx.Response(
+            status_code=response.status,
+            headers=response.headers,
+            stream=_ResponseStream(response.stream),
+            extensions=response.extensions,
+        )
 
     async def aclose(self):
-        await self._wrapper.aclose()
+        await self._pool.aclose()
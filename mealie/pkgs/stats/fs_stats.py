@@ -24,17 +24,29 @@ def pretty_size(size: int) -> str:
 
 def get_dir_size(path: Path | str) -> int:
     """
-    Get the size of a directory
+    Get the size of a directory, including the size of its subdirectories
     """
     try:
         total_size = os.path.getsize(path)
     except FileNotFoundError:
         return 0
 
-    for item in os.listdir(path):
-        itempath = os.path.join(path, item)
-        if os.path.isfile(itempath):
-            total_size += os.path.getsize(itempath)
-        elif os.path.isdir(itempath):
-            total_size += get_dir_size(itempath)
+    # os.scandir gets each entry's type without another system call, which adds up in large directories
+    directories = [path]
+    while directories:
+        try:
+            with os.scandir(directories.pop()) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            directories.append(entry.path)
+                        elif not entry.is_file(follow_symlinks=False):
+                            continue
+
+                        total_size += entry.stat(follow_symlinks=False).st_size
+                    except FileNotFoundError:
+                        continue
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+
     return total_size
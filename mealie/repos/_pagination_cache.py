@@ -0,0 +1,52 @@
+import json
+from dataclasses import dataclass
+from typing import Any
+
+import sqlalchemy as sa
+from sqlalchemy import orm
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from mealie.pkgs.cache import QueryCache
+
+
+class Explain(Executable, ClauseElement):
+    """`EXPLAIN (FORMAT JSON)` for a select statement, so we can read the query planner's row estimate"""
+
+    inherit_cache = False
+
+    def __init__(self, statement: sa.Select) -> None:
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler, **kw):
+    return f"EXPLAIN (FORMAT JSON) {compiler.process(element.statement, **kw)}"
+
+
+def estimate_row_count(session: orm.Session, query: sa.Select) -> int:
+    """Returns the postgres query planner's estimate of how many rows a query returns"""
+
+    plan = session.execute(Explain(query)).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+@dataclass(slots=True, frozen=True)
+class CachedPage:
+    """A page of results, stored as the ids of its items along with the pagination totals"""
+
+    ids: tuple[Any, ...]
+    page: int
+    per_page: int
+    total: int | None
+    total_pages: int | None
+    total_is_approximate: bool
+
+
+count_cache = QueryCache[int]()
+
+# search results change with every recipe edit, and type-ahead searches are short-lived, so keep them briefly
+search_cache = QueryCache[CachedPage](ttl_seconds=60, max_entries=512)
@@ -28,7 +28,7 @@ class RepositoryCookbooks(HouseholdRepositoryGeneric[ReadCookBook, CookBook]):
 
         raise  # raise the last IntegrityError
 
-    def create_many(self, data: Iterable[ReadCookBook | dict]) -> list[ReadCookBook]:
+    def create_many(self, data: Iterable[ReadCookBook | dict], bulk: bool = False) -> list[ReadCookBook]:
         return [self.create(entry) for entry in data]
 
     def update(self, match_value: str | int | UUID4, data: SaveCookBook | dict) -> ReadCookBook:
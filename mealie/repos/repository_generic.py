@@ -1,31 +1,50 @@
 from __future__ import annotations
 
-import random
-from collections.abc import Iterable
+import hashlib
+from collections.abc import Iterable, Sequence
 from datetime import UTC, datetime
 from math import ceil
 from typing import Any
 
 from fastapi import HTTPException
 from pydantic import UUID4, BaseModel
-from sqlalchemy import ColumnElement, Select, case, delete, func, nulls_first, nulls_last, select
-from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy import (
+    ColumnElement,
+    Select,
+    and_,
+    delete,
+    false,
+    func,
+    insert,
+    nulls_first,
+    nulls_last,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.exc import NoResultFound
+from sqlalchemy.orm import MANYTOONE, InstrumentedAttribute
 from sqlalchemy.orm.session import Session
 from sqlalchemy.sql import sqltypes
 
 from mealie.core.root_logger import get_logger
 from mealie.db.models._model_base import SqlAlchemyBase
+from mealie.db.models._model_utils.seeded_random import seeded_random
+from mealie.pkgs.cache import QueryCache
 from mealie.schema._mealie import MealieModel
 from mealie.schema.response.pagination import (
+    CountStrategy,
     OrderByNullPosition,
     OrderDirection,
     PaginationBase,
+    PaginationCursor,
     PaginationQuery,
     RequestQuery,
 )
 from mealie.schema.response.query_filter import QueryFilterBuilder
 from mealie.schema.response.query_search import SearchFilter
 
+from ._pagination_cache import count_cache, estimate_row_count
 from ._utils import NOT_SET, NotSet
 
 
@@ -42,6 +61,11 @@ class RepositoryGeneric[Schema: MealieModel, Model: SqlAlchemyBase]:
     _group_id: UUID4 | None = None
     _household_id: UUID4 | None = None
 
+    # below this many estimated rows, approximate counts fall back to exact counts
+    approximate_count_threshold = 1000
+    # max number of ids to read back in a single query after creating/updating many documents
+    bulk_batch_size = 1000
+
     def __init__(
         self,
         session: Session,
@@ -180,20 +204,116 @@ class RepositoryGeneric[Schema: MealieModel, Model: SqlAlchemyBase]:
 
         return self.schema.model_validate(new_document)
 
-    def create_many(self, data: Iterable[Schema | dict]) -> list[Schema]:
+    def create_many(self, data: Iterable[Schema | dict], bulk: bool = False) -> list[Schema]:
+        """
+        Creates all documents in one transaction, then reads them back with a single query (per
+        `bulk_batch_size` documents) rather than refreshing each one.
+
+        With `bulk=True`, documents without nested relationships are inserted with executemany-style
+        INSERTs rather than through the ORM unit of work (see `_bulk_insert`). This skips mapper events
+        (e.g. `after_insert`), so only use it for models that don't rely on them. If any document has
+        nested relationships, or the database can't return generated ids in order, the regular path is
+        used instead.
+        """
         new_documents = []
         for document in data:
             document = document if isinstance(document, dict) else document.model_dump()
             new_document = self.model(session=self.session, **document)
             new_documents.append(new_document)
 
-        self.session.add_all(new_documents)
-        self.session.commit()
+        try:
+            if bulk and self._can_bulk_insert(new_documents):
+                new_ids = self._bulk_insert(new_documents)
+            else:
+                self.session.add_all(new_documents)
+                self.session.flush()
+                new_ids = [new_document.id for new_document in new_documents]
+
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+
+        return [self.schema.model_validate(x) for x in self._get_many_by_id(new_ids)]
+
+    def _can_bulk_insert(self, new_documents: list[Model]) -> bool:
+        if not new_documents:
+            return False
+
+        id_default = self.model.__table__.c.id.default
+        if not (id_default is not None and id_default.is_callable):
+            # the database generates the ids, so it needs to return them in the order they were inserted
+            if not self.session.get_bind().dialect.insert_executemany_returning_sort_by_parameter_order:
+                return False
+
+        relationship_keys = self.model.__mapper__.relationships.keys()
+        for new_document in new_documents:
+            # documents with related objects are already in the session through a backref cascade
+            if new_document in self.session:
+                return False
+
+            document_values = vars(new_document)
+            if any(document_values.get(key) for key in relationship_keys):
+                return False
+
+        return True
+
+    def _bulk_insert(self, new_documents: list[Model]) -> list[Any]:
+        """
+        Inserts the column values set on each document with executemany-style INSERTs and returns the new ids,
+        in the same order as the documents.
+
+        Ids with a client-side default (e.g. GUIDs) are generated up front, otherwise they're returned by the
+        database using `INSERT ... RETURNING`.
+        """
+
+        column_keys = {attr.key for attr in self.model.__mapper__.column_attrs}
+        rows = [{k: v for k, v in vars(doc).items() if k in column_keys} for doc in new_documents]
+
+        id_default = self.model.__table__.c.id.default
+        generate_ids = id_default is not None and id_default.is_callable
+        if generate_ids:
+            for row in rows:
+                if row.get("id") is None:
+                    row["id"] = id_default.arg(None)
+
+        # null values are left out of the INSERT, and rows are batched into one statement per run of rows
+        # with the same non-null columns, so we group those rows together
+        insert_order = sorted(range(len(rows)), key=lambda i: sorted(k for k, v in rows[i].items() if v is not None))
+        ordered_rows = [rows[i] for i in insert_order]
+
+        if generate_ids:
+            self.session.execute(insert(self.model), ordered_rows)
+            return [row["id"] for row in rows]
+
+        stmt = insert(self.model).returning(self.model.id, sort_by_parameter_order=True)
+        inserted_ids = self.session.execute(stmt, ordered_rows).scalars().all()
+
+        new_ids: list[Any] = [None] * len(rows)
+        for i, new_id in zip(insert_order, inserted_ids, strict=True):
+            new_ids[i] = new_id
+
+        return new_ids
 
-        for created_document in new_documents:
-            self.session.refresh(created_document)
+    def _get_many_by_id(self, ids: Sequence[Any], with_options=True) -> list[Model]:
+        """
+        Reads the documents (with the schema's loader options, unless disabled) in the same order as `ids`,
+        whatever group or household they're in. Raises `NoResultFound` if any of them don't exist.
+        """
+
+        # ids may be passed in another form than they're read back in, e.g. GUIDs as strings
+        sort_key = self.model.__table__.c.id.type.sort_key_function
+        key = sort_key if sort_key is not None else (lambda id_: id_)
+
+        documents_by_id: dict[Any, Model] = {}
+        for i in range(0, len(ids), self.bulk_batch_size):
+            q = self._query(with_options=with_options).where(self.model.id.in_(ids[i : i + self.bulk_batch_size]))
+            documents_by_id.update((key(doc.id), doc) for doc in self.session.execute(q).unique().scalars())
 
-        return [self.schema.model_validate(x) for x in new_documents]
+        if missing_ids := [id_ for id_ in ids if key(id_) not in documents_by_id]:
+            raise NoResultFound(f"{self.model.__name__} documents not found: {missing_ids}")
+
+        return [documents_by_id[key(id_)] for id_ in ids]
 
     def update(self, match_value: str | int | UUID4, new_data: dict | BaseModel) -> Schema:
         """Update a database entry.
@@ -222,14 +342,14 @@ class RepositoryGeneric[Schema: MealieModel, Model: SqlAlchemyBase]:
         documents_to_update_query = self._query().filter(self.model.id.in_(list(document_data_by_id.keys())))
         documents_to_update = self.session.execute(documents_to_update_query).unique().scalars().all()
 
-        updated_documents = []
+        updated_ids = []
         for document_to_update in documents_to_update:
             data = document_data_by_id[document_to_update.id]  # type: ignore
             document_to_update.update(session=self.session, **data)  # type: ignore
-            updated_documents.append(document_to_update)
+            updated_ids.append(document_to_update.id)
 
         self.session.commit()
-        return [self.schema.model_validate(x) for x in updated_documents]
+        return [self.schema.model_validate(x) for x in self._get_many_by_id(updated_ids)]
 
     def patch(self, match_value: str | int | UUID4, new_data: dict | BaseModel) -> Schema:
         new_data = new_data if isinstance(new_data, dict) else new_data.model_dump()
@@ -256,16 +376,31 @@ class RepositoryGeneric[Schema: MealieModel, Model: SqlAlchemyBase]:
 
         return result_as_model
 
-    def delete_many(self, values: Iterable) -> list[Schema]:
-        query = self._query().filter(self.model.id.in_(values))
-        results = self.session.execute(query).unique().scalars().all()
-        results_as_model = [self.schema.model_validate(result) for result in results]
+    def delete_many(self, values: Iterable, return_results: bool = True) -> list[Schema]:
+        """
+        Deletes all documents with an id in `values` in one transaction.
+
+        When none of the cascaded models rely on delete events (see `_can_bulk_delete`), the documents and their
+        children are removed with set-based DELETE statements (see `_bulk_delete`) instead of one ORM delete per
+        row. With `return_results=False` the deleted documents aren't loaded or validated, and an empty list is
+        returned.
+        """
+        # only documents in this repository's group/household are deleted, whatever ids the caller passes
+        ids = self._scoped_ids(list(values))
+        bulk = self._can_bulk_delete(self.model)
+
+        results: Sequence[Model] = []
+        if return_results or not bulk:
+            results = self._get_many_by_id(ids) if return_results else self._get_many_by_id(ids, with_options=False)
+
+        results_as_model = [self.schema.model_validate(result) for result in results] if return_results else []
 
         try:
-            # we create a delete statement for each row
-            # we don't delete the whole query in one statement because postgres doesn't cascade correctly
-            for result in results:
-                self.session.delete(result)
+            if bulk:
+                self._bulk_delete(self.model, ids)
+            else:
+                for result in results:
+                    self.session.delete(result)
 
             self.session.commit()
         except Exception as e:
@@ -274,6 +409,83 @@ class RepositoryGeneric[Schema: MealieModel, Model: SqlAlchemyBase]:
 
         return results_as_model
 
+    def _scoped_ids(self, ids: Sequence[Any]) -> list[Any]:
+        """The ids in `ids` of documents in this repository's group/household, in the same order"""
+
+        found: set[Any] = set()
+        for i in range(0, len(ids), self.bulk_batch_size):
+            q = (
+                select(self.model.id)
+                .filter_by(**self._filter_builder())
+                .where(self.model.id.in_(ids[i : i + self.bulk_batch_size]))
+            )
+            found.update(self.session.scalars(q))
+
+        return [id_ for id_ in ids if id_ in found]
+
+    @classmethod
+    def _can_bulk_delete(cls, model: type[SqlAlchemyBase], _seen: set[type[SqlAlchemyBase]] | None = None) -> bool:
+        """
+        Whether `model`, and every model its deletes cascade to, can be deleted with `_bulk_delete`: set-based
+        deletes skip mapper events (e.g. `after_delete`), so models that rely on them have to go through the ORM
+        """
+
+        _seen = _seen if _seen is not None else set()
+        if model in _seen:
+            return True
+        _seen.add(model)
+
+        mapper = model.__mapper__
+        if "id" not in mapper.columns or mapper.dispatch.before_delete or mapper.dispatch.after_delete:
+            return False
+
+        for rel in mapper.relationships:
+            if rel.viewonly or rel.secondary is not None:
+                continue
+            if len(rel.synchronize_pairs) != 1:
+                return False
+            if rel.direction is MANYTOONE:
+                if rel.cascade.delete:
+                    return False
+            elif rel.cascade.delete and not cls._can_bulk_delete(rel.mapper.class_, _seen):
+                return False
+
+        return True
+
+    def _bulk_delete(self, model: type[SqlAlchemyBase], ids: Sequence[Any]) -> None:
+        """Deletes the rows of `model` with an id in `ids`, and their children, in batches of `bulk_batch_size` ids"""
+
+        id_col = model.__mapper__.columns["id"]
+        for i in range(0, len(ids), self.bulk_batch_size):
+            self._bulk_delete_where(model, id_col.in_(ids[i : i + self.bulk_batch_size]))
+
+    def _bulk_delete_where(self, model: type[SqlAlchemyBase], criteria: ColumnElement[bool]) -> None:
+        """
+        Deletes the rows of `model` matching `criteria` with one statement per table, following the same rules
+        as the ORM: association rows are removed, children with a delete cascade are deleted (recursively, with
+        a subquery on their parent), and other children have their foreign key set to null
+        """
+
+        deleted_secondaries: set[Any] = set()
+        for rel in model.__mapper__.relationships:
+            if rel.viewonly or rel.direction is MANYTOONE:
+                continue
+
+            ((parent_col, child_col),) = rel.synchronize_pairs
+            child_criteria = child_col.in_(select(parent_col).where(criteria))
+
+            if rel.secondary is not None:
+                # several relationships can share an association table (e.g. ratings and favorites)
+                if rel.secondary not in deleted_secondaries:
+                    deleted_secondaries.add(rel.secondary)
+                    self.session.execute(delete(rel.secondary).where(child_criteria))
+            elif rel.cascade.delete:
+                self._bulk_delete_where(rel.mapper.class_, child_criteria)
+            elif not rel.passive_deletes:
+                self.session.execute(update(rel.mapper.class_).where(child_criteria).values({child_col: None}))
+
+        self.session.execute(delete(model).where(criteria))
+
     def delete_all(self) -> None:
         delete(self.model)
         self.session.commit()
@@ -320,36 +532,48 @@ class RepositoryGeneric[Schema: MealieModel, Model: SqlAlchemyBase]:
         if search:
             q = self.add_search_to_query(q, eff_schema, search)
 
-        if not pagination_result.order_by and not search:
-            # default ordering if not searching
+        if not pagination_result.order_by and (not search or pagination_result.is_cursor_mode):
+            # default ordering if not searching; cursors can't seek by search relevance
             pagination_result.order_by = "created_at"
 
-        q, count, total_pages = self.add_pagination_to_query(q, pagination_result)
+        q, count, total_pages, total_is_approximate = self.add_pagination_to_query(q, pagination_result)
 
         # Apply options late, so they do not get used for counting
-        q = q.options(*eff_schema.loader_options())
         try:
-            data = self.session.execute(q).unique().scalars().all()
+            data = self.session.execute(q.options(*eff_schema.loader_options())).unique().scalars().all()
         except Exception as e:
             self._log_exception(e)
             self.session.rollback()
             raise e
+
+        next_cursor: str | None = None
+        if pagination_result.is_cursor_mode:
+            data, next_cursor = self.get_next_cursor(q, pagination_result, data)
+
         return PaginationBase(
             page=pagination_result.page,
             per_page=pagination_result.per_page,
             total=count,
             total_pages=total_pages,
+            total_is_approximate=total_is_approximate,
             items=[eff_schema.model_validate(s) for s in data],
+            next_cursor=next_cursor,
         )
 
-    def add_pagination_to_query(self, query: Select, pagination: PaginationQuery) -> tuple[Select, int, int]:
+    def add_pagination_to_query(
+        self, query: Select, pagination: PaginationQuery
+    ) -> tuple[Select, int | None, int | None, bool]:
         """
         Adds pagination data to an existing query.
 
+        In cursor mode the query is ordered by its keyset and fetches one extra row, which
+        `get_next_cursor` uses to determine whether there is another page.
+
         :returns:
             - query - modified query with pagination data
-            - count - total number of records (without pagination)
-            - total_pages - the total number of pages in the query
+            - count - total number of records (without pagination), or None if counting was skipped
+            - total_pages - the total number of pages in the query, or None if counting was skipped
+            - total_is_approximate - whether the count is the database's estimate rather than an exact count
         """
 
         if pagination.query_filter:
@@ -361,10 +585,10 @@ class RepositoryGeneric[Schema: MealieModel, Model: SqlAlchemyBase]:
                 self.logger.error(e)
                 raise HTTPException(status_code=400, detail=str(e)) from e
 
-        count_query = select(func.count()).select_from(query.subquery())
-        count = self.session.scalar(count_query)
-        if not count:
-            count = 0
+        if pagination.is_cursor_mode and pagination.skip_count:
+            return self.add_cursor_to_query(query, pagination), None, None, False
+
+        count, total_is_approximate = self.count_query_results(query, pagination)
 
         # interpret -1 as "get_all"
         if pagination.per_page == -1:
@@ -375,6 +599,9 @@ class RepositoryGeneric[Schema: MealieModel, Model: SqlAlchemyBase]:
         except ZeroDivisionError:
             total_pages = 0
 
+        if pagination.is_cursor_mode:
+            return self.add_cursor_to_query(query, pagination), count, total_pages, total_is_approximate
+
         # interpret -1 as "last page"
         if pagination.page == -1:
             pagination.page = total_pages
@@ -384,7 +611,177 @@ class RepositoryGeneric[Schema: MealieModel, Model: SqlAlchemyBase]:
             pagination.page = 1
 
         query = self.add_order_by_to_query(query, pagination)
-        return query.limit(pagination.per_page).offset((pagination.page - 1) * pagination.per_page), count, total_pages
+        query = query.limit(pagination.per_page).offset((pagination.page - 1) * pagination.per_page)
+        return query, count, total_pages, total_is_approximate
+
+    def count_query_results(self, query: Select, pagination: PaginationQuery) -> tuple[int, bool]:
+        """
+        Counts the results of a query (without pagination) using the requested count strategy.
+
+        :returns:
+            - count - total number of records
+            - is_approximate - whether the count is the database's estimate rather than an exact count
+        """
+
+        strategy = pagination.count_strategy
+
+        # the "get all" and "last page" shorthands need an exact count to return the right results
+        if pagination.per_page == -1 or pagination.page == -1:
+            strategy = CountStrategy.exact
+
+        if strategy is CountStrategy.approximate:
+            if self.session.get_bind().name == "postgresql":
+                estimate = estimate_row_count(self.session, query)
+                if estimate >= self.approximate_count_threshold:
+                    return estimate, True
+
+                # estimates for small results are unreliable, and exact counts are cheap anyway
+                strategy = CountStrategy.exact
+            else:
+                # only postgres exposes its row estimates, so the next best thing is a cached count
+                strategy = CountStrategy.cached
+
+        count_query = select(func.count()).select_from(query.subquery())
+        if strategy is CountStrategy.cached:
+            compiled = count_query.compile(dialect=self.session.get_bind().dialect)
+            cache_key = (str(compiled), repr(sorted(compiled.params.items())))
+            if (cached_count := count_cache.get(cache_key)) is not None:
+                return cached_count, False
+
+        count = self.session.scalar(count_query) or 0
+        if strategy is CountStrategy.cached:
+            count_cache.set(cache_key, count, QueryCache.tables_for_query(query))
+
+        return count, False
+
+    def _cursor_fingerprint(self, pagination: PaginationQuery) -> str:
+        null_position = pagination.order_by_null_position.value if pagination.order_by_null_position else ""
+        seed = pagination.pagination_seed if pagination.order_by == "random" else ""
+        order_spec = "|".join(
+            [
+                self.model.__name__,
+                pagination.order_by or "",
+                pagination.order_direction.value,
+                null_position,
+                seed or "",
+            ]
+        )
+        return hashlib.sha256(order_spec.encode()).hexdigest()[:16]
+
+    def _get_cursor_keys(
+        self, pagination: PaginationQuery, query: Select | None = None
+    ) -> tuple[Select | None, list[tuple[ColumnElement, OrderDirection, OrderByNullPosition]]]:
+        """
+        Builds the keyset used by cursor pagination: every order by expression, followed by the id as a tiebreaker.
+        Optionally provide a query to apply the necessary table joins.
+
+        Null positions are always explicit (defaulting to nulls being the largest value, regardless of the database)
+        so the seek filter knows on which side of a value the nulls are.
+        """
+        keys: list[tuple[ColumnElement, OrderDirection, OrderByNullPosition]] = []
+        if pagination.order_by == "random":
+            keys.append(
+                (seeded_random(self.model.id, pagination.pagination_seed), OrderDirection.asc, OrderByNullPosition.last)
+            )
+        elif pagination.order_by:
+            query, order_attrs = self._resolve_order_by(pagination, query)
+            for order_attr, order_dir in order_attrs:
+                null_position = pagination.order_by_null_position or (
+                    OrderByNullPosition.last if order_dir is OrderDirection.asc else OrderByNullPosition.first
+                )
+                keys.append((self._get_order_expression(order_attr), order_dir, null_position))
+
+        keys.append((self.model.id, pagination.order_direction, OrderByNullPosition.last))
+        return query, keys
+
+    @staticmethod
+    def _get_cursor_filter(
+        keys: list[tuple[ColumnElement, OrderDirection, OrderByNullPosition]], values: list[Any]
+    ) -> ColumnElement:
+        """
+        Builds the lexicographic equivalent of `WHERE (col_1, ..., id) > (val_1, ..., val_id)`,
+        which also supports mixed directions and null values
+        """
+        seek_clauses: list[ColumnElement] = []
+        equal_clauses: list[ColumnElement] = []
+        for (expr, order_dir, null_position), value in zip(keys, values, strict=True):
+            if value is None:
+                after = expr.is_not(None) if null_position is OrderByNullPosition.first else false()
+                equal = expr.is_(None)
+            else:
+                after = expr > value if order_dir is OrderDirection.asc else expr < value
+                if null_position is OrderByNullPosition.last:
+                    after = or_(after, expr.is_(None))
+                equal = expr == value
+
+            seek_clauses.append(and_(*equal_clauses, after))
+            equal_clauses.append(equal)
+
+        return or_(*seek_clauses)
+
+    def add_cursor_to_query(self, query: Select, pagination: PaginationQuery) -> Select:
+        """Orders a query by its keyset and seeks past the pagination cursor, if there is one"""
+
+        query, keys = self._get_cursor_keys(pagination, query)
+        assert query is not None
+
+        # the keyset must be the only ordering, otherwise the seek filter won't match the page boundaries
+        query = query.order_by(None)
+        for expr, order_dir, null_position in keys:
+            order_expr = expr.asc() if order_dir is OrderDirection.asc else expr.desc()
+            if null_position is OrderByNullPosition.first:
+                query = query.order_by(nulls_first(order_expr))
+            else:
+                query = query.order_by(nulls_last(order_expr))
+
+        if pagination.cursor:
+            try:
+                cursor = PaginationCursor.decode(pagination.cursor)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e)) from e
+
+            if cursor.fingerprint != self._cursor_fingerprint(pagination) or len(cursor.values) != len(keys):
+                raise HTTPException(status_code=400, detail="pagination cursor does not match the requested order")
+
+            query = query.where(self._get_cursor_filter(keys, cursor.values))
+
+        if pagination.per_page > 0:
+            # fetch one extra row to find out if there's another page
+            query = query.limit(pagination.per_page + 1)
+
+        return query
+
+    def get_next_cursor[T](
+        self, query: Select, pagination: PaginationQuery, data: Sequence[T]
+    ) -> tuple[list[T], str | None]:
+        """
+        Trims the extra row fetched by a cursor query and builds the cursor for the next page, if there is one.
+        The query should be the one returned by `add_pagination_to_query`, before any loader options are applied.
+        """
+        if pagination.per_page < 1 or len(data) <= pagination.per_page:
+            return list(data), None
+
+        page_data = list(data[: pagination.per_page])
+        _, keys = self._get_cursor_keys(pagination)
+        key_query = (
+            query.with_only_columns(*[expr for expr, _, _ in keys])
+            .where(self.model.id == page_data[-1].id)  # type: ignore
+            .order_by(None)
+            .limit(1)
+        )
+
+        values = self.session.execute(key_query).one()
+        cursor = PaginationCursor(fingerprint=self._cursor_fingerprint(pagination), values=list(values))
+        return page_data, cursor.encode()
+
+    def _get_order_expression(self, order_attr: InstrumentedAttribute) -> ColumnElement:
+        order_attr = self.column_aliases.get(order_attr.key, order_attr)
+
+        # queries handle uppercase and lowercase differently, which is undesirable
+        if isinstance(order_attr.type, sqltypes.String):
+            order_attr = func.lower(order_attr)
+
+        return order_attr
 
     def add_order_attr_to_query(
         self,
@@ -393,11 +790,7 @@ class RepositoryGeneric[Schema: MealieModel, Model: SqlAlchemyBase]:
         order_dir: OrderDirection,
         order_by_null: OrderByNullPosition | None,
     ) -> Select:
-        order_attr = self.column_aliases.get(order_attr.key, order_attr)
-
-        # queries handle uppercase and lowercase differently, which is undesirable
-        if isinstance(order_attr.type, sqltypes.String):
-            order_attr = func.lower(order_attr)
+        order_attr = self._get_order_expression(order_attr)
 
         if order_dir is OrderDirection.asc:
             order_attr = order_attr.asc()
@@ -416,47 +809,47 @@ class RepositoryGeneric[Schema: MealieModel, Model: SqlAlchemyBase]:
             return query
 
         elif request_query.order_by == "random":
-            # randomize outside of database, since not all db's can set random seeds
-            # this solution is db-independent & stable to paging
-            temp_query = query.with_only_columns(self.model.id)
-            allids = self.session.execute(temp_query).scalars().all()  # fast because id is indexed
-            if not allids:
-                return query
-
-            order = list(range(len(allids)))
-            random.seed(request_query.pagination_seed)
-            random.shuffle(order)
-            random_dict = dict(zip(allids, order, strict=True))
-            case_stmt = case(random_dict, value=self.model.id)
-            return query.order_by(case_stmt)
+            # order by a hash of each id and the seed, which is stable across pages for the same seed
+            return query.order_by(seeded_random(self.model.id, request_query.pagination_seed))
 
         else:
-            for order_by_val in request_query.order_by.split(","):
-                try:
-                    order_by_val = order_by_val.strip()
-                    if ":" in order_by_val:
-                        order_by, order_dir_val = order_by_val.split(":")
-                        order_dir = OrderDirection(order_dir_val)
-                    else:
-                        order_by = order_by_val
-                        order_dir = request_query.order_direction
-
-                    _, order_attr, query = QueryFilterBuilder.get_model_and_model_attr_from_attr_string(
-                        order_by, self.model, query=query
-                    )
-
-                    query = self.add_order_attr_to_query(
-                        query, order_attr, order_dir, request_query.order_by_null_position
-                    )
-
-                except ValueError as e:
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f'Invalid order_by statement "{request_query.order_by}": "{order_by_val}" is invalid',
-                    ) from e
+            query, order_attrs = self._resolve_order_by(request_query, query)
+            for order_attr, order_dir in order_attrs:
+                query = self.add_order_attr_to_query(query, order_attr, order_dir, request_query.order_by_null_position)
 
             return query
 
+    def _resolve_order_by(
+        self, request_query: RequestQuery, query: Select | None = None
+    ) -> tuple[Select | None, list[tuple[InstrumentedAttribute, OrderDirection]]]:
+        """
+        Parses the order_by string into model attributes and their directions.
+        Optionally provide a query to apply the necessary table joins.
+        """
+        order_attrs: list[tuple[InstrumentedAttribute, OrderDirection]] = []
+        for order_by_val in (request_query.order_by or "").split(","):
+            try:
+                order_by_val = order_by_val.strip()
+                if ":" in order_by_val:
+                    order_by, order_dir_val = order_by_val.split(":")
+                    order_dir = OrderDirection(order_dir_val)
+                else:
+                    order_by = order_by_val
+                    order_dir = request_query.order_direction
+
+                _, order_attr, query = QueryFilterBuilder.get_model_and_model_attr_from_attr_string(
+                    order_by, self.model, query=query
+                )
+                order_attrs.append((order_attr, order_dir))
+
+            except ValueError as e:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f'Invalid order_by statement "{request_query.order_by}": "{order_by_val}" is invalid',
+                ) from e
+
+        return query, order_attrs
+
     def add_search_to_query(self, query: Select, schema: type[Schema], search: str) -> Select:
         search_filter = SearchFilter(self.session, search, schema._normalize_search)
         return search_filter.filter_query_by_search(query, schema, self.model)
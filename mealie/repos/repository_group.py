@@ -34,7 +34,7 @@ class RepositoryGroup(RepositoryGeneric[GroupInDB, Group]):
 
                 data["name"] = f"{original_name} ({attempts})"
 
-    def create_many(self, data: Iterable[GroupInDB | dict]) -> list[GroupInDB]:
+    def create_many(self, data: Iterable[GroupInDB | dict], bulk: bool = False) -> list[GroupInDB]:
         # since create uses special logic for resolving slugs, we don't want to use the standard create_many method
         return [self.create(new_group) for new_group in data]
 
@@ -47,7 +47,7 @@ class RepositoryHousehold(GroupRepositoryGeneric[HouseholdInDB, Household]):
 
                 data["name"] = f"{original_name} ({attempts})"
 
-    def create_many(self, data: Iterable[HouseholdInDB | dict]) -> list[HouseholdInDB]:
+    def create_many(self, data: Iterable[HouseholdInDB | dict], bulk: bool = False) -> list[HouseholdInDB]:
         # since create uses special logic for resolving slugs, we don't want to use the standard create_many method
         return [self.create(new_household) for new_household in data]
 
@@ -1,5 +1,5 @@
 import re as re
-from collections.abc import Iterable, Sequence
+from collections.abc import Hashable, Iterable, Sequence
 from random import randint
 from typing import Self, cast
 from uuid import UUID
@@ -19,6 +19,7 @@ from mealie.db.models.recipe.tag import Tag
 from mealie.db.models.recipe.tool import Tool, households_to_tools, recipes_to_tools
 from mealie.db.models.users.user_to_recipe import UserToRecipe
 from mealie.db.models.users.users import User
+from mealie.pkgs.cache import QueryCache
 from mealie.schema.cookbook.cookbook import ReadCookBook
 from mealie.schema.recipe import Recipe
 from mealie.schema.recipe.recipe import RecipeCategory, RecipePagination, RecipeSummary, create_recipe_slug
@@ -27,8 +28,10 @@ from mealie.schema.recipe.recipe_suggestion import RecipeSuggestionQuery, Recipe
 from mealie.schema.recipe.recipe_tool import RecipeToolOut
 from mealie.schema.response.pagination import PaginationQuery
 from mealie.schema.response.query_filter import QueryFilterBuilder
+from mealie.schema.response.query_search import SearchFilter
 
 from ..db.models._model_base import SqlAlchemyBase
+from ._pagination_cache import CachedPage, search_cache
 from .repository_generic import HouseholdRepositoryGeneric
 
 
@@ -102,6 +105,36 @@ class RepositoryRecipes(HouseholdRepositoryGeneric[Recipe, RecipeModel]):
                 if i >= max_retries:
                     raise
 
+    def create_many(self, data: Iterable[Recipe], bulk: bool = False) -> list[Recipe]:  # type: ignore
+        """
+        Creates all recipes in one transaction. Like `create`, recipes whose slug is already taken (by an
+        existing recipe or another recipe in `data`) are renamed to "<name> (1)", "<name> (2)", etc.
+        """
+
+        documents = list(data)
+        original_names: list[str] = [document.name for document in documents]  # type: ignore
+        suffixes = [0] * len(documents)
+
+        taken: set[tuple[str, UUID4 | None]] = set()
+        unchecked = {document.slug for document in documents}
+        while unchecked:
+            stmt = sa.select(self.model.slug, self.model.group_id).where(self.model.slug.in_(unchecked))
+            taken.update((slug, group_id) for slug, group_id in self.session.execute(stmt))
+
+            # slugs generated by renaming a recipe need to be checked again
+            unchecked = set()
+            seen: set[tuple[str, UUID4 | None]] = set()
+            for i, document in enumerate(documents):
+                while (key := (document.slug, document.group_id)) in taken or key in seen:
+                    suffixes[i] += 1
+                    document.name = f"{original_names[i]} ({suffixes[i]})"
+                    document.slug = create_recipe_slug(document.name)
+                    unchecked.add(document.slug)
+
+                seen.add(key)
+
+        return super().create_many(documents, bulk=bulk)
+
     def _delete_recipe(self, recipe: RecipeModel) -> Recipe:
         recipe_as_model = self.schema.model_validate(recipe)
 
@@ -129,24 +162,6 @@ class RepositoryRecipes(HouseholdRepositoryGeneric[Recipe, RecipeModel]):
         recipe_in_db = self._query_one(value, match_key)
         return self._delete_recipe(recipe_in_db)
 
-    def delete_many(self, values: Iterable) -> list[Recipe]:
-        query = self._query().filter(self.model.id.in_(values))
-        recipes_in_db = self.session.execute(query).unique().scalars().all()
-        results: list[Recipe] = []
-
-        # we create a delete statement for each row
-        # we don't delete the whole query in one statement because postgres doesn't cascade correctly
-        for recipe_in_db in recipes_in_db:
-            results.append(self._delete_recipe(recipe_in_db))
-
-        try:
-            self.session.commit()
-        except Exception as e:
-            self.session.rollback()
-            raise e
-
-        return results
-
     def update_image(self, slug: str, _: str | None = None) -> int:
         entry: RecipeModel = self._query_one(match_value=slug)
         entry.image = randint(0, 255)
@@ -238,32 +253,94 @@ class RepositoryRecipes(HouseholdRepositoryGeneric[Recipe, RecipeModel]):
                 require_all_foods=require_all_foods,
             )
             q = q.filter(*filters)
-        if search:
-            q = self.add_search_to_query(q, self.schema, search)
+        search_filter = SearchFilter(self.session, search, self.schema._normalize_search) if search else None
+        cache_key = self._search_cache_key(q, search_filter, pagination_result)
+        if cache_key is not None and (cached_page := search_cache.get(cache_key)) is not None:
+            return self._page_from_cache(cached_page)
+
+        if search_filter:
+            q = search_filter.filter_query_by_search(q, self.schema, self.model)
 
-        if not pagination_result.order_by and not search:
-            # default ordering if not searching
+        if not pagination_result.order_by and (not search or pagination_result.is_cursor_mode):
+            # default ordering if not searching; cursors can't seek by search relevance
             pagination_result.order_by = "created_at"
 
-        q, count, total_pages = self.add_pagination_to_query(q, pagination_result)
+        q, count, total_pages, total_is_approximate = self.add_pagination_to_query(q, pagination_result)
 
         # Apply options late, so they do not get used for counting
-        q = q.options(*RecipeSummary.loader_options())
         try:
             self.logger.debug(f"Recipe Pagination Query: {pagination_result}")
-            data = self.session.execute(q).scalars().unique().all()
+            data = self.session.execute(q.options(*RecipeSummary.loader_options())).scalars().unique().all()
         except Exception as e:
             self._log_exception(e)
             self.session.rollback()
             raise e
 
+        next_cursor: str | None = None
+        if pagination_result.is_cursor_mode:
+            data, next_cursor = self.get_next_cursor(q, pagination_result, data)
+
+        if cache_key is not None:
+            cached_page = CachedPage(
+                ids=tuple(item.id for item in data),
+                page=pagination_result.page,
+                per_page=pagination_result.per_page,
+                total=count,
+                total_pages=total_pages,
+                total_is_approximate=total_is_approximate,
+            )
+            search_cache.set(cache_key, cached_page, QueryCache.tables_for_query(q))
+
         items = [RecipeSummary.model_validate(item) for item in data]
         return RecipePagination(
             page=pagination_result.page,
             per_page=pagination_result.per_page,
             total=count,
             total_pages=total_pages,
+            total_is_approximate=total_is_approximate,
             items=items,
+            next_cursor=next_cursor,
+        )
+
+    def _search_cache_key(
+        self, query: sa.Select, search_filter: SearchFilter | None, pagination: PaginationQuery
+    ) -> Hashable | None:
+        """
+        Builds the key for caching a page of search results, or returns None if the page shouldn't be cached.
+
+        The key covers the compiled query (group, household, and recipe filters), the normalized search, the user
+        (for user-specific order by columns), and the requested pagination (query filter, order, and page).
+        """
+
+        # cursor pages depend on the cursor's row, and "get all" pages can be arbitrarily large
+        if not search_filter or pagination.is_cursor_mode or pagination.per_page == -1:
+            return None
+
+        compiled = query.compile(dialect=self.session.get_bind().dialect)
+        return (
+            str(compiled),
+            repr(sorted(compiled.params.items())),
+            search_filter.search_type,
+            search_filter.search,
+            tuple(search_filter.search_list),
+            self.user_id,
+            pagination.model_dump_json(),
+        )
+
+    def _page_from_cache(self, cached_page: CachedPage) -> RecipePagination:
+        stmt = sa.select(self.model).filter(self.model.id.in_(cached_page.ids))
+        recipes_by_id = {
+            recipe.id: recipe
+            for recipe in self.session.execute(stmt.options(*RecipeSummary.loader_options())).scalars().unique()
+        }
+
+        return RecipePagination(
+            page=cached_page.page,
+            per_page=cached_page.per_page,
+            total=cached_page.total,
+            total_pages=cached_page.total_pages,
+            total_is_approximate=cached_page.total_is_approximate,
+            items=[RecipeSummary.model_validate(recipes_by_id[id_]) for id_ in cached_page.ids if id_ in recipes_by_id],
         )
 
     def get_by_categories(self, categories: list[RecipeCategory]) -> list[RecipeSummary]:
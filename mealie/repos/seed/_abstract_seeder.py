@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from collections.abc import Callable
 from logging import Logger
 from pathlib import Path
 
@@ -23,3 +24,25 @@ class AbstractSeeder(ABC):
 
     @abstractmethod
     def seed(self, locale: str | None = None) -> None: ...
+
+    def create_all[T](
+        self, items: list[T], create_many: Callable[[list[T]], object], create_one: Callable[[T], object]
+    ):
+        """
+        Creates all items at once, falling back to creating them one at a time if that fails,
+        so a single bad item doesn't prevent the rest from being seeded.
+        """
+        if not items:
+            return
+
+        try:
+            create_many(items)
+            return
+        except Exception as e:
+            self.logger.error(e)
+
+        for item in items:
+            try:
+                create_one(item)
+            except Exception as e:
+                self.logger.error(e)
@@ -3,7 +3,7 @@ import pathlib
 from collections.abc import Generator
 from functools import cached_property
 
-from mealie.schema.labels import MultiPurposeLabelOut, MultiPurposeLabelSave
+from mealie.schema.labels import MultiPurposeLabelCreate, MultiPurposeLabelOut, MultiPurposeLabelSave
 from mealie.schema.recipe.recipe_ingredient import (
     IngredientFood,
     IngredientUnit,
@@ -45,11 +45,8 @@ class MultiPurposeLabelSeeder(AbstractSeeder):
 
     def seed(self, locale: str | None = None) -> None:
         self.logger.info("Seeding MultiPurposeLabel")
-        for label in self.load_data(locale):
-            try:
-                self.service.create_one(label)
-            except Exception as e:
-                self.logger.error(e)
+        labels: list[MultiPurposeLabelCreate] = list(self.load_data(locale))
+        self.create_all(labels, self.service.create_many, self.service.create_one)
 
 
 class IngredientUnitsSeeder(AbstractSeeder):
@@ -80,11 +77,12 @@ class IngredientUnitsSeeder(AbstractSeeder):
 
     def seed(self, locale: str | None = None) -> None:
         self.logger.info("Seeding Ingredient Units")
-        for unit in self.load_data(locale):
-            try:
-                self.repos.ingredient_units.create(unit)
-            except Exception as e:
-                self.logger.error(e)
+        units = list(self.load_data(locale))
+        self.create_all(
+            units,
+            lambda items: self.repos.ingredient_units.create_many(items, bulk=True),
+            self.repos.ingredient_units.create,
+        )
 
 
 class IngredientFoodsSeeder(AbstractSeeder):
@@ -121,8 +119,9 @@ class IngredientFoodsSeeder(AbstractSeeder):
 
     def seed(self, locale: str | None = None) -> None:
         self.logger.info("Seeding Ingredient Foods")
-        for food in self.load_data(locale):
-            try:
-                self.repos.ingredient_foods.create(food)
-            except Exception as e:
-                self.logger.error(e)
+        foods = list(self.load_data(locale))
+        self.create_all(
+            foods,
+            lambda items: self.repos.ingredient_foods.create_many(items, bulk=True),
+            self.repos.ingredient_foods.create,
+        )
@@ -210,3 +210,4 @@ class BaseCrudController(BaseUserController):
             document_data=document_data,
             message=message,
         )
+        self.session.commit()
@@ -9,6 +9,7 @@ from . import (
     admin_management_groups,
     admin_management_households,
     admin_management_users,
+    admin_scheduler,
 )
 
 router = AdminAPIRouter(prefix="/admin")
@@ -20,4 +21,5 @@ router.include_router(admin_management_groups.router, tags=["Admin: Manage Group
 router.include_router(admin_email.router, tags=["Admin: Email"])
 router.include_router(admin_backups.router, tags=["Admin: Backups"])
 router.include_router(admin_maintenance.router, tags=["Admin: Maintenance"])
+router.include_router(admin_scheduler.router, tags=["Admin: Scheduler"])
 router.include_router(admin_debug.router, tags=["Admin: Debug"])
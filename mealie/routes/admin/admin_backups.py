@@ -1,5 +1,6 @@
 import operator
 import shutil
+from functools import cached_property
 from pathlib import Path
 
 from fastapi import APIRouter, File, HTTPException, UploadFile, status
@@ -11,7 +12,9 @@ from mealie.pkgs.stats.fs_stats import pretty_size
 from mealie.routes._base import BaseAdminController, controller
 from mealie.schema.admin.backup import AllBackups, BackupFile
 from mealie.schema.response.responses import ErrorResponse, FileTokenResponse, SuccessResponse
+from mealie.services.backups_v2.backup_store import BackupChunkStore
 from mealie.services.backups_v2.backup_v2 import BackupSchemaMismatch, BackupV2
+from mealie.services.storage_stats.storage_stats_service import StorageStatsService
 
 logger = get_logger()
 router = APIRouter(prefix="/backups")
@@ -22,6 +25,10 @@ class AdminBackupController(BaseAdminController):
     def _backup_path(self, name) -> Path:
         return get_app_dirs().BACKUP_DIR / name
 
+    @cached_property
+    def storage_stats(self) -> StorageStatsService:
+        return StorageStatsService(self.session)
+
     @router.get("", response_model=AllBackups)
     def get_all(self):
         app_dirs = get_app_dirs()
@@ -46,6 +53,8 @@ class AdminBackupController(BaseAdminController):
         except Exception as e:
             logger.exception(e)
             raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR) from e
+        finally:
+            self.storage_stats.invalidate()
 
         return SuccessResponse.respond("Backup created successfully")
 
@@ -70,6 +79,11 @@ class AdminBackupController(BaseAdminController):
         except Exception as e:
             raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR) from e
 
+        # remove the files from incremental backups that no other backup uses
+        app_dirs = get_app_dirs()
+        BackupChunkStore(app_dirs.BACKUP_CHUNKS_DIR).remove_unused(app_dirs.BACKUP_DIR)
+        self.storage_stats.invalidate()
+
         return SuccessResponse.respond(f"{file_name} has been deleted.")
 
     @router.post("/upload", response_model=SuccessResponse)
@@ -92,6 +106,8 @@ class AdminBackupController(BaseAdminController):
         with dest.open("wb") as buffer:
             shutil.copyfileobj(archive.file, buffer)
 
+        self.storage_stats.invalidate()
+
         if not dest.is_file():
             raise HTTPException(status.HTTP_400_BAD_REQUEST)
 
@@ -111,5 +127,8 @@ class AdminBackupController(BaseAdminController):
         except Exception as e:
             logger.exception(e)
             raise HTTPException(status.HTTP_500_INTERNAL_SERVER_ERROR) from e
+        finally:
+            # a restore replaces the data directory, along with the recipes' sizes
+            self.storage_stats.invalidate()
 
         return SuccessResponse.respond("Restore successful")
@@ -1,14 +1,17 @@
 import shutil
 import uuid
+from functools import cached_property
 from pathlib import Path
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, BackgroundTasks, HTTPException
 
 from mealie.pkgs.stats import fs_stats
 from mealie.routes._base import BaseAdminController, controller
 from mealie.schema.admin import MaintenanceSummary
 from mealie.schema.admin.maintenance import MaintenanceStorageDetails
 from mealie.schema.response import ErrorResponse, SuccessResponse
+from mealie.services.scheduler.tasks.reconcile_storage_stats import reconcile_storage_stats
+from mealie.services.storage_stats.storage_stats_service import StorageStatsService
 
 router = APIRouter(prefix="/maintenance")
 
@@ -64,35 +67,60 @@ def tail_log(log_file: Path, n: int) -> list[str]:
 
 @controller(router)
 class AdminMaintenanceController(BaseAdminController):
+    @cached_property
+    def storage_stats(self) -> StorageStatsService:
+        return StorageStatsService(self.session)
+
     @router.get("", response_model=MaintenanceSummary)
     def get_maintenance_summary(self):
         """
-        Get the maintenance summary
+        Get the maintenance summary, from the storage statistics of the last reconciliation
         """
+        snapshot = self.storage_stats.get_snapshot()
 
         return MaintenanceSummary(
-            data_dir_size=fs_stats.pretty_size(fs_stats.get_dir_size(self.folders.DATA_DIR)),
-            cleanable_images=clean_images(self.folders.RECIPE_DATA_DIR, dry_run=True),
-            cleanable_dirs=clean_recipe_folders(self.folders.RECIPE_DATA_DIR, dry_run=True),
+            data_dir_size=fs_stats.pretty_size(snapshot.data_dir_size),
+            cleanable_images=snapshot.cleanable_images,
+            cleanable_dirs=snapshot.cleanable_dirs,
         )
 
     @router.get("/storage", response_model=MaintenanceStorageDetails)
     def get_storage_details(self):
+        snapshot = self.storage_stats.get_snapshot()
+
         return MaintenanceStorageDetails(
-            temp_dir_size=fs_stats.pretty_size(fs_stats.get_dir_size(self.folders.TEMP_DIR)),
-            backups_dir_size=fs_stats.pretty_size(fs_stats.get_dir_size(self.folders.BACKUP_DIR)),
-            groups_dir_size=fs_stats.pretty_size(fs_stats.get_dir_size(self.folders.GROUPS_DIR)),
-            recipes_dir_size=fs_stats.pretty_size(fs_stats.get_dir_size(self.folders.RECIPE_DATA_DIR)),
-            user_dir_size=fs_stats.pretty_size(fs_stats.get_dir_size(self.folders.USER_DIR)),
+            temp_dir_size=fs_stats.pretty_size(snapshot.dir_size(self.folders.TEMP_DIR)),
+            backups_dir_size=fs_stats.pretty_size(snapshot.dir_size(self.folders.BACKUP_DIR)),
+            groups_dir_size=fs_stats.pretty_size(snapshot.dir_size(self.folders.GROUPS_DIR)),
+            recipes_dir_size=fs_stats.pretty_size(snapshot.dir_size(self.folders.RECIPE_DATA_DIR)),
+            user_dir_size=fs_stats.pretty_size(snapshot.dir_size(self.folders.USER_DIR)),
         )
 
+    @router.post("/storage/reconcile", response_model=SuccessResponse)
+    def reconcile_storage(self):
+        """
+        Measures the data directory again, updating the storage statistics
+        """
+        try:
+            self.storage_stats.reconcile()
+        except Exception as e:
+            raise HTTPException(
+                status_code=500, detail=ErrorResponse.respond("Failed to reconcile storage statistics")
+            ) from e
+
+        return SuccessResponse.respond("Storage statistics reconciled")
+
     @router.post("/clean/images", response_model=SuccessResponse)
-    def clean_images(self):
+    def clean_images(self, bg_tasks: BackgroundTasks):
         """
         Purges all the images from the filesystem that aren't .webp
         """
         try:
             cleaned_images = clean_images(self.folders.RECIPE_DATA_DIR, dry_run=False)
+
+            # cleaning changes the size of the recipes, not just of the data directory, so the statistics are
+            # reconciled after responding; until then, the summary shows the previous statistics
+            bg_tasks.add_task(reconcile_storage_stats)
             return SuccessResponse.respond(f"{cleaned_images} Images cleaned")
         except Exception as e:
             raise HTTPException(status_code=500, detail=ErrorResponse.respond("Failed to clean images")) from e
@@ -104,6 +132,7 @@ class AdminMaintenanceController(BaseAdminController):
                 shutil.rmtree(self.folders.TEMP_DIR)
 
             self.folders.TEMP_DIR.mkdir(parents=True, exist_ok=True)
+            self.storage_stats.invalidate()
         except Exception as e:
             raise HTTPException(status_code=500, detail=ErrorResponse.respond("Failed to clean temp")) from e
 
@@ -116,6 +145,7 @@ class AdminMaintenanceController(BaseAdminController):
         """
         try:
             cleaned_dirs = clean_recipe_folders(self.folders.RECIPE_DATA_DIR, dry_run=False)
+            self.storage_stats.invalidate()
             return SuccessResponse.respond(f"{cleaned_dirs} Recipe folders removed")
         except Exception as e:
             raise HTTPException(status_code=500, detail=ErrorResponse.respond("Failed to clean directories")) from e
@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+
+from mealie.routes._base import BaseAdminController, controller
+from mealie.schema.admin.scheduler import ScheduledTaskSummary
+from mealie.services.scheduler import get_scheduled_tasks
+
+router = APIRouter(prefix="/scheduler")
+
+
+@controller(router)
+class AdminSchedulerController(BaseAdminController):
+    @router.get("/tasks", response_model=list[ScheduledTaskSummary])
+    def get_scheduled_tasks(self):
+        """
+        Get the state of every scheduled task, including the duration and result of its last run
+        """
+
+        return get_scheduled_tasks(self.session)
@@ -571,5 +571,6 @@ class RecipeController(BaseRecipeController):
         recipe.assets.append(asset_in)
 
         self.mixins.update_one(recipe, slug)
+        RecipeDataService(recipe.id).record_data_size()
 
         return asset_in
@@ -21,6 +21,7 @@ from mealie.schema.response.pagination import PaginationQuery
 from mealie.services import urls
 from mealie.services.event_bus_service.event_types import EventOperation, EventRecipeTimelineEventData, EventTypes
 from mealie.services.recipe.recipe_data_service import RecipeDataService
+from mealie.services.storage_stats.storage_stats_service import StorageStatsService
 
 router = UserAPIRouter(route_class=MealieCrudRoute, prefix="/timeline/events")
 
@@ -115,6 +116,8 @@ class RecipeTimelineEventsController(BaseCrudController):
             except FileNotFoundError:
                 pass
 
+            StorageStatsService(self.session).record_recipe_size(event.recipe_id)
+
         recipe = self.group_recipes.get_one(event.recipe_id, "id")
         if recipe:
             self.publish_event(
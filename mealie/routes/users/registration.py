@@ -42,5 +42,6 @@ class RegistrationController(BasePublicController):
             event_type=EventTypes.user_signup,
             document_data=EventUserSignupData(username=result.username, email=result.email),
         )
+        self.session.commit()
 
         return result
@@ -15,6 +15,7 @@ from .restore import (
     SettingsImport,
     UserImport,
 )
+from .scheduler import ScheduledTaskStatus, ScheduledTaskSummary
 from .settings import CustomPageBase, CustomPageOut
 
 __all__ = [
@@ -25,6 +26,8 @@ __all__ = [
     "MigrationFile",
     "MigrationImport",
     "Migrations",
+    "ScheduledTaskStatus",
+    "ScheduledTaskSummary",
     "CustomPageBase",
     "CustomPageOut",
     "CommentImport",
@@ -0,0 +1,25 @@
+from datetime import datetime
+from enum import Enum
+
+from mealie.schema._mealie import MealieModel
+
+
+class ScheduledTaskStatus(Enum):
+    scheduled = "scheduled"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
+
+class ScheduledTaskSummary(MealieModel):
+    name: str
+    schedule: str | None = None
+    status: ScheduledTaskStatus
+    next_run_at: datetime | None = None
+    last_started_at: datetime | None = None
+    last_completed_at: datetime | None = None
+    last_duration: float | None = None
+    """Duration of the last run, in seconds"""
+    last_error: str | None = None
+    run_count: int = 0
+    failure_count: int = 0
@@ -9,7 +9,7 @@ from uuid import uuid4
 from pydantic import UUID4, BaseModel, ConfigDict, Field, field_validator, model_validator
 from pydantic_core.core_schema import ValidationInfo
 from slugify import slugify
-from sqlalchemy import Select, desc, func, or_, select, text
+from sqlalchemy import Select, func, or_, select, text
 from sqlalchemy.orm import Session, joinedload, selectinload
 from sqlalchemy.orm.interfaces import LoaderOption
 
@@ -26,6 +26,7 @@ from ...db.models.recipe import (
     RecipeInstruction,
     RecipeModel,
 )
+from ...db.models.recipe.full_text_search import filter_query_by_full_text_search
 from .recipe_asset import RecipeAsset
 from .recipe_comments import RecipeCommentOut
 from .recipe_notes import RecipeNote
@@ -326,35 +327,29 @@ class Recipe(RecipeSummary):
         cls, db_model, query: Select, session: Session, search_type: SearchType, search: str, search_list: list[str]
     ) -> Select:
         """
-        1. token search looks for any individual exact hit in name, description, and ingredients
+        1. token search looks for any individual word (or prefix) in name, description, and ingredients, using
+           the full-text search indexes, and ranks name hits above description hits
         2. fuzzy search looks for trigram hits in name, description, and ingredients
         3. Sort order is determined by closeness to the recipe name
         Should search also look at tags?
         """
 
         if search_type is SearchType.fuzzy:
-            # I would prefer to just do this in the recipe_ingredient.any part of the main query,
-            # but it turns out that at least sqlite wont use indexes for that correctly anymore and
-            # takes a big hit, so prefiltering it is
-            ingredient_ids = (
-                session.execute(
-                    select(RecipeIngredientModel.id).filter(
-                        or_(
-                            RecipeIngredientModel.note_normalized.op("%>")(search),
-                            RecipeIngredientModel.original_text_normalized.op("%>")(search),
-                        )
-                    )
+            # match ingredients with an uncorrelated subquery in the same statement, rather than loading every
+            # matching ingredient id first; `recipe_ingredient.any(...)` would be a correlated EXISTS per recipe
+            session.execute(text(f"set pg_trgm.word_similarity_threshold = {cls._fuzzy_similarity_threshold};"))
+            ingredient_matches = select(RecipeIngredientModel.recipe_id).filter(
+                or_(
+                    RecipeIngredientModel.note_normalized.op("%>")(search),
+                    RecipeIngredientModel.original_text_normalized.op("%>")(search),
                 )
-                .scalars()
-                .all()
             )
 
-            session.execute(text(f"set pg_trgm.word_similarity_threshold = {cls._fuzzy_similarity_threshold};"))
             return query.filter(
                 or_(
                     RecipeModel.name_normalized.op("%>")(search),
                     RecipeModel.description_normalized.op("%>")(search),
-                    RecipeModel.recipe_ingredient.any(RecipeIngredientModel.id.in_(ingredient_ids)),
+                    RecipeModel.id.in_(ingredient_matches),
                 )
             ).order_by(  # trigram ordering could be too slow on million record db, but is fine with thousands.
                 func.least(
@@ -363,26 +358,7 @@ class Recipe(RecipeSummary):
             )
 
         else:
-            ingredient_ids = (
-                session.execute(
-                    select(RecipeIngredientModel.id).filter(
-                        or_(
-                            *[RecipeIngredientModel.note_normalized.like(f"%{ns}%") for ns in search_list],
-                            *[RecipeIngredientModel.original_text_normalized.like(f"%{ns}%") for ns in search_list],
-                        )
-                    )
-                )
-                .scalars()
-                .all()
-            )
-
-            return query.filter(
-                or_(
-                    *[RecipeModel.name_normalized.like(f"%{ns}%") for ns in search_list],
-                    *[RecipeModel.description_normalized.like(f"%{ns}%") for ns in search_list],
-                    RecipeModel.recipe_ingredient.any(RecipeIngredientModel.id.in_(ingredient_ids)),
-                )
-            ).order_by(desc(RecipeModel.name_normalized.like(f"%{search}%")))
+            return filter_query_by_full_text_search(query, session, search, search_list)
 
 
 class RecipeLastMade(BaseModel):
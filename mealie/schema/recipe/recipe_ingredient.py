@@ -10,7 +10,7 @@ from pydantic import UUID4, ConfigDict, Field, field_validator, model_validator
 from sqlalchemy.orm import joinedload, selectinload
 from sqlalchemy.orm.interfaces import LoaderOption
 
-from mealie.db.models.recipe import IngredientFoodModel
+from mealie.db.models.recipe import IngredientFoodModel, IngredientUnitModel
 from mealie.schema._mealie import MealieModel
 from mealie.schema._mealie.mealie_model import UpdatedAtField
 from mealie.schema._mealie.types import NoneFloat
@@ -92,6 +92,7 @@ class IngredientFood(CreateIngredientFood):
     def loader_options(cls) -> list[LoaderOption]:
         return [
             selectinload(IngredientFoodModel.households_with_ingredient_food),
+            selectinload(IngredientFoodModel.aliases),
             joinedload(IngredientFoodModel.extras),
             joinedload(IngredientFoodModel.label),
         ]
@@ -150,6 +151,10 @@ class IngredientUnit(CreateIngredientUnit):
     _normalize_search: ClassVar[bool] = True
     model_config = ConfigDict(from_attributes=True)
 
+    @classmethod
+    def loader_options(cls) -> list[LoaderOption]:
+        return [selectinload(IngredientUnitModel.aliases)]
+
 
 class RecipeIngredientBase(MealieModel):
     quantity: NoneFloat = 1
@@ -1,8 +1,11 @@
 # This file is auto-generated by gen_schema_exports.py
 from .pagination import (
+    CountStrategy,
     OrderByNullPosition,
     OrderDirection,
     PaginationBase,
+    PaginationCursor,
+    PaginationMode,
     PaginationQuery,
     RecipeSearchQuery,
     RequestQuery,
@@ -29,9 +32,12 @@ __all__ = [
     "RelationalKeyword",
     "RelationalOperator",
     "ValidationResponse",
+    "CountStrategy",
     "OrderByNullPosition",
     "OrderDirection",
     "PaginationBase",
+    "PaginationCursor",
+    "PaginationMode",
     "PaginationQuery",
     "RecipeSearchQuery",
     "RequestQuery",
@@ -1,6 +1,12 @@
+import base64
+import binascii
 import enum
+import json
+from datetime import date, datetime
+from decimal import Decimal
 from typing import Annotated, Any
 from urllib.parse import parse_qs, urlencode, urlsplit, urlunsplit
+from uuid import UUID
 
 from humps import camelize
 from pydantic import UUID4, BaseModel, Field, field_validator
@@ -19,6 +25,17 @@ class OrderByNullPosition(str, enum.Enum):
     last = "last"
 
 
+class PaginationMode(str, enum.Enum):
+    offset = "offset"
+    cursor = "cursor"
+
+
+class CountStrategy(str, enum.Enum):
+    exact = "exact"
+    cached = "cached"
+    approximate = "approximate"
+
+
 class RecipeSearchQuery(MealieModel):
     cookbook: UUID4 | str | None = None
     require_all_categories: bool = False
@@ -47,18 +64,104 @@ class PaginationQuery(RequestQuery):
     page: int = 1
     per_page: int = 50
 
+    # cursor mode uses keyset pagination: instead of jumping to `page`, the next page is fetched by passing
+    # the previous response's `next_cursor` as `cursor`. Providing a cursor implies cursor mode.
+    pagination_mode: PaginationMode = PaginationMode.offset
+    cursor: Annotated[str | None, Field(exclude=True)] = None
+    # skipping the total count only applies to cursor mode
+    skip_count: bool = False
+    # how the total is counted: "cached" reuses totals until the underlying tables are written to, "approximate"
+    # uses the database's row estimate for large results (postgres only; other databases use "cached")
+    count_strategy: CountStrategy = CountStrategy.exact
+
+    @property
+    def is_cursor_mode(self) -> bool:
+        return self.pagination_mode is PaginationMode.cursor or bool(self.cursor)
+
+
+class PaginationCursor(BaseModel):
+    """
+    Opaque keyset position, holding the order by values of the last row of a page (including its id).
+    The fingerprint ties a cursor to the ordering it was created with.
+    """
+
+    fingerprint: str
+    values: list[Any]
+
+    @staticmethod
+    def _encode_value(value: Any) -> Any:
+        if value is None or isinstance(value, bool | int | float | str):
+            return value
+        if isinstance(value, datetime):
+            return {"dt": value.isoformat()}
+        if isinstance(value, date):
+            return {"d": value.isoformat()}
+        if isinstance(value, UUID):
+            return {"uuid": str(value)}
+        if isinstance(value, Decimal):
+            return {"dec": str(value)}
+
+        raise ValueError(f"unsupported cursor value type {type(value).__name__}")
+
+    @staticmethod
+    def _decode_value(value: Any) -> Any:
+        if not isinstance(value, dict):
+            return value
+
+        [(value_type, raw)] = value.items()
+        if value_type == "dt":
+            return datetime.fromisoformat(raw)
+        if value_type == "d":
+            return date.fromisoformat(raw)
+        if value_type == "uuid":
+            return UUID(raw)
+        if value_type == "dec":
+            return Decimal(raw)
+
+        raise ValueError(f"unsupported cursor value type {value_type}")
+
+    def encode(self) -> str:
+        payload = {"f": self.fingerprint, "v": [self._encode_value(v) for v in self.values]}
+        raw = json.dumps(payload, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, cursor: str) -> "PaginationCursor":
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            payload = json.loads(raw)
+            return cls(fingerprint=payload["f"], values=[cls._decode_value(v) for v in payload["v"]])
+        except (binascii.Error, UnicodeDecodeError, TypeError, KeyError, ValueError) as e:
+            raise ValueError("invalid pagination cursor") from e
+
 
 class PaginationBase[DataT: BaseModel](BaseModel):
     page: int = 1
     per_page: int = 10
-    total: int = 0
-    total_pages: int = 0
+    total: int | None = 0
+    total_pages: int | None = 0
+    total_is_approximate: bool = False
     items: list[DataT]
     next: str | None = None
     previous: str | None = None
+    next_cursor: str | None = None
+
+    @staticmethod
+    def _is_cursor_mode(query_params: dict[str, Any]) -> bool:
+        return query_params.get("paginationMode") == PaginationMode.cursor or bool(query_params.get("cursor"))
 
     def _set_next(self, route: str, query_params: dict[str, Any]) -> None:
-        if self.page >= self.total_pages:
+        if self._is_cursor_mode(query_params):
+            if not self.next_cursor:
+                self.next = None
+                return
+
+            query_params.pop("page", None)
+            query_params["cursor"] = self.next_cursor
+            self.next = PaginationBase.merge_query_parameters(route, query_params)
+            return
+
+        if self.total_pages is None or self.page >= self.total_pages:
             self.next = None
             return
 
@@ -67,7 +170,8 @@ class PaginationBase[DataT: BaseModel](BaseModel):
         self.next = PaginationBase.merge_query_parameters(route, query_params)
 
     def _set_prev(self, route: str, query_params: dict[str, Any]) -> None:
-        if self.page <= 1:
+        # cursors only move forward
+        if self.page <= 1 or self._is_cursor_mode(query_params):
             self.previous = None
             return
 
@@ -3,6 +3,7 @@ from __future__ import annotations
 import re
 from collections import deque
 from enum import Enum
+from functools import lru_cache
 from typing import Any, cast
 from uuid import UUID
 
@@ -230,16 +231,7 @@ class QueryFilterBuilder:
     list_item_sep: str = ","
 
     def __init__(self, filter_string: str) -> None:
-        # parse filter string
-        components = QueryFilterBuilder._break_filter_string_into_components(filter_string)
-        base_components = QueryFilterBuilder._break_components_into_base_components(components)
-        if base_components.count(QueryFilterBuilder.l_group_sep) != base_components.count(
-            QueryFilterBuilder.r_group_sep
-        ):
-            raise ValueError("invalid query string: parenthesis are unbalanced")
-
-        # parse base components into a filter group
-        self.filter_components = QueryFilterBuilder._parse_base_components_into_filter_components(base_components)
+        self.filter_components = QueryFilterBuilder._parse_filter_string(filter_string)
 
     def __repr__(self) -> str:
         joined = " ".join(
@@ -251,6 +243,26 @@ class QueryFilterBuilder:
 
         return f"<<{joined}>>"
 
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _parse_filter_string(filter_string: str) -> tuple[str | QueryFilterBuilderComponent | LogicalOperator, ...]:
+        """
+        Parse a filter string into its filter components.
+
+        Parsing only depends on the filter string, and the same filters (e.g. from cookbooks and meal plan rules)
+        are used over and over, so the results are cached. The components are shared and must not be modified.
+        """
+
+        components = QueryFilterBuilder._break_filter_string_into_components(filter_string)
+        base_components = QueryFilterBuilder._break_components_into_base_components(components)
+        if base_components.count(QueryFilterBuilder.l_group_sep) != base_components.count(
+            QueryFilterBuilder.r_group_sep
+        ):
+            raise ValueError("invalid query string: parenthesis are unbalanced")
+
+        # parse base components into a filter group
+        return tuple(QueryFilterBuilder._parse_base_components_into_filter_components(base_components))
+
     @classmethod
     def _consolidate_group(
         cls, group: list[sa.ColumnElement], logical_operators: deque[LogicalOperator]
@@ -287,8 +299,26 @@ class QueryFilterBuilder:
         Works with shallow attributes (e.g. "slug" from `RecipeModel`)
         and arbitrarily deep ones (e.g. "recipe.group.preferences" on `RecipeTimelineEvent`).
         """
+        current_model, model_attr, joins = cls._resolve_attr_string(attr_string, model)  # type: ignore
+        if query is not None:
+            for join in joins:
+                query = query.join(join, isouter=True)
+
+        return current_model, model_attr, query
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _resolve_attr_string(
+        attr_string: str, model: type[SqlAlchemyBase]
+    ) -> tuple[SqlAlchemyBase, InstrumentedAttribute, tuple[InstrumentedAttribute, ...]]:
+        """
+        Resolve an attribute string on a model to the nested model, its attribute, and the relationships that need
+        to be joined to reach it. This only depends on the mappers, so the results are cached.
+        """
+
         mapper: Mapper
         model_attr: InstrumentedAttribute | None = None
+        joins: list[InstrumentedAttribute] = []
 
         attribute_chain = decamelize(attr_string).split(".")
         if not attribute_chain:
@@ -305,9 +335,7 @@ class QueryFilterBuilder:
                     proxied_attribute_link = model_attr.target_collection
                     next_attribute_link = model_attr.value_attr
                     model_attr = getattr(current_model, proxied_attribute_link)
-
-                    if query is not None:
-                        query = query.join(model_attr, isouter=True)
+                    joins.append(model_attr)
 
                     mapper = sa.inspect(current_model)
                     relationship = mapper.relationships[proxied_attribute_link]
@@ -318,8 +346,7 @@ class QueryFilterBuilder:
                 if i == len(attribute_chain) - 1:
                     break
 
-                if query is not None:
-                    query = query.join(model_attr, isouter=True)
+                joins.append(model_attr)
 
                 mapper = sa.inspect(current_model)
                 relationship = mapper.relationships[attribute_link]
@@ -331,7 +358,7 @@ class QueryFilterBuilder:
         if model_attr is None:
             raise ValueError(f"invalid attribute string: '{attr_string}'")
 
-        return current_model, model_attr, query
+        return current_model, model_attr, tuple(joins)
 
     @classmethod
     def _transform_model_attr(cls, model_attr: InstrumentedAttribute, model_attr_type: Any) -> InstrumentedAttribute:
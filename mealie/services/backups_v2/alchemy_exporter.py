@@ -1,24 +1,39 @@
 import datetime
+import itertools
+import json
 import os
-import uuid
+from collections.abc import Callable, Generator, Iterable
 from logging import Logger
 from os import path
 from textwrap import dedent
-from typing import Any
+from typing import IO, Any
 
 from alembic import command
 from alembic.config import Config
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from sqlalchemy import Connection, ForeignKey, ForeignKeyConstraint, MetaData, Table, create_engine, insert, text
+from sqlalchemy import (
+    Column,
+    Connection,
+    ForeignKeyConstraint,
+    MetaData,
+    Table,
+    create_engine,
+    insert,
+    select,
+    text,
+)
 from sqlalchemy.engine import base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.sql import sqltypes
 
 from mealie.db import init_db
 from mealie.db.fixes.fix_migration_data import fix_migration_data
 from mealie.db.init_db import ALEMBIC_DIR
 from mealie.db.models._model_utils.guid import GUID
+from mealie.db.models.recipe.full_text_search import FULL_TEXT_SEARCH_TABLES, is_full_text_search_table
 from mealie.services._base_service import BaseService
+from mealie.services.backups_v2.backup_file import BackupContents
 
 
 class ForeignKeyDisabler:
@@ -56,9 +71,8 @@ class AlchemyExporter(BaseService):
     engine: base.Engine
     meta: MetaData
 
-    look_for_datetime = {"created_at", "update_at", "date_updated", "timestamp", "expires_at", "locked_at", "last_made"}
-    look_for_date = {"date_added", "date"}
-    look_for_time = {"scheduled_time"}
+    restore_batch_size = 1000
+    """Maximum number of rows inserted at a time during a restore"""
 
     class DateTimeParser(BaseModel):
         date: datetime.date | None = None
@@ -74,72 +88,126 @@ class AlchemyExporter(BaseService):
         self.session_maker = sessionmaker(bind=self.engine)
 
     @staticmethod
-    def is_uuid(value: Any) -> bool:
+    def include_table(table_name: str, _: MetaData) -> bool:
+        """The full-text search tables are derived from the recipe tables, so they're left out of backups"""
+        return not is_full_text_search_table(table_name)
+
+    @staticmethod
+    def _parse_datetime(value: Any) -> Any:
+        if not isinstance(value, str):
+            return value
+
+        try:
+            return datetime.datetime.fromisoformat(value)
+        except ValueError:
+            return AlchemyExporter.DateTimeParser(dt=value).dt
+
+    @staticmethod
+    def _parse_date(value: Any) -> Any:
+        if not isinstance(value, str):
+            return value
+
         try:
-            uuid.UUID(value)
-            return True
+            return datetime.date.fromisoformat(value)
         except ValueError:
-            return False
+            return AlchemyExporter.DateTimeParser(date=value).date
 
     @staticmethod
-    def is_valid_foreign_key(db_dump: dict[str, list[dict]], fk: ForeignKey, fk_value: Any) -> bool:
-        if not fk_value:
-            return True
+    def _parse_time(value: Any) -> Any:
+        if not isinstance(value, str):
+            return value
+
+        try:
+            return datetime.time.fromisoformat(value)
+        except ValueError:
+            return AlchemyExporter.DateTimeParser(time=value).time
+
+    def _convert_guid(self, value: Any) -> Any:
+        if not isinstance(value, str):
+            return value
+
+        try:
+            # convert the data to the current database's native GUID type
+            return GUID.convert_value_to_guid(value, self.engine.dialect)
+        except ValueError:
+            return value
+
+    def _column_converter(self, column: Column) -> Callable[[Any], Any] | None:
+        """
+        Returns a function that converts the column's json values back to the type the column expects,
+        based on the column's type in the database, or None if the values can be inserted as they are
+        """
+
+        column_type = column.type
+        if isinstance(column_type, sqltypes.DateTime):
+            return self._parse_datetime
+        if isinstance(column_type, sqltypes.Date):
+            return self._parse_date
+        if isinstance(column_type, sqltypes.Time):
+            return self._parse_time
+
+        # GUIDs are native UUIDs on postgres, and CHAR(32) everywhere else
+        if isinstance(column_type, sqltypes.Uuid) or (
+            isinstance(column_type, sqltypes.CHAR) and column_type.length == 32
+        ):
+            return self._convert_guid
+
+        return None
 
-        foreign_table_name = fk.column.table.name
-        foreign_field_name = fk.column.name
+    def _row_converter(self, table: Table) -> Callable[[dict], dict]:
+        converters = {
+            column.name: converter for column in table.columns if (converter := self._column_converter(column))
+        }
 
-        for row in db_dump.get(foreign_table_name, []):
-            if row[foreign_field_name] == fk_value:
-                return True
+        def convert(row: dict) -> dict:
+            for key, converter in converters.items():
+                if key in row:
+                    row[key] = converter(row[key])
+            return row
 
-        return False
+        return convert
 
-    def convert_types(self, data: dict) -> dict:
+    def _foreign_key_values(self, tables: Iterable[tuple[str, list[dict]]]) -> dict[tuple[str, str], set[Any]]:
         """
-        walks the dictionary to restore all things that look like string representations of their complex types
-        used in the context of reading a json file into a database via SQLAlchemy.
+        Collects the values in the backup of every column referenced by a foreign key,
+        so each foreign key can be checked with a set lookup
         """
-        for key, value in data.items():
-            if isinstance(value, dict):
-                data = self.convert_types(value)
-            elif isinstance(value, list):  # assume that this is a list of dictionaries
-                data[key] = [self.convert_types(item) for item in value]
-            elif isinstance(value, str):
-                if self.is_uuid(value):
-                    # convert the data to the current database's native GUID type
-                    data[key] = GUID.convert_value_to_guid(value, self.engine.dialect)
-                if key in self.look_for_datetime:
-                    data[key] = self.DateTimeParser(dt=value).dt
-                if key in self.look_for_date:
-                    data[key] = self.DateTimeParser(date=value).date
-                if key in self.look_for_time:
-                    data[key] = self.DateTimeParser(time=value).time
-        return data
-
-    def clean_rows(self, db_dump: dict[str, list[dict]], table: Table, rows: list[dict]) -> list[dict]:
+
+        referenced_columns: dict[str, set[str]] = {}
+        for table in self.meta.tables.values():
+            for fk in table.foreign_keys:
+                referenced_columns.setdefault(fk.column.table.name, set()).add(fk.column.name)
+
+        values: dict[tuple[str, str], set[Any]] = {}
+        for table_name, rows in tables:
+            for column_name in referenced_columns.get(table_name, ()):
+                column_values = values.setdefault((table_name, column_name), set())
+                column_values.update(row[column_name] for row in rows if row.get(column_name) is not None)
+
+        return values
+
+    def clean_rows(
+        self, foreign_key_values: dict[tuple[str, str], set[Any]], table: Table, rows: Iterable[dict]
+    ) -> list[dict]:
         """
         Checks rows against foreign key restraints and removes any rows that would violate them
         """
 
-        fks = table.foreign_keys
+        fks = [(fk, foreign_key_values.get((fk.column.table.name, fk.column.name), set())) for fk in table.foreign_keys]
 
         valid_rows = []
         for row in rows:
-            is_valid_row = True
-            for fk in fks:
+            for fk, valid_values in fks:
                 fk_value = row.get(fk.parent.name)
-                if self.is_valid_foreign_key(db_dump, fk, row.get(fk.parent.name)):
+                if not fk_value or fk_value in valid_values:
                     continue
 
-                is_valid_row = False
                 self.logger.warning(
                     f"Removing row from table {table.name} because of invalid foreign key {fk.parent.name}: {fk_value}"
                 )
                 self.logger.warning(f"Row: {row}")
                 break
-
-            if is_valid_row:
+            else:
                 valid_rows.append(row)
 
         return valid_rows
@@ -150,7 +218,7 @@ class AlchemyExporter(BaseService):
         jsonable_encoder to ensure that the object can be converted to a json string.
         """
         with self.engine.connect() as connection:
-            self.meta.reflect(bind=self.engine)
+            self.meta.reflect(bind=self.engine, only=self.include_table)
 
             all_tables = self.meta.tables.values()
 
@@ -163,10 +231,11 @@ class AlchemyExporter(BaseService):
 
             return jsonable_encoder(results)
 
-    def dump(self) -> dict[str, list[dict]]:
+    def iter_dump(self, batch_size: int = 1000) -> Generator[tuple[str, list[dict]], None, None]:
         """
-        Returns the entire SQLAlchemy database as a python dictionary. This dictionary is wrapped by
-        jsonable_encoder to ensure that the object can be converted to a json string.
+        Yields the rows of every table in batches of at most `batch_size`, so the database is never fully
+        loaded into memory. Every table is yielded at least once (with no rows if it's empty), starting with
+        `alembic_version` and then in dependency order, so referenced tables come before the tables referencing them.
         """
 
         # run database fixes first so we aren't backing up bad data
@@ -177,20 +246,62 @@ class AlchemyExporter(BaseService):
                 self.logger.error("Error fixing migration data during export; continuing anyway")
 
         with self.engine.connect() as connection:
-            self.meta.reflect(bind=self.engine)  #  http://docs.sqlalchemy.org/en/rel_0_9/core/reflection.html
+            #  http://docs.sqlalchemy.org/en/rel_0_9/core/reflection.html
+            self.meta.reflect(bind=self.engine, only=self.include_table)
 
-            result = {
-                table.name: [dict(row) for row in connection.execute(table.select()).mappings()]
-                for table in self.meta.sorted_tables
-            }
+            tables = sorted(self.meta.sorted_tables, key=lambda table: table.name != "alembic_version")
+            for table in tables:
+                # generated columns (e.g. search vectors) are left out, since the database computes them on restore
+                stmt = select(*[c for c in table.columns if c.computed is None]).execution_options(yield_per=batch_size)
+
+                # fetch rows in batches from a server-side cursor, rather than all at once
+                result = connection.execute(stmt)
+                has_rows = False
+                for partition in result.mappings().partitions():
+                    has_rows = True
+                    yield table.name, [dict(row) for row in partition]
+
+                if not has_rows:
+                    yield table.name, []
+
+    def dump(self) -> dict[str, list[dict]]:
+        """
+        Returns the entire SQLAlchemy database as a python dictionary. This dictionary is wrapped by
+        jsonable_encoder to ensure that the object can be converted to a json string.
+        """
+
+        result: dict[str, list[dict]] = {}
+        for table_name, rows in self.iter_dump():
+            result.setdefault(table_name, []).extend(rows)
 
         return jsonable_encoder(result)
 
-    def restore(self, db_dump: dict) -> None:
-        # setup alembic to run migrations up the version of the backup
-        alembic_data = db_dump["alembic_version"]
-        alembic_version = alembic_data[0]["version_num"]
+    def dump_ndjson(self, file: IO[bytes], batch_size: int = 1000) -> None:
+        """
+        Writes the entire database to `file` as newline-delimited JSON, one line per batch of rows:
+        `{"table": "recipes", "rows": [...]}`. Memory use depends on the batch size, not the size of the database.
+        """
+
+        for table_name, rows in self.iter_dump(batch_size):
+            # only values json can't serialize (e.g. UUIDs and datetimes) go through jsonable_encoder
+            line = json.dumps({"table": table_name, "rows": rows}, default=jsonable_encoder)
+            file.write(line.encode("utf-8") + b"\n")
+
+    def restore(self, db_dump: "dict | BackupContents") -> None:
+        """
+        Restores all data from the backup into the database. Backup contents are read twice, once to collect
+        the values referenced by foreign keys and once to insert the rows, so streamed backups are never
+        fully loaded into memory.
+        """
+
+        if isinstance(db_dump, dict):
+            alembic_version = db_dump["alembic_version"][0]["version_num"]
+            tables: Callable[[], Iterable[tuple[str, list[dict]]]] = db_dump.items
+        else:
+            alembic_version = db_dump.schema_version()
+            tables = db_dump.iter_tables
 
+        # setup alembic to run migrations up the version of the backup
         alembic_cfg_path = os.getenv("ALEMBIC_CONFIG_FILE", default=str(ALEMBIC_DIR / "alembic.ini"))
 
         if not path.isfile(alembic_cfg_path):
@@ -199,21 +310,27 @@ class AlchemyExporter(BaseService):
         alembic_cfg = Config(alembic_cfg_path)
         command.upgrade(alembic_cfg, alembic_version)
 
-        del db_dump["alembic_version"]
-        """Restores all data from dictionary into the database"""
         with self.engine.begin() as connection:
             with ForeignKeyDisabler(connection, self.engine.dialect.name, logger=self.logger):
-                data = self.convert_types(db_dump)
+                self.meta.reflect(bind=self.engine, only=self.include_table)
+                foreign_key_values = self._foreign_key_values(tables())
 
-                self.meta.reflect(bind=self.engine)
-                for table_name, rows in data.items():
-                    if not rows:
+                row_converters: dict[str, Callable[[dict], dict]] = {}
+                for table_name, rows in tables():
+                    if table_name == "alembic_version" or not rows:
                         continue
+
                     table = self.meta.tables[table_name]
-                    rows = self.clean_rows(db_dump, table, rows)
+                    if table_name not in row_converters:
+                        row_converters[table_name] = self._row_converter(table)
+                        connection.execute(table.delete())
+
+                    convert = row_converters[table_name]
+                    for batch in itertools.batched(rows, self.restore_batch_size):
+                        valid_rows = self.clean_rows(foreign_key_values, table, batch)
+                        if valid_rows:
+                            connection.execute(insert(table), [convert(row) for row in valid_rows])
 
-                    connection.execute(table.delete())
-                    connection.execute(insert(table), rows)
                 if self.engine.dialect.name == "postgresql":
                     # Restore postgres sequence numbers
                     sequences = [
@@ -257,6 +374,9 @@ class AlchemyExporter(BaseService):
             tables = []
             all_fkeys = []
             for table_name in inspector.get_table_names():
+                if is_full_text_search_table(table_name):
+                    continue
+
                 fkeys = []
 
                 for fkey in inspector.get_foreign_keys(table_name):
@@ -279,5 +399,9 @@ class AlchemyExporter(BaseService):
                 # Since we only have one, this will have to do for now
                 connection.execute(text("DROP TYPE authmethod"))
             else:
+                # dropping the full-text search tables also drops their shadow tables
+                for table_name in FULL_TEXT_SEARCH_TABLES:
+                    connection.execute(text(f"DROP TABLE IF EXISTS {table_name}"))
+
                 for table in tables:
                     connection.execute(DropTable(table))
@@ -1,16 +1,40 @@
 import json
 import shutil
 import tempfile
-from pathlib import Path
+from collections.abc import Generator
+from pathlib import Path, PurePosixPath
+from zipfile import ZipFile, ZipInfo
+
+from mealie.services.backups_v2.backup_store import MANIFEST_FILE, BackupManifest
+from mealie.services.backups_v2.data_restore import is_safe_path
+
+
+def is_data_file(name: str) -> bool:
+    """Whether the zip entry is a file in the backup's data directory"""
+
+    # the data directory is at the root of the zip, or in its base directory in zips mangled by Safari
+    return "data" in PurePosixPath(name).parts[:2] and not name.endswith("/")
 
 
 class BackupContents:
+    database_ndjson = "database.ndjson"
+    """The database as newline-delimited json, with one line per batch of a table's rows"""
+    database_json = "database.json"
+    """The database as a single json object, used by backups made before the database was streamed"""
+    manifest_json = MANIFEST_FILE
+    """The data directory's files in an incremental backup, which are kept in the backup chunk store"""
+
     _tables: dict | None = None
 
-    def __init__(self, file: Path) -> None:
+    def __init__(self, file: Path, archive: Path | None = None) -> None:
+        self.root = file
+        # the backup's zip, when the data directory wasn't extracted with the rest of the backup
+        self.archive = archive
+
         self.base = self._find_base(file)
         self.data_directory = self._find_data_dir_from_base(self.base)
         self.tables = self._find_database_from_base(self.base)
+        self.manifest = self.base / self.manifest_json
 
     @classmethod
     def _find_base(cls, file: Path) -> Path:
@@ -40,13 +64,14 @@ class BackupContents:
 
     @classmethod
     def _find_database_from_base(cls, base: Path) -> Path:
-        return base / "database.json"
+        ndjson_file = base / cls.database_ndjson
+        return ndjson_file if ndjson_file.exists() else base / cls.database_json
 
     def validate(self) -> bool:
         if not self.base.is_dir():
             return False
 
-        if not self.data_directory.is_dir():
+        if not (self.data_directory.is_dir() or self.is_incremental or self.archived_data_files()):
             return False
 
         if not self.tables.is_file():
@@ -54,20 +79,69 @@ class BackupContents:
 
         return True
 
+    @property
+    def is_incremental(self) -> bool:
+        return self.manifest.is_file()
+
+    def archived_data_files(self) -> dict[str, ZipInfo]:
+        """
+        The files of the data directory that are still in the backup's zip, by their path relative to the
+        data directory. Only backups opened without extracting the data directory have any.
+        """
+
+        if not self.archive:
+            return {}
+
+        prefix = f"{(self.base.relative_to(self.root) / 'data').as_posix()}/"
+        with ZipFile(self.archive) as zip_file:
+            return {
+                info.filename.removeprefix(prefix): info
+                for info in zip_file.infolist()
+                if info.filename.startswith(prefix)
+                and not info.is_dir()
+                and is_safe_path(info.filename.removeprefix(prefix))
+            }
+
+    def read_manifest(self) -> BackupManifest | None:
+        return BackupManifest.read(self.manifest) if self.is_incremental else None
+
     def schema_version(self) -> str:
-        tables = self.read_tables()
+        # alembic_version is the first table in streamed backups, so the rest of the file isn't read
+        for table_name, rows in self.iter_tables():
+            if table_name == "alembic_version":
+                return rows[0].get("version_num", "") if rows else ""
+
+        return ""
 
-        alembic_version = tables.get("alembic_version", [])
+    def iter_tables(self) -> Generator[tuple[str, list[dict]], None, None]:
+        """
+        Yields the rows of each table in batches. A table may be yielded more than once, with a different batch
+        of rows each time. Only streamed backups are read in batches; older backups are loaded all at once.
+        """
 
-        if not alembic_version:
-            return ""
+        if self.tables.name != self.database_ndjson:
+            yield from self.read_tables().items()
+            return
 
-        return alembic_version[0].get("version_num", "")
+        with open(self.tables, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+
+                batch = json.loads(line)
+                yield batch["table"], batch["rows"]
 
     def read_tables(self) -> dict:
         if self._tables is None:
-            with open(self.tables) as f:
-                self._tables = json.load(f)
+            if self.tables.name == self.database_ndjson:
+                tables: dict[str, list[dict]] = {}
+                for table_name, rows in self.iter_tables():
+                    tables.setdefault(table_name, []).extend(rows)
+
+                self._tables = tables
+            else:
+                with open(self.tables) as f:
+                    self._tables = json.load(f)
 
         return self._tables
 
@@ -75,13 +149,30 @@ class BackupContents:
 class BackupFile:
     temp_dir: Path | None = None
 
-    def __init__(self, file: Path) -> None:
+    def __init__(self, file: Path, extract_data: bool = True) -> None:
+        """
+        When `extract_data` is False, only the database is extracted, and the data directory's files are left in
+        the zip to be read with `BackupContents.archived_data_files`.
+        """
+
         self.zip = file
+        self.extract_data = extract_data
 
     def __enter__(self) -> BackupContents:
         self.temp_dir = Path(tempfile.mkdtemp())
-        shutil.unpack_archive(str(self.zip), str(self.temp_dir))
-        return BackupContents(self.temp_dir)
+        if self.extract_data:
+            shutil.unpack_archive(str(self.zip), str(self.temp_dir))
+            return BackupContents(self.temp_dir)
+
+        with ZipFile(self.zip) as zip_file:
+            members = [
+                info
+                for info in zip_file.infolist()
+                if not is_data_file(info.filename) and is_safe_path(info.filename.rstrip("/"))
+            ]
+            zip_file.extractall(self.temp_dir, members)
+
+        return BackupContents(self.temp_dir, archive=self.zip)
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         if self.temp_dir and self.temp_dir.is_dir():
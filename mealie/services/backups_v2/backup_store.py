@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from zipfile import BadZipFile, ZipFile
+
+HASH_BLOCK_SIZE = 1024 * 1024
+MANIFEST_FILE = "manifest.json"
+"""Name of the manifest in incremental backups, and of the latest backup's manifest in the chunk store"""
+
+
+def file_sha256(file: Path) -> str:
+    digest = hashlib.sha256()
+    with open(file, "rb") as f:
+        while block := f.read(HASH_BLOCK_SIZE):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+@dataclass(slots=True)
+class ManifestEntry:
+    hash: str
+    size: int
+    mtime_ns: int
+
+
+class BackupManifest:
+    """
+    The files in the data directory at the time of a backup, by their path relative to the data directory,
+    along with the hash of their contents. An incremental backup stores its manifest instead of the files,
+    which are kept in the `BackupChunkStore`.
+    """
+
+    def __init__(self, files: dict[str, ManifestEntry] | None = None) -> None:
+        self.files = files or {}
+
+    @classmethod
+    def from_json(cls, data: str | bytes) -> "BackupManifest":
+        files = json.loads(data)["files"]
+        return cls({path: ManifestEntry(**entry) for path, entry in files.items()})
+
+    @classmethod
+    def read(cls, file: Path) -> "BackupManifest | None":
+        try:
+            return cls.from_json(file.read_bytes())
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def to_json(self) -> str:
+        return json.dumps({"files": {path: asdict(entry) for path, entry in self.files.items()}})
+
+    @property
+    def hashes(self) -> set[str]:
+        return {entry.hash for entry in self.files.values()}
+
+
+class BackupChunkStore:
+    """
+    A content-addressed store for the files of incremental backups. Each file is stored once by the hash of its
+    contents, so files that don't change between backups, like recipe images, aren't copied again.
+
+    The store keeps the manifest of the latest backup, so files whose size and modification time haven't changed
+    since then don't need to be hashed again.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+
+    def path(self, file_hash: str) -> Path:
+        return self.directory / file_hash[:2] / file_hash
+
+    def has(self, file_hash: str) -> bool:
+        return self.path(file_hash).is_file()
+
+    def add(self, file: Path) -> ManifestEntry:
+        """Adds the file to the store, unless a file with the same contents is already stored"""
+
+        stat = file.stat()
+        file_hash = file_sha256(file)
+
+        chunk = self.path(file_hash)
+        if not chunk.is_file():
+            # copy to a temporary file first, so an interrupted backup never leaves a partial chunk behind
+            chunk.parent.mkdir(parents=True, exist_ok=True)
+            tmp_chunk = chunk.with_name(f".{chunk.name}.{uuid.uuid4().hex}.tmp")
+            shutil.copyfile(file, tmp_chunk)
+            os.replace(tmp_chunk, chunk)
+
+        return ManifestEntry(hash=file_hash, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+
+    def build_manifest(self, files: dict[str, Path]) -> BackupManifest:
+        """
+        Adds the files to the store and returns their manifest. Files with the same size and modification time
+        as in the previous manifest are assumed to be unchanged, and aren't read again.
+        """
+
+        previous = self.read_manifest()
+        manifest = BackupManifest()
+
+        for relative_path, file in files.items():
+            entry = previous.files.get(relative_path)
+            stat = file.stat()
+            if entry and entry.size == stat.st_size and entry.mtime_ns == stat.st_mtime_ns and self.has(entry.hash):
+                manifest.files[relative_path] = entry
+            else:
+                manifest.files[relative_path] = self.add(file)
+
+        self.write_manifest(manifest)
+        return manifest
+
+    def read_manifest(self) -> BackupManifest:
+        return BackupManifest.read(self.directory / MANIFEST_FILE) or BackupManifest()
+
+    def write_manifest(self, manifest: BackupManifest) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.directory / f".{MANIFEST_FILE}.{uuid.uuid4().hex}.tmp"
+        tmp_file.write_text(manifest.to_json())
+        os.replace(tmp_file, self.directory / MANIFEST_FILE)
+
+    def missing(self, manifest: BackupManifest) -> set[str]:
+        """The hashes of the files in the manifest that aren't in the store"""
+
+        return {file_hash for file_hash in manifest.hashes if not self.has(file_hash)}
+
+    def remove_unused(self, backup_dir: Path) -> int:
+        """
+        Removes the stored files that aren't used by any of the backups in `backup_dir`, or by the
+        latest backup's manifest. Returns the number of files removed.
+        """
+
+        used = self.read_manifest().hashes
+        for backup in backup_dir.glob("*.zip"):
+            try:
+                with ZipFile(backup) as zip_file:
+                    if MANIFEST_FILE not in zip_file.namelist():
+                        continue
+
+                    used.update(BackupManifest.from_json(zip_file.read(MANIFEST_FILE)).hashes)
+            except (OSError, BadZipFile, ValueError, KeyError, TypeError):
+                # if a backup can't be read, it's not safe to tell which files are unused
+                return 0
+
+        removed = 0
+        for chunk in self.directory.glob("*/*"):
+            if chunk.is_file() and chunk.name not in used:
+                chunk.unlink(missing_ok=True)
+                removed += 1
+
+        return removed
@@ -1,12 +1,16 @@
 import datetime
-import json
 import shutil
 from pathlib import Path
-from zipfile import ZipFile
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
 
 from mealie.services._base_service import BaseService
 from mealie.services.backups_v2.alchemy_exporter import AlchemyExporter
-from mealie.services.backups_v2.backup_file import BackupFile
+from mealie.services.backups_v2.backup_file import BackupContents, BackupFile
+from mealie.services.backups_v2.backup_store import BackupChunkStore, BackupManifest
+from mealie.services.backups_v2.data_restore import DataDirectoryRestore
+
+STORED_EXTENSIONS = {".webp", ".jpg", ".jpeg", ".png", ".gif", ".avif", ".pdf", ".gz", ".zip"}
+"""Files that are already compressed, and are added to backups without compressing them again"""
 
 
 class BackupSchemaMismatch(Exception): ...
@@ -20,6 +24,7 @@ class BackupV2(BaseService):
         self.db_url: str = db_url or self.settings.DB_URL  # type: ignore
 
         self.db_exporter = AlchemyExporter(self.db_url)
+        self.chunk_store = BackupChunkStore(self.directories.BACKUP_CHUNKS_DIR)
 
     def _sqlite(self) -> None:
         db_file = self.settings.DB_URL.removeprefix("sqlite:///")  # type: ignore
@@ -31,46 +36,82 @@ class BackupV2(BaseService):
     def _postgres(self) -> None:
         pass
 
-    def backup(self) -> Path:
+    def _data_files(self) -> dict[str, Path]:
+        """The files in the data directory that are backed up, by their path relative to the data directory"""
+
         # sourcery skip: merge-nested-ifs, reintroduce-else, remove-redundant-continue
         exclude = {"mealie.db", "mealie.log", ".secret"}
         exclude_ext = {".zip"}
-        exclude_dirs = {"backups", ".temp"}
+        exclude_dirs = {"backups", ".temp", ".cache"}
+
+        files: dict[str, Path] = {}
+        for data_file in self.directories.DATA_DIR.glob("**/*"):
+            if data_file.name in exclude:
+                continue
+
+            if data_file.is_file() and data_file.suffix not in exclude_ext:
+                relative_path = data_file.relative_to(self.directories.DATA_DIR)
+                if any(parent.name in exclude_dirs for parent in relative_path.parents):
+                    continue
+
+                files[relative_path.as_posix()] = data_file
+
+        return files
+
+    def backup(self, incremental: bool | None = None) -> Path:
+        """
+        Backs up the database and the data directory into a new zip file. Incremental backups store the data
+        directory's files in the chunk store instead, along with a manifest of the files in the zip.
+        """
+
+        if incremental is None:
+            incremental = self.settings.BACKUP_INCREMENTAL
 
         timestamp = datetime.datetime.now(datetime.UTC).strftime("%Y.%m.%d.%H.%M.%S")
 
         backup_name = f"mealie_{timestamp}.zip"
         backup_file = self.directories.BACKUP_DIR / backup_name
 
-        database_json = self.db_exporter.dump()
-
-        with ZipFile(backup_file, "w") as zip_file:
-            zip_file.writestr("database.json", json.dumps(database_json))
+        with ZipFile(backup_file, "w", compression=ZIP_DEFLATED) as zip_file:
+            # the database is streamed into the zip in batches, so it's never fully loaded into memory
+            with zip_file.open(BackupContents.database_ndjson, "w", force_zip64=True) as database_file:
+                self.db_exporter.dump_ndjson(database_file)
 
-            for data_file in self.directories.DATA_DIR.glob("**/*"):
-                if data_file.name in exclude:
-                    continue
+            data_files = self._data_files()
+            if incremental:
+                manifest = self.chunk_store.build_manifest(data_files)
+                zip_file.writestr(BackupContents.manifest_json, manifest.to_json())
+            else:
+                for relative_path, data_file in data_files.items():
+                    compress_type = ZIP_STORED if data_file.suffix.lower() in STORED_EXTENSIONS else None
+                    zip_file.write(data_file, f"data/{relative_path}", compress_type=compress_type)
 
-                if data_file.is_file() and data_file.suffix not in exclude_ext:
-                    if data_file.parent.name in exclude_dirs:
-                        continue
-
-                    zip_file.write(data_file, f"data/{data_file.relative_to(self.directories.DATA_DIR)}")
+        if incremental:
+            self.chunk_store.remove_unused(self.directories.BACKUP_DIR)
 
         return backup_file
 
-    def _copy_data(self, data_path: Path) -> None:
-        for f in data_path.iterdir():
-            if f.is_file():
-                continue
+    def _restore_data(self, backup_path: Path, contents: BackupContents, manifest: BackupManifest | None) -> None:
+        stat = backup_path.stat()
+        backup_id = f"{backup_path.name}:{stat.st_size}:{stat.st_mtime_ns}"
 
-            shutil.rmtree(self.directories.DATA_DIR / f.name)
-            shutil.copytree(f, self.directories.DATA_DIR / f.name)
+        data_restore = DataDirectoryRestore(
+            self.directories.DATA_DIR,
+            self.directories.BACKUP_DIR / ".restore-progress",
+            workers=self.settings.BACKUP_RESTORE_WORKERS,
+            logger=self.logger,
+        )
+
+        if manifest:
+            data_restore.restore_manifest(backup_id, self.chunk_store, manifest)
+        else:
+            data_restore.restore_archive(backup_id, backup_path, contents.archived_data_files())
 
     def restore(self, backup_path: Path) -> None:
         self.logger.info("initializing backup restore")
 
-        backup = BackupFile(backup_path)
+        # the data directory is restored straight from the zip, so only the database is extracted
+        backup = BackupFile(backup_path, extract_data=False)
 
         if self.settings.DB_ENGINE == "sqlite":
             self._sqlite()
@@ -86,7 +127,20 @@ class BackupV2(BaseService):
                 )
                 raise ValueError("Invalid backup file")
 
-            database_json = contents.read_tables()
+            # the tables are streamed from the backup while they're restored, so only the schema version is read here
+            if not contents.schema_version():
+                self.logger.error("Invalid backup file. database does not contain a schema version")
+                raise ValueError("Invalid backup file")
+
+            manifest = contents.read_manifest()
+            if contents.is_incremental:
+                if manifest is None:
+                    self.logger.error("Invalid backup file. the manifest of the data directory can't be read")
+                    raise ValueError("Invalid backup file")
+
+                if missing := self.chunk_store.missing(manifest):
+                    self.logger.error(f"Invalid backup file. {len(missing)} files are missing from the backup store")
+                    raise ValueError("Invalid backup file")
 
             # ================================
             # Purge Database
@@ -98,12 +152,12 @@ class BackupV2(BaseService):
             # Restore Database
 
             self.logger.info("importing database tables")
-            self.db_exporter.restore(database_json)
+            self.db_exporter.restore(contents)
 
             self.logger.info("database tables imported successfully")
 
             self.logger.info("restoring data directory")
-            self._copy_data(contents.data_directory)
+            self._restore_data(backup_path, contents, manifest)
             self.logger.info("data directory restored successfully")
 
         self.logger.info("backup restore complete")
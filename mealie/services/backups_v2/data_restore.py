@@ -0,0 +1,166 @@
+import json
+import os
+import shutil
+import threading
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from logging import Logger
+from pathlib import Path, PurePosixPath
+from zipfile import ZipFile, ZipInfo
+
+from mealie.services.backups_v2.backup_store import BackupChunkStore, BackupManifest
+
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+def is_safe_path(relative_path: str) -> bool:
+    """Whether the path stays inside the directory it's relative to, so a backup can't write outside of it"""
+
+    path = PurePosixPath(relative_path)
+    return bool(path.parts) and not path.is_absolute() and ".." not in path.parts and "\\" not in relative_path
+
+
+class DataRestoreProgress:
+    """
+    Records which files of a backup have been restored, so an interrupted restore of the same backup continues
+    where it stopped instead of starting over. The first line identifies the backup, followed by one line per
+    restored file, so the file is only ever appended to while restoring.
+    """
+
+    def __init__(self, file: Path, backup_id: str) -> None:
+        self.file = file
+        self.backup_id = backup_id
+        self.restored: set[str] = set()
+        self.resuming = self._read()
+
+    def _read(self) -> bool:
+        try:
+            with open(self.file, encoding="utf-8") as f:
+                if json.loads(f.readline()).get("backup") != self.backup_id:
+                    return False
+
+                for line in f:
+                    try:
+                        self.restored.add(json.loads(line))
+                    except ValueError:
+                        # the last line is incomplete if the restore was interrupted while writing it
+                        break
+        except (OSError, ValueError, AttributeError):
+            return False
+
+        return True
+
+    @contextmanager
+    def record(self) -> Iterator[Callable[[str], None]]:
+        """Yields a function that records a restored file, and removes the progress once everything is restored"""
+
+        if not self.resuming:
+            self.file.parent.mkdir(parents=True, exist_ok=True)
+            self.file.write_text(json.dumps({"backup": self.backup_id}) + "\n", encoding="utf-8")
+
+        with open(self.file, "a", encoding="utf-8") as f:
+
+            def add(relative_path: str) -> None:
+                f.write(json.dumps(relative_path) + "\n")
+                f.flush()
+
+            yield add
+
+        self.file.unlink(missing_ok=True)
+
+
+class DataDirectoryRestore:
+    """
+    Restores the data directory from a backup, writing each file directly into place with a pool of threads.
+    Like the backup's own layout, each top-level directory in the backup replaces the one in the data directory.
+
+    Files are read straight from the backup's zip, or from the chunk store for incremental backups, so the backup
+    is never extracted to a temporary directory first. Each restored file is recorded in a `DataRestoreProgress`,
+    so restoring the same backup after an interruption skips the files that were already restored.
+    """
+
+    def __init__(self, data_dir: Path, progress_file: Path, workers: int, logger: Logger) -> None:
+        self.data_dir = data_dir
+        self.progress_file = progress_file
+        self.workers = workers
+        self.logger = logger
+
+    def restore_archive(self, backup_id: str, archive: Path, files: dict[str, ZipInfo]) -> None:
+        """Restores the files in the backup's zip, by their path relative to the data directory"""
+
+        local = threading.local()
+        zip_files: list[ZipFile] = []
+        lock = threading.Lock()
+
+        def write_file(relative_path: str, dest: Path) -> None:
+            # each thread reads from its own handle of the zip, so reads don't need to wait for each other
+            zip_file: ZipFile | None = getattr(local, "zip_file", None)
+            if zip_file is None:
+                zip_file = local.zip_file = ZipFile(archive)
+                with lock:
+                    zip_files.append(zip_file)
+
+            with zip_file.open(files[relative_path]) as src, open(dest, "wb") as dst:
+                shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+
+        try:
+            self._restore(backup_id, list(files), write_file)
+        finally:
+            for zip_file in zip_files:
+                zip_file.close()
+
+    def restore_manifest(self, backup_id: str, chunk_store: BackupChunkStore, manifest: BackupManifest) -> None:
+        """Restores the files of an incremental backup from the chunk store"""
+
+        def write_file(relative_path: str, dest: Path) -> None:
+            entry = manifest.files[relative_path]
+            shutil.copyfile(chunk_store.path(entry.hash), dest)
+
+            # keep the modification time, so the next incremental backup knows the file hasn't changed
+            os.utime(dest, ns=(entry.mtime_ns, entry.mtime_ns))
+
+        self._restore(backup_id, list(manifest.files), write_file)
+
+    def _restore(self, backup_id: str, files: list[str], write_file: Callable[[str, Path], None]) -> None:
+        # files at the top of the data directory, like the database, are never restored
+        files = [path for path in files if is_safe_path(path) and "/" in path]
+
+        progress = DataRestoreProgress(self.progress_file, backup_id)
+        if progress.resuming:
+            self.logger.info(f"resuming data directory restore, {len(progress.restored)} files already restored")
+
+        def restore_file(relative_path: str) -> str:
+            # a partially written file is never recorded as restored, so it's written again when resuming
+            write_file(relative_path, self.data_dir / relative_path)
+            return relative_path
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            if not progress.resuming:
+                directories = {path.split("/", 1)[0] for path in files}
+                self._remove_directories(pool, [self.data_dir / directory for directory in directories])
+
+            pending = [path for path in files if path not in progress.restored or not (self.data_dir / path).is_file()]
+
+            # create each directory once, instead of checking it exists for every file
+            for directory in sorted({(self.data_dir / path).parent for path in pending}):
+                directory.mkdir(parents=True, exist_ok=True)
+
+            with progress.record() as record:
+                for relative_path in pool.map(restore_file, pending):
+                    record(relative_path)
+
+    @staticmethod
+    def _remove_directories(pool: ThreadPoolExecutor, directories: list[Path]) -> None:
+        """Removes the directories, removing their contents in parallel since there can be thousands of them"""
+
+        def remove(path: Path) -> None:
+            if path.is_dir() and not path.is_symlink():
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                path.unlink(missing_ok=True)
+
+        directories = [directory for directory in directories if directory.is_dir()]
+        list(pool.map(remove, [child for directory in directories for child in directory.iterdir()]))
+        for directory in directories:
+            shutil.rmtree(directory, ignore_errors=True)
@@ -12,24 +12,33 @@ from sqlalchemy import select
 from sqlalchemy.orm.session import Session
 
 from mealie.db.db_setup import session_context
+from mealie.db.models.household.events import GroupEventNotifierModel, GroupEventNotifierOptionsModel
 from mealie.db.models.household.webhooks import GroupWebhooksModel
+from mealie.pkgs.cache import QueryCache
 from mealie.repos.repository_factory import AllRepositories
-from mealie.schema.household.group_events import GroupEventNotifierPrivate
 from mealie.schema.household.webhook import ReadWebhook
 
 from .event_types import Event, EventDocumentType, EventTypes, EventWebhookData
 from .publisher import ApprisePublisher, PublisherLike, WebhookPublisher
 
+# Apprise URLs by household id, keyed by (group id, event type); notifiers rarely change, but are looked up for every
+# event, so they're cached until one of these tables is written to. Writes made by other processes can't invalidate
+# the cache, so entries are only kept briefly, to stop notifying disabled or deleted notifiers soon after
+_NOTIFIER_TABLES = frozenset([GroupEventNotifierModel.__tablename__, GroupEventNotifierOptionsModel.__tablename__])
+apprise_subscriber_cache = QueryCache[dict[str, tuple[str, ...]]](ttl_seconds=10, max_entries=1024)
+
 
 class EventListenerBase(ABC):
     _session: Session | None = None
     _repos: AllRepositories | None = None
 
-    def __init__(self, group_id: UUID4, household_id: UUID4, publisher: PublisherLike) -> None:
+    def __init__(
+        self, group_id: UUID4, household_id: UUID4, publisher: PublisherLike, session: Session | None = None
+    ) -> None:
         self.group_id = group_id
         self.household_id = household_id
         self.publisher = publisher
-        self._session = None
+        self._session = session
         self._repos = None
 
     @abstractmethod
@@ -71,19 +80,48 @@ class EventListenerBase(ABC):
 
 
 class AppriseEventListener(EventListenerBase):
-    def __init__(self, group_id: UUID4, household_id: UUID4) -> None:
-        super().__init__(group_id, household_id, ApprisePublisher())
+    def __init__(
+        self,
+        group_id: UUID4,
+        household_id: UUID4,
+        publisher: PublisherLike | None = None,
+        session: Session | None = None,
+    ) -> None:
+        super().__init__(group_id, household_id, publisher or ApprisePublisher(), session)
 
     def get_subscribers(self, event: Event) -> list[str]:
-        with self.ensure_repos(self.group_id, self.household_id) as repos:
-            notifiers: list[GroupEventNotifierPrivate] = repos.group_event_notifier.multi_query(
-                {"enabled": True}, override_schema=GroupEventNotifierPrivate
-            )
+        with self.ensure_session() as session:
+            subscribers = self.get_group_subscribers(session, self.group_id, event.event_type)
 
-            urls = [notifier.apprise_url for notifier in notifiers if getattr(notifier.options, event.event_type.name)]
-            urls = AppriseEventListener.update_urls_with_event_data(urls, event)
+        urls = list(subscribers.get(str(self.household_id), ()))
+        return AppriseEventListener.update_urls_with_event_data(urls, event)
+
+    @staticmethod
+    def get_group_subscribers(session: Session, group_id: UUID4, event_type: EventTypes) -> dict[str, tuple[str, ...]]:
+        """The Apprise URLs of the enabled notifiers subscribed to `event_type`, by household id, for the whole group"""
+
+        key = (str(group_id), event_type.name)
+        if (cached := apprise_subscriber_cache.get(key)) is not None:
+            return cached
+
+        subscribers: dict[str, tuple[str, ...]] = {}
+
+        # internal event types (e.g. `test_message`) don't have an option, so they have no subscribers
+        if (option := getattr(GroupEventNotifierOptionsModel, event_type.name, None)) is not None:
+            stmt = (
+                select(GroupEventNotifierModel.household_id, GroupEventNotifierModel.apprise_url)
+                .join(GroupEventNotifierModel.options)
+                .where(
+                    GroupEventNotifierModel.group_id == group_id,
+                    GroupEventNotifierModel.enabled == True,  # noqa: E712 - required for SQLAlchemy comparison
+                    option == True,  # noqa: E712 - required for SQLAlchemy comparison
+                )
+            )
+            for household_id, url in session.execute(stmt):
+                subscribers[str(household_id)] = (*subscribers.get(str(household_id), ()), url)
 
-        return urls
+        apprise_subscriber_cache.set(key, subscribers, _NOTIFIER_TABLES)
+        return subscribers
 
     def publish_to_subscribers(self, event: Event, subscribers: list[str]) -> None:
         self.publisher.publish(event, subscribers)
@@ -133,8 +171,14 @@ class AppriseEventListener(EventListenerBase):
 
 
 class WebhookEventListener(EventListenerBase):
-    def __init__(self, group_id: UUID4, household_id: UUID4) -> None:
-        super().__init__(group_id, household_id, WebhookPublisher())
+    def __init__(
+        self,
+        group_id: UUID4,
+        household_id: UUID4,
+        publisher: PublisherLike | None = None,
+        session: Session | None = None,
+    ) -> None:
+        super().__init__(group_id, household_id, publisher or WebhookPublisher(), session)
 
     def get_subscribers(self, event: Event) -> list[ReadWebhook]:
         # we only care about events that contain webhook information
@@ -1,17 +1,14 @@
-from fastapi import BackgroundTasks, Depends
+from collections.abc import Iterable
+
+import sqlalchemy as sa
+from fastapi import Depends
 from pydantic import UUID4
 from sqlalchemy.orm.session import Session
 
 from mealie.core.config import get_app_settings
-from mealie.db.db_setup import generate_session
-from mealie.repos.all_repositories import get_repositories
-from mealie.schema.response.pagination import PaginationQuery
-from mealie.services.event_bus_service.event_bus_listeners import (
-    AppriseEventListener,
-    EventListenerBase,
-    WebhookEventListener,
-)
+from mealie.db.db_setup import generate_session, session_context
 
+from .event_bus_worker import enqueue_events, event_bus_worker
 from .event_types import Event, EventBusMessage, EventDocumentDataBase, EventTypes
 
 settings = get_app_settings()
@@ -40,28 +37,36 @@ class EventSource:
 
 
 class EventBusService:
-    bg: BackgroundTasks | None = None
     session: Session | None = None
 
-    def __init__(
-        self,
-        bg: BackgroundTasks | None = None,
-        session: Session | None = None,
-    ) -> None:
-        self.bg = bg
+    def __init__(self, session: Session | None = None) -> None:
         self.session = session
 
-    def _get_listeners(self, group_id: UUID4, household_id: UUID4) -> list[EventListenerBase]:
-        return [
-            AppriseEventListener(group_id, household_id),
-            WebhookEventListener(group_id, household_id),
-        ]
+    @staticmethod
+    def _new_event(
+        integration_id: str, event_type: EventTypes, document_data: EventDocumentDataBase | None, message: str = ""
+    ) -> Event:
+        return Event(
+            message=EventBusMessage.from_type(event_type, body=message),
+            event_type=event_type,
+            integration_id=integration_id,
+            document_data=document_data,
+        )
+
+    def _enqueue(self, events: list[tuple[Event, UUID4, UUID4 | None]]) -> None:
+        if not events:
+            return
 
-    def _publish_event(self, event: Event, group_id: UUID4, household_id: UUID4) -> None:
-        """Publishes the event to all listeners"""
-        for listener in self._get_listeners(group_id, household_id):
-            if subscribers := listener.get_subscribers(event):
-                listener.publish_to_subscribers(event, subscribers)
+        if self.session is None:
+            with session_context() as session:
+                enqueue_events(session, events)
+                session.commit()
+
+            event_bus_worker.wake()
+        else:
+            # the events are delivered once the caller commits them along with its own changes
+            enqueue_events(self.session, events)
+            sa.event.listen(self.session, "after_commit", lambda _: event_bus_worker.wake(), once=True)
 
     def dispatch(
         self,
@@ -72,34 +77,37 @@ class EventBusService:
         document_data: EventDocumentDataBase | None,
         message: str = "",
     ) -> None:
-        event = Event(
-            message=EventBusMessage.from_type(event_type, body=message),
-            event_type=event_type,
-            integration_id=integration_id,
-            document_data=document_data,
-        )
+        """
+        Queues the event for delivery to the event bus listeners (see `EventBusWorker`).
+        If `household_id` is None, the event is delivered to every household in the group.
 
-        if not household_id:
-            if not self.session:
-                raise ValueError("Session is required if household_id is not provided")
+        If the service was created with a session, the event is added to it, and the caller commits it;
+        otherwise the event is committed right away.
+        """
 
-            repos = get_repositories(self.session, group_id=group_id)
-            households = repos.households.page_all(PaginationQuery(page=1, per_page=-1)).items
-            household_ids = [household.id for household in households]
-        else:
-            household_ids = [household_id]
+        event = self._new_event(integration_id, event_type, document_data, message)
+        self._enqueue([(event, group_id, household_id)])
 
-        for household_id in household_ids:
-            if self.bg:
-                self.bg.add_task(self._publish_event, event=event, group_id=group_id, household_id=household_id)
-            else:
-                self._publish_event(event, group_id, household_id)
+    def dispatch_many(
+        self,
+        integration_id: str,
+        event_type: EventTypes,
+        documents: Iterable[tuple[UUID4, UUID4 | None, EventDocumentDataBase | None]],
+        message: str = "",
+    ) -> None:
+        """
+        Queues an event for each (group id, household id, document data) entry in a single transaction;
+        see `dispatch`
+        """
+
+        self._enqueue(
+            [
+                (self._new_event(integration_id, event_type, document_data, message), group_id, household_id)
+                for group_id, household_id, document_data in documents
+            ]
+        )
 
     @classmethod
-    def as_dependency(
-        cls,
-        bg: BackgroundTasks,
-        session=Depends(generate_session),
-    ):
+    def as_dependency(cls, session=Depends(generate_session)):
         """Convenience method to use as a dependency in FastAPI routes"""
-        return cls(bg, session)
+        return cls(session)
@@ -0,0 +1,383 @@
+"""
+Delivers queued events to the event bus listeners.
+
+`EventBusService.dispatch` only inserts the event into the `event_bus_outbox` table. The worker claims batches of due
+events, delivers them on its own thread pool, and retries destinations that failed with exponential backoff. Claimed
+events are leased, so events claimed by a worker that stopped (e.g. during a restart) are delivered again once the
+lease expires.
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import threading
+import uuid
+from collections.abc import Generator, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from urllib.parse import urlsplit
+
+from pydantic import UUID4
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.orm.session import Session
+
+from mealie.core import root_logger
+from mealie.core.config import get_app_settings
+from mealie.db.db_setup import session_context
+from mealie.db.models.household.events import EventBusOutboxModel
+from mealie.db.models.household.household import Household
+from mealie.pkgs.cache import QueryCache
+
+from .event_bus_listeners import AppriseEventListener, EventListenerBase, WebhookEventListener
+from .event_types import Event, EventDocumentDataBase
+from .publisher import ApprisePublisher, PublisherLike, WebhookPublisher
+
+logger = root_logger.get_logger()
+
+POLL_INTERVAL_SECONDS = 1
+LEASE_DURATION = timedelta(minutes=5)
+RETRY_BASE_DELAY = timedelta(seconds=10)
+RETRY_MAX_DELAY = timedelta(hours=1)
+
+# household ids by group id, for events delivered to every household in a group; kept briefly, like the notifiers,
+# since households created by other processes can't invalidate it
+household_ids_cache = QueryCache[tuple[UUID4, ...]](ttl_seconds=10, max_entries=1024)
+
+
+def _document_data_types() -> dict[str, type[EventDocumentDataBase]]:
+    types: dict[str, type[EventDocumentDataBase]] = {}
+    pending = [EventDocumentDataBase]
+    while pending:
+        cls = pending.pop()
+        types[cls.__name__] = cls
+        pending.extend(cls.__subclasses__())
+
+    return types
+
+
+def enqueue_event(session: Session, event: Event, group_id: UUID4, household_id: UUID4 | None) -> None:
+    """Adds an event to the outbox; if `household_id` is None, the event is delivered to every household in the group"""
+
+    enqueue_events(session, [(event, group_id, household_id)])
+
+
+def enqueue_events(session: Session, events: Iterable[tuple[Event, UUID4, UUID4 | None]]) -> None:
+    """
+    Adds (event, group id, household id) entries to the outbox; see `enqueue_event`.
+    The events are flushed, but not committed, so they're only delivered if the caller commits its transaction.
+    """
+
+    session.add_all(
+        EventBusOutboxModel(
+            group_id=group_id,
+            household_id=household_id,
+            event_type=event.event_type.name,
+            document_data_type=type(event.document_data).__name__ if event.document_data is not None else None,
+            payload=event.model_dump(mode="json"),
+            delivered_destinations=[],
+        )
+        for event, group_id, household_id in events
+    )
+    session.flush()
+
+
+def load_event(payload: dict, document_data_type: str | None) -> Event:
+    """Rebuilds an event from the outbox, keeping its original id, timestamp, and document data type"""
+
+    data = dict(payload)
+    if document_data_type and data.get("document_data") is not None:
+        data["document_data"] = _document_data_types()[document_data_type].model_validate(data["document_data"])
+
+    # `Event.__init__` generates a new id and timestamp, so restore the original ones
+    event = Event.model_validate(data)
+    if payload.get("event_id"):
+        event.event_id = uuid.UUID(payload["event_id"])
+    if payload.get("timestamp"):
+        event.timestamp = datetime.fromisoformat(payload["timestamp"])
+
+    return event
+
+
+@dataclass(slots=True)
+class _OutboxEntry:
+    id: UUID4
+    lease_id: UUID4
+    group_id: UUID4
+    household_id: UUID4 | None
+    document_data_type: str | None
+    payload: dict
+    attempts: int
+    delivered_destinations: list[str]
+
+
+@dataclass(slots=True)
+class _Delivery:
+    entry: _OutboxEntry
+    delivered_destinations: list[str]
+    errors: list[str] = field(default_factory=list)
+
+
+class DestinationLimiter:
+    """Limits how many events are delivered to the same host at the same time, across all workers"""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._semaphores: dict[str, threading.BoundedSemaphore] = {}
+
+    @staticmethod
+    def destination(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.hostname or ''}"
+
+    @contextlib.contextmanager
+    def acquire(self, url: str) -> Generator[None, None, None]:
+        key = self.destination(url)
+        with self._lock:
+            semaphore = self._semaphores.setdefault(key, threading.BoundedSemaphore(self.limit))
+
+        with semaphore:
+            yield
+
+
+class _OutboxPublisher:
+    """
+    Publishes to each destination separately, so a failing destination doesn't prevent delivery to the others,
+    and skips destinations that received the event on a previous attempt
+    """
+
+    def __init__(
+        self, publisher: PublisherLike, household_id: UUID4, limiter: DestinationLimiter, delivery: _Delivery
+    ) -> None:
+        self.publisher = publisher
+        self.household_id = household_id
+        self.limiter = limiter
+        self.delivery = delivery
+
+    def publish(self, event: Event, notification_urls: list[str]):
+        for url in notification_urls:
+            # destination URLs may contain secrets, so only their hashes are stored
+            key = hashlib.sha256(f"{self.household_id}:{url}".encode()).hexdigest()
+            if key in self.delivery.delivered_destinations:
+                continue
+
+            try:
+                with self.limiter.acquire(url):
+                    self.publisher.publish(event, [url])
+            except Exception as e:
+                self.delivery.errors.append(f"{self.limiter.destination(url)}: {e}")
+            else:
+                self.delivery.delivered_destinations.append(key)
+
+
+class EventBusWorker:
+    def __init__(
+        self,
+        workers: int | None = None,
+        batch_size: int | None = None,
+        max_attempts: int | None = None,
+        destination_concurrency: int | None = None,
+    ) -> None:
+        settings = get_app_settings()
+
+        self.workers = workers or settings.EVENT_BUS_WORKERS
+        self.batch_size = batch_size or settings.EVENT_BUS_BATCH_SIZE
+        self.max_attempts = max_attempts or settings.EVENT_BUS_MAX_ATTEMPTS
+        self.limiter = DestinationLimiter(destination_concurrency or settings.EVENT_BUS_DESTINATION_CONCURRENCY)
+
+        self._executor = self._new_executor()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    def _new_executor(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="event-bus")
+
+    def _get_listeners(
+        self, session: Session, group_id: UUID4, household_id: UUID4, delivery: _Delivery
+    ) -> list[EventListenerBase]:
+        return [
+            AppriseEventListener(
+                group_id,
+                household_id,
+                _OutboxPublisher(ApprisePublisher(hard_fail=True), household_id, self.limiter, delivery),
+                session,
+            ),
+            WebhookEventListener(
+                group_id,
+                household_id,
+                _OutboxPublisher(WebhookPublisher(hard_fail=True), household_id, self.limiter, delivery),
+                session,
+            ),
+        ]
+
+    def _get_household_ids(self, session: Session, group_id: UUID4) -> tuple[UUID4, ...]:
+        key = str(group_id)
+        if (household_ids := household_ids_cache.get(key)) is None:
+            household_ids = tuple(session.scalars(select(Household.id).where(Household.group_id == group_id)))
+            household_ids_cache.set(key, household_ids, frozenset([Household.__tablename__]))
+
+        return household_ids
+
+    def retry_delay(self, attempts: int) -> timedelta:
+        return min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY)
+
+    def _claim(self) -> list[_OutboxEntry]:
+        """Leases a batch of events that are due for delivery"""
+
+        now = datetime.now(UTC)
+        lease_id = uuid.uuid4()
+        unleased = or_(EventBusOutboxModel.leased_until.is_(None), EventBusOutboxModel.leased_until <= now)
+        due = (
+            select(EventBusOutboxModel.id)
+            .where(
+                EventBusOutboxModel.failed == False,  # noqa: E712 - required for SQLAlchemy comparison
+                EventBusOutboxModel.next_attempt_at <= now,
+                unleased,
+            )
+            .order_by(EventBusOutboxModel.next_attempt_at)
+            .limit(self.batch_size)
+        )
+
+        with session_context() as session:
+            # the lease condition is checked again by the update, so concurrent workers can't claim the same events
+            session.execute(
+                update(EventBusOutboxModel)
+                .where(EventBusOutboxModel.id.in_(due), unleased)
+                .values(lease_id=lease_id, leased_until=now + LEASE_DURATION)
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
+
+            rows = session.execute(select(EventBusOutboxModel).where(EventBusOutboxModel.lease_id == lease_id))
+            return [
+                _OutboxEntry(
+                    id=row.id,
+                    lease_id=lease_id,
+                    group_id=row.group_id,
+                    household_id=row.household_id,
+                    document_data_type=row.document_data_type,
+                    payload=row.payload,
+                    attempts=row.attempts,
+                    delivered_destinations=list(row.delivered_destinations),
+                )
+                for row in rows.scalars()
+            ]
+
+    def _deliver(self, entry: _OutboxEntry) -> _Delivery:
+        delivery = _Delivery(entry, delivered_destinations=list(entry.delivered_destinations))
+
+        try:
+            event = load_event(entry.payload, entry.document_data_type)
+            with session_context() as session:
+                if entry.household_id:
+                    household_ids: tuple[UUID4, ...] = (entry.household_id,)
+                else:
+                    household_ids = self._get_household_ids(session, entry.group_id)
+
+                for household_id in household_ids:
+                    for listener in self._get_listeners(session, entry.group_id, household_id, delivery):
+                        if subscribers := listener.get_subscribers(event):
+                            listener.publish_to_subscribers(event, subscribers)
+        except Exception as e:
+            delivery.errors.append(str(e))
+
+        return delivery
+
+    def _record(self, lease_id: UUID4, deliveries: list[_Delivery]) -> None:
+        """Deletes delivered events and reschedules (or fails) the rest, if they're still leased by this worker"""
+
+        now = datetime.now(UTC)
+        leased = EventBusOutboxModel.lease_id == lease_id
+
+        with session_context() as session:
+            if delivered := [delivery.entry.id for delivery in deliveries if not delivery.errors]:
+                session.execute(
+                    delete(EventBusOutboxModel)
+                    .where(EventBusOutboxModel.id.in_(delivered), leased)
+                    .execution_options(synchronize_session=False)
+                )
+
+            for delivery in deliveries:
+                if not delivery.errors:
+                    continue
+
+                attempts = delivery.entry.attempts + 1
+                failed = attempts >= self.max_attempts
+                last_error = "; ".join(delivery.errors)
+                if failed:
+                    logger.error(f"Event bus delivery failed after {attempts} attempts: {last_error}")
+                else:
+                    logger.warning(f"Event bus delivery failed (attempt {attempts}), retrying: {last_error}")
+
+                session.execute(
+                    update(EventBusOutboxModel)
+                    .where(EventBusOutboxModel.id == delivery.entry.id, leased)
+                    .values(
+                        attempts=attempts,
+                        failed=failed,
+                        last_error=last_error,
+                        next_attempt_at=now + self.retry_delay(attempts),
+                        delivered_destinations=delivery.delivered_destinations,
+                        lease_id=None,
+                        leased_until=None,
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+
+            session.commit()
+
+    async def run_once(self) -> int:
+        """Delivers a batch of due events and returns how many were claimed"""
+
+        loop = asyncio.get_running_loop()
+        entries = await loop.run_in_executor(self._executor, self._claim)
+        if not entries:
+            return 0
+
+        deliveries = await asyncio.gather(*[loop.run_in_executor(self._executor, self._deliver, e) for e in entries])
+        await loop.run_in_executor(self._executor, self._record, entries[0].lease_id, list(deliveries))
+        return len(entries)
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None
+
+        while True:
+            self._wakeup.clear()
+            try:
+                claimed = await self.run_once()
+            except Exception as e:
+                logger.error(f"Error delivering event bus events: {e}")
+                claimed = 0
+
+            # keep going while there's a backlog, otherwise wait for new events or for retries to be due
+            if claimed < self.batch_size:
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), POLL_INTERVAL_SECONDS)
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+
+        self._task = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._new_executor()
+
+    def wake(self) -> None:
+        """Starts delivering new events right away instead of at the next poll; safe to call from any thread"""
+
+        if self._loop is not None and self._wakeup is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+
+event_bus_worker = EventBusWorker()
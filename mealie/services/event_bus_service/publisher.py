@@ -1,9 +1,9 @@
 from typing import Protocol
 
 import apprise
-import requests
 from fastapi.encoders import jsonable_encoder
 
+from mealie.pkgs.safehttp import ClientPurpose, http_clients
 from mealie.services.event_bus_service.event_types import Event
 
 
@@ -23,6 +23,9 @@ class ApprisePublisher:
     def publish(self, event: Event, notification_urls: list[str]):
         """Publishses a list of notification URLs"""
 
+        # only notify the URLs passed to this call, not the ones from previous calls
+        self.apprise.clear()
+
         tags = []
         for dest in notification_urls:
             # we tag the url so it only sends each notification once
@@ -34,7 +37,10 @@ class ApprisePublisher:
             if not status and self.hard_fail:
                 raise Exception("Apprise URL Add Failed")
 
-        self.apprise.notify(title=event.message.title, body=event.message.body, tag=tags)
+        status = self.apprise.notify(title=event.message.title, body=event.message.body, tag=tags)
+
+        if status is False and self.hard_fail:
+            raise Exception("Apprise Notification Failed")
 
 
 class WebhookPublisher:
@@ -43,7 +49,8 @@ class WebhookPublisher:
 
     def publish(self, event: Event, notification_urls: list[str]):
         event_payload = jsonable_encoder(event)
+        client = http_clients.client(ClientPurpose.webhooks)
         for url in notification_urls:
-            r = requests.post(url, json=event_payload, timeout=15)
+            r = client.post(url, json=event_payload, timeout=15)
             if self.hard_fail:
                 r.raise_for_status()
@@ -119,7 +119,6 @@ class BaseMigrator(BaseService):
         is_success = True
         is_failure = True
 
-        new_entries: list[ReportEntryOut] = []
         for entry in self.report_entries:
             if is_failure and entry.success:
                 is_failure = False
@@ -127,7 +126,7 @@ class BaseMigrator(BaseService):
             if is_success and not entry.success:
                 is_success = False
 
-            new_entries.append(self.db.group_report_entries.create(entry))
+        new_entries: list[ReportEntryOut] = self.db.group_report_entries.create_many(self.report_entries, bulk=True)
 
         if is_success:
             self.report.status = ReportSummaryStatus.success
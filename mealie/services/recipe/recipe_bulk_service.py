@@ -1,6 +1,9 @@
 from pathlib import Path
 
+from sqlalchemy import select
+
 from mealie.core.exceptions import UnexpectedNone
+from mealie.db.models.recipe.recipe import RecipeModel
 from mealie.repos.repository_factory import AllRepositories
 from mealie.schema.group.group_exports import GroupDataExport
 from mealie.schema.recipe import CategoryBase
@@ -105,9 +108,11 @@ class RecipeBulkActionsService(BaseService):
                 self.logger.error(e)
 
     def delete_recipes(self, recipes: list[str]) -> None:
-        for slug in recipes:
-            try:
-                self.repos.recipes.delete(slug)
-            except Exception as e:
-                self.logger.error(f"Failed to delete recipe {slug}")
-                self.logger.error(e)
+        stmt = select(RecipeModel.id).filter(RecipeModel.group_id == self.group.id, RecipeModel.slug.in_(recipes))
+        recipe_ids = self.repos.session.scalars(stmt).all()
+
+        try:
+            self.repos.recipes.delete_many(recipe_ids, return_results=False)
+        except Exception as e:
+            self.logger.error(f"Failed to delete recipes {recipes}")
+            self.logger.error(e)
@@ -1,15 +1,51 @@
 import asyncio
+import multiprocessing
 import shutil
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 
 from httpx import AsyncClient, Response
 from pydantic import UUID4
 
+from mealie.core.config import get_app_settings
+from mealie.db.db_setup import session_context
 from mealie.pkgs import img, safehttp
-from mealie.pkgs.safehttp.transport import AsyncSafeTransport
 from mealie.schema.recipe.recipe import Recipe
 from mealie.services._base_service import BaseService
 from mealie.services.scraper.user_agents_manager import get_user_agents_manager
+from mealie.services.storage_stats.storage_stats_service import StorageStatsService
+
+_IMAGE_PROCESS_POOL: ProcessPoolExecutor | None = None
+_IMAGE_PROCESS_POOL_LOCK = threading.Lock()
+
+
+def get_image_process_pool() -> ProcessPoolExecutor:
+    """
+    Returns the pool that processes images. Decoding and encoding images is CPU bound,
+    so it's done in separate processes to keep it from slowing down the rest of the app.
+    """
+    global _IMAGE_PROCESS_POOL
+
+    with _IMAGE_PROCESS_POOL_LOCK:
+        if not _IMAGE_PROCESS_POOL:
+            _IMAGE_PROCESS_POOL = ProcessPoolExecutor(
+                max_workers=get_app_settings().IMAGE_PROCESSING_WORKERS,
+                # forking a process with running threads isn't safe
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+        return _IMAGE_PROCESS_POOL
+
+
+def shutdown_image_process_pool() -> None:
+    global _IMAGE_PROCESS_POOL
+
+    with _IMAGE_PROCESS_POOL_LOCK:
+        if _IMAGE_PROCESS_POOL:
+            _IMAGE_PROCESS_POOL.shutdown(wait=False, cancel_futures=True)
+            _IMAGE_PROCESS_POOL = None
 
 
 async def gather_with_concurrency(n, *coros, ignore_exceptions=False):
@@ -36,7 +72,7 @@ async def largest_content_len(urls: list[str]) -> tuple[str, int]:
     async def do(client: AsyncClient, url: str) -> Response:
         return await client.head(url, headers=user_agent_manager.get_scrape_headers())
 
-    async with AsyncClient(transport=safehttp.AsyncSafeTransport()) as client:
+    async with safehttp.http_clients.async_client(safehttp.ClientPurpose.images) as client:
         tasks = [do(client, url) for url in urls]
         responses: list[Response] = await gather_with_concurrency(max_concurrency, *tasks, ignore_exceptions=True)
         for response in responses:
@@ -83,7 +119,26 @@ class RecipeDataService(BaseService):
         except Exception as e:
             self.logger.exception(f"Failed to delete recipe data: {e}")
 
-    def write_image(self, file_data: bytes | Path, extension: str, image_dir: Path | None = None) -> Path:
+    def record_data_size(self) -> None:
+        """Stores the size of the recipe's directory, called after its images or assets change"""
+
+        try:
+            with session_context() as session:
+                StorageStatsService(session).record_recipe_size(self.recipe_id)
+        except Exception as e:
+            # the size is measured again when the storage statistics are reconciled
+            self.logger.error(f"Failed to record recipe data size: {e}")
+
+    def _minify(self, image_path: Path) -> Future[None]:
+        try:
+            return get_image_process_pool().submit(self.minifier.minify, image_path)
+        except BrokenProcessPool:
+            # a worker died (e.g. it ran out of memory), so start over with a new pool
+            self.logger.error("Image processing pool is broken, restarting it")
+            shutdown_image_process_pool()
+            return get_image_process_pool().submit(self.minifier.minify, image_path)
+
+    def _save_image(self, file_data: bytes | Path, extension: str, image_dir: Path | None = None) -> Path:
         if not image_dir:
             image_dir = self.dir_image
 
@@ -100,8 +155,22 @@ class RecipeDataService(BaseService):
             with open(image_path, "ab") as f:
                 shutil.copyfileobj(file_data, f)
 
-        self.minifier.minify(image_path)
+        return image_path
+
+    def write_image(self, file_data: bytes | Path, extension: str, image_dir: Path | None = None) -> Path:
+        """Saves the image and waits for its renditions to be created in the image processing pool"""
+
+        image_path = self._save_image(file_data, extension, image_dir)
+        self._minify(image_path).result()
+        self.record_data_size()
+        return image_path
+
+    async def write_image_async(self, file_data: bytes | Path, extension: str, image_dir: Path | None = None) -> Path:
+        """Same as `write_image`, without blocking the event loop"""
 
+        image_path = await asyncio.to_thread(self._save_image, file_data, extension, image_dir)
+        await asyncio.wrap_future(self._minify(image_path))
+        await asyncio.to_thread(self.record_data_size)
         return image_path
 
     async def scrape_image(self, image_url: str | dict[str, str] | list[str]) -> None:
@@ -135,7 +204,7 @@ class RecipeDataService(BaseService):
         file_name = f"{self.recipe_id!s}.{ext}"
         file_path = Recipe.directory_from_id(self.recipe_id).joinpath("images", file_name)
 
-        async with AsyncClient(transport=AsyncSafeTransport()) as client:
+        async with safehttp.http_clients.async_client(safehttp.ClientPurpose.images) as client:
             try:
                 r = await client.get(image_url_str, headers={"User-Agent": user_agent})
             except Exception:
@@ -154,5 +223,5 @@ class RecipeDataService(BaseService):
                 raise NotAnImageError(f"Content-Type {content_type} is not an image")
 
             self.logger.debug(f"File Name Suffix {file_path.suffix}")
-            self.write_image(r.read(), file_path.suffix)
+            await self.write_image_async(r.read(), file_path.suffix)
             file_path.unlink(missing_ok=True)
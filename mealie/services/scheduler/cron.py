@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+
+ALIASES = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+# years to search for a matching time before giving up, e.g. for "0 0 30 2 *"
+MAX_SEARCH_YEARS = 5
+
+
+def _parse_field(field: str, low: int, high: int) -> frozenset[int]:
+    values: set[int] = set()
+    for part in field.split(","):
+        expr, has_step, step_str = part.partition("/")
+        step = int(step_str) if has_step else 1
+
+        if expr == "*":
+            start, end = low, high
+        elif "-" in expr:
+            start_str, end_str = expr.split("-", 1)
+            start, end = int(start_str), int(end_str)
+        else:
+            start = int(expr)
+            end = high if has_step else start
+
+        if step < 1 or start < low or end > high or start > end:
+            raise ValueError(f"invalid cron field '{field}', values must be between {low} and {high}")
+
+        values.update(range(start, end + 1, step))
+
+    return frozenset(values)
+
+
+class CronSchedule:
+    """
+    A standard 5 field cron expression (minute, hour, day of month, month, day of week), evaluated in UTC.
+    Supports `*`, ranges, steps, lists, and the `@daily`-style aliases.
+    """
+
+    def __init__(self, expression: str) -> None:
+        self.expression = expression
+
+        fields = ALIASES.get(expression, expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"invalid cron expression '{expression}', expected 5 fields")
+
+        minute, hour, day, month, weekday = fields
+        self.minutes = _parse_field(minute, 0, 59)
+        self.hours = _parse_field(hour, 0, 23)
+        self.days = _parse_field(day, 1, 31)
+        self.months = _parse_field(month, 1, 12)
+        # 0 and 7 are both Sunday
+        self.weekdays = frozenset(d % 7 for d in _parse_field(weekday, 0, 7))
+
+        # like cron, when both days of the month and days of the week are restricted, either one can match
+        self._any_day = day != "*" and weekday != "*"
+
+    def __repr__(self) -> str:
+        return f"CronSchedule({self.expression!r})"
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, CronSchedule) and other.expression == self.expression
+
+    def __hash__(self) -> int:
+        return hash(self.expression)
+
+    def _day_matches(self, dt: datetime) -> bool:
+        day_matches = dt.day in self.days
+        weekday_matches = (dt.weekday() + 1) % 7 in self.weekdays
+        return day_matches or weekday_matches if self._any_day else day_matches and weekday_matches
+
+    def next_after(self, dt: datetime) -> datetime:
+        """The first time matching the schedule that is strictly after `dt`"""
+
+        next_dt = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        max_year = next_dt.year + MAX_SEARCH_YEARS
+
+        while next_dt.year <= max_year:
+            if next_dt.month not in self.months:
+                next_month = next_dt.replace(day=1, hour=0, minute=0) + timedelta(days=32)
+                next_dt = next_month.replace(day=1)
+                continue
+
+            if not self._day_matches(next_dt):
+                next_dt = next_dt.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+
+            if next_dt.hour not in self.hours:
+                hour = min((h for h in self.hours if h > next_dt.hour), default=None)
+                if hour is None:
+                    next_dt = next_dt.replace(hour=0, minute=0) + timedelta(days=1)
+                else:
+                    next_dt = next_dt.replace(hour=hour, minute=0)
+                continue
+
+            minute = min((m for m in self.minutes if m >= next_dt.minute), default=None)
+            if minute is None:
+                next_dt = next_dt.replace(minute=0) + timedelta(hours=1)
+                continue
+
+            return next_dt.replace(minute=minute)
+
+        raise ValueError(f"cron expression '{self.expression}' never matches")
@@ -1,17 +1,21 @@
+import random
 from collections.abc import Callable
 from dataclasses import dataclass, field
+from datetime import datetime, timedelta
 
-from pydantic import BaseModel
+from .cron import CronSchedule
 
 
 @dataclass(slots=True)
-class ScheduledFunc(BaseModel):
-    id: tuple[str, int]
+class ScheduledTask:
     name: str
-    hour: int
-    minutes: int
     callback: Callable
+    schedule: CronSchedule
+    jitter: timedelta = field(default_factory=timedelta)
+    """A random delay of up to `jitter` is added to each run, so tasks on the same schedule don't all start at once"""
 
-    max_instances: int = 1
-    replace_existing: bool = True
-    args: list = field(default_factory=list)
+    last_run_arg: str | None = None
+    """If set, the start time of the previous run (or None) is passed to the callback as this keyword argument"""
+
+    def next_run_after(self, dt: datetime) -> datetime:
+        return self.schedule.next_after(dt) + timedelta(seconds=random.uniform(0, self.jitter.total_seconds()))
@@ -1,59 +1,92 @@
-from collections.abc import Callable, Iterable
+from collections.abc import Callable
+from datetime import timedelta
 
 from mealie.core import root_logger
+from mealie.core.config import get_app_settings
+
+from .cron import CronSchedule
+from .scheduled_func import ScheduledTask
 
 logger = root_logger.get_logger()
 
+HOURLY_SCHEDULE = "0 * * * *"
+MINUTELY_SCHEDULE = "*/5 * * * *"
+
+DAILY_JITTER = timedelta(minutes=5)
+HOURLY_JITTER = timedelta(minutes=1)
+
 
 class SchedulerRegistry:
     """
     A container class for registering and removing callbacks for the scheduler.
     """
 
-    _daily: list[Callable] = []
-    _hourly: list[Callable] = []
-    _minutely: list[Callable] = []
+    _tasks: dict[str, ScheduledTask] = {}
 
     @staticmethod
-    def _register(name: str, callbacks: list[Callable], callback: Iterable[Callable]):
-        for cb in callback:
-            logger.debug(f"Registering {name} callback: {cb.__name__}")
-            callbacks.append(cb)
+    def register(
+        callback: Callable,
+        schedule: str,
+        *,
+        name: str | None = None,
+        jitter: timedelta | None = None,
+        last_run_arg: str | None = None,
+    ) -> ScheduledTask:
+        """Registers a callback to run on a cron schedule; see `CronSchedule`"""
+
+        task = ScheduledTask(
+            name=name or callback.__name__,
+            callback=callback,
+            schedule=CronSchedule(schedule),
+            jitter=jitter or timedelta(),
+            last_run_arg=last_run_arg,
+        )
+
+        logger.debug(f"Registering scheduled task: {task.name} ({schedule})")
+        SchedulerRegistry._tasks[task.name] = task
+        return task
+
+    @staticmethod
+    def remove(callback: Callable):
+        logger.debug(f"Removing scheduled task: {callback.__name__}")
+        for name, task in list(SchedulerRegistry._tasks.items()):
+            if task.callback is callback:
+                del SchedulerRegistry._tasks[name]
+
+    @staticmethod
+    def tasks() -> list[ScheduledTask]:
+        return list(SchedulerRegistry._tasks.values())
 
     @staticmethod
     def register_daily(*callbacks: Callable):
-        SchedulerRegistry._register("daily", SchedulerRegistry._daily, callbacks)
+        daily_schedule_time = get_app_settings().DAILY_SCHEDULE_TIME_UTC
+        schedule = f"{daily_schedule_time.minute} {daily_schedule_time.hour} * * *"
+        for cb in callbacks:
+            SchedulerRegistry.register(cb, schedule, jitter=DAILY_JITTER)
 
     @staticmethod
     def remove_daily(callback: Callable):
-        logger.debug(f"Removing daily callback: {callback.__name__}")
-        SchedulerRegistry._daily.remove(callback)
+        SchedulerRegistry.remove(callback)
 
     @staticmethod
     def register_hourly(*callbacks: Callable):
-        SchedulerRegistry._register("daily", SchedulerRegistry._hourly, callbacks)
+        for cb in callbacks:
+            SchedulerRegistry.register(cb, HOURLY_SCHEDULE, jitter=HOURLY_JITTER)
 
     @staticmethod
     def remove_hourly(callback: Callable):
-        logger.debug(f"Removing hourly callback: {callback.__name__}")
-        SchedulerRegistry._hourly.remove(callback)
+        SchedulerRegistry.remove(callback)
 
     @staticmethod
     def register_minutely(*callbacks: Callable):
-        SchedulerRegistry._register("minutely", SchedulerRegistry._minutely, callbacks)
+        for cb in callbacks:
+            SchedulerRegistry.register(cb, MINUTELY_SCHEDULE)
 
     @staticmethod
     def remove_minutely(callback: Callable):
-        logger.debug(f"Removing minutely callback: {callback.__name__}")
-        SchedulerRegistry._minutely.remove(callback)
+        SchedulerRegistry.remove(callback)
 
     @staticmethod
     def print_jobs():
-        for job in SchedulerRegistry._daily:
-            logger.debug(f"Daily job: {job.__name__}")
-
-        for job in SchedulerRegistry._hourly:
-            logger.debug(f"Hourly job: {job.__name__}")
-
-        for job in SchedulerRegistry._minutely:
-            logger.debug(f"Minutely job: {job.__name__}")
+        for task in SchedulerRegistry._tasks.values():
+            logger.debug(f"Scheduled task: {task.name} ({task.schedule.expression})")
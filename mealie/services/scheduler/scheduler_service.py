@@ -1,81 +1,286 @@
+"""
+Runs the tasks registered with `SchedulerRegistry` on their cron schedules.
+
+The state of each task is stored in the `server_tasks` table, so it's shared by every server process. A process leases
+a task while running it (renewing the lease until the task finishes), so each run happens in exactly one process.
+Independent tasks run concurrently on the scheduler's thread pool.
+"""
+
 import asyncio
+import contextlib
+import time
+import traceback
+import uuid
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
-from pathlib import Path
+
+from pydantic import UUID4
+from sqlalchemy import or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
 
 from mealie.core import root_logger
 from mealie.core.config import get_app_settings
-from mealie.services.scheduler.runner import repeat_every
+from mealie.db.db_setup import session_context
+from mealie.db.models.server.task import ServerTaskModel
+from mealie.schema.admin.scheduler import ScheduledTaskStatus, ScheduledTaskSummary
 
+from .scheduled_func import ScheduledTask
 from .scheduler_registry import SchedulerRegistry
 
 logger = root_logger.get_logger()
 
-CWD = Path(__file__).parent
+POLL_INTERVAL_SECONDS = 15
+LEASE_DURATION = timedelta(minutes=10)
+LEASE_RENEW_INTERVAL = timedelta(minutes=1)
+
+
+@dataclass(slots=True)
+class _TaskRun:
+    task: ScheduledTask
+    lease_id: UUID4
+    last_started_at: datetime | None
 
-MINUTES_DAY = 1440
-MINUTES_5 = 5
-MINUTES_HOUR = 60
+    started_at: datetime | None = None
+    duration: float = 0
+    error: str | None = None
 
 
 class SchedulerService:
+    def __init__(self, tasks: Iterable[ScheduledTask] | None = None, concurrency: int | None = None) -> None:
+        self._tasks = list(tasks) if tasks is not None else None
+        self.concurrency = concurrency or get_app_settings().SCHEDULER_CONCURRENCY
+
+        self._executor = self._new_executor()
+        self._task: asyncio.Task | None = None
+        self._running: dict[str, asyncio.Task] = {}
+
+    def _new_executor(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="scheduler")
+
+    @property
+    def tasks(self) -> dict[str, ScheduledTask]:
+        tasks = self._tasks if self._tasks is not None else SchedulerRegistry.tasks()
+        return {task.name: task for task in tasks}
+
+    def _add_missing_tasks(self, session: Session, tasks: dict[str, ScheduledTask], now: datetime) -> None:
+        """
+        Stores the tasks that don't have a row yet, e.g. new tasks, or every task after a backup restore recreated
+        the table. Each row is committed on its own, so a row another process stored first doesn't undo the others.
+        """
+
+        stored = set(session.scalars(select(ServerTaskModel.name).where(ServerTaskModel.name.in_(tasks))))
+        for name, task in tasks.items():
+            if name in stored:
+                continue
+
+            session.add(
+                ServerTaskModel(
+                    name=name,
+                    status=ScheduledTaskStatus.scheduled.value,
+                    schedule=task.schedule.expression,
+                    next_run_at=task.next_run_after(now),
+                    run_count=0,
+                    failure_count=0,
+                    session=session,
+                )
+            )
+            try:
+                session.commit()
+            except IntegrityError:
+                # another process stored the task first
+                session.rollback()
+
+    def sync_tasks(self) -> None:
+        """Stores the registered tasks, scheduling new tasks and tasks whose schedule changed"""
+
+        now = datetime.now(UTC)
+        tasks = self.tasks
+
+        with session_context() as session:
+            rows = session.scalars(select(ServerTaskModel).where(ServerTaskModel.name.in_(tasks)))
+            for row in rows:
+                task = tasks[row.name]
+                if row.schedule != task.schedule.expression or row.next_run_at is None:
+                    row.schedule = task.schedule.expression
+                    row.next_run_at = task.next_run_after(now)
+
+            session.commit()
+            self._add_missing_tasks(session, tasks, now)
+
+    def _claim(self) -> list[_TaskRun]:
+        """Leases the tasks that are due to run"""
+
+        now = datetime.now(UTC)
+        lease_id = uuid.uuid4()
+        tasks = self.tasks
+        names = [name for name in tasks if name not in self._running]
+        if not names:
+            return []
+
+        with session_context() as session:
+            self._add_missing_tasks(session, tasks, now)
+
+            # the lease condition is part of the update, so only one process can claim each run
+            session.execute(
+                update(ServerTaskModel)
+                .where(
+                    ServerTaskModel.name.in_(names),
+                    ServerTaskModel.next_run_at <= now,
+                    or_(ServerTaskModel.leased_until.is_(None), ServerTaskModel.leased_until <= now),
+                )
+                .values(lease_id=lease_id, leased_until=now + LEASE_DURATION)
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
+
+            rows = session.scalars(select(ServerTaskModel).where(ServerTaskModel.lease_id == lease_id))
+            return [_TaskRun(tasks[row.name], lease_id, row.last_started_at) for row in rows]
+
     @staticmethod
-    async def start():
-        await run_minutely()
-        await run_hourly()
+    def _leased(run: _TaskRun):
+        return (ServerTaskModel.name == run.task.name) & (ServerTaskModel.lease_id == run.lease_id)
 
-        # Wait to trigger our daily run until our given "daily time", so having asyncio handle it.
-        asyncio.create_task(schedule_daily())
+    def _renew_lease(self, run: _TaskRun) -> None:
+        with session_context() as session:
+            session.execute(
+                update(ServerTaskModel)
+                .where(self._leased(run))
+                .values(leased_until=datetime.now(UTC) + LEASE_DURATION)
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
 
+    def _call(self, run: _TaskRun) -> None:
+        run.started_at = datetime.now(UTC)
+        with session_context() as session:
+            session.execute(
+                update(ServerTaskModel)
+                .where(self._leased(run))
+                .values(status=ScheduledTaskStatus.running.value, last_started_at=run.started_at)
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
 
-async def schedule_daily():
-    now = datetime.now(UTC)
-    daily_schedule_time = get_app_settings().DAILY_SCHEDULE_TIME_UTC
-    logger.debug(f"Current time is {now} and DAILY_SCHEDULE_TIME (in UTC) is {daily_schedule_time}")
+        kwargs = {run.task.last_run_arg: run.last_started_at} if run.task.last_run_arg else {}
+        start = time.perf_counter()
+        try:
+            run.task.callback(**kwargs)
+        except Exception as e:
+            logger.error("Error in scheduled task func='%s': exception='%s'", run.task.name, e)
+            run.error = "".join(traceback.format_exception(e))
+        finally:
+            run.duration = time.perf_counter() - start
 
-    next_schedule = now.replace(
-        hour=daily_schedule_time.hour, minute=daily_schedule_time.minute, second=0, microsecond=0
-    )
-    delta = next_schedule - now
-    if delta < timedelta(0):
-        next_schedule = next_schedule + timedelta(days=1)
-        delta = next_schedule - now
+    def _record(self, run: _TaskRun) -> None:
+        """Stores the result of a run and schedules the next one, if the task is still leased by this process"""
+
+        now = datetime.now(UTC)
+        failed = run.error is not None
+
+        with session_context() as session:
+            session.execute(
+                update(ServerTaskModel)
+                .where(self._leased(run))
+                .values(
+                    status=(ScheduledTaskStatus.failed if failed else ScheduledTaskStatus.succeeded).value,
+                    completed_date=now,
+                    last_duration=run.duration,
+                    log=run.error,
+                    run_count=ServerTaskModel.run_count + 1,
+                    failure_count=ServerTaskModel.failure_count + int(failed),
+                    next_run_at=run.task.next_run_after(now),
+                    lease_id=None,
+                    leased_until=None,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
+
+        logger.debug(f"Scheduled task {run.task.name} finished in {run.duration:.3f}s")
 
-    hours_until, seconds_reminder = divmod(delta.total_seconds(), 3600)
-    minutes_until, seconds_reminder = divmod(seconds_reminder, 60)
-    seconds_until = round(seconds_reminder)
-    logger.debug("Time left: %02d:%02d:%02d", hours_until, minutes_until, seconds_until)
+    async def _execute(self, run: _TaskRun) -> None:
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, self._call, run)
 
-    target_time = next_schedule.replace(microsecond=0, second=0)
-    logger.info("Daily tasks scheduled for %s", str(target_time))
+        # tasks can take longer than the lease, so keep renewing it until the task is done
+        while True:
+            try:
+                await asyncio.wait_for(asyncio.shield(future), LEASE_RENEW_INTERVAL.total_seconds())
+                break
+            except TimeoutError:
+                await asyncio.to_thread(self._renew_lease, run)
 
-    wait_seconds = delta.total_seconds()
-    await asyncio.sleep(wait_seconds)
-    await run_daily()
+        await asyncio.to_thread(self._record, run)
 
+    async def _start_due_tasks(self) -> list[asyncio.Task]:
+        started: list[asyncio.Task] = []
+        for run in await asyncio.to_thread(self._claim):
+            task = asyncio.create_task(self._execute(run), name=run.task.name)
+            self._running[run.task.name] = task
+            task.add_done_callback(lambda task: self._running.pop(task.get_name(), None))
+            started.append(task)
 
-def _scheduled_task_wrapper(callable):
-    try:
-        callable()
-    except Exception as e:
-        logger.error("Error in scheduled task func='%s': exception='%s'", callable.__name__, e)
+        return started
 
+    async def run_once(self) -> list[str]:
+        """Runs the tasks that are due, and returns their names"""
 
-@repeat_every(minutes=MINUTES_DAY, wait_first=False, logger=logger)
-def run_daily():
-    logger.debug("Running daily callbacks")
-    for func in SchedulerRegistry._daily:
-        _scheduled_task_wrapper(func)
+        started = await self._start_due_tasks()
+        await asyncio.gather(*started)
+        return [task.get_name() for task in started]
 
+    async def _run(self) -> None:
+        await asyncio.to_thread(self.sync_tasks)
 
-@repeat_every(minutes=MINUTES_HOUR, wait_first=True, logger=logger)
-def run_hourly():
-    logger.debug("Running hourly callbacks")
-    for func in SchedulerRegistry._hourly:
-        _scheduled_task_wrapper(func)
+        while True:
+            try:
+                await self._start_due_tasks()
+            except Exception as e:
+                logger.error(f"Error starting scheduled tasks: {e}")
+
+            await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        for task in [self._task, *self._running.values()]:
+            task.cancel()
+        for task in [self._task, *self._running.values()]:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+        self._task = None
+        self._running = {}
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._new_executor()
+
+
+def get_scheduled_tasks(session: Session) -> list[ScheduledTaskSummary]:
+    rows = session.scalars(
+        select(ServerTaskModel).where(ServerTaskModel.schedule.is_not(None)).order_by(ServerTaskModel.name)
+    )
+    return [
+        ScheduledTaskSummary(
+            name=row.name,
+            schedule=row.schedule,
+            status=ScheduledTaskStatus(row.status),
+            next_run_at=row.next_run_at,
+            last_started_at=row.last_started_at,
+            last_completed_at=row.completed_date,
+            last_duration=row.last_duration,
+            last_error=row.log,
+            run_count=row.run_count,
+            failure_count=row.failure_count,
+        )
+        for row in rows
+    ]
 
 
-@repeat_every(minutes=MINUTES_5, wait_first=True, logger=logger)
-def run_minutely():
-    logger.debug("Running minutely callbacks")
-    for func in SchedulerRegistry._minutely:
-        _scheduled_task_wrapper(func)
+scheduler_service = SchedulerService()
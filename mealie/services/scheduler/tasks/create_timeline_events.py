@@ -1,16 +1,21 @@
-from datetime import UTC, datetime, time, timedelta
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, time, timedelta
 
 from dateutil.tz import tzlocal
 from pydantic import UUID4
+from sqlalchemy import insert, or_, select, update
 from sqlalchemy.orm import Session
 
 from mealie.db.db_setup import session_context
+from mealie.db.models.household.household_to_recipe import HouseholdToRecipe
+from mealie.db.models.household.mealplan import GroupMealPlan
+from mealie.db.models.recipe.recipe import RecipeModel
+from mealie.db.models.recipe.recipe_timeline import RecipeTimelineEvent
+from mealie.db.models.users.users import User
 from mealie.repos.all_repositories import get_repositories
-from mealie.schema.household.household import HouseholdRecipeUpdate
 from mealie.schema.meal_plan.new_meal import PlanEntryType
-from mealie.schema.recipe.recipe import RecipeSummary
 from mealie.schema.recipe.recipe_timeline_events import RecipeTimelineEventCreate, TimelineEventType
-from mealie.schema.response.pagination import PaginationQuery
 from mealie.schema.user.user import DEFAULT_INTEGRATION_ID
 from mealie.services.event_bus_service.event_bus_service import EventBusService
 from mealie.services.event_bus_service.event_types import (
@@ -19,116 +24,196 @@ from mealie.services.event_bus_service.event_types import (
     EventRecipeTimelineEventData,
     EventTypes,
 )
-from mealie.services.household_services.household_service import HouseholdService
 
+# maximum number of ids in a single IN clause
+BATCH_SIZE = 500
 
-def _create_mealplan_timeline_events_for_household(
-    event_time: datetime, session: Session, group_id: UUID4, household_id: UUID4
-) -> None:
-    repos = get_repositories(session, group_id=group_id, household_id=household_id)
-    household_service = HouseholdService(group_id, household_id, repos)
-    event_bus_service = EventBusService(session=session)
 
-    timeline_events_to_create: list[RecipeTimelineEventCreate] = []
-    recipes_to_update: dict[UUID4, RecipeSummary] = {}
-    recipe_id_to_slug_map: dict[UUID4, str] = {}
+@dataclass(slots=True, frozen=True)
+class _PlannedMeal:
+    group_id: UUID4
+    household_id: UUID4
+    recipe_id: UUID4
+    recipe_slug: str
+    user_id: UUID4
+    subject: str
 
-    local_tz = tzlocal()
-    mealplans = repos.meals.get_today(tz=local_tz)
-    for mealplan in mealplans:
-        if not (mealplan.recipe and mealplan.user_id):
-            continue
 
-        user = repos.users.get_one(mealplan.user_id)
-        if not user:
-            continue
+def _batches[T](values: Sequence[T]) -> Iterable[Sequence[T]]:
+    for i in range(0, len(values), BATCH_SIZE):
+        yield values[i : i + BATCH_SIZE]
 
-        # TODO: make this translatable
-        if mealplan.entry_type == PlanEntryType.side:
-            event_subject = f"{user.full_name} made this as a side"
 
-        else:
-            event_subject = f"{user.full_name} made this for {mealplan.entry_type.value}"
-
-        query_start_time = datetime.combine(datetime.now(UTC).date(), time.min)
-        query_end_time = query_start_time + timedelta(days=1)
-        query = PaginationQuery(
-            query_filter=(
-                f'recipe_id = "{mealplan.recipe_id}" '
-                f'AND timestamp >= "{query_start_time.isoformat()}" '
-                f'AND timestamp < "{query_end_time.isoformat()}" '
-                f'AND subject = "{event_subject}"'
-            )
+def _get_planned_meals(session: Session, today: date) -> list[_PlannedMeal]:
+    """Today's meal plan entries with a recipe, across every household"""
+
+    stmt = (
+        select(
+            GroupMealPlan.group_id,
+            User.household_id,
+            GroupMealPlan.recipe_id,
+            RecipeModel.slug,
+            User.id,
+            User.full_name,
+            GroupMealPlan.entry_type,
         )
+        .join(User, User.id == GroupMealPlan.user_id)
+        .join(RecipeModel, RecipeModel.id == GroupMealPlan.recipe_id)
+        .where(GroupMealPlan.date == today, GroupMealPlan.group_id == User.group_id)
+        .order_by(GroupMealPlan.id)
+    )
+
+    planned_meals: list[_PlannedMeal] = []
+    for group_id, household_id, recipe_id, recipe_slug, user_id, full_name, entry_type in session.execute(stmt):
+        # TODO: make this translatable
+        if entry_type == PlanEntryType.side.value:
+            subject = f"{full_name} made this as a side"
+        else:
+            subject = f"{full_name} made this for {entry_type}"
 
-        # if this event already exists, don't create it again
-        events = repos.recipe_timeline_events.page_all(pagination=query)
-        if events.items:
-            continue
+        planned_meals.append(_PlannedMeal(group_id, household_id, recipe_id, recipe_slug, user_id, subject))
 
-        # bump up the last made date
-        household_to_recipe = household_service.get_household_recipe(mealplan.recipe.slug)
-        last_made = household_to_recipe.last_made if household_to_recipe else None
-        if (not last_made or last_made.date() < event_time.date()) and mealplan.recipe_id not in recipes_to_update:
-            recipes_to_update[mealplan.recipe_id] = mealplan.recipe
+    return planned_meals
 
-        timeline_events_to_create.append(
-            RecipeTimelineEventCreate(
-                user_id=user.id,
-                subject=event_subject,
-                event_type=TimelineEventType.info,
-                timestamp=event_time,
-                recipe_id=mealplan.recipe_id,
+
+def _get_existing_events(session: Session, recipe_ids: Sequence[UUID4], event_time: datetime) -> set[tuple[UUID4, str]]:
+    """The (recipe id, subject) of each of today's timeline events for the given recipes"""
+
+    query_start_time = datetime.combine(event_time.date(), time.min, tzinfo=UTC)
+    query_end_time = query_start_time + timedelta(days=1)
+
+    existing_events: set[tuple[UUID4, str]] = set()
+    for batch in _batches(recipe_ids):
+        stmt = select(RecipeTimelineEvent.recipe_id, RecipeTimelineEvent.subject).where(
+            RecipeTimelineEvent.recipe_id.in_(batch),
+            RecipeTimelineEvent.timestamp >= query_start_time,
+            RecipeTimelineEvent.timestamp < query_end_time,
+        )
+        existing_events.update((recipe_id, subject) for recipe_id, subject in session.execute(stmt))
+
+    return existing_events
+
+
+def _update_last_made(session: Session, planned_meals: list[_PlannedMeal], event_time: datetime) -> list[_PlannedMeal]:
+    """Bumps up the household's and the recipe's last made date, and returns the meals whose recipe was updated"""
+
+    planned_meals_by_key = {(meal.household_id, meal.recipe_id): meal for meal in planned_meals}
+    recipe_ids = list({meal.recipe_id for meal in planned_meals})
+
+    household_recipes: dict[tuple[UUID4, UUID4], tuple[UUID4, datetime | None]] = {}
+    for batch in _batches(recipe_ids):
+        stmt = select(
+            HouseholdToRecipe.id,
+            HouseholdToRecipe.household_id,
+            HouseholdToRecipe.recipe_id,
+            HouseholdToRecipe.last_made,
+        ).where(HouseholdToRecipe.recipe_id.in_(batch))
+        for id_, household_id, recipe_id, last_made in session.execute(stmt):
+            if (household_id, recipe_id) in planned_meals_by_key:
+                household_recipes[(household_id, recipe_id)] = (id_, last_made)
+
+    to_create: list[dict] = []
+    to_update: list[dict] = []
+    updated_meals: list[_PlannedMeal] = []
+    for (household_id, recipe_id), meal in planned_meals_by_key.items():
+        values = {"household_id": household_id, "recipe_id": recipe_id, "last_made": event_time}
+        if (household_recipe := household_recipes.get((household_id, recipe_id))) is None:
+            to_create.append(values)
+        else:
+            id_, last_made = household_recipe
+            if last_made and last_made.date() >= event_time.date():
+                continue
+
+            to_update.append({"id": id_, **values})
+
+        updated_meals.append(meal)
+
+    # bulk statements skip the `HouseholdToRecipe` listeners that update the recipe, so we update them ourselves
+    if to_create:
+        session.execute(insert(HouseholdToRecipe), to_create)
+    if to_update:
+        session.execute(update(HouseholdToRecipe), to_update)
+
+    updated_recipe_ids = list({meal.recipe_id for meal in updated_meals})
+    for batch in _batches(updated_recipe_ids):
+        session.execute(
+            update(RecipeModel)
+            .where(
+                RecipeModel.id.in_(batch),
+                or_(RecipeModel.last_made.is_(None), RecipeModel.last_made < event_time),
             )
+            .values(last_made=event_time)
+            .execution_options(synchronize_session=False)
         )
 
-        recipe_id_to_slug_map[mealplan.recipe_id] = mealplan.recipe.slug
+    session.commit()
+    return updated_meals
+
 
-    if not timeline_events_to_create:
+def _create_mealplan_timeline_events(session: Session, event_time: datetime, today: date) -> None:
+    planned_meals = _get_planned_meals(session, today)
+    if not planned_meals:
         return
 
-    # TODO: use bulk operations
-    for event in timeline_events_to_create:
-        new_event = repos.recipe_timeline_events.create(event)
-        event_bus_service.dispatch(
-            integration_id=DEFAULT_INTEGRATION_ID,
-            group_id=group_id,
-            household_id=household_id,
-            event_type=EventTypes.recipe_updated,
-            document_data=EventRecipeTimelineEventData(
-                operation=EventOperation.create,
-                recipe_slug=recipe_id_to_slug_map[new_event.recipe_id],
-                recipe_timeline_event_id=new_event.id,
-            ),
-        )
+    # if an event already exists, don't create it again
+    existing_events = _get_existing_events(session, list({meal.recipe_id for meal in planned_meals}), event_time)
+    new_meals = [meal for meal in planned_meals if (meal.recipe_id, meal.subject) not in existing_events]
 
-    for recipe in recipes_to_update.values():
-        household_service.set_household_recipe(recipe.slug, HouseholdRecipeUpdate(last_made=event_time))
-        repos.recipes.patch(recipe.slug, {"last_made": event_time})
-        event_bus_service.dispatch(
-            integration_id=DEFAULT_INTEGRATION_ID,
-            group_id=group_id,
-            household_id=household_id,
-            event_type=EventTypes.recipe_updated,
-            document_data=EventRecipeData(operation=EventOperation.update, recipe_slug=recipe.slug),
-        )
+    if not new_meals:
+        return
+
+    repos = get_repositories(session, group_id=None, household_id=None)
+    new_events = repos.recipe_timeline_events.create_many(
+        [
+            RecipeTimelineEventCreate(
+                user_id=meal.user_id,
+                subject=meal.subject,
+                event_type=TimelineEventType.info,
+                timestamp=event_time,
+                recipe_id=meal.recipe_id,
+            )
+            for meal in new_meals
+        ],
+        bulk=True,
+    )
 
+    updated_meals = _update_last_made(session, new_meals, event_time)
 
-def _create_mealplan_timeline_events_for_group(event_time: datetime, session: Session, group_id: UUID4) -> None:
-    repos = get_repositories(session, group_id=group_id)
-    households_data = repos.households.page_all(PaginationQuery(page=1, per_page=-1))
-    household_ids = [household.id for household in households_data.items]
-    for household_id in household_ids:
-        _create_mealplan_timeline_events_for_household(event_time, session, group_id, household_id)
+    event_bus_service = EventBusService(session=session)
+    event_bus_service.dispatch_many(
+        integration_id=DEFAULT_INTEGRATION_ID,
+        event_type=EventTypes.recipe_updated,
+        documents=[
+            (
+                meal.group_id,
+                meal.household_id,
+                EventRecipeTimelineEventData(
+                    operation=EventOperation.create,
+                    recipe_slug=meal.recipe_slug,
+                    recipe_timeline_event_id=new_event.id,
+                ),
+            )
+            for meal, new_event in zip(new_meals, new_events, strict=True)
+        ],
+    )
+    event_bus_service.dispatch_many(
+        integration_id=DEFAULT_INTEGRATION_ID,
+        event_type=EventTypes.recipe_updated,
+        documents=[
+            (
+                meal.group_id,
+                meal.household_id,
+                EventRecipeData(operation=EventOperation.update, recipe_slug=meal.recipe_slug),
+            )
+            for meal in updated_meals
+        ],
+    )
+    session.commit()
 
 
 def create_mealplan_timeline_events() -> None:
     event_time = datetime.now(UTC)
+    today = datetime.now(tz=tzlocal()).date()
 
     with session_context() as session:
-        repos = get_repositories(session)
-        groups_data = repos.groups.page_all(PaginationQuery(page=1, per_page=-1))
-        group_ids = [group.id for group in groups_data.items]
-
-        for group_id in group_ids:
-            _create_mealplan_timeline_events_for_group(event_time, session, group_id)
+        _create_mealplan_timeline_events(session, event_time, today)
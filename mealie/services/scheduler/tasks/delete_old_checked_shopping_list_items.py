@@ -49,6 +49,7 @@ def _trim_list_items(shopping_list_service: ShoppingListService, shopping_list_i
     items_to_delete = query.items[MAX_CHECKED_ITEMS:]
     items_response = shopping_list_service.bulk_delete_items([item.id for item in items_to_delete])
     publish_list_item_events(event_publisher, items_response)
+    shopping_list_service.repos.session.commit()
 
 
 def delete_old_checked_list_items():
@@ -59,24 +59,16 @@ def post_group_webhooks(
         webhook_end_dt=end_dt,
     )
 
+    # if no household is specified, the event bus delivers the event to each household in the group
+    event_bus = EventBusService()
     for group_id in group_ids:
-        if household_id is None:
-            with session_context() as session:
-                household_repos = get_repositories(session, group_id=group_id)
-                households_data = household_repos.households.page_all(PaginationQuery(page=1, per_page=-1))
-                household_ids = [household.id for household in households_data.items]
-        else:
-            household_ids = [household_id]
-
-        for household_id in household_ids:
-            event_bus = EventBusService()
-            event_bus.dispatch(
-                integration_id=INTERNAL_INTEGRATION_ID,
-                group_id=group_id,
-                household_id=household_id,
-                event_type=event_type,
-                document_data=event_document_data,
-            )
+        event_bus.dispatch(
+            integration_id=INTERNAL_INTEGRATION_ID,
+            group_id=group_id,
+            household_id=household_id,
+            event_type=event_type,
+            document_data=event_document_data,
+        )
 
 
 def post_single_webhook(webhook: ReadWebhook, message: str = "") -> None:
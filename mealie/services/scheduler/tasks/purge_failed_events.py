@@ -0,0 +1,26 @@
+import datetime
+
+from sqlalchemy import delete
+
+from mealie.core import root_logger
+from mealie.db.db_setup import session_context
+from mealie.db.models.household.events import EventBusOutboxModel
+
+logger = root_logger.get_logger()
+
+MAX_DAYS_OLD = 7
+
+
+def purge_failed_events():
+    """Purges events that ran out of delivery attempts more than x days ago"""
+    logger.debug("purging failed event bus events")
+    limit = datetime.datetime.now(datetime.UTC) - datetime.timedelta(days=MAX_DAYS_OLD)
+
+    with session_context() as session:
+        stmt = delete(EventBusOutboxModel).filter(
+            EventBusOutboxModel.failed == True,  # noqa: E712 - required for SQLAlchemy comparison
+            EventBusOutboxModel.update_at <= limit,
+        )
+        result = session.execute(stmt)
+        session.commit()
+        logger.info(f"{result.rowcount} failed event bus events purged")
@@ -0,0 +1,15 @@
+from mealie.core import root_logger
+from mealie.db.db_setup import session_context
+from mealie.pkgs.stats import fs_stats
+from mealie.services.storage_stats.storage_stats_service import StorageStatsService
+
+
+def reconcile_storage_stats() -> None:
+    """Measures the data directory, correcting the storage statistics for changes made outside of Mealie"""
+    logger = root_logger.get_logger()
+
+    with session_context() as session:
+        snapshot = StorageStatsService(session).reconcile()
+
+    data_dir_size = fs_stats.pretty_size(snapshot.data_dir_size)
+    logger.info(f"finished reconciling storage statistics, data directory is {data_dir_size}")
@@ -473,6 +473,17 @@ def parse_duration(iso_duration: str) -> timedelta:
     return timedelta(**times)
 
 
+TIME_SCALE_TRANSLATION_KEYS = {
+    timedelta(days=365): "datetime.year",
+    timedelta(days=1): "datetime.day",
+    timedelta(hours=1): "datetime.hour",
+    timedelta(minutes=1): "datetime.minute",
+    timedelta(seconds=1): "datetime.second",
+    timedelta(microseconds=1000): "datetime.millisecond",
+    timedelta(microseconds=1): "datetime.microsecond",
+}
+
+
 def pretty_print_timedelta(t: timedelta, translator: Translator, max_components=None, max_decimal_places=2):
     """
     Print a pretty string for a timedelta.
@@ -480,18 +491,9 @@ def pretty_print_timedelta(t: timedelta, translator: Translator, max_components=
     Setting max_components to e.g. 1 will change this to '2.2 days', where the number of decimal
     points can also be set.
     """
-    time_scale_translation_keys_dict = {
-        timedelta(days=365): "datetime.year",
-        timedelta(days=1): "datetime.day",
-        timedelta(hours=1): "datetime.hour",
-        timedelta(minutes=1): "datetime.minute",
-        timedelta(seconds=1): "datetime.second",
-        timedelta(microseconds=1000): "datetime.millisecond",
-        timedelta(microseconds=1): "datetime.microsecond",
-    }
     count = 0
     out_list = []
-    for scale, scale_translation_key in time_scale_translation_keys_dict.items():
+    for scale, scale_translation_key in TIME_SCALE_TRANSLATION_KEYS.items():
         if t >= scale:
             count += 1
             n = t / scale if count == max_components else int(t / scale)
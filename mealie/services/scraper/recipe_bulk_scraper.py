@@ -1,37 +1,87 @@
 import asyncio
+import contextlib
+from collections.abc import AsyncGenerator
+from dataclasses import dataclass
+from urllib.parse import urlsplit
 
 from pydantic import UUID4
 
 from mealie.lang.providers import Translator
 from mealie.repos.repository_factory import AllRepositories
-from mealie.schema.recipe.recipe import CreateRecipeByUrlBulk, Recipe
+from mealie.schema.recipe.recipe import CreateRecipeBulk, CreateRecipeByUrlBulk, Recipe
 from mealie.schema.reports.reports import (
     ReportCategory,
     ReportCreate,
     ReportEntryCreate,
-    ReportEntryOut,
+    ReportOut,
     ReportSummaryStatus,
 )
 from mealie.schema.user.user import GroupInDB
 from mealie.services._base_service import BaseService
 from mealie.services.recipe.recipe_service import RecipeService
-from mealie.services.scraper.scraper import create_from_html
+from mealie.services.scraper.scraper import extract_url, scrape_recipe, scrape_recipe_image
+from mealie.services.scraper.scraper_strategies import safe_scrape_html
+
+
+class DomainLimiter:
+    """Limits how many requests are made to the same domain at the same time"""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+
+    @staticmethod
+    def domain(url: str) -> str:
+        # URLs like "www.example.com/recipe" don't have a scheme, so they need a "//" to be parsed as a host
+        return (urlsplit(url if "://" in url else f"//{url}").hostname or "").lower()
+
+    @contextlib.asynccontextmanager
+    async def acquire(self, url: str) -> AsyncGenerator[None, None]:
+        semaphore = self._semaphores.setdefault(self.domain(url), asyncio.Semaphore(self.limit))
+        async with semaphore:
+            yield
+
+
+@dataclass(slots=True)
+class _ImportResult:
+    bulk_import: CreateRecipeBulk
+    recipe: Recipe | None = None
+    error: ReportEntryCreate | None = None
 
 
 class RecipeBulkScraperService(BaseService):
-    report_entries: list[ReportEntryCreate]
+    """
+    Imports recipes from a list of URLs. Each recipe is fetched, parsed, and its image downloaded independently,
+    so slow sites don't hold up the rest of the import, while finished recipes are saved to the database in
+    batches. The report is updated with each batch, so it shows the progress of the import while it runs.
+    """
+
+    batch_size = 50
+    """Maximum number of recipes saved at a time"""
 
     def __init__(
-        self, service: RecipeService, repos: AllRepositories, group: GroupInDB, translator: Translator
+        self,
+        service: RecipeService,
+        repos: AllRepositories,
+        group: GroupInDB,
+        translator: Translator,
+        concurrency: int | None = None,
+        domain_concurrency: int | None = None,
     ) -> None:
         self.service = service
         self.repos = repos
         self.group = group
-        self.report_entries = []
         self.translator = translator
+        self.report: ReportOut | None = None
+
+        self.succeeded = 0
+        self.failed = 0
 
         super().__init__()
 
+        self.concurrency = concurrency or self.settings.BULK_IMPORT_CONCURRENCY
+        self.domain_concurrency = domain_concurrency or self.settings.BULK_IMPORT_DOMAIN_CONCURRENCY
+
     def get_report_id(self) -> UUID4:
         import_report = ReportCreate(
             name="Bulk Import",
@@ -43,85 +93,131 @@ class RecipeBulkScraperService(BaseService):
         self.report = self.repos.group_reports.create(import_report)
         return self.report.id
 
-    def _add_error_entry(self, message: str, exception: str = "") -> None:
-        self.report_entries.append(
-            ReportEntryCreate(
-                report_id=self.report.id,
-                success=False,
-                message=message,
-                exception=exception,
+    def _new_entry(self, message: str, exception: str = "", success: bool = True) -> ReportEntryCreate:
+        assert self.report is not None
+        return ReportEntryCreate(report_id=self.report.id, success=success, message=message, exception=exception)
+
+    async def _import(
+        self, bulk_import: CreateRecipeBulk, limit: asyncio.Semaphore, domain_limiter: DomainLimiter
+    ) -> _ImportResult:
+        try:
+            url = extract_url(bulk_import.url)
+
+            # only fetching the page counts towards the domain's limit, since that's the request made to the site
+            async with domain_limiter.acquire(url), limit:
+                html = await safe_scrape_html(url)
+
+            if not html:
+                raise ValueError(f"no HTML was returned from {url}")
+
+            recipe, _ = await scrape_recipe(url, self.translator, html)
+
+            async with limit:
+                await scrape_recipe_image(recipe)
+        except Exception as e:
+            self.service.logger.error(f"failed to scrape url during bulk url import {bulk_import.url}")
+            self.service.logger.exception(e)
+            error = self._new_entry(f"failed to scrape url {bulk_import.url}", str(e), success=False)
+            return _ImportResult(bulk_import, error=error)
+
+        if bulk_import.tags:
+            recipe.tags = bulk_import.tags
+
+        if bulk_import.categories:
+            recipe.recipe_category = bulk_import.categories
+
+        return _ImportResult(bulk_import, recipe=recipe)
+
+    def _create_recipe(self, result: _ImportResult) -> ReportEntryCreate:
+        assert result.recipe is not None
+        url = result.bulk_import.url
+
+        try:
+            new_recipe = self.service.create_one(result.recipe)
+        except Exception as e:
+            self.service.logger.error(f"Failed to save recipe to database during bulk url import {url}")
+            self.service.logger.exception(e)
+            return self._new_entry(
+                f"Failed to save recipe to database during bulk url import {url}", str(e), success=False
             )
-        )
 
-    def _save_all_entries(self) -> None:
-        is_success = True
-        is_failure = True
+        return self._new_entry(f"Successfully imported recipe {new_recipe.name}")
+
+    def _create_recipes(self, results: list[_ImportResult]) -> list[ReportEntryCreate]:
+        if not results:
+            return []
+
+        try:
+            new_recipes = self.service.create_many([result.recipe for result in results if result.recipe])
+        except Exception as e:
+            # save the recipes one at a time, so one bad recipe doesn't prevent saving the rest of the batch
+            self.service.logger.warning(f"Failed to save a batch of recipes during bulk url import: {e}")
+            return [self._create_recipe(result) for result in results]
+
+        return [self._new_entry(f"Successfully imported recipe {new_recipe.name}") for new_recipe in new_recipes]
+
+    def _save_batch(self, batch: list[_ImportResult]) -> None:
+        entries = [result.error for result in batch if result.error]
+        entries.extend(self._create_recipes([result for result in batch if result.recipe]))
+
+        self.repos.group_report_entries.create_many(entries, bulk=True)
+        for entry in entries:
+            if entry.success:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+
+    async def _save_results(self, results: asyncio.Queue[_ImportResult | None]) -> None:
+        """Saves results until it gets `None`, batching together the results that came in while saving the last batch"""
 
-        new_entries: list[ReportEntryOut] = []
-        for entry in self.report_entries:
-            if is_failure and entry.success:
-                is_failure = False
+        while True:
+            batch: list[_ImportResult] = []
+            result = await results.get()
+            while result is not None:
+                batch.append(result)
+                if len(batch) >= self.batch_size or results.empty():
+                    break
 
-            if is_success and not entry.success:
-                is_success = False
+                result = results.get_nowait()
 
-            new_entries.append(self.repos.group_report_entries.create(entry))
+            if batch:
+                await asyncio.to_thread(self._save_batch, batch)
 
-        if is_success:
+            if result is None:
+                return
+
+    def _save_report_status(self) -> None:
+        assert self.report is not None
+
+        if not self.failed:
             self.report.status = ReportSummaryStatus.success
 
-        if is_failure:
+        if not self.succeeded:
             self.report.status = ReportSummaryStatus.failure
 
-        if not is_success and not is_failure:
+        if self.failed and self.succeeded:
             self.report.status = ReportSummaryStatus.partial
 
-        self.report.entries = new_entries
-        self.repos.group_reports.update(self.report.id, self.report)
+        # the entries were saved with each batch, and updating the report with an empty list would delete them
+        self.repos.group_reports.update(self.report.id, self.report.model_dump(exclude={"entries"}))
 
     async def scrape(self, urls: CreateRecipeByUrlBulk) -> None:
-        sem = asyncio.Semaphore(3)
-
-        async def _do(url: str) -> Recipe | None:
-            async with sem:
-                try:
-                    recipe, _ = await create_from_html(url, self.translator)
-                    return recipe
-                except Exception as e:
-                    self.service.logger.error(f"failed to scrape url during bulk url import {url}")
-                    self.service.logger.exception(e)
-                    self._add_error_entry(f"failed to scrape url {url}", str(e))
-                    return None
-
         if self.report is None:
             self.get_report_id()
-        tasks = [_do(b.url) for b in urls.imports]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        for b, recipe in zip(urls.imports, results, strict=True):
-            if not recipe or isinstance(recipe, BaseException):
-                continue
-
-            if b.tags:
-                recipe.tags = b.tags
-
-            if b.categories:
-                recipe.recipe_category = b.categories
-
-            try:
-                self.service.create_one(recipe)
-            except Exception as e:
-                self.service.logger.error(f"Failed to save recipe to database during bulk url import {b.url}")
-                self.service.logger.exception(e)
-                self._add_error_entry(f"Failed to save recipe to database during bulk url import {b.url}", str(e))
-                continue
-
-            self.report_entries.append(
-                ReportEntryCreate(
-                    report_id=self.report.id,
-                    success=True,
-                    message=f"Successfully imported recipe {recipe.name}",
-                    exception="",
-                )
-            )
 
-        self._save_all_entries()
+        limit = asyncio.Semaphore(self.concurrency)
+        domain_limiter = DomainLimiter(self.domain_concurrency)
+
+        results: asyncio.Queue[_ImportResult | None] = asyncio.Queue()
+        writer = asyncio.create_task(self._save_results(results))
+
+        async def _do(bulk_import: CreateRecipeBulk) -> None:
+            await results.put(await self._import(bulk_import, limit, domain_limiter))
+
+        try:
+            await asyncio.gather(*(_do(bulk_import) for bulk_import in urls.imports))
+        finally:
+            await results.put(None)
+            await writer
+
+        await asyncio.to_thread(self._save_report_status)
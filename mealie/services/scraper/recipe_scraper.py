@@ -1,7 +1,12 @@
+import asyncio
+import json
+
+from mealie.core.config import get_app_settings
 from mealie.core.root_logger import get_logger
 from mealie.lang.providers import Translator
 from mealie.schema.recipe.recipe import Recipe
 from mealie.services.scraper import cleaner
+from mealie.services.scraper.scrape_cache import CACHE_VERSION, get_scrape_cache, sha256
 from mealie.services.scraper.scraped_extras import ScrapedExtras
 
 from .scraper_strategies import (
@@ -35,13 +40,37 @@ class RecipeScraper:
         self.translator = translator
         self.logger = get_logger()
 
+    def _cache_key(self, url: str, html: str) -> str:
+        """A key for everything that affects the recipe parsed from the page"""
+
+        return sha256(
+            json.dumps(
+                [
+                    CACHE_VERSION,
+                    url,
+                    sha256(html),
+                    [scraper.__name__ for scraper in self.scrapers],
+                    get_app_settings().OPENAI_ENABLED,
+                    # the translator is used to format the recipe's times
+                    [self.translator.t(key) for key in cleaner.TIME_SCALE_TRANSLATION_KEYS.values()],
+                ]
+            )
+        )
+
     async def scrape(self, url: str, html: str | None = None) -> tuple[Recipe, ScrapedExtras] | tuple[None, None]:
         """
         Scrapes a recipe from the web.
-        Skips the network request if `html` is provided.
+        Skips the network request if `html` is provided, and skips parsing if the same page was parsed before.
         """
 
         raw_html = html or await safe_scrape_html(url)
+
+        scrape_cache = get_scrape_cache()
+        cache_key = self._cache_key(url, raw_html) if raw_html and scrape_cache.enabled else None
+        if cache_key and (cached := await asyncio.to_thread(scrape_cache.get_recipe, cache_key)):
+            self.logger.debug(f"Using cached recipe for URL: {url}")
+            return cached
+
         for scraper_type in self.scrapers:
             scraper = scraper_type(url, self.translator, raw_html=raw_html)
 
@@ -61,6 +90,9 @@ class RecipeScraper:
                 self.logger.exception(f"Failed to clean recipe data from {scraper.__class__.__name__}")
                 continue
 
+            if cache_key:
+                await asyncio.to_thread(scrape_cache.set_recipe, cache_key, recipe, extras)
+
             return recipe, extras
 
         return None, None
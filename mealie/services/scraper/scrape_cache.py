@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+from mealie.core.config import get_app_dirs, get_app_settings
+from mealie.core.root_logger import get_logger
+from mealie.schema.recipe.recipe import Recipe
+from mealie.services.scraper.scraped_extras import ScrapedExtras
+
+CACHE_VERSION = 1
+"""Bump to invalidate cached recipes when the scraper's output changes"""
+
+_SCRAPE_CACHE: ScrapeCache | None = None
+
+
+def get_scrape_cache() -> ScrapeCache:
+    global _SCRAPE_CACHE
+
+    if not _SCRAPE_CACHE:
+        settings = get_app_settings()
+        _SCRAPE_CACHE = ScrapeCache(
+            get_app_dirs().CACHE_DIR / "scraper",
+            max_size=settings.SCRAPER_CACHE_SIZE_MB * 1024 * 1024,
+            ttl=timedelta(minutes=settings.SCRAPER_CACHE_TTL_MINUTES),
+        )
+
+    return _SCRAPE_CACHE
+
+
+def sha256(value: str) -> str:
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+@dataclass(slots=True)
+class CachedPage:
+    url: str
+    html: str
+    content_hash: str
+    fetched_at: datetime
+    etag: str | None = None
+    last_modified: str | None = None
+    is_fresh: bool = False
+
+    @property
+    def revalidation_headers(self) -> dict[str, str]:
+        """Headers that ask the site to only send the page if it changed since it was cached"""
+
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ScrapeCache:
+    """
+    An on-disk cache for URL imports, so importing the same page again doesn't need to fetch or parse it.
+
+    Pages are stored by content hash, with a small entry per URL pointing to the content along with the
+    `ETag` and `Last-Modified` headers it was sent with. Once an entry is older than the TTL, it's revalidated
+    with the site instead of being downloaded again. Parsed recipes are stored by a hash of the page content and
+    everything else that affects how it's parsed, so they stay valid for as long as the page doesn't change.
+
+    When the cache grows past `max_size` bytes, the least recently used files are removed. A `max_size`
+    of 0 disables the cache.
+    """
+
+    def __init__(self, directory: Path, max_size: int, ttl: timedelta) -> None:
+        self.directory = directory
+        self.max_size = max_size
+        self.ttl = ttl
+        self.logger = get_logger()
+
+        self._pages_dir = directory / "pages"
+        self._html_dir = directory / "html"
+        self._recipes_dir = directory / "recipes"
+
+        self._size: int | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def get_page(self, url: str) -> CachedPage | None:
+        if not self.enabled:
+            return None
+
+        entry = self._read_json(self._pages_dir / f"{sha256(url)}.json")
+        if not entry or entry.get("url") != url:
+            return None
+
+        html_file = self._html_dir / entry["content_hash"]
+        try:
+            html = html_file.read_text(encoding="utf-8")
+        except OSError:
+            return None
+
+        self._touch(html_file)
+        fetched_at = datetime.fromisoformat(entry["fetched_at"])
+        return CachedPage(
+            url=url,
+            html=html,
+            content_hash=entry["content_hash"],
+            fetched_at=fetched_at,
+            etag=entry.get("etag"),
+            last_modified=entry.get("last_modified"),
+            is_fresh=datetime.now(UTC) - fetched_at < self.ttl,
+        )
+
+    def set_page(self, url: str, html: str, headers: Mapping[str, str]) -> None:
+        """
+        Caches the page fetched from `url`, unless the site asked for it not to be stored, or it may be specific
+        to the user who fetched it. Pages are shared by every group, so private pages, and pages that set cookies
+        (e.g. for a session), aren't cached.
+        """
+
+        if not (self.enabled and html):
+            return
+
+        cache_control = {
+            directive.split("=", 1)[0].strip() for directive in headers.get("cache-control", "").lower().split(",")
+        }
+        if cache_control & {"no-store", "private"} or "set-cookie" in headers:
+            return
+
+        content_hash = sha256(html)
+        html_file = self._html_dir / content_hash
+        if html_file.exists():
+            self._touch(html_file)
+        else:
+            self._write(html_file, html.encode("utf-8"))
+
+        page = CachedPage(
+            url=url,
+            html=html,
+            content_hash=content_hash,
+            fetched_at=datetime.now(UTC),
+            etag=headers.get("etag"),
+            last_modified=headers.get("last-modified"),
+        )
+        self._write_page(page)
+
+    def refresh_page(self, page: CachedPage) -> None:
+        """Restarts the TTL of a page the site confirmed hasn't changed"""
+
+        if not self.enabled:
+            return
+
+        page.fetched_at = datetime.now(UTC)
+        page.is_fresh = True
+        self._write_page(page)
+
+    def get_recipe(self, key: str) -> tuple[Recipe, ScrapedExtras] | None:
+        if not self.enabled:
+            return None
+
+        entry = self._read_json(self._recipes_dir / f"{key}.json")
+        if not entry:
+            return None
+
+        try:
+            recipe = Recipe.model_validate(entry["recipe"])
+        except Exception:
+            self.logger.exception("Failed to load cached recipe")
+            return None
+
+        extras = ScrapedExtras()
+        extras.set_tags(entry.get("tags", []))
+        return recipe, extras
+
+    def set_recipe(self, key: str, recipe: Recipe, extras: ScrapedExtras | None) -> None:
+        if not self.enabled:
+            return
+
+        entry = {"recipe": recipe.model_dump(mode="json"), "tags": extras.tags if extras else []}
+        self._write(self._recipes_dir / f"{key}.json", json.dumps(entry).encode("utf-8"))
+
+    def clear(self) -> None:
+        with self._lock:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self._size = 0
+
+    def _write_page(self, page: CachedPage) -> None:
+        entry = {
+            "url": page.url,
+            "content_hash": page.content_hash,
+            "fetched_at": page.fetched_at.isoformat(),
+            "etag": page.etag,
+            "last_modified": page.last_modified,
+        }
+        self._write(self._pages_dir / f"{sha256(page.url)}.json", json.dumps(entry).encode("utf-8"))
+
+    def _read_json(self, path: Path) -> dict[str, Any] | None:
+        try:
+            data = json.loads(path.read_bytes())
+        except (OSError, ValueError):
+            return None
+
+        self._touch(path)
+        return data
+
+    def _touch(self, path: Path) -> None:
+        """Marks the file as recently used, so it's the last to be evicted"""
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _write(self, path: Path, data: bytes) -> None:
+        """Writes the file atomically, so concurrent readers never see a partial file"""
+
+        try:
+            old_size = path.stat().st_size
+        except OSError:
+            old_size = 0
+
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            self.logger.exception(f"Failed to write scraper cache file {path}")
+            return
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._disk_usage()
+            else:
+                self._size += len(data) - old_size
+
+            if self._size > self.max_size:
+                self._evict()
+
+    def _files(self) -> list[os.DirEntry]:
+        files: list[os.DirEntry] = []
+        for directory in [self._pages_dir, self._html_dir, self._recipes_dir]:
+            try:
+                with os.scandir(directory) as entries:
+                    files.extend(entry for entry in entries if entry.is_file())
+            except OSError:
+                continue
+        return files
+
+    def _disk_usage(self) -> int:
+        return sum(entry.stat().st_size for entry in self._files())
+
+    def _evict(self) -> None:
+        """Removes the least recently used files until the cache is back under 80% of its maximum size"""
+
+        files = sorted(self._files(), key=lambda entry: entry.stat().st_mtime)
+        size = sum(entry.stat().st_size for entry in files)
+        target = self.max_size * 0.8
+
+        for entry in files:
+            if size <= target:
+                break
+
+            try:
+                file_size = entry.stat().st_size
+                os.remove(entry.path)
+            except OSError:
+                continue
+
+            size -= file_size
+
+        self._size = size
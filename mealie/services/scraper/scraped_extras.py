@@ -20,6 +20,10 @@ class ScrapedExtras:
     def __init__(self) -> None:
         self._tags: list[str] = []
 
+    @property
+    def tags(self) -> list[str]:
+        return self._tags
+
     def set_tags(self, tags: list[str]) -> None:
         self._tags = tags
 
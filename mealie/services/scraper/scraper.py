@@ -21,33 +21,34 @@ class ParserErrors(str, Enum):
     CONNECTION_ERROR = "CONNECTION_ERROR"
 
 
-async def create_from_html(
-    url: str, translator: Translator, html: str | None = None
-) -> tuple[Recipe, ScrapedExtras | None]:
-    """Main entry point for generating a recipe from a URL. Pass in a URL and
-    a Recipe object will be returned if successful. Optionally pass in the HTML to skip fetching it.
+def extract_url(url: str) -> str:
+    """Extracts the URL from text that contains one, e.g. a URL shared along with the page's title"""
 
-    Args:
-        url (str): a valid string representing a URL
-        html (str | None): optional HTML string to skip network request. Defaults to None.
+    extracted_url = regex_search(r"(https?://|www\.)[^\s]+", url)
+    if not extracted_url:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, {"details": ParserErrors.BAD_RECIPE_DATA.value})
 
-    Returns:
-        Recipe: Recipe Object
-    """
-    scraper = RecipeScraper(translator)
+    return extracted_url.group(0)
 
-    if not html:
-        extracted_url = regex_search(r"(https?://|www\.)[^\s]+", url)
-        if not extracted_url:
-            raise HTTPException(status.HTTP_400_BAD_REQUEST, {"details": ParserErrors.BAD_RECIPE_DATA.value})
-        url = extracted_url.group(0)
 
+async def scrape_recipe(
+    url: str, translator: Translator, html: str | None = None
+) -> tuple[Recipe, ScrapedExtras | None]:
+    """Parses a new recipe from the HTML, fetching it from the URL if it's not passed in. Doesn't scrape the image"""
+
+    scraper = RecipeScraper(translator)
     new_recipe, extras = await scraper.scrape(url, html)
 
     if not new_recipe:
         raise HTTPException(status.HTTP_400_BAD_REQUEST, {"details": ParserErrors.BAD_RECIPE_DATA.value})
 
     new_recipe.id = uuid4()
+    return new_recipe, extras
+
+
+async def scrape_recipe_image(new_recipe: Recipe) -> None:
+    """Downloads the image of a recipe returned by `scrape_recipe`, and fills in its name and slug"""
+
     logger = get_logger()
     logger.debug(f"Image {new_recipe.image}")
 
@@ -71,4 +72,24 @@ async def create_from_html(
         new_recipe.name = f"No Recipe Name Found - {uuid4()!s}"
         new_recipe.slug = slugify(new_recipe.name)
 
+
+async def create_from_html(
+    url: str, translator: Translator, html: str | None = None
+) -> tuple[Recipe, ScrapedExtras | None]:
+    """Main entry point for generating a recipe from a URL. Pass in a URL and
+    a Recipe object will be returned if successful. Optionally pass in the HTML to skip fetching it.
+
+    Args:
+        url (str): a valid string representing a URL
+        html (str | None): optional HTML string to skip network request. Defaults to None.
+
+    Returns:
+        Recipe: Recipe Object
+    """
+    if not html:
+        url = extract_url(url)
+
+    new_recipe, extras = await scrape_recipe(url, translator, html)
+    await scrape_recipe_image(new_recipe)
+
     return new_recipe, extras
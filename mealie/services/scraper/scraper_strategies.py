@@ -1,3 +1,6 @@
+import asyncio
+import codecs
+import re
 import time
 from abc import ABC, abstractmethod
 from collections.abc import Callable
@@ -6,7 +9,7 @@ from typing import Any
 import bs4
 import extruct
 from fastapi import HTTPException, status
-from httpx import AsyncClient, Response
+from httpx import Response
 from recipe_scrapers import NoSchemaFoundInWildMode, SchemaScraperFactory, scrape_html
 from slugify import slugify
 from w3lib.html import get_base_url
@@ -20,9 +23,19 @@ from mealie.services.openai import OpenAIService
 from mealie.services.scraper.scraped_extras import ScrapedExtras
 
 from . import cleaner
+from .scrape_cache import get_scrape_cache
 from .user_agents_manager import get_user_agents_manager
 
 SCRAPER_TIMEOUT = 15
+SCRAPER_CHUNK_SIZE = 64 * 1024
+CHARSET_PRESCAN_SIZE = 1024
+"""Number of bytes searched for a `<meta>` charset, the same as browsers"""
+
+META_CHARSET_RE = re.compile(rb"""<meta[^>]*?charset\s*=\s*["']?\s*([\w.:-]+)""", re.IGNORECASE)
+LD_JSON_SCRIPT_RE = re.compile(
+    rb"""<script[^>]*?type\s*=\s*["']?application/ld\+json["']?[^>]*>(.*?)</script\s*>""", re.IGNORECASE | re.DOTALL
+)
+
 logger = get_logger()
 
 
@@ -30,68 +43,145 @@ class ForceTimeoutException(Exception):
     pass
 
 
+def _find_ld_json_recipe(html_bytes: bytearray, start: int) -> tuple[bool, int]:
+    """
+    Searches the page from `start` for a complete JSON-LD block describing a recipe.
+    Returns whether one was found, and where to continue searching once more of the page is read.
+    """
+
+    for match in LD_JSON_SCRIPT_RE.finditer(html_bytes, start):
+        if b"Recipe" in match.group(1):
+            return True, match.end()
+
+        start = match.end()
+
+    # only search again from a script tag that may be a JSON-LD block that isn't complete yet
+    script_start = html_bytes.rfind(b"<script", start)
+    if script_start != -1:
+        tag_end = html_bytes.find(b">", script_start)
+        if tag_end == -1 or b"ld+json" in html_bytes[script_start:tag_end]:
+            return False, script_start
+
+    return False, max(start, len(html_bytes) - len(b"<script"))
+
+
+async def _read_html(response: Response, max_size: int, stop_at_recipe_data: bool = False) -> tuple[bytearray, bool]:
+    """
+    Reads the page into a single buffer, up to `max_size` bytes. With `stop_at_recipe_data`,
+    the rest of the page isn't downloaded once a complete JSON-LD recipe has been read.
+
+    Returns the page, and whether all of it was read.
+    """
+
+    html_bytes = bytearray()
+    search_start = 0
+    start_time = time.time()
+
+    async for chunk in response.aiter_bytes(chunk_size=SCRAPER_CHUNK_SIZE):
+        html_bytes += chunk
+
+        if time.time() - start_time > SCRAPER_TIMEOUT:
+            raise ForceTimeoutException()
+
+        if len(html_bytes) >= max_size:
+            logger.warning(f"Page is larger than {max_size} bytes, only the start of it will be used: {response.url}")
+            del html_bytes[max_size:]
+            return html_bytes, False
+
+        if stop_at_recipe_data:
+            found, search_start = _find_ld_json_recipe(html_bytes, search_start)
+            if found:
+                logger.debug(f"Found recipe data after {len(html_bytes)} bytes: {response.url}")
+                return html_bytes, False
+
+    return html_bytes, True
+
+
+def _detect_encoding(html_bytes: bytearray, charset: str | None) -> str:
+    """
+    Finds the page's encoding from the `Content-Type` charset, or a `<meta>` charset at the start of the page,
+    falling back to UTF-8
+    """
+
+    if not charset and (match := META_CHARSET_RE.search(html_bytes, 0, CHARSET_PRESCAN_SIZE)):
+        charset = match.group(1).decode("ascii")
+
+    if charset:
+        try:
+            encoding = codecs.lookup(charset).name
+        except LookupError:
+            logger.debug(f"Unknown page encoding: {charset}")
+        else:
+            # a page that was decoded enough to read its <meta> charset can't be UTF-16
+            return "utf-8" if encoding.startswith("utf-16") else encoding
+
+    return "utf-8"
+
+
 async def safe_scrape_html(url: str) -> str:
     """
     Scrapes the html from a url but will cancel the request
     if the request takes longer than 15 seconds. This is used to mitigate
     DDOS attacks from users providing a url with arbitrary large content.
+    Pages larger than `SCRAPER_MAX_HTML_SIZE_MB` are cut off at that size.
+
+    Pages are cached on disk (unless they were cut off), and a cached page is returned without a request
+    until it's older than the cache's TTL, after which it's only downloaded again if the site says it changed.
     """
+    scrape_cache = get_scrape_cache()
+    # the cache reads, writes, and evicts files, so it's used off the event loop
+    cached_page = await asyncio.to_thread(scrape_cache.get_page, url)
+    if cached_page and cached_page.is_fresh:
+        logger.debug(f"Using cached HTML for URL: {url}")
+        return cached_page.html
+
+    settings = get_app_settings()
     user_agents_manager = get_user_agents_manager()
 
     logger.debug(f"Scraping URL: {url}")
-    async with AsyncClient(transport=safehttp.AsyncSafeTransport()) as client:
+    async with safehttp.http_clients.async_client(safehttp.ClientPurpose.scraper) as client:
         for user_agent in user_agents_manager.user_agents:
             logger.debug(f'Trying User-Agent: "{user_agent}"')
 
+            headers = user_agents_manager.get_scrape_headers(user_agent)
+            if cached_page:
+                headers.update(cached_page.revalidation_headers)
+
             response: Response | None = None
-            html_bytes = b""
+            html_bytes = bytearray()
+            complete = False
             async with client.stream(
                 "GET",
                 url,
                 timeout=SCRAPER_TIMEOUT,
-                headers=user_agents_manager.get_scrape_headers(user_agent),
+                headers=headers,
                 follow_redirects=True,
             ) as resp:
                 if resp.status_code == status.HTTP_403_FORBIDDEN:
                     logger.debug(f'403 Forbidden with User-Agent: "{user_agent}"')
                     continue
 
-                start_time = time.time()
-
-                async for chunk in resp.aiter_bytes(chunk_size=1024):
-                    html_bytes += chunk
-
-                    if time.time() - start_time > SCRAPER_TIMEOUT:
-                        raise ForceTimeoutException()
+                if resp.status_code == status.HTTP_304_NOT_MODIFIED and cached_page:
+                    logger.debug(f"Cached HTML is still valid for URL: {url}")
+                    await asyncio.to_thread(scrape_cache.refresh_page, cached_page)
+                    return cached_page.html
 
+                html_bytes, complete = await _read_html(
+                    resp,
+                    max_size=settings.SCRAPER_MAX_HTML_SIZE_MB * 1024 * 1024,
+                    stop_at_recipe_data=settings.SCRAPER_STOP_AT_RECIPE_DATA,
+                )
                 response = resp
                 break
 
         if not (response and html_bytes):
             return ""
 
-        # =====================================
-        # Copied from requests text property
-
-        # Try charset from content-type
-        content = None
-        encoding = response.encoding
+        content = html_bytes.decode(_detect_encoding(html_bytes, response.charset_encoding), errors="replace")
 
-        # Fallback to auto-detected encoding.
-        if encoding is None:
-            encoding = response.apparent_encoding
-
-        # Decode unicode from given encoding.
-        try:
-            content = str(html_bytes, encoding, errors="replace")
-        except (LookupError, TypeError):
-            # A LookupError is raised if the encoding was not found which could
-            # indicate a misspelling or similar mistake.
-            #
-            # A TypeError can be raised if encoding is None
-            #
-            # So we try blindly encoding.
-            content = str(html_bytes, errors="replace")
+        # pages that were cut off short would be used for later imports as if they were complete
+        if response.is_success and complete:
+            await asyncio.to_thread(scrape_cache.set_page, url, content, response.headers)
 
         return content
 
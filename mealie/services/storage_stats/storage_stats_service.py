@@ -0,0 +1,228 @@
+import json
+import os
+import uuid
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+
+from pydantic import UUID4
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.orm import Session
+
+from mealie.db.models.recipe.recipe import RecipeModel
+from mealie.pkgs.stats import fs_stats
+from mealie.services._base_service import BaseService
+
+SNAPSHOT_FILE = "storage_stats.json"
+
+
+@dataclass(slots=True)
+class RecipeDirStats:
+    name: str
+    size: int
+    cleanable_images: int
+
+
+@dataclass(slots=True)
+class StorageSnapshot:
+    """The sizes of the data directory's contents at the time of the last reconciliation"""
+
+    reconciled_at: datetime
+    data_dir_size: int
+    cleanable_images: int
+    cleanable_dirs: int
+    dir_sizes: dict[str, int] = field(default_factory=dict)
+    """The size of each of the data directory's top-level directories, by name"""
+
+    @classmethod
+    def from_json(cls, data: str | bytes) -> "StorageSnapshot":
+        values = json.loads(data)
+        values["reconciled_at"] = datetime.fromisoformat(values["reconciled_at"])
+        return cls(**values)
+
+    def to_json(self) -> str:
+        return json.dumps({**asdict(self), "reconciled_at": self.reconciled_at.isoformat()})
+
+    def dir_size(self, directory: Path) -> int:
+        return self.dir_sizes.get(directory.name, 0)
+
+
+def measure_recipe_dir(path: Path | str) -> RecipeDirStats:
+    """Measures a recipe's directory, counting the images that aren't .webp like the maintenance cleanup does"""
+
+    name = os.path.basename(path)
+    cleanable_images = 0
+    try:
+        with os.scandir(os.path.join(path, "images")) as entries:
+            for entry in entries:
+                if not entry.is_dir() and Path(entry.name).suffix != ".webp":
+                    cleanable_images += 1
+    except (FileNotFoundError, NotADirectoryError):
+        pass
+
+    return RecipeDirStats(name=name, size=fs_stats.get_dir_size(path), cleanable_images=cleanable_images)
+
+
+def entry_size(entry: os.DirEntry) -> int:
+    try:
+        if entry.is_dir(follow_symlinks=False):
+            return fs_stats.get_dir_size(entry.path)
+
+        return entry.stat(follow_symlinks=False).st_size
+    except FileNotFoundError:
+        return 0
+
+
+def is_recipe_dir_name(name: str) -> bool:
+    try:
+        uuid.UUID(name)
+        return True
+    except ValueError:
+        return False
+
+
+class StorageStatsService(BaseService):
+    """
+    Keeps the storage statistics of the data directory, so they don't have to be measured on every request.
+
+    The size of each recipe's directory is stored with the recipe, and updated whenever its images or assets
+    change, so a group's storage is the sum of its recipes' sizes. The sizes of the rest of the data directory
+    are measured when the statistics are reconciled and kept in a snapshot in the cache directory.
+    """
+
+    def __init__(self, session: Session) -> None:
+        self.session = session
+        super().__init__()
+
+    @property
+    def snapshot_file(self) -> Path:
+        return self.directories.CACHE_DIR / SNAPSHOT_FILE
+
+    def _recipe_dir(self, recipe_id: UUID4 | str) -> Path:
+        return self.directories.RECIPE_DATA_DIR / str(recipe_id)
+
+    def _update_recipe_sizes(self, sizes: Iterable[tuple[UUID4, int]]) -> None:
+        params = [{"recipe_id": recipe_id, "size": size} for recipe_id, size in sizes]
+        if params:
+            table = RecipeModel.__table__
+            stmt = (
+                update(table)
+                .where(table.c.id == bindparam("recipe_id"))
+                # keep the recipe's last update time, since measuring it doesn't change the recipe
+                .values(data_size=bindparam("size"), update_at=table.c.update_at)
+            )
+            self.session.execute(stmt, params)
+
+        self.session.commit()
+
+    def record_recipe_size(self, recipe_id: UUID4) -> int:
+        """
+        Measures the recipe's directory and stores its size, called whenever its images or assets change.
+        The snapshot is adjusted by the change in size, so it doesn't have to be reconciled.
+        """
+
+        previous_size = self.session.scalar(select(RecipeModel.data_size).filter(RecipeModel.id == recipe_id))
+        size = fs_stats.get_dir_size(self._recipe_dir(recipe_id))
+        self._update_recipe_sizes([(recipe_id, size)])
+
+        # recipes that haven't been measured were created after the last reconciliation, so they're not in the snapshot
+        self.adjust_snapshot(self.directories.RECIPE_DATA_DIR, size - (previous_size or 0))
+        return size
+
+    def group_storage_bytes(self, group_id: UUID4) -> int:
+        """The size of the group's recipes, measuring the recipes that haven't been measured yet"""
+
+        unmeasured = self.session.scalars(
+            select(RecipeModel.id).filter(RecipeModel.group_id == group_id, RecipeModel.data_size.is_(None))
+        ).all()
+
+        if unmeasured:
+            with ThreadPoolExecutor(max_workers=self.settings.STORAGE_STATS_WORKERS) as pool:
+                sizes = pool.map(lambda recipe_id: fs_stats.get_dir_size(self._recipe_dir(recipe_id)), unmeasured)
+                self._update_recipe_sizes(zip(unmeasured, sizes, strict=True))
+
+        stmt = select(func.coalesce(func.sum(RecipeModel.data_size), 0)).filter(RecipeModel.group_id == group_id)
+        return int(self.session.scalar(stmt) or 0)
+
+    def reconcile(self) -> StorageSnapshot:
+        """
+        Measures the whole data directory, updating the size of every recipe and replacing the snapshot.
+        The directories are measured with a pool of threads, since there's one for every recipe.
+        """
+
+        data_dir = self.directories.DATA_DIR
+        recipes_dir = self.directories.RECIPE_DATA_DIR
+
+        recipe_dirs: list[str] = []
+        recipe_files_size = 0
+        with os.scandir(recipes_dir) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    recipe_dirs.append(entry.path)
+                else:
+                    recipe_files_size += entry_size(entry)
+
+        # the recipes directory is measured recipe by recipe, so it's left out of the rest of the data directory
+        with os.scandir(data_dir) as entries:
+            others = [entry for entry in entries if entry.name != recipes_dir.name]
+
+        with ThreadPoolExecutor(max_workers=self.settings.STORAGE_STATS_WORKERS) as pool:
+            recipe_stats = list(pool.map(measure_recipe_dir, recipe_dirs))
+            other_sizes = list(pool.map(entry_size, others))
+
+        recipe_sizes = {stats.name: stats.size for stats in recipe_stats}
+        dir_sizes = {entry.name: size for entry, size in zip(others, other_sizes, strict=True)}
+        dir_sizes[recipes_dir.name] = os.path.getsize(recipes_dir) + recipe_files_size + sum(recipe_sizes.values())
+
+        recipe_ids = self.session.scalars(select(RecipeModel.id)).all()
+        self._update_recipe_sizes((recipe_id, recipe_sizes.get(str(recipe_id), 0)) for recipe_id in recipe_ids)
+
+        snapshot = StorageSnapshot(
+            reconciled_at=datetime.now(UTC),
+            data_dir_size=os.path.getsize(data_dir) + sum(dir_sizes.values()),
+            cleanable_images=sum(stats.cleanable_images for stats in recipe_stats),
+            cleanable_dirs=sum(not is_recipe_dir_name(stats.name) for stats in recipe_stats),
+            dir_sizes=dir_sizes,
+        )
+
+        self._write_snapshot(snapshot)
+        return snapshot
+
+    def _write_snapshot(self, snapshot: StorageSnapshot) -> None:
+        self.snapshot_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.snapshot_file.with_name(f".{SNAPSHOT_FILE}.{uuid.uuid4().hex}.tmp")
+        tmp_file.write_text(snapshot.to_json())
+        os.replace(tmp_file, self.snapshot_file)
+
+    def get_snapshot(self) -> StorageSnapshot:
+        """The statistics of the last reconciliation, reconciling them first if there aren't any"""
+
+        try:
+            return StorageSnapshot.from_json(self.snapshot_file.read_bytes())
+        except (OSError, ValueError, KeyError, TypeError):
+            return self.reconcile()
+
+    def adjust_snapshot(self, directory: Path, size_change: int) -> None:
+        """
+        Adds `size_change` to the size of one of the data directory's top-level directories in the snapshot,
+        if there is one. Concurrent adjustments can be lost, which the next reconciliation corrects.
+        """
+
+        if not size_change:
+            return
+
+        try:
+            snapshot = StorageSnapshot.from_json(self.snapshot_file.read_bytes())
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+
+        snapshot.dir_sizes[directory.name] = max(snapshot.dir_size(directory) + size_change, 0)
+        snapshot.data_dir_size = max(snapshot.data_dir_size + size_change, 0)
+        self._write_snapshot(snapshot)
+
+    def invalidate(self) -> None:
+        """Removes the snapshot, so the statistics are reconciled the next time they're read"""
+
+        self.snapshot_file.unlink(missing_ok=True)
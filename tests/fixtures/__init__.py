@@ -1,5 +1,6 @@
 from .fixture_admin import *
 from .fixture_database import *
+from .fixture_http import *
 from .fixture_multitenant import *
 from .fixture_recipe import *
 from .fixture_shopping_lists import *
@@ -0,0 +1,21 @@
+from collections.abc import Generator
+from ipaddress import ip_address
+
+from pytest import MonkeyPatch, fixture
+
+from mealie.pkgs.safehttp.transport import AsyncSafeTransport
+from tests import data as test_data
+from tests.utils.fake_http_server import FakeHTTPServer, FakeResponse
+
+
+@fixture()
+def fake_server(monkeypatch: MonkeyPatch) -> Generator[FakeHTTPServer, None, None]:
+    async def resolve_to_server(self, host: str):
+        return (ip_address("127.0.0.1"),)
+
+    # every host resolves to the local server, which the transport would otherwise refuse to connect to
+    monkeypatch.setattr(AsyncSafeTransport, "validate_host", resolve_to_server)
+
+    with FakeHTTPServer() as server:
+        server.add("/image.jpg", FakeResponse(test_data.images_test_image_1.read_bytes(), "image/jpeg"))
+        yield server
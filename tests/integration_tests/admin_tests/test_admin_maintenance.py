@@ -0,0 +1,139 @@
+import shutil
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from mealie.core.config import get_app_dirs
+from mealie.schema.recipe.recipe import Recipe
+from mealie.services.storage_stats.storage_stats_service import StorageStatsService
+from tests import data
+from tests.utils import api_routes, random_string
+from tests.utils.fixture_schemas import TestUser
+
+
+def test_admin_maintenance_summary_is_reconciled(api_client: TestClient, admin_user: TestUser):
+    response = api_client.post(api_routes.admin_maintenance_storage_reconcile, headers=admin_user.token)
+    assert response.status_code == 200
+
+    response = api_client.get(api_routes.admin_maintenance, headers=admin_user.token)
+    assert response.status_code == 200
+    summary = response.json()
+
+    recipe_dir = get_app_dirs().RECIPE_DATA_DIR / random_string()
+    recipe_dir.mkdir()
+    try:
+        # the summary isn't measured again until the storage statistics are reconciled
+        response = api_client.get(api_routes.admin_maintenance, headers=admin_user.token)
+        assert response.json()["cleanableDirs"] == summary["cleanableDirs"]
+
+        response = api_client.post(api_routes.admin_maintenance_storage_reconcile, headers=admin_user.token)
+        assert response.status_code == 200
+
+        response = api_client.get(api_routes.admin_maintenance, headers=admin_user.token)
+        assert response.json()["cleanableDirs"] == summary["cleanableDirs"] + 1
+    finally:
+        shutil.rmtree(recipe_dir)
+
+
+def test_admin_maintenance_clean_images(
+    api_client: TestClient, admin_user: TestUser, unique_user: TestUser, recipe_ingredient_only: Recipe
+):
+    image = recipe_ingredient_only.image_dir / f"{random_string()}.jpg"
+    image.parent.mkdir(parents=True, exist_ok=True)
+    image_size = image.write_bytes(data.images_test_image_1.read_bytes())
+
+    response = api_client.post(api_routes.admin_maintenance_storage_reconcile, headers=admin_user.token)
+    assert response.status_code == 200
+
+    response = api_client.get(api_routes.admin_maintenance, headers=admin_user.token)
+    assert response.json()["cleanableImages"] >= 1
+    response = api_client.get(api_routes.groups_storage, headers=unique_user.token)
+    used_storage = response.json()["usedStorageBytes"]
+
+    response = api_client.post(api_routes.admin_maintenance_clean_images, headers=admin_user.token)
+    assert response.status_code == 200
+    assert not image.exists()
+
+    # cleaning reconciles the statistics, including the size of the recipes
+    response = api_client.get(api_routes.admin_maintenance, headers=admin_user.token)
+    assert response.json()["cleanableImages"] == 0
+    response = api_client.get(api_routes.groups_storage, headers=unique_user.token)
+    assert response.json()["usedStorageBytes"] <= used_storage - image_size
+
+
+def test_admin_maintenance_storage_follows_timeline_images(
+    api_client: TestClient,
+    session: Session,
+    admin_user: TestUser,
+    unique_user: TestUser,
+    recipe_ingredient_only: Recipe,
+):
+    storage_stats = StorageStatsService(session)
+    recipes_dir = get_app_dirs().RECIPE_DATA_DIR
+
+    def get_storage() -> tuple[int, int]:
+        response = api_client.get(api_routes.groups_storage, headers=unique_user.token)
+        return storage_stats.get_snapshot().dir_size(recipes_dir), response.json()["usedStorageBytes"]
+
+    def assert_storage_is_reconciled(storage: tuple[int, int]) -> None:
+        response = api_client.post(api_routes.admin_maintenance_storage_reconcile, headers=admin_user.token)
+        assert response.status_code == 200
+        assert get_storage() == storage
+
+    response = api_client.post(api_routes.admin_maintenance_storage_reconcile, headers=admin_user.token)
+    assert response.status_code == 200
+    initial_storage = get_storage()
+
+    event_data = {
+        "recipe_id": str(recipe_ingredient_only.id),
+        "user_id": str(unique_user.user_id),
+        "subject": random_string(),
+        "event_type": "info",
+    }
+    response = api_client.post(api_routes.recipes_timeline_events, json=event_data, headers=unique_user.token)
+    event_id = response.json()["id"]
+    response = api_client.put(
+        api_routes.recipes_timeline_events_item_id_image(event_id),
+        files={"image": data.images_test_image_1.read_bytes()},
+        data={"extension": "jpg"},
+        headers=unique_user.token,
+    )
+    assert response.status_code == 200
+
+    # writing the image adjusts the statistics to what reconciling them would measure
+    storage_with_image = get_storage()
+    assert storage_with_image[0] > initial_storage[0]
+    assert storage_with_image[1] > initial_storage[1]
+    assert_storage_is_reconciled(storage_with_image)
+
+    response = api_client.delete(api_routes.recipes_timeline_events_item_id(event_id), headers=unique_user.token)
+    assert response.status_code == 200
+
+    # and so does deleting the event's image
+    storage_without_image = get_storage()
+    assert storage_without_image[0] < storage_with_image[0]
+    assert storage_without_image[1] < storage_with_image[1]
+    assert_storage_is_reconciled(storage_without_image)
+
+
+def test_admin_maintenance_backups_invalidate_storage(api_client: TestClient, session: Session, admin_user: TestUser):
+    storage_stats = StorageStatsService(session)
+
+    backups_dir = get_app_dirs().BACKUP_DIR
+    existing_backups = set(backups_dir.glob("*.zip"))
+
+    response = api_client.post(api_routes.admin_maintenance_storage_reconcile, headers=admin_user.token)
+    assert response.status_code == 200
+    assert storage_stats.snapshot_file.exists()
+
+    response = api_client.post(api_routes.admin_backups, headers=admin_user.token)
+    assert response.status_code == 201
+    assert not storage_stats.snapshot_file.exists()
+
+    response = api_client.post(api_routes.admin_maintenance_storage_reconcile, headers=admin_user.token)
+    assert response.status_code == 200
+
+    for backup in set(backups_dir.glob("*.zip")) - existing_backups:
+        response = api_client.delete(api_routes.admin_backups_file_name(backup.name), headers=admin_user.token)
+        assert response.status_code == 200
+        assert not storage_stats.snapshot_file.exists()
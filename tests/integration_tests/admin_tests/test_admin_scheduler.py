@@ -0,0 +1,25 @@
+from fastapi.testclient import TestClient
+
+from mealie.services.scheduler import SchedulerService
+from mealie.services.scheduler.cron import CronSchedule
+from mealie.services.scheduler.scheduled_func import ScheduledTask
+from tests.utils import api_routes, random_string
+from tests.utils.fixture_schemas import TestUser
+
+
+def test_admin_get_scheduled_tasks(api_client: TestClient, admin_user: TestUser):
+    task = ScheduledTask(random_string(), lambda: None, CronSchedule("*/5 * * * *"))
+    SchedulerService([task]).sync_tasks()
+
+    response = api_client.get(api_routes.admin_scheduler_tasks, headers=admin_user.token)
+    assert response.status_code == 200
+
+    summaries = {summary["name"]: summary for summary in response.json()}
+    assert summaries[task.name]["schedule"] == "*/5 * * * *"
+    assert summaries[task.name]["status"] == "scheduled"
+    assert summaries[task.name]["runCount"] == 0
+
+
+def test_admin_get_scheduled_tasks_requires_admin(api_client: TestClient, unique_user: TestUser):
+    response = api_client.get(api_routes.admin_scheduler_tasks, headers=unique_user.token)
+    assert response.status_code == 403
@@ -4,6 +4,8 @@ import pytest
 from fastapi.testclient import TestClient
 
 from mealie.repos.repository_factory import AllRepositories
+from mealie.schema.recipe.recipe import Recipe
+from tests import data
 from tests.utils import api_routes, random_int, random_string
 from tests.utils.fixture_schemas import TestUser
 
@@ -79,3 +81,23 @@ def test_get_one_household(api_client: TestClient, unique_user: TestUser):
 def test_get_one_household_not_found(api_client: TestClient, unique_user: TestUser):
     response = api_client.get(api_routes.groups_households_household_slug(random_string()), headers=unique_user.token)
     assert response.status_code == 404
+
+
+def test_get_group_storage(api_client: TestClient, unique_user: TestUser, recipe_ingredient_only: Recipe):
+    response = api_client.get(api_routes.groups_storage, headers=unique_user.token)
+    assert response.status_code == 200
+    used_storage = response.json()["usedStorageBytes"]
+
+    asset = data.images_test_image_1.read_bytes()
+    response = api_client.post(
+        api_routes.recipes_slug_assets(recipe_ingredient_only.slug),
+        data={"name": random_string(), "icon": random_string(), "extension": "jpg"},
+        files={"file": asset},
+        headers=unique_user.token,
+    )
+    assert response.status_code == 200
+
+    # the recipe's size is recorded when the asset is uploaded
+    response = api_client.get(api_routes.groups_storage, headers=unique_user.token)
+    assert response.status_code == 200
+    assert response.json()["usedStorageBytes"] >= used_storage + len(asset)
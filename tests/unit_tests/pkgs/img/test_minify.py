@@ -0,0 +1,63 @@
+import shutil
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from mealie.pkgs.img import minify
+from mealie.pkgs.img.minify import MinifierOptions, PillowMinifier
+from tests import data as test_data
+
+
+@pytest.fixture()
+def image_file(tmp_path: Path) -> Path:
+    return Path(shutil.copy(test_data.images_test_image_1, tmp_path / "source.jpg"))
+
+
+def test_minify_decodes_image_once(image_file: Path, monkeypatch: pytest.MonkeyPatch):
+    opened: list[Path] = []
+    image_open = Image.open
+
+    def count_open(fp, *args, **kwargs):
+        opened.append(fp)
+        return image_open(fp, *args, **kwargs)
+
+    monkeypatch.setattr(minify.Image, "open", count_open)
+    PillowMinifier(purge=True).minify(image_file)
+    assert opened == [image_file]
+
+    original = image_file.parent / "original.webp"
+    miniature = image_file.parent / "min-original.webp"
+    tiny = image_file.parent / "tiny-original.webp"
+
+    # the source image is purged once the renditions are created
+    assert not image_file.exists()
+    assert original.read_bytes() == miniature.read_bytes()
+
+    with Image.open(test_data.images_test_image_1) as src, Image.open(original) as org, Image.open(tiny) as tiny_img:
+        assert org.format == "WEBP"
+        assert org.size == src.size
+        assert tiny_img.size == (300, 300)
+
+
+def test_minify_applies_exif_orientation(tmp_path: Path):
+    image_file = tmp_path / "rotated.jpg"
+    exif = Image.Exif()
+    exif[0x0112] = 6  # rotated 90 degrees
+    Image.new("RGB", (400, 200), "red").save(image_file, "JPEG", exif=exif)
+
+    PillowMinifier().minify(image_file)
+
+    for name in ["original.webp", "min-original.webp"]:
+        with Image.open(tmp_path / name) as img:
+            assert img.size == (200, 400)
+
+
+def test_minify_skips_existing(image_file: Path):
+    PillowMinifier(opts=MinifierOptions(tiny=False)).minify(image_file)
+    original = image_file.parent / "original.webp"
+    modified = original.stat().st_mtime_ns
+
+    PillowMinifier().minify(image_file, force=False)
+    assert original.stat().st_mtime_ns == modified
+    assert (image_file.parent / "tiny-original.webp").exists()
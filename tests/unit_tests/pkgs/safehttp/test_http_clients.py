@@ -0,0 +1,144 @@
+import asyncio
+import threading
+from collections.abc import Generator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from mealie.pkgs.safehttp import ClientPurpose, HTTPClientManager, InvalidDomainError
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = 0
+    received_cookies: list[str | None] = []
+
+    def setup(self):
+        super().setup()
+        KeepAliveHandler.connections += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        KeepAliveHandler.received_cookies.append(self.headers.get("Cookie"))
+
+        if self.path == "/redirect":
+            self.send_response(307)
+            self.send_header("Location", "/")
+        else:
+            self.send_response(200)
+            self.send_header("Set-Cookie", "session=secret; Path=/")
+
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_server() -> Generator[str, None, None]:
+    KeepAliveHandler.connections = 0
+    KeepAliveHandler.received_cookies = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_shared_async_clients_are_reused():
+    manager = HTTPClientManager()
+
+    async def run():
+        await manager.start()
+        async with manager.async_client(ClientPurpose.scraper) as first:
+            pass
+        async with manager.async_client(ClientPurpose.scraper) as second:
+            pass
+        async with manager.async_client(ClientPurpose.images) as images:
+            pass
+
+        assert first is second
+        assert images is not first
+        assert not first.is_closed
+
+        await manager.close()
+        assert first.is_closed
+
+    asyncio.run(run())
+
+
+def test_async_client_without_shared_clients_is_short_lived():
+    manager = HTTPClientManager()
+
+    async def run():
+        async with manager.async_client(ClientPurpose.scraper) as first:
+            pass
+        async with manager.async_client(ClientPurpose.scraper) as second:
+            pass
+
+        assert first is not second
+        assert first.is_closed
+
+    asyncio.run(run())
+
+
+def test_shared_async_client_refuses_private_addresses(local_server: str):
+    manager = HTTPClientManager()
+
+    async def run():
+        await manager.start()
+        try:
+            async with manager.async_client(ClientPurpose.scraper) as client:
+                with pytest.raises(InvalidDomainError):
+                    await client.get(local_server)
+        finally:
+            await manager.close()
+
+    asyncio.run(run())
+    assert KeepAliveHandler.connections == 0
+
+
+def test_shared_client_keeps_connections_alive(local_server: str):
+    manager = HTTPClientManager()
+    client = manager.client(ClientPurpose.webhooks)
+
+    try:
+        for _ in range(5):
+            client.post(local_server, json={}).raise_for_status()
+
+        assert manager.client(ClientPurpose.webhooks) is client
+        assert KeepAliveHandler.connections == 1
+    finally:
+        asyncio.run(manager.close())
+
+    with pytest.raises(ValueError):
+        manager.client(ClientPurpose.scraper)
+
+
+def test_shared_client_never_stores_cookies(local_server: str):
+    manager = HTTPClientManager()
+    client = manager.client(ClientPurpose.webhooks)
+
+    try:
+        for _ in range(2):
+            client.post(local_server, json={}).raise_for_status()
+
+        assert not client.cookies
+        assert KeepAliveHandler.received_cookies == [None, None]
+    finally:
+        asyncio.run(manager.close())
+
+
+def test_webhooks_client_follows_redirects(local_server: str):
+    manager = HTTPClientManager()
+
+    try:
+        response = manager.client(ClientPurpose.webhooks).post(f"{local_server}/redirect", json={})
+        assert response.status_code == 200
+        assert len(KeepAliveHandler.received_cookies) == 2
+    finally:
+        asyncio.run(manager.close())
@@ -0,0 +1,155 @@
+import asyncio
+
+import httpcore
+import httpx
+import pytest
+
+from mealie.pkgs.safehttp import AsyncSafeTransport, DNSCache, InvalidDomainError
+
+
+class StubResolver:
+    """Resolves hosts from a fixed table, and records every lookup"""
+
+    def __init__(self, hosts: dict[str, list[str]], delay: float = 0) -> None:
+        self.hosts = hosts
+        self.delay = delay
+        self.lookups: list[str] = []
+
+    async def __call__(self, host: str) -> list[str]:
+        self.lookups.append(host)
+        await asyncio.sleep(self.delay)
+        return self.hosts[host]
+
+
+class RecordingBackend(httpcore.AsyncMockBackend):
+    """Responds on every connection with a canned response, and records the hosts it connected to"""
+
+    def __init__(self) -> None:
+        super().__init__([b"HTTP/1.1 200 OK\r\n", b"Content-Length: 2\r\n", b"Connection: close\r\n", b"\r\n", b"ok"])
+        self.hosts: list[str] = []
+
+    async def connect_tcp(self, host: str, port: int, *args, **kwargs) -> httpcore.AsyncNetworkStream:
+        self.hosts.append(host)
+        return httpcore.AsyncMockStream(list(self._buffer))
+
+
+def test_dns_cache_hits_and_expiry():
+    resolver = StubResolver({"recipes.example.com": ["93.184.216.34"]})
+    cache = DNSCache(resolver, ttl_seconds=0.05)
+
+    async def run():
+        first = await cache.resolve("recipes.example.com")
+        second = await cache.resolve("Recipes.Example.com")
+        assert first == second
+        assert [str(ip) for ip in first] == ["93.184.216.34"]
+        assert len(resolver.lookups) == 1
+
+        await asyncio.sleep(0.1)
+        await cache.resolve("recipes.example.com")
+        assert len(resolver.lookups) == 2
+
+        # IP addresses aren't looked up
+        await cache.resolve("10.0.0.1")
+        assert len(resolver.lookups) == 2
+
+    asyncio.run(run())
+
+    stats = cache.stats()
+    assert stats.hits == 1
+    assert stats.misses == 2
+    assert stats.size == 1
+
+
+def test_dns_cache_coalesces_concurrent_lookups():
+    resolver = StubResolver({"recipes.example.com": ["93.184.216.34"]}, delay=0.05)
+    cache = DNSCache(resolver)
+
+    async def run():
+        return await asyncio.gather(*(cache.resolve("recipes.example.com") for _ in range(10)))
+
+    results = asyncio.run(run())
+    assert len(set(results)) == 1
+    assert resolver.lookups == ["recipes.example.com"]
+    assert cache.stats().coalesced == 9
+
+
+def test_dns_cache_does_not_cache_failures():
+    resolver = StubResolver({})
+    cache = DNSCache(resolver)
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(KeyError):
+                await cache.resolve("missing.example.com")
+
+    asyncio.run(run())
+    assert len(resolver.lookups) == 2
+    assert cache.stats().errors == 2
+    assert cache.stats().size == 0
+
+
+def test_dns_cache_evicts_least_recently_used():
+    resolver = StubResolver({f"{i}.example.com": ["93.184.216.34"] for i in range(3)})
+    cache = DNSCache(resolver, max_entries=2)
+
+    async def run():
+        for i in range(3):
+            await cache.resolve(f"{i}.example.com")
+
+    asyncio.run(run())
+    assert cache.stats().evictions == 1
+    assert cache.stats().size == 2
+
+
+@pytest.mark.parametrize("address", ["127.0.0.1", "10.0.0.5", "192.168.1.20", "::1"])
+def test_safe_transport_refuses_private_addresses(address: str):
+    backend = RecordingBackend()
+    cache = DNSCache(StubResolver({"internal.example.com": ["93.184.216.34", address]}))
+    transport = AsyncSafeTransport(dns_cache=cache, network_backend=backend)
+
+    async def run():
+        async with httpx.AsyncClient(transport=transport) as client:
+            with pytest.raises(InvalidDomainError):
+                await client.get("http://internal.example.com/recipe")
+
+    asyncio.run(run())
+    assert backend.hosts == []
+
+
+def test_safe_transport_connects_to_validated_address():
+    backend = RecordingBackend()
+    resolver = StubResolver({"recipes.example.com": ["93.184.216.34"]})
+    transport = AsyncSafeTransport(dns_cache=DNSCache(resolver), network_backend=backend)
+
+    async def run():
+        async with httpx.AsyncClient(transport=transport) as client:
+            response = await client.get("http://recipes.example.com/recipe")
+            assert response.text == "ok"
+            assert response.url == "http://recipes.example.com/recipe"
+
+            # a rebinding resolver can't swap in a private address between the check and the connection
+            resolver.hosts["recipes.example.com"] = ["127.0.0.1"]
+            await client.get("http://recipes.example.com/other-recipe")
+
+    asyncio.run(run())
+    assert resolver.lookups == ["recipes.example.com"]
+    assert backend.hosts == ["93.184.216.34", "93.184.216.34"]
+
+
+def test_safe_transport_raises_httpx_errors():
+    class RefusingBackend(RecordingBackend):
+        async def connect_tcp(self, host: str, port: int, *args, **kwargs) -> httpcore.AsyncNetworkStream:
+            self.hosts.append(host)
+            raise httpcore.ConnectError("connection refused")
+
+    backend = RefusingBackend()
+    resolver = StubResolver({"recipes.example.com": ["93.184.216.34", "93.184.216.35"]})
+    transport = AsyncSafeTransport(dns_cache=DNSCache(resolver), network_backend=backend)
+
+    async def run():
+        async with httpx.AsyncClient(transport=transport) as client:
+            with pytest.raises(httpx.ConnectError):
+                await client.get("http://recipes.example.com/recipe")
+
+    asyncio.run(run())
+    assert backend.hosts == ["93.184.216.34", "93.184.216.35"]
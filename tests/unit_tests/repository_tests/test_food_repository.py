@@ -1,7 +1,12 @@
-from uuid import UUID
+from uuid import UUID, uuid4
 
+import pytest
+from sqlalchemy import event
+
+from mealie.schema.labels import MultiPurposeLabelSave
 from mealie.schema.recipe.recipe import Recipe
-from mealie.schema.recipe.recipe_ingredient import RecipeIngredient, SaveIngredientFood
+from mealie.schema.recipe.recipe_ingredient import CreateIngredientFoodAlias, RecipeIngredient, SaveIngredientFood
+from mealie.schema.response.pagination import PaginationQuery
 from tests.utils.factories import random_string
 from tests.utils.fixture_schemas import TestUser
 
@@ -50,3 +55,74 @@ def test_food_merger(unique_user: TestUser):
 
     for ingredient in recipe.recipe_ingredient:
         assert ingredient.food.id == food_1.id  # type: ignore
+
+
+@pytest.mark.parametrize("bulk", [True, False])
+def test_food_create_many(unique_user: TestUser, bulk: bool):
+    database = unique_user.repos
+    label = database.group_multi_purpose_labels.create(
+        MultiPurposeLabelSave(name=random_string(), group_id=unique_user.group_id)
+    )
+    foods_to_create = [
+        SaveIngredientFood(
+            name=random_string(10),
+            description=random_string(),
+            group_id=unique_user.group_id,
+            label_id=label.id if i % 2 else None,
+        )
+        for i in range(50)
+    ]
+
+    statements: list[str] = []
+
+    def track_statements(conn, cursor, statement: str, *args):
+        statements.append(statement)
+
+    engine = database.session.get_bind()
+    event.listen(engine, "before_cursor_execute", track_statements)
+    try:
+        foods = database.ingredient_foods.create_many(foods_to_create, bulk=bulk)
+    finally:
+        event.remove(engine, "before_cursor_execute", track_statements)
+
+    # created foods are returned in order and read back together, rather than refreshed one at a time
+    assert [food.name for food in foods] == [food.name for food in foods_to_create]
+    assert [food.label.id if food.label else None for food in foods] == [food.label_id for food in foods_to_create]
+    assert len([statement for statement in statements if statement.lstrip().upper().startswith("SELECT")]) < 10
+    if bulk:
+        # one executemany per set of columns (foods with and without a label)
+        assert len([statement for statement in statements if statement.lstrip().upper().startswith("INSERT")]) == 2
+
+    # normalized columns are populated the same way as the regular create
+    search_results = database.ingredient_foods.page_all(PaginationQuery(page=1, per_page=-1), search=foods[0].name)
+    assert foods[0].id in {food.id for food in search_results.items}
+
+
+def test_food_create_many_bulk_with_nested_data(unique_user: TestUser):
+    database = unique_user.repos
+    foods_to_create = [
+        SaveIngredientFood(
+            name=random_string(10),
+            group_id=unique_user.group_id,
+            aliases=[CreateIngredientFoodAlias(name=random_string(10))],
+        )
+        for _ in range(5)
+    ]
+
+    # foods with aliases can't be bulk inserted, so they fall back to the regular create
+    foods = database.ingredient_foods.create_many(foods_to_create, bulk=True)
+    assert [food.aliases[0].name for food in foods] == [food.aliases[0].name for food in foods_to_create]
+
+
+@pytest.mark.parametrize("bulk", [True, False])
+def test_food_create_many_returns_every_food(unique_user: TestUser, bulk: bool):
+    database = unique_user.repos
+    ids = [uuid4() for _ in range(5)]
+
+    # ids passed in another form than they're read back in are still matched up with the created foods
+    foods_to_create = [
+        {**SaveIngredientFood(name=random_string(10), group_id=unique_user.group_id).model_dump(), "id": id_.hex}
+        for id_ in ids
+    ]
+    foods = database.ingredient_foods.create_many(foods_to_create, bulk=bulk)
+    assert [food.id for food in foods] == ids
@@ -2,13 +2,16 @@ import random
 import time
 from collections import defaultdict
 from datetime import UTC, datetime, timedelta
+from math import ceil
 from random import randint
 from urllib.parse import parse_qsl, urlsplit
 
 import pytest
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
 from humps import camelize
 from pydantic import UUID4
+from sqlalchemy import event
 
 from mealie.repos.repository_factory import AllRepositories
 from mealie.repos.repository_units import RepositoryUnit
@@ -29,8 +32,10 @@ from mealie.schema.recipe.recipe_ingredient import (
 )
 from mealie.schema.recipe.recipe_tool import RecipeToolSave
 from mealie.schema.response.pagination import (
+    CountStrategy,
     OrderByNullPosition,
     OrderDirection,
+    PaginationMode,
     PaginationQuery,
 )
 from mealie.schema.user.user import UserRatingUpdate
@@ -176,6 +181,225 @@ def test_pagination_guides(unique_user: TestUser):
         assert source_param in prev_params
 
 
+@pytest.mark.parametrize(
+    "order_by_str, order_direction",
+    [
+        ("description", OrderDirection.asc),
+        ("label.name, description", OrderDirection.desc),
+        ("description:desc, label.name", OrderDirection.asc),
+    ],
+    ids=["simple", "nested_with_nulls", "mixed_directions"],
+)
+def test_pagination_cursor_mode(unique_user_fn_scoped: TestUser, order_by_str: str, order_direction: OrderDirection):
+    database = unique_user_fn_scoped.repos
+    labels = database.group_multi_purpose_labels.create_many(
+        [MultiPurposeLabelSave(group_id=unique_user_fn_scoped.group_id, name=random_string()) for _ in range(3)]
+    )
+
+    # names are unique per group, so repeat descriptions and labels so the id tiebreaker is needed
+    foods_repo = database.ingredient_foods
+    foods_repo.create_many(
+        [
+            SaveIngredientFood(
+                group_id=unique_user_fn_scoped.group_id,
+                name=random_string(),
+                description=random.choice(["x", "y"]),
+                label_id=random.choice([None, *[label.id for label in labels]]),
+            )
+            for _ in range(47)
+        ]
+    )
+
+    # cursor mode always orders nulls explicitly and uses the id as a tiebreaker
+    null_position = OrderByNullPosition.last if order_direction is OrderDirection.asc else OrderByNullPosition.first
+    expected = foods_repo.page_all(
+        PaginationQuery(
+            page=1,
+            per_page=-1,
+            order_by=f"{order_by_str}, id",
+            order_direction=order_direction,
+            order_by_null_position=null_position,
+        )
+    ).items
+
+    seen = []
+    cursor: str | None = None
+    while True:
+        results = foods_repo.page_all(
+            PaginationQuery(
+                per_page=10,
+                order_by=order_by_str,
+                order_direction=order_direction,
+                pagination_mode=PaginationMode.cursor,
+                cursor=cursor,
+            )
+        )
+        assert len(results.items) <= 10
+        assert results.total == len(expected)
+
+        seen.extend(results.items)
+        cursor = results.next_cursor
+        if not cursor:
+            break
+
+    assert [food.id for food in seen] == [food.id for food in expected]
+
+
+def test_pagination_cursor_mode_skip_count_and_guides(unique_user: TestUser):
+    database = unique_user.repos
+    group = database.groups.get_one(unique_user.group_id)
+    assert group
+
+    seeder = SeederService(AllRepositories(database.session, group_id=group.id))
+    seeder.seed_foods("en-US")
+
+    foods_repo = database.ingredient_foods
+    foods_route = "/foods"
+
+    query = PaginationQuery(
+        per_page=5,
+        order_by="name",
+        order_direction=OrderDirection.asc,
+        pagination_mode=PaginationMode.cursor,
+        skip_count=True,
+    )
+    first_page = foods_repo.page_all(query)
+    first_page.set_pagination_guides(foods_route, query.model_dump())
+
+    assert len(first_page.items) == 5
+    assert first_page.total is None
+    assert first_page.total_pages is None
+    assert first_page.next_cursor
+    assert first_page.previous is None
+
+    next_params: dict = dict(parse_qsl(urlsplit(first_page.next).query))  # type: ignore
+    assert next_params["cursor"] == first_page.next_cursor
+    assert "page" not in next_params
+
+    query = PaginationQuery(
+        per_page=5,
+        order_by="name",
+        order_direction=OrderDirection.asc,
+        cursor=first_page.next_cursor,
+        skip_count=True,
+    )
+    second_page = foods_repo.page_all(query)
+    assert second_page.items[0].name.lower() >= first_page.items[-1].name.lower()
+    assert not {food.id for food in first_page.items} & {food.id for food in second_page.items}
+
+    # cursors are tied to the ordering they were created with
+    with pytest.raises(HTTPException) as e:
+        foods_repo.page_all(PaginationQuery(per_page=5, order_by="createdAt", cursor=first_page.next_cursor))
+    assert e.value.status_code == 400
+
+    with pytest.raises(HTTPException) as e:
+        foods_repo.page_all(PaginationQuery(per_page=5, order_by="name", cursor="not-a-cursor"))
+    assert e.value.status_code == 400
+
+
+@pytest.mark.parametrize("count_strategy", list(CountStrategy))
+def test_pagination_count_strategies(unique_user_fn_scoped: TestUser, count_strategy: CountStrategy):
+    database = unique_user_fn_scoped.repos
+    units_repo = database.ingredient_units
+    units_repo.create_many(
+        [
+            SaveIngredientUnit(group_id=unique_user_fn_scoped.group_id, name=random_string())
+            for _ in range(random_int(5, 10))
+        ]
+    )
+    expected_count = len(units_repo.page_all(PaginationQuery(page=1, per_page=-1)).items)
+
+    query = PaginationQuery(page=1, per_page=2, count_strategy=count_strategy)
+    results = units_repo.page_all(query)
+    assert results.total == expected_count
+    assert results.total_pages == ceil(expected_count / 2)
+    assert not results.total_is_approximate  # estimates are only used for large results
+
+    # writing to the table invalidates any cached count
+    units_repo.create(SaveIngredientUnit(group_id=unique_user_fn_scoped.group_id, name=random_string()))
+    assert units_repo.page_all(query).total == expected_count + 1
+
+    units_repo.delete_many([unit.id for unit in units_repo.page_all(PaginationQuery(page=1, per_page=3)).items])
+    assert units_repo.page_all(query).total == expected_count - 2
+
+
+def test_pagination_cached_count_is_reused(unique_user_fn_scoped: TestUser):
+    database = unique_user_fn_scoped.repos
+    units_repo = database.ingredient_units
+    units_repo.create_many(
+        [SaveIngredientUnit(group_id=unique_user_fn_scoped.group_id, name=random_string()) for _ in range(5)]
+    )
+
+    count_statements: list[str] = []
+
+    def track_count_statements(conn, cursor, statement: str, *args):
+        if "count(*)" in statement.lower():
+            count_statements.append(statement)
+
+    engine = database.session.get_bind()
+    event.listen(engine, "before_cursor_execute", track_count_statements)
+    try:
+        query = PaginationQuery(
+            page=1, per_page=2, count_strategy=CountStrategy.cached, query_filter="name IS NOT NULL"
+        )
+        first_results = units_repo.page_all(query)
+        assert len(count_statements) == 1
+
+        query.page = 2
+        second_results = units_repo.page_all(query)
+        assert len(count_statements) == 1
+        assert first_results.total == second_results.total == 5
+
+        # a different filter is a different count
+        query.query_filter = "name IS NULL"
+        assert units_repo.page_all(query).total == 0
+        assert len(count_statements) == 2
+    finally:
+        event.remove(engine, "before_cursor_execute", track_count_statements)
+
+
+def test_pagination_random_order_is_stable(unique_user_fn_scoped: TestUser):
+    database = unique_user_fn_scoped.repos
+    units_repo = database.ingredient_units
+    units_repo.create_many(
+        [SaveIngredientUnit(group_id=unique_user_fn_scoped.group_id, name=random_string()) for _ in range(23)]
+    )
+    all_ids = {unit.id for unit in units_repo.page_all(PaginationQuery(page=1, per_page=-1)).items}
+
+    orders: list[list] = []
+    for seed in ["first-seed", "second-seed"]:
+        seen = []
+        for page in range(1, 6):
+            query = PaginationQuery(page=page, per_page=5, order_by="random", pagination_seed=seed)
+            seen.extend(unit.id for unit in units_repo.page_all(query).items)
+
+        # every row shows up exactly once across pages, and the same seed always gives the same order
+        assert len(seen) == len(all_ids)
+        assert set(seen) == all_ids
+        assert seen == [
+            unit.id
+            for unit in units_repo.page_all(
+                PaginationQuery(page=1, per_page=-1, order_by="random", pagination_seed=seed)
+            ).items
+        ]
+
+        cursor_seen = []
+        query = PaginationQuery(
+            per_page=5, order_by="random", pagination_seed=seed, pagination_mode=PaginationMode.cursor
+        )
+        while True:
+            results = units_repo.page_all(query)
+            cursor_seen.extend(unit.id for unit in results.items)
+            if not results.next_cursor:
+                break
+            query.cursor = results.next_cursor
+
+        assert cursor_seen == seen
+        orders.append(seen)
+
+    assert orders[0] != orders[1]
+
+
 @pytest.fixture(scope="function")
 def query_units(unique_user: TestUser):
     database = unique_user.repos
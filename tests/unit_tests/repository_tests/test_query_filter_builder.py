@@ -1,3 +1,6 @@
+import sqlalchemy as sa
+
+from mealie.db.models.recipe.recipe import RecipeModel
 from mealie.schema.response.query_filter import (
     LogicalOperator,
     QueryFilterBuilder,
@@ -6,6 +9,7 @@ from mealie.schema.response.query_filter import (
     RelationalKeyword,
     RelationalOperator,
 )
+from tests.utils.factories import random_string
 
 
 def test_query_filter_builder_json():
@@ -60,3 +64,32 @@ def test_query_filter_builder_json():
             ),
         ]
     )
+
+
+def test_query_filter_builder_caches_parsing():
+    qf = (
+        f'(name = "{random_string()}" OR tags.name CONTAINS ALL ["tag1", "tag2"]) '
+        'AND (user.username IN ["user1", "user2"] OR household.name LIKE "%house%") AND rating >= 3'
+    )
+    attr_strings = ["name", "tags.name", "user.username", "household.name", "rating"]
+
+    parse_hits = QueryFilterBuilder._parse_filter_string.cache_info().hits
+    resolve_hits = QueryFilterBuilder._resolve_attr_string.cache_info().hits
+
+    resolved = [
+        [QueryFilterBuilder.get_model_and_model_attr_from_attr_string(attr, RecipeModel) for attr in attr_strings]
+        for _ in range(2)
+    ]
+    assert QueryFilterBuilder(qf).filter_components is QueryFilterBuilder(qf).filter_components
+
+    # the filter string is only parsed once, and each attribute is only resolved once
+    assert QueryFilterBuilder._parse_filter_string.cache_info().hits - parse_hits == 1
+    assert QueryFilterBuilder._resolve_attr_string.cache_info().hits - resolve_hits >= len(attr_strings)
+    assert all(first[1] is second[1] for first, second in zip(*resolved, strict=True))
+
+    # cached attribute resolutions still join the same tables
+    query = sa.select(RecipeModel)
+    first = QueryFilterBuilder(qf).filter_query(query, RecipeModel)
+    second = QueryFilterBuilder(qf).filter_query(query, RecipeModel)
+    assert str(first) == str(second)
+    assert "JOIN users" in str(second)
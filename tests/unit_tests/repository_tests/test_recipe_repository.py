@@ -1,17 +1,29 @@
 from datetime import UTC, datetime, timedelta
 from typing import cast
-from uuid import UUID
+from uuid import UUID, uuid4
 
 import pytest
+from sqlalchemy import event, func, select, text
 from sqlalchemy.orm import Session
 
+from mealie.db.models.recipe.ingredient import RecipeIngredientModel
+from mealie.db.models.recipe.instruction import RecipeIngredientRefLink, RecipeInstruction
+from mealie.db.models.recipe.note import Note
+from mealie.db.models.recipe.recipe import RecipeModel
+from mealie.db.models.recipe.recipe_timeline import RecipeTimelineEvent
+from mealie.db.models.recipe.tag import Tag
+from mealie.db.models.users.user_to_recipe import UserToRecipe
+from mealie.repos._pagination_cache import search_cache
 from mealie.repos.all_repositories import get_repositories
 from mealie.repos.repository_factory import AllRepositories
 from mealie.repos.repository_recipes import RepositoryRecipes
 from mealie.schema.household.household import HouseholdCreate, HouseholdRecipeCreate
-from mealie.schema.recipe import RecipeIngredient, SaveIngredientFood
+from mealie.schema.recipe import RecipeIngredient, SaveIngredientFood, SaveIngredientUnit
 from mealie.schema.recipe.recipe import Recipe, RecipeCategory, RecipeSummary
 from mealie.schema.recipe.recipe_category import CategoryOut, CategorySave, TagSave
+from mealie.schema.recipe.recipe_notes import RecipeNote
+from mealie.schema.recipe.recipe_step import IngredientReferences, RecipeStep
+from mealie.schema.recipe.recipe_timeline_events import RecipeTimelineEventCreate, TimelineEventType
 from mealie.schema.recipe.recipe_tool import RecipeToolSave
 from mealie.schema.response import OrderDirection, PaginationQuery
 from mealie.schema.user.user import GroupBase, UserRatingCreate
@@ -687,6 +699,31 @@ def test_fuzzy_recipe_search(
     assert results and results[0].name == "Steinbock Sloop"
 
 
+def test_recipe_search_matches_ingredients_in_one_statement(
+    unique_db: AllRepositories,
+    search_recipes: list[Recipe],  # required so database is populated
+):
+    repo = unique_db.recipes
+    pagination = PaginationQuery(page=1, per_page=-1, order_by="created_at", order_direction=OrderDirection.asc)
+
+    statements: list[str] = []
+
+    def track_statements(conn, cursor, statement: str, *args):
+        statements.append(statement)
+
+    engine = unique_db.session.get_bind()
+    event.listen(engine, "before_cursor_execute", track_statements)
+    try:
+        results = repo.page_all(pagination, search="moss").items
+    finally:
+        event.remove(engine, "before_cursor_execute", track_statements)
+
+    assert results and results[0].name == "Fiddlehead Fern Stir Fry"
+
+    # ingredient matches are resolved within the recipe query, rather than loaded separately
+    assert not [s for s in statements if s.lstrip().startswith("SELECT recipes_ingredients.id")]
+
+
 def test_random_order_recipe_search(
     unique_db: AllRepositories,
     search_recipes: list[Recipe],  # required so database is populated
@@ -885,3 +922,281 @@ def test_order_by_rating(user_tuple: tuple[TestUser, TestUser]):
     assert data[0].slug == recipe_2.slug  # global rating == 2.5 (avg of 4 and 1)
     assert data[1].slug == recipe_3.slug  # global rating == 3
     assert data[2].slug == recipe_1.slug  # global rating == 4.25 (avg of 5 and 3.5)
+
+
+def test_recipe_create_resolves_relationships_in_batches(unique_user: TestUser):
+    database = unique_user.repos
+    foods = database.ingredient_foods.create_many(
+        [SaveIngredientFood(group_id=unique_user.group_id, name=random_string()) for _ in range(40)]
+    )
+    units = database.ingredient_units.create_many(
+        [SaveIngredientUnit(group_id=unique_user.group_id, name=random_string()) for _ in range(5)]
+    )
+    tags = database.tags.create_many([TagSave(group_id=unique_user.group_id, name=random_string()) for _ in range(10)])
+    tools = database.tools.create_many(
+        [RecipeToolSave(group_id=unique_user.group_id, name=random_string()) for _ in range(5)]
+    )
+
+    recipe = Recipe(
+        user_id=unique_user.user_id,
+        group_id=unique_user.group_id,
+        name=random_string(),
+        recipe_ingredient=[
+            RecipeIngredient(food=food, unit=units[i % len(units)], note=random_string())
+            for i, food in enumerate(foods)
+        ],
+        tags=tags,
+        tools=tools,
+    )
+
+    statements: list[str] = []
+
+    def track_statements(conn, cursor, statement: str, *args):
+        statements.append(statement)
+
+    engine = database.session.get_bind()
+    event.listen(engine, "before_cursor_execute", track_statements)
+    try:
+        model = RecipeModel(session=database.session, **recipe.model_dump())
+    finally:
+        event.remove(engine, "before_cursor_execute", track_statements)
+
+    # one query per relationship (tags, tools, foods, and units), regardless of how many items each has
+    assert len(statements) == 4
+
+    database.session.add(model)
+    database.session.commit()
+
+    created = database.recipes.get_one(recipe.slug)
+    assert created
+    assert [ingredient.food.id for ingredient in created.recipe_ingredient if ingredient.food] == [
+        food.id for food in foods
+    ]
+    assert [ingredient.unit.id for ingredient in created.recipe_ingredient if ingredient.unit] == [
+        units[i % len(units)].id for i in range(len(foods))
+    ]
+    assert {tag.id for tag in created.tags} == {tag.id for tag in tags}
+    assert {tool.id for tool in created.tools} == {tool.id for tool in tools}
+
+
+@pytest.mark.parametrize("return_results", [True, False])
+def test_recipe_delete_many_removes_children(unique_user: TestUser, return_results: bool):
+    database = unique_user.repos
+    tags = database.tags.create_many([TagSave(group_id=unique_user.group_id, name=random_string()) for _ in range(2)])
+
+    recipes: list[Recipe] = []
+    for _ in range(5):
+        ingredients = [RecipeIngredient(note=random_string(), reference_id=uuid4()) for _ in range(3)]
+        recipe = database.recipes.create(
+            Recipe(
+                user_id=unique_user.user_id,
+                group_id=unique_user.group_id,
+                name=random_string(),
+                tags=tags,
+                recipe_ingredient=ingredients,
+                recipe_instructions=[
+                    RecipeStep(
+                        text=random_string(),
+                        ingredient_references=[IngredientReferences(reference_id=i.reference_id) for i in ingredients],
+                    )
+                ],
+                notes=[RecipeNote(title=random_string(), text=random_string())],
+            )
+        )
+        database.user_ratings.create(UserRatingCreate(user_id=unique_user.user_id, recipe_id=recipe.id, rating=4))
+        database.recipe_timeline_events.create(
+            RecipeTimelineEventCreate(
+                recipe_id=recipe.id,
+                user_id=unique_user.user_id,
+                subject=random_string(),
+                event_type=TimelineEventType.info,
+            )
+        )
+        recipes.append(recipe)
+
+    to_delete, to_keep = recipes[:4], recipes[4:]
+    delete_ids = [recipe.id for recipe in to_delete]
+    kept_ids = [recipe.id for recipe in to_keep]
+
+    def instruction_ids(recipe_ids: list[UUID]) -> list[UUID]:
+        stmt = select(RecipeInstruction.id).where(RecipeInstruction.recipe_id.in_(recipe_ids))
+        return list(database.session.scalars(stmt))
+
+    deleted_instruction_ids, kept_instruction_ids = instruction_ids(delete_ids), instruction_ids(kept_ids)
+
+    statements: list[str] = []
+
+    def track_statements(conn, cursor, statement: str, *args):
+        statements.append(statement)
+
+    engine = database.session.get_bind()
+    event.listen(engine, "before_cursor_execute", track_statements)
+    try:
+        deleted = database.recipes.delete_many(delete_ids, return_results=return_results)
+    finally:
+        event.remove(engine, "before_cursor_execute", track_statements)
+
+    if return_results:
+        assert [recipe.id for recipe in deleted] == delete_ids
+    else:
+        assert deleted == []
+
+    # one statement per table, regardless of how many recipes are deleted
+    delete_statements = [s for s in statements if s.lstrip().upper().startswith("DELETE")]
+    assert len(delete_statements) == len(set(delete_statements))
+
+    def count(model, *criteria) -> int:
+        return database.session.scalar(select(func.count()).select_from(model).where(*criteria))
+
+    assert count(RecipeModel, RecipeModel.id.in_(delete_ids)) == 0
+    assert count(RecipeModel, RecipeModel.id.in_(kept_ids)) == 1
+    for model in [RecipeIngredientModel, RecipeInstruction, Note, RecipeTimelineEvent, UserToRecipe]:
+        assert count(model, model.recipe_id.in_(delete_ids)) == 0
+        assert count(model, model.recipe_id.in_(kept_ids)) > 0
+
+    assert count(RecipeIngredientRefLink, RecipeIngredientRefLink.instruction_id.in_(deleted_instruction_ids)) == 0
+    assert count(RecipeIngredientRefLink, RecipeIngredientRefLink.instruction_id.in_(kept_instruction_ids)) > 0
+
+    # shared rows are left alone
+    assert count(Tag, Tag.id.in_([tag.id for tag in tags])) == len(tags)
+    kept_recipe = database.recipes.get_one(to_keep[0].slug)
+    assert kept_recipe
+    assert {tag.id for tag in kept_recipe.tags} == {tag.id for tag in tags}
+
+
+@pytest.mark.parametrize("return_results", [True, False])
+def test_recipe_delete_many_is_scoped_to_group(unique_user: TestUser, return_results: bool):
+    database = unique_user.repos
+    recipe = database.recipes.create(
+        Recipe(user_id=unique_user.user_id, group_id=unique_user.group_id, name=random_string())
+    )
+
+    other_group_repos = get_repositories(database.session, group_id=uuid4(), household_id=None)
+    assert other_group_repos.recipes.delete_many([recipe.id], return_results=return_results) == []
+    assert database.recipes.get_one(recipe.slug)
+
+
+def test_recipe_search_index_follows_updates(unique_user: TestUser):
+    database = unique_user.repos
+    old_name, new_name, ingredient_note = (random_string() for _ in range(3))
+    recipe = database.recipes.create(
+        Recipe(
+            user_id=unique_user.user_id,
+            group_id=unique_user.group_id,
+            name=old_name,
+            recipe_ingredient=[RecipeIngredient(note=ingredient_note)],
+        )
+    )
+
+    def search(value: str) -> list[UUID]:
+        pagination = PaginationQuery(page=1, per_page=-1)
+        return [result.id for result in database.recipes.page_all(pagination, search=f'"{value}"').items]
+
+    assert search(old_name) == [recipe.id]
+    assert search(ingredient_note) == [recipe.id]
+
+    recipe.name = new_name
+    recipe.recipe_ingredient = [RecipeIngredient(note=random_string())]
+    database.recipes.update(recipe.slug, recipe)
+
+    assert search(old_name) == []
+    assert search(ingredient_note) == []
+    assert search(new_name) == [recipe.id]
+
+    database.recipes.delete(recipe.slug)
+    assert search(new_name) == []
+
+
+def test_recipe_search_matches_within_words(unique_user_fn_scoped: TestUser):
+    database = unique_user_fn_scoped.repos
+    names = ["Tomato Bisque", "トマトスープ", "ต้มยำกุ้ง"]
+    recipes = {
+        name: database.recipes.create(
+            Recipe(user_id=unique_user_fn_scoped.user_id, group_id=unique_user_fn_scoped.group_id, name=name)
+        )
+        for name in names
+    }
+
+    def search(value: str) -> set[UUID]:
+        pagination = PaginationQuery(page=1, per_page=-1)
+        return {result.id for result in database.recipes.page_all(pagination, search=value).items}
+
+    # the middle of a word, and part of a word in scripts written without spaces
+    assert search("mato") == {recipes["Tomato Bisque"].id, recipes["トマトスープ"].id}
+    assert search("マト") == {recipes["Tomato Bisque"].id, recipes["トマトスープ"].id}
+    assert search("ยำ") == {recipes["ต้มยำกุ้ง"].id}
+
+    # terms matching whole words still use the index, alongside terms that don't
+    assert search("bisque ยำ") == {recipes["Tomato Bisque"].id, recipes["ต้มยำกุ้ง"].id}
+
+
+def test_recipe_search_matches_within_words_alongside_prefixes(unique_user_fn_scoped: TestUser):
+    database = unique_user_fn_scoped.repos
+    matoke, tomato = (
+        database.recipes.create(
+            Recipe(user_id=unique_user_fn_scoped.user_id, group_id=unique_user_fn_scoped.group_id, name=name)
+        )
+        for name in ["Matoke Stew", "Roasted Tomato Soup"]
+    )
+
+    # "mato" prefix-matches "Matoke" in the index, which doesn't stop it from matching the middle of "Tomato";
+    # the prefix match is ranked first
+    pagination = PaginationQuery(page=1, per_page=-1)
+    results = database.recipes.page_all(pagination, search="mato").items
+    assert [result.id for result in results] == [matoke.id, tomato.id]
+
+
+def test_recipe_search_index_is_keyed_by_recipe_id(unique_user_fn_scoped: TestUser):
+    database = unique_user_fn_scoped.repos
+    if database.session.get_bind().name != "sqlite":
+        return
+
+    names = [random_string() for _ in range(2)]
+    recipes = [
+        database.recipes.create(
+            Recipe(user_id=unique_user_fn_scoped.user_id, group_id=unique_user_fn_scoped.group_id, name=name)
+        )
+        for name in names
+    ]
+
+    # the implicit rowids of the recipes table aren't stable, e.g. VACUUM may renumber them
+    database.session.execute(
+        text("UPDATE recipes SET rowid = -rowid WHERE group_id = :group_id"),
+        {"group_id": UUID(str(unique_user_fn_scoped.group_id)).hex},
+    )
+    database.session.commit()
+
+    def search(value: str) -> list[UUID]:
+        pagination = PaginationQuery(page=1, per_page=-1)
+        return [result.id for result in database.recipes.page_all(pagination, search=f'"{value}"').items]
+
+    assert search(names[0]) == [recipes[0].id]
+    assert search(names[1]) == [recipes[1].id]
+
+
+def test_recipe_search_results_are_cached(unique_user: TestUser):
+    database = unique_user.repos
+    name = random_string()
+    recipe = database.recipes.create(Recipe(user_id=unique_user.user_id, group_id=unique_user.group_id, name=name))
+    pagination = PaginationQuery(page=1, per_page=10)
+
+    def search(value: str) -> list[UUID]:
+        return [result.id for result in database.recipes.page_all(pagination, search=value).items]
+
+    stats = search_cache.stats()
+    assert search(name) == [recipe.id]
+    assert search(name) == [recipe.id]
+    assert search(name[:-1]) == [recipe.id]
+
+    new_stats = search_cache.stats()
+    assert new_stats.hits == stats.hits + 1
+    assert new_stats.misses == stats.misses + 2
+
+    # writing to any recipe table drops the cached results
+    other_recipe = database.recipes.create(
+        Recipe(user_id=unique_user.user_id, group_id=unique_user.group_id, name=f"{name} 2")
+    )
+    assert set(search(name)) == {recipe.id, other_recipe.id}
+
+    database.recipes.delete(recipe.slug)
+    assert search(name) == [other_recipe.id]
@@ -1,4 +1,6 @@
+import io
 import json
+import uuid
 
 from mealie.core.config import get_app_settings
 from mealie.services.backups_v2.alchemy_exporter import AlchemyExporter
@@ -12,3 +14,42 @@ def test_alchemy_exporter():
 
     assert data["alembic_version"] == alembic_versions()
     assert json.dumps(data, indent=4)  # Make sure data is json-serializable
+
+
+def test_alchemy_exporter_ndjson():
+    settings = get_app_settings()
+    exporter = AlchemyExporter(settings.DB_URL)
+
+    buffer = io.BytesIO()
+    exporter.dump_ndjson(buffer, batch_size=2)
+    batches = [json.loads(line) for line in buffer.getvalue().splitlines()]
+
+    # alembic_version comes first, so the schema version can be read without reading the whole file
+    assert batches[0] == {"table": "alembic_version", "rows": alembic_versions()}
+    assert all(len(batch["rows"]) <= 2 for batch in batches)
+
+    tables: dict[str, list[dict]] = {}
+    for batch in batches:
+        tables.setdefault(batch["table"], []).extend(batch["rows"])
+
+    assert tables == exporter.dump()
+
+
+def test_alchemy_exporter_restore_removes_invalid_foreign_keys():
+    settings = get_app_settings()
+    exporter = AlchemyExporter(settings.DB_URL)
+    exporter.restore_batch_size = 2
+
+    original_data = json.loads(json.dumps(exporter.dump()))
+    db_dump = json.loads(json.dumps(original_data))
+
+    # a household in a group that doesn't exist is dropped instead of failing the restore
+    invalid_household = {**db_dump["households"][0], "id": str(uuid.uuid4()), "group_id": str(uuid.uuid4())}
+    db_dump["households"].append(invalid_household)
+
+    exporter.restore(db_dump)
+
+    restored_data = json.loads(json.dumps(AlchemyExporter(settings.DB_URL).dump()))
+    assert restored_data.keys() == original_data.keys()
+    for table_name, rows in original_data.items():
+        assert sorted(restored_data[table_name], key=json.dumps) == sorted(rows, key=json.dumps), table_name
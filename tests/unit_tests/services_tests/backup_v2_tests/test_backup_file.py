@@ -54,3 +54,51 @@ def test_backup_file_valid_zip(tmp_path: Path):
 
         assert content.read_tables() == dummy_dict
         assert content.data_directory.joinpath("test.txt").is_file()
+
+
+def test_backup_file_valid_zip_ndjson(tmp_path: Path):
+    batches = [
+        {"table": "alembic_version", "rows": [{"version_num": "abc123"}]},
+        {"table": "recipes", "rows": [{"id": 1}, {"id": 2}]},
+        {"table": "recipes", "rows": [{"id": 3}]},
+        {"table": "tags", "rows": []},
+    ]
+
+    temp_zip = zip_factory(tmp_path)
+    with ZipFile(temp_zip, "a") as zip_file:
+        zip_file.writestr("data/test.txt", "test")
+        zip_file.writestr("database.ndjson", "\n".join(json.dumps(batch) for batch in batches) + "\n")
+
+    with BackupFile(temp_zip) as content:
+        assert content.validate()
+        assert content.schema_version() == "abc123"
+
+        assert [(table, len(rows)) for table, rows in content.iter_tables()] == [
+            ("alembic_version", 1),
+            ("recipes", 2),
+            ("recipes", 1),
+            ("tags", 0),
+        ]
+        assert content.read_tables() == {
+            "alembic_version": [{"version_num": "abc123"}],
+            "recipes": [{"id": 1}, {"id": 2}, {"id": 3}],
+            "tags": [],
+        }
+
+
+def test_backup_file_without_extracting_data(tmp_path: Path):
+    temp_zip = zip_factory(tmp_path)
+
+    # zips mangled by Safari have the backup in a directory, next to a "__MACOSX" directory
+    with ZipFile(temp_zip, "a") as zip_file:
+        zip_file.writestr("backup/data/recipes/1/images/original.webp", "image")
+        zip_file.writestr("backup/data/../outside.txt", "outside")
+        zip_file.writestr("backup/database.json", json.dumps({"hello": "world"}))
+        zip_file.writestr("__MACOSX/backup/._database.json", "")
+
+    with BackupFile(temp_zip, extract_data=False) as content:
+        assert content.validate()
+        assert content.read_tables() == {"hello": "world"}
+
+        assert not content.data_directory.exists()
+        assert list(content.archived_data_files()) == ["recipes/1/images/original.webp"]
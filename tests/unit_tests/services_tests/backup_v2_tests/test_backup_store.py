@@ -0,0 +1,84 @@
+from pathlib import Path
+from zipfile import ZipFile
+
+from mealie.services.backups_v2.backup_store import MANIFEST_FILE, BackupChunkStore, file_sha256
+from tests import utils
+
+
+def data_files(data_dir: Path, count: int) -> dict[str, Path]:
+    files: dict[str, Path] = {}
+    for i in range(count):
+        file = data_dir / "recipes" / str(i) / "images" / "original.webp"
+        file.parent.mkdir(parents=True, exist_ok=True)
+        file.write_text(utils.random_string(100))
+        files[file.relative_to(data_dir).as_posix()] = file
+
+    return files
+
+
+def test_backup_chunk_store_stores_files_once(tmp_path: Path):
+    store = BackupChunkStore(tmp_path / "chunks")
+    files = data_files(tmp_path / "data", 3)
+
+    # files with the same contents are only stored once
+    duplicate = tmp_path / "data" / "recipes" / "duplicate.webp"
+    duplicate.write_bytes(files["recipes/0/images/original.webp"].read_bytes())
+    files["recipes/duplicate.webp"] = duplicate
+
+    manifest = store.build_manifest(files)
+    assert len(manifest.files) == 4
+    assert len(manifest.hashes) == 3
+    assert not store.missing(manifest)
+
+    for relative_path, entry in manifest.files.items():
+        assert entry.hash == file_sha256(files[relative_path])
+        assert store.path(entry.hash).read_bytes() == files[relative_path].read_bytes()
+
+
+def test_backup_chunk_store_only_reads_changed_files(tmp_path: Path, monkeypatch):
+    store = BackupChunkStore(tmp_path / "chunks")
+    files = data_files(tmp_path / "data", 3)
+    first_manifest = store.build_manifest(files)
+
+    changed_file = files["recipes/1/images/original.webp"]
+    changed_file.write_text(utils.random_string(200))
+
+    added: list[Path] = []
+    add = store.add
+
+    def add_spy(file: Path):
+        added.append(file)
+        return add(file)
+
+    monkeypatch.setattr(store, "add", add_spy)
+    second_manifest = store.build_manifest(files)
+
+    assert added == [changed_file]
+    assert (
+        second_manifest.files["recipes/0/images/original.webp"]
+        == first_manifest.files["recipes/0/images/original.webp"]
+    )
+    assert second_manifest.files["recipes/1/images/original.webp"].hash == file_sha256(changed_file)
+
+
+def test_backup_chunk_store_remove_unused(tmp_path: Path):
+    store = BackupChunkStore(tmp_path / "chunks")
+    backup_dir = tmp_path / "backups"
+    backup_dir.mkdir()
+
+    files = data_files(tmp_path / "data", 3)
+    old_manifest = store.build_manifest(files)
+    with ZipFile(backup_dir / "old.zip", "w") as zip_file:
+        zip_file.writestr(MANIFEST_FILE, old_manifest.to_json())
+
+    changed_file = files["recipes/1/images/original.webp"]
+    changed_file.write_text(utils.random_string(200))
+    new_manifest = store.build_manifest(files)
+
+    # the old backup still uses the file's previous contents
+    assert store.remove_unused(backup_dir) == 0
+
+    (backup_dir / "old.zip").unlink()
+    assert store.remove_unused(backup_dir) == 1
+    assert not store.missing(new_manifest)
+    assert store.missing(old_manifest) == {old_manifest.files["recipes/1/images/original.webp"].hash}
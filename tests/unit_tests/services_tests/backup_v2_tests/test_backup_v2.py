@@ -1,12 +1,14 @@
 import filecmp
+import shutil
 import statistics
 from pathlib import Path
 from typing import Any
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
 
 from sqlalchemy.orm import Session
 
 import tests.data as test_data
-from mealie.core.config import get_app_settings
+from mealie.core.config import get_app_dirs, get_app_settings
 from mealie.db.db_setup import session_context
 from mealie.db.models._model_utils.guid import GUID
 from mealie.db.models.group import Group
@@ -22,8 +24,10 @@ from mealie.db.models.recipe.tool import Tool
 from mealie.db.models.users.user_to_recipe import UserToRecipe
 from mealie.db.models.users.users import User
 from mealie.services.backups_v2.alchemy_exporter import AlchemyExporter
-from mealie.services.backups_v2.backup_file import BackupFile
+from mealie.services.backups_v2.backup_file import BackupContents, BackupFile
+from mealie.services.backups_v2.backup_store import BackupManifest
 from mealie.services.backups_v2.backup_v2 import BackupV2
+from tests.utils import random_string
 
 
 def dict_sorter(d: dict) -> Any:
@@ -55,6 +59,46 @@ def test_database_backup():
         assert contents.validate()
 
 
+def test_database_backup_stores_compressed_files():
+    image = get_app_dirs().RECIPE_DATA_DIR / random_string() / "images" / "original.webp"
+    image.parent.mkdir(parents=True)
+    image.write_bytes(b"webp" * 1000)
+
+    try:
+        path_to_backup = BackupV2().backup(incremental=False)
+        with ZipFile(path_to_backup) as zip_file:
+            relative_path = image.relative_to(get_app_dirs().DATA_DIR).as_posix()
+            assert zip_file.getinfo(f"data/{relative_path}").compress_type == ZIP_STORED
+            assert zip_file.getinfo(BackupContents.database_ndjson).compress_type == ZIP_DEFLATED
+    finally:
+        shutil.rmtree(image.parent.parent)
+
+
+def test_database_restore_incremental():
+    app_dirs = get_app_dirs()
+    image = app_dirs.RECIPE_DATA_DIR / random_string() / "images" / "original.webp"
+    image.parent.mkdir(parents=True)
+    image.write_bytes(b"webp" * 1000)
+
+    try:
+        backup_v2 = BackupV2()
+        path_to_backup = backup_v2.backup(incremental=True)
+
+        # the data directory's files are in the chunk store, instead of the backup
+        with ZipFile(path_to_backup) as zip_file:
+            assert not any(name.startswith("data/") for name in zip_file.namelist())
+            manifest = BackupManifest.from_json(zip_file.read(BackupContents.manifest_json))
+
+        relative_path = image.relative_to(app_dirs.DATA_DIR).as_posix()
+        assert backup_v2.chunk_store.has(manifest.files[relative_path].hash)
+
+        image.write_bytes(b"changed")
+        backup_v2.restore(path_to_backup)
+        assert image.read_bytes() == b"webp" * 1000
+    finally:
+        shutil.rmtree(image.parent.parent)
+
+
 def test_database_restore():
     settings = get_app_settings()
 
@@ -0,0 +1,112 @@
+from pathlib import Path
+from zipfile import ZipFile
+
+import pytest
+
+from mealie.core.root_logger import get_logger
+from mealie.services.backups_v2.backup_store import BackupChunkStore, BackupManifest
+from mealie.services.backups_v2.data_restore import DataDirectoryRestore, DataRestoreProgress
+from tests import utils
+
+
+@pytest.fixture()
+def data_restore(tmp_path: Path) -> DataDirectoryRestore:
+    return DataDirectoryRestore(tmp_path / "data", tmp_path / "progress", workers=4, logger=get_logger())
+
+
+def backup_zip(tmp_path: Path, files: dict[str, str]) -> tuple[Path, dict]:
+    archive = tmp_path / "backup.zip"
+    with ZipFile(archive, "w") as zip_file:
+        for relative_path, content in files.items():
+            zip_file.writestr(f"data/{relative_path}", content)
+
+    with ZipFile(archive) as zip_file:
+        infos = {info.filename.removeprefix("data/"): info for info in zip_file.infolist()}
+
+    return archive, infos
+
+
+def test_restore_archive(tmp_path: Path, data_restore: DataDirectoryRestore):
+    files = {f"recipes/{i}/images/original.webp": utils.random_string() for i in range(20)}
+    files["mealie.db"] = "database"
+    archive, infos = backup_zip(tmp_path, files)
+
+    # directories in the backup replace the ones in the data directory, the rest are left alone
+    stale_file = data_restore.data_dir / "recipes" / "stale" / "original.webp"
+    stale_file.parent.mkdir(parents=True)
+    stale_file.write_text("stale")
+    other_file = data_restore.data_dir / "users" / "user.webp"
+    other_file.parent.mkdir(parents=True)
+    other_file.write_text("user")
+
+    data_restore.restore_archive("backup", archive, infos)
+
+    for relative_path, content in files.items():
+        if relative_path != "mealie.db":
+            assert (data_restore.data_dir / relative_path).read_text() == content
+
+    assert not (data_restore.data_dir / "mealie.db").exists()
+    assert not stale_file.exists()
+    assert other_file.exists()
+    assert not data_restore.progress_file.exists()
+
+
+def test_restore_resumes_after_interruption(tmp_path: Path, data_restore: DataDirectoryRestore):
+    files = {f"recipes/{i}/images/original.webp": utils.random_string() for i in range(20)}
+    archive, infos = backup_zip(tmp_path, files)
+
+    written: list[str] = []
+    interrupt = True
+
+    def write_file(relative_path: str, dest: Path) -> None:
+        if relative_path == "recipes/10/images/original.webp" and interrupt:
+            raise OSError("interrupted")
+
+        written.append(relative_path)
+        dest.write_text(files[relative_path])
+
+    with pytest.raises(OSError):
+        data_restore._restore("backup", list(files), write_file)
+
+    progress = DataRestoreProgress(data_restore.progress_file, "backup")
+    assert progress.resuming
+    assert progress.restored and "recipes/10/images/original.webp" not in progress.restored
+
+    # a restore of a different backup starts over
+    assert not DataRestoreProgress(data_restore.progress_file, "other backup").resuming
+
+    # files added since the interruption aren't removed, since the directories were already replaced
+    added_file = data_restore.data_dir / "recipes" / "added" / "original.webp"
+    added_file.parent.mkdir(parents=True)
+    added_file.write_text("added")
+
+    restored = set(progress.restored)
+    written.clear()
+    interrupt = False
+    data_restore._restore("backup", list(files), write_file)
+
+    assert set(written) == set(files) - restored
+    assert added_file.exists()
+    for relative_path, content in files.items():
+        assert (data_restore.data_dir / relative_path).read_text() == content
+
+    assert not data_restore.progress_file.exists()
+
+
+def test_restore_manifest(tmp_path: Path, data_restore: DataDirectoryRestore):
+    store = BackupChunkStore(tmp_path / "chunks")
+
+    files: dict[str, Path] = {}
+    for i in range(5):
+        file = tmp_path / "original" / "recipes" / str(i) / "images" / "original.webp"
+        file.parent.mkdir(parents=True)
+        file.write_text(utils.random_string())
+        files[f"recipes/{i}/images/original.webp"] = file
+
+    manifest: BackupManifest = store.build_manifest(files)
+    data_restore.restore_manifest("backup", store, manifest)
+
+    for relative_path, file in files.items():
+        restored_file = data_restore.data_dir / relative_path
+        assert restored_file.read_bytes() == file.read_bytes()
+        assert restored_file.stat().st_mtime_ns == file.stat().st_mtime_ns
@@ -5,8 +5,8 @@ from fastapi.testclient import TestClient
 from pydantic import UUID4
 
 from mealie.schema.household.household import HouseholdRecipeSummary
-from mealie.schema.meal_plan.new_meal import CreatePlanEntry
-from mealie.schema.recipe.recipe import RecipeLastMade, RecipeSummary
+from mealie.schema.meal_plan.new_meal import CreatePlanEntry, SavePlanEntry
+from mealie.schema.recipe.recipe import Recipe, RecipeLastMade, RecipeSummary
 from mealie.services.scheduler.tasks.create_timeline_events import create_mealplan_timeline_events
 from tests.utils import api_routes
 from tests.utils.factories import random_int, random_string
@@ -251,3 +251,48 @@ def test_preserve_future_made_date(api_client: TestClient, unique_user: TestUser
     response = api_client.get(api_routes.households_self_recipes_recipe_slug(recipe.slug), headers=h2_user.token)
     household_recipe = HouseholdRecipeSummary.model_validate(response.json())
     assert household_recipe.last_made is None
+
+
+def test_new_mealplan_events_across_households(unique_user: TestUser, h2_user: TestUser):
+    recipes = [
+        unique_user.repos.recipes.create(
+            Recipe(user_id=unique_user.user_id, group_id=unique_user.group_id, name=random_string())
+        )
+        for _ in range(3)
+    ]
+
+    # both households plan the first recipe, and each plans one of the others
+    today = datetime.now(UTC).date()
+    plans = [
+        (unique_user, [recipes[0], recipes[1]]),
+        (h2_user, [recipes[0], recipes[2]]),
+    ]
+    for user, planned_recipes in plans:
+        for recipe in planned_recipes:
+            user.repos.meals.create(
+                SavePlanEntry(
+                    date=today,
+                    entry_type="dinner",
+                    recipe_id=recipe.id,
+                    group_id=user.group_id,
+                    user_id=user.user_id,
+                )
+            )
+
+    # running the task twice only creates the events once
+    for _ in range(2):
+        create_mealplan_timeline_events()
+
+    for recipe in recipes:
+        events = unique_user.repos.recipe_timeline_events.multi_query({"recipe_id": recipe.id})
+        assert len(events) == (2 if recipe is recipes[0] else 1)
+
+        updated_recipe = unique_user.repos.recipes.get_one(recipe.id, key="id")
+        assert updated_recipe and updated_recipe.last_made
+        assert updated_recipe.last_made.date() == today
+
+    for user, planned_recipes in plans:
+        for recipe in planned_recipes:
+            household_recipe = user.repos.household_recipes.get_by_recipe(recipe.id)
+            assert household_recipe and household_recipe.last_made
+            assert household_recipe.last_made.date() == today
@@ -0,0 +1,44 @@
+from datetime import UTC, datetime
+
+import pytest
+
+from mealie.services.scheduler.cron import CronSchedule
+
+
+def dt(*args: int) -> datetime:
+    return datetime(*args, tzinfo=UTC)  # type: ignore[misc]
+
+
+@pytest.mark.parametrize(
+    "expression, after, expected",
+    [
+        ("*/5 * * * *", dt(2024, 1, 1, 10, 3, 30), dt(2024, 1, 1, 10, 5)),
+        ("*/5 * * * *", dt(2024, 1, 1, 10, 5), dt(2024, 1, 1, 10, 10)),
+        ("45 23 * * *", dt(2024, 1, 1, 23, 45), dt(2024, 1, 2, 23, 45)),
+        ("45 23 * * *", dt(2024, 12, 31, 23, 50), dt(2025, 1, 1, 23, 45)),
+        ("0 * * * *", dt(2024, 1, 1, 23, 59), dt(2024, 1, 2, 0, 0)),
+        ("0 9-17/4 * * *", dt(2024, 1, 1, 9, 0), dt(2024, 1, 1, 13, 0)),
+        ("30 6 * * 1-5", dt(2024, 1, 5, 7, 0), dt(2024, 1, 8, 6, 30)),  # Friday -> Monday
+        ("0 0 * * 7", dt(2024, 1, 1), dt(2024, 1, 7)),  # 7 is Sunday
+        ("0 0 1 2,3 *", dt(2024, 2, 1), dt(2024, 3, 1)),
+        ("0 0 29 2 *", dt(2024, 3, 1), dt(2028, 2, 29)),
+        # when both are restricted, either the day of the month or the day of the week matches
+        ("0 0 15 * 1", dt(2024, 1, 1), dt(2024, 1, 8)),
+        ("@daily", dt(2024, 1, 1, 12), dt(2024, 1, 2)),
+    ],
+)
+def test_cron_next_after(expression: str, after: datetime, expected: datetime):
+    assert CronSchedule(expression).next_after(after) == expected
+
+
+@pytest.mark.parametrize(
+    "expression", ["* * * *", "60 * * * *", "* 24 * * *", "*/0 * * * *", "5-1 * * * *", "a * * * *"]
+)
+def test_cron_invalid_expressions(expression: str):
+    with pytest.raises(ValueError):
+        CronSchedule(expression)
+
+
+def test_cron_never_matches():
+    with pytest.raises(ValueError):
+        CronSchedule("0 0 30 2 *").next_after(dt(2024, 1, 1))
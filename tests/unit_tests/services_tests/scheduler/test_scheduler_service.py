@@ -0,0 +1,174 @@
+import asyncio
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from mealie.db.db_setup import session_context
+from mealie.db.models.server.task import ServerTaskModel
+from mealie.schema.admin.scheduler import ScheduledTaskStatus
+from mealie.services.scheduler import SchedulerService, get_scheduled_tasks
+from mealie.services.scheduler.cron import CronSchedule
+from mealie.services.scheduler.scheduled_func import ScheduledTask
+from tests.utils import random_string
+
+
+def new_task(callback: Callable, last_run_arg: str | None = None) -> ScheduledTask:
+    return ScheduledTask(random_string(), callback, CronSchedule("0 0 * * *"), last_run_arg=last_run_arg)
+
+
+def get_row(session: Session, task: ScheduledTask) -> ServerTaskModel:
+    session.expire_all()
+    return session.scalars(select(ServerTaskModel).where(ServerTaskModel.name == task.name)).one()
+
+
+def make_due(session: Session, *tasks: ScheduledTask) -> None:
+    session.execute(
+        update(ServerTaskModel)
+        .where(ServerTaskModel.name.in_([task.name for task in tasks]))
+        .values(next_run_at=datetime.now(UTC) - timedelta(seconds=1))
+    )
+    session.commit()
+
+
+def test_scheduler_records_task_runs(session: Session):
+    def fail():
+        raise Exception("something went wrong")
+
+    succeeding, failing = new_task(lambda: None), new_task(fail)
+    scheduler = SchedulerService([succeeding, failing])
+    scheduler.sync_tasks()
+
+    # tasks aren't due until their next scheduled time
+    assert get_row(session, succeeding).next_run_at > datetime.now(UTC)
+    assert asyncio.run(scheduler.run_once()) == []
+
+    make_due(session, succeeding, failing)
+    assert sorted(asyncio.run(scheduler.run_once())) == sorted([succeeding.name, failing.name])
+
+    row = get_row(session, succeeding)
+    assert row.status == ScheduledTaskStatus.succeeded.value
+    assert row.run_count == 1 and row.failure_count == 0
+    assert row.last_duration is not None
+    assert row.next_run_at > datetime.now(UTC)
+    assert row.lease_id is None
+
+    row = get_row(session, failing)
+    assert row.status == ScheduledTaskStatus.failed.value
+    assert row.run_count == 1 and row.failure_count == 1
+    assert "something went wrong" in row.log
+
+    summaries = {summary.name: summary for summary in get_scheduled_tasks(session)}
+    assert summaries[failing.name].status == ScheduledTaskStatus.failed
+    assert summaries[failing.name].last_error
+    assert summaries[succeeding.name].last_duration is not None
+
+
+def test_scheduler_runs_each_task_in_one_process(session: Session):
+    started, finish = threading.Event(), threading.Event()
+    runs: list[str] = []
+
+    def slow():
+        runs.append("run")
+        started.set()
+        finish.wait(timeout=10)
+
+    task = new_task(slow)
+    first, second = SchedulerService([task]), SchedulerService([task])
+    first.sync_tasks()
+    second.sync_tasks()
+    make_due(session, task)
+
+    async def run():
+        first_run = asyncio.create_task(first.run_once())
+        await asyncio.to_thread(started.wait, 10)
+
+        # the task is leased by the first scheduler while it runs
+        assert get_row(session, task).status == ScheduledTaskStatus.running.value
+        assert await second.run_once() == []
+
+        finish.set()
+        return await first_run
+
+    assert asyncio.run(run()) == [task.name]
+    assert runs == ["run"]
+
+
+def test_scheduler_runs_tasks_concurrently(session: Session):
+    # each task waits for the other, so they only finish if they run at the same time
+    barrier = threading.Barrier(2, timeout=10)
+    tasks = [new_task(barrier.wait), new_task(barrier.wait)]
+    scheduler = SchedulerService(tasks, concurrency=2)
+    scheduler.sync_tasks()
+    make_due(session, *tasks)
+
+    assert len(asyncio.run(scheduler.run_once())) == 2
+    assert all(get_row(session, task).status == ScheduledTaskStatus.succeeded.value for task in tasks)
+
+
+def test_scheduler_passes_last_run(session: Session):
+    last_runs: list[datetime | None] = []
+    task = new_task(lambda start_dt: last_runs.append(start_dt), last_run_arg="start_dt")
+    scheduler = SchedulerService([task])
+    scheduler.sync_tasks()
+
+    for _ in range(2):
+        make_due(session, task)
+        asyncio.run(scheduler.run_once())
+
+    # the second run gets the start time of the first
+    assert last_runs[0] is None
+    assert last_runs[1] is not None
+    assert last_runs[1] < get_row(session, task).last_started_at
+
+
+def test_scheduler_stores_missing_tasks(session: Session):
+    runs: list[str] = []
+    task = new_task(lambda: runs.append("run"))
+    scheduler = SchedulerService([task])
+    scheduler.sync_tasks()
+
+    # e.g. restoring a backup made before the tasks were stored recreates the table without them
+    session.execute(delete(ServerTaskModel).where(ServerTaskModel.name == task.name))
+    session.commit()
+
+    assert asyncio.run(scheduler.run_once()) == []
+    assert get_row(session, task).next_run_at > datetime.now(UTC)
+
+    make_due(session, task)
+    assert asyncio.run(scheduler.run_once()) == [task.name]
+    assert runs == ["run"]
+
+
+def test_scheduler_keeps_schedule_changes_when_another_process_stores_a_task(session: Session):
+    @dataclass(slots=True)
+    class RacingTask(ScheduledTask):
+        """Stores itself from another session when it's scheduled, as if another process stored it first"""
+
+        def next_run_after(self, dt: datetime) -> datetime:
+            with session_context() as other_session:
+                other_session.add(
+                    ServerTaskModel(
+                        name=self.name,
+                        status=ScheduledTaskStatus.scheduled.value,
+                        schedule=self.schedule.expression,
+                        next_run_at=dt,
+                        session=other_session,
+                    )
+                )
+                other_session.commit()
+
+            return ScheduledTask.next_run_after(self, dt)
+
+    changed = new_task(lambda: None)
+    SchedulerService([changed]).sync_tasks()
+
+    changed.schedule = CronSchedule("30 1 * * *")
+    racing = RacingTask(random_string(), lambda: None, CronSchedule("0 0 * * *"))
+    SchedulerService([changed, racing]).sync_tasks()
+
+    assert get_row(session, changed).schedule == "30 1 * * *"
+    assert get_row(session, racing).schedule == "0 0 * * *"
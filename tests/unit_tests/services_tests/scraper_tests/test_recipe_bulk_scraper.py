@@ -0,0 +1,119 @@
+import asyncio
+
+import pytest
+
+from mealie.lang.providers import local_provider
+from mealie.schema.recipe.recipe import CreateRecipeBulk, CreateRecipeByUrlBulk, RecipeTag
+from mealie.schema.recipe.recipe_category import TagSave
+from mealie.schema.reports.reports import ReportSummaryStatus
+from mealie.services.recipe.recipe_service import RecipeService
+from mealie.services.scraper.recipe_bulk_scraper import RecipeBulkScraperService
+from tests.utils import random_string
+from tests.utils.fake_http_server import FakeHTTPServer, FakeResponse
+from tests.utils.fixture_schemas import TestUser
+from tests.utils.recipe_data import recipe_page
+
+
+def get_bulk_scraper(unique_user: TestUser, **kwargs) -> RecipeBulkScraperService:
+    repos = unique_user.repos
+    user = repos.users.get_one(unique_user.user_id)
+    household = repos.households.get_one(unique_user.household_id)
+    group = repos.groups.get_one(unique_user.group_id)
+    assert user and household and group
+
+    translator = local_provider()
+    service = RecipeService(repos, user, household, translator)
+    return RecipeBulkScraperService(service, repos, group, translator, **kwargs)
+
+
+def test_bulk_import(unique_user: TestUser, fake_server: FakeHTTPServer):
+    tag = unique_user.repos.tags.create(TagSave(name=random_string(), group_id=unique_user.group_id))
+    image_url = fake_server.url("images.test", "/image.jpg")
+
+    hosts = ["site-a.test", "site-b.test", "site-c.test"]
+    names: list[str] = []
+    imports: list[CreateRecipeBulk] = []
+    for host in hosts:
+        for _ in range(4):
+            name = random_string()
+            fake_server.add(f"/{name}", FakeResponse(recipe_page(name, image_url), delay=0.2))
+            names.append(name)
+            imports.append(
+                CreateRecipeBulk(
+                    url=fake_server.url(host, f"/{name}"),
+                    tags=[RecipeTag(id=tag.id, name=tag.name, slug=tag.slug)],
+                )
+            )
+
+    # a missing page and a page without a recipe
+    imports.append(CreateRecipeBulk(url=fake_server.url("site-a.test", "/missing")))
+    fake_server.add("/not-a-recipe", FakeResponse(b"<html><body>Nothing to see here</body></html>"))
+    imports.append(CreateRecipeBulk(url=fake_server.url("site-b.test", "/not-a-recipe")))
+
+    bulk_scraper = get_bulk_scraper(unique_user, concurrency=6, domain_concurrency=2)
+    report_id = bulk_scraper.get_report_id()
+    asyncio.run(bulk_scraper.scrape(CreateRecipeByUrlBulk(imports=imports)))
+
+    # the pages from different sites are fetched at the same time, but never more than two per site
+    assert 2 < fake_server.max_in_flight <= 6
+    for host in hosts:
+        assert fake_server.max_in_flight_by_host[host] <= 2
+
+    report = unique_user.repos.group_reports.get_one(report_id)
+    assert report
+    assert report.status == ReportSummaryStatus.partial
+    assert len(report.entries) == len(imports)
+    assert len([entry for entry in report.entries if entry.success]) == len(names)
+
+    for name in names:
+        recipe = unique_user.repos.recipes.get_one(name, "name")
+        assert recipe
+        assert recipe.image and recipe.image != "no image"
+        assert [recipe_tag.id for recipe_tag in recipe.tags or []] == [tag.id]
+        assert len(recipe.recipe_instructions or []) == 1
+
+
+def test_bulk_import_renames_duplicates(unique_user: TestUser, fake_server: FakeHTTPServer):
+    name = random_string()
+    fake_server.add("/recipe", FakeResponse(recipe_page(name, fake_server.url("images.test", "/image.jpg"))))
+
+    imports = [CreateRecipeBulk(url=fake_server.url(f"site-{i}.test", "/recipe")) for i in range(3)]
+    for _ in range(2):
+        bulk_scraper = get_bulk_scraper(unique_user)
+        report_id = bulk_scraper.get_report_id()
+        asyncio.run(bulk_scraper.scrape(CreateRecipeByUrlBulk(imports=imports)))
+
+        report = unique_user.repos.group_reports.get_one(report_id)
+        assert report and report.status == ReportSummaryStatus.success
+
+    # recipes with the same name are imported under a new name, whether they're in the same import or not
+    expected_names = {name, *(f"{name} ({i})" for i in range(1, 6))}
+    recipes = unique_user.repos.recipes.multi_query({"group_id": unique_user.group_id})
+    assert {recipe.name for recipe in recipes if recipe.name and recipe.name.startswith(name)} == expected_names
+
+
+def test_bulk_import_retries_batch_without_duplicates(
+    unique_user: TestUser, fake_server: FakeHTTPServer, monkeypatch: pytest.MonkeyPatch
+):
+    names = [random_string() for _ in range(3)]
+    image_url = fake_server.url("images.test", "/image.jpg")
+    for name in names:
+        fake_server.add(f"/{name}", FakeResponse(recipe_page(name, image_url)))
+
+    # saving the batch fails after the recipes are saved, so they're saved again one at a time
+    def create_many(*args, **kwargs):
+        raise Exception("failed to save timeline events")
+
+    monkeypatch.setattr(unique_user.repos.recipe_timeline_events, "create_many", create_many)
+
+    bulk_scraper = get_bulk_scraper(unique_user)
+    report_id = bulk_scraper.get_report_id()
+    imports = [CreateRecipeBulk(url=fake_server.url("site.test", f"/{name}")) for name in names]
+    asyncio.run(bulk_scraper.scrape(CreateRecipeByUrlBulk(imports=imports)))
+
+    report = unique_user.repos.group_reports.get_one(report_id)
+    assert report and report.status == ReportSummaryStatus.success
+
+    recipes = unique_user.repos.recipes.multi_query({"group_id": unique_user.group_id})
+    imported = [recipe for recipe in recipes if recipe.name and recipe.name.startswith(tuple(names))]
+    assert sorted(recipe.name for recipe in imported) == sorted(names)
@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from mealie.core.config import get_app_settings
+from mealie.lang.providers import local_provider
+from mealie.services.scraper.recipe_scraper import RecipeScraper
+from mealie.services.scraper.scraper_strategies import safe_scrape_html
+from tests.utils import random_string
+from tests.utils.fake_http_server import FakeHTTPServer, FakeResponse
+from tests.utils.recipe_data import recipe_page
+
+
+def large_recipe_page(name: str, size: int) -> bytes:
+    page = recipe_page(name, "https://example.com/image.jpg")
+    body_start = page.index(b"<body>") + len(b"<body>")
+    return page[:body_start] + b"<p>" + b"a" * size + b"</p>" + page[body_start:]
+
+
+def test_safe_scrape_html_max_size(fake_server: FakeHTTPServer, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(get_app_settings(), "SCRAPER_MAX_HTML_SIZE_MB", 1)
+
+    path = f"/{random_string()}"
+    fake_server.add(path, FakeResponse(large_recipe_page(random_string(), 3 * 1024 * 1024)))
+
+    html = asyncio.run(safe_scrape_html(fake_server.url("site.test", path)))
+    assert len(html) == 1024 * 1024
+
+
+def test_safe_scrape_html_stop_at_recipe_data(fake_server: FakeHTTPServer, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(get_app_settings(), "SCRAPER_STOP_AT_RECIPE_DATA", True)
+
+    name = random_string()
+    path = f"/{random_string()}"
+    fake_server.add(path, FakeResponse(large_recipe_page(name, 5 * 1024 * 1024)))
+    url = fake_server.url("site.test", path)
+
+    # the page is cut off soon after the recipe data, which is enough to scrape the recipe
+    html = asyncio.run(safe_scrape_html(url))
+    assert '<script type="application/ld+json">' in html
+    assert len(html) < 1024 * 1024
+
+    recipe, _ = asyncio.run(RecipeScraper(local_provider()).scrape(url, html))
+    assert recipe and recipe.name == name
+
+
+@pytest.mark.parametrize(
+    "content_type, meta",
+    [
+        ("text/html; charset=windows-1252", ""),
+        ("text/html", '<meta charset="windows-1252">'),
+        ("text/html", '<meta http-equiv="Content-Type" content="text/html; charset=windows-1252">'),
+    ],
+)
+def test_safe_scrape_html_encoding(fake_server: FakeHTTPServer, content_type: str, meta: str):
+    body = f"<html><head>{meta}<title>Crème brûlée</title></head><body></body></html>"
+
+    path = f"/{random_string()}"
+    fake_server.add(path, FakeResponse(body.encode("windows-1252"), content_type))
+
+    assert asyncio.run(safe_scrape_html(fake_server.url("site.test", path))) == body
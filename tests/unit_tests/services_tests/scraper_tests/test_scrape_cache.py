@@ -0,0 +1,153 @@
+import asyncio
+import threading
+from collections.abc import Generator
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+from mealie.core.config import get_app_settings
+from mealie.lang.providers import local_provider
+from mealie.services.scraper import scrape_cache as scrape_cache_module
+from mealie.services.scraper.recipe_scraper import DEFAULT_SCRAPER_STRATEGIES, RecipeScraper
+from mealie.services.scraper.scrape_cache import ScrapeCache
+from mealie.services.scraper.scraper_strategies import safe_scrape_html
+from tests.utils import random_string
+from tests.utils.fake_http_server import FakeHTTPServer, FakeResponse
+from tests.utils.recipe_data import recipe_page
+
+
+@pytest.fixture()
+def scrape_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Generator[ScrapeCache, None, None]:
+    cache = ScrapeCache(tmp_path / "scraper", max_size=10 * 1024 * 1024, ttl=timedelta(minutes=60))
+    monkeypatch.setattr(scrape_cache_module, "_SCRAPE_CACHE", cache)
+    yield cache
+
+
+def test_safe_scrape_html_revalidates_cached_page(scrape_cache: ScrapeCache, fake_server: FakeHTTPServer):
+    html = recipe_page(random_string(), fake_server.url("images.test", "/image.jpg"))
+    fake_server.add("/recipe", FakeResponse(html, headers={"ETag": '"v1"'}))
+    url = fake_server.url("site.test", "/recipe")
+
+    # the page is only fetched once while it's fresh
+    for _ in range(2):
+        assert asyncio.run(safe_scrape_html(url)) == html.decode()
+    assert len(fake_server.requests) == 1
+
+    # once it expires, the site is asked whether it changed, and answers with a 304 without the page
+    scrape_cache.ttl = timedelta(0)
+    assert asyncio.run(safe_scrape_html(url)) == html.decode()
+    assert len(fake_server.requests) == 2
+
+    # when the page changes, the new version is cached
+    new_html = recipe_page(random_string(), fake_server.url("images.test", "/image.jpg"))
+    fake_server.add("/recipe", FakeResponse(new_html, headers={"ETag": '"v2"'}))
+    assert asyncio.run(safe_scrape_html(url)) == new_html.decode()
+
+    scrape_cache.ttl = timedelta(minutes=60)
+    assert asyncio.run(safe_scrape_html(url)) == new_html.decode()
+    assert len(fake_server.requests) == 3
+
+
+def test_scrape_cache_is_used_off_the_event_loop(
+    scrape_cache: ScrapeCache, fake_server: FakeHTTPServer, monkeypatch: pytest.MonkeyPatch
+):
+    threads: dict[str, set[int]] = {}
+    for method in ["get_page", "set_page", "refresh_page", "get_recipe", "set_recipe"]:
+
+        def record(*args, _method=method, _call=getattr(scrape_cache, method)):
+            threads.setdefault(_method, set()).add(threading.get_ident())
+            return _call(*args)
+
+        monkeypatch.setattr(scrape_cache, method, record)
+
+    html = recipe_page(random_string(), fake_server.url("images.test", "/image.jpg"))
+    fake_server.add("/recipe", FakeResponse(html, headers={"ETag": '"v1"'}))
+    url = fake_server.url("site.test", "/recipe")
+
+    scraper = RecipeScraper(local_provider())
+    asyncio.run(scraper.scrape(url))
+    scrape_cache.ttl = timedelta(0)
+    asyncio.run(safe_scrape_html(url))
+
+    # the cache reads and writes files, which would block every other request on the event loop
+    assert set(threads) == {"get_page", "set_page", "refresh_page", "get_recipe", "set_recipe"}
+    assert all(threading.get_ident() not in idents for idents in threads.values())
+
+
+@pytest.mark.parametrize(
+    "headers",
+    [{"Cache-Control": "no-store"}, {"Cache-Control": "max-age=60, private"}, {"Set-Cookie": "session=abc123"}],
+    ids=["no_store", "private", "set_cookie"],
+)
+def test_safe_scrape_html_skips_uncacheable_pages(
+    scrape_cache: ScrapeCache, fake_server: FakeHTTPServer, headers: dict[str, str]
+):
+    fake_server.add("/recipe", FakeResponse(b"<html></html>", headers=headers))
+    url = fake_server.url("site.test", "/recipe")
+
+    for _ in range(2):
+        asyncio.run(safe_scrape_html(url))
+    assert len(fake_server.requests) == 2
+    assert scrape_cache.get_page(url) is None
+
+
+@pytest.mark.parametrize(
+    "setting, value",
+    [("SCRAPER_MAX_HTML_SIZE_MB", 1), ("SCRAPER_STOP_AT_RECIPE_DATA", True)],
+    ids=["max_size", "stop_at_recipe_data"],
+)
+def test_safe_scrape_html_skips_cut_off_pages(
+    scrape_cache: ScrapeCache, fake_server: FakeHTTPServer, monkeypatch: pytest.MonkeyPatch, setting: str, value
+):
+    monkeypatch.setattr(get_app_settings(), setting, value)
+
+    page = recipe_page(random_string(), fake_server.url("images.test", "/image.jpg"))
+    body_start = page.index(b"<body>") + len(b"<body>")
+    fake_server.add("/recipe", FakeResponse(page[:body_start] + b"a" * 3 * 1024 * 1024 + page[body_start:]))
+    url = fake_server.url("site.test", "/recipe")
+
+    # only part of the page is read, so it's not cached as if it were the whole page
+    for _ in range(2):
+        assert len(asyncio.run(safe_scrape_html(url))) < len(page) + 3 * 1024 * 1024
+    assert len(fake_server.requests) == 2
+    assert scrape_cache.get_page(url) is None
+
+
+def test_scrape_uses_cached_recipe(scrape_cache: ScrapeCache, monkeypatch: pytest.MonkeyPatch):
+    name = random_string()
+    html = recipe_page(name, "https://example.com/image.jpg").decode()
+    scraper = RecipeScraper(local_provider())
+
+    recipe, _ = asyncio.run(scraper.scrape("https://example.com/recipe", html))
+    assert recipe and recipe.name == name
+
+    async def fail(self):
+        raise AssertionError("the cached recipe should be used")
+
+    for scraper_cls in DEFAULT_SCRAPER_STRATEGIES:
+        monkeypatch.setattr(scraper_cls, "parse", fail)
+
+    cached_recipe, _ = asyncio.run(scraper.scrape("https://example.com/recipe", html))
+    assert cached_recipe == recipe
+
+    # a different page isn't served from the cache
+    other_html = recipe_page(random_string(), "https://example.com/image.jpg").decode()
+    assert asyncio.run(scraper.scrape("https://example.com/recipe", other_html)) == (None, None)
+
+
+def test_scrape_cache_evicts_least_recently_used(tmp_path: Path):
+    cache = ScrapeCache(tmp_path / "scraper", max_size=10_000, ttl=timedelta(minutes=60))
+
+    urls = [f"https://example.com/{i}" for i in range(10)]
+    for url in urls:
+        cache.set_page(url, random_string(1000), {})
+
+        # keep the first page in use, so it's never the least recently used
+        assert cache.get_page(urls[0])
+
+    size = sum(f.stat().st_size for f in cache.directory.rglob("*") if f.is_file())
+    assert size <= cache.max_size
+    assert cache.get_page(urls[0])
+    assert cache.get_page(urls[-1])
+    assert not cache.get_page(urls[1])
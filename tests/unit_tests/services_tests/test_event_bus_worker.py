@@ -0,0 +1,262 @@
+import asyncio
+import time
+from collections.abc import Generator
+from datetime import UTC, datetime, timedelta
+from urllib.parse import urlsplit
+
+import pytest
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from mealie.db.models.household.events import EventBusOutboxModel, GroupEventNotifierModel
+from mealie.repos.all_repositories import get_repositories
+from mealie.schema.household.group_events import GroupEventNotifierOptions, GroupEventNotifierSave
+from mealie.schema.household.household import HouseholdCreate
+from mealie.services.event_bus_service.event_bus_listeners import AppriseEventListener, apprise_subscriber_cache
+from mealie.services.event_bus_service.event_bus_service import EventBusService
+from mealie.services.event_bus_service.event_bus_worker import EventBusWorker, load_event
+from mealie.services.event_bus_service.event_types import (
+    INTERNAL_INTEGRATION_ID,
+    Event,
+    EventOperation,
+    EventRecipeData,
+    EventTypes,
+)
+from mealie.services.event_bus_service.publisher import ApprisePublisher
+from mealie.services.scheduler.tasks.purge_failed_events import MAX_DAYS_OLD, purge_failed_events
+from tests.utils import random_string
+from tests.utils.fixture_schemas import TestUser
+
+
+class PublishedHosts(list[str]):
+    """The hosts notified by Apprise; publishing to hosts in `failing` raises"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.failing: set[str] = set()
+
+
+@pytest.fixture
+def published(
+    unique_user_fn_scoped: TestUser, monkeypatch: pytest.MonkeyPatch
+) -> Generator[PublishedHosts, None, None]:
+    hosts = PublishedHosts()
+
+    def publish(self, event: Event, notification_urls: list[str]):
+        for url in notification_urls:
+            host = urlsplit(url).hostname
+            if host in hosts.failing:
+                raise Exception(f"{host} is down")
+
+            hosts.append(host)
+
+    monkeypatch.setattr(ApprisePublisher, "publish", publish)
+
+    # the outbox is shared by every test, so start from (and leave behind) an empty queue
+    session = unique_user_fn_scoped.repos.session
+    session.execute(delete(EventBusOutboxModel))
+    session.commit()
+    yield hosts
+
+    session.rollback()
+    session.execute(delete(EventBusOutboxModel))
+    session.commit()
+
+
+def create_notifier(unique_user: TestUser, household_id: str | None = None) -> str:
+    household_id = household_id or unique_user.household_id
+    repos = get_repositories(unique_user.repos.session, group_id=unique_user.group_id, household_id=household_id)
+
+    host = f"{random_string()}.example.com".lower()
+    repos.group_event_notifier.create(
+        GroupEventNotifierSave(
+            name=random_string(),
+            apprise_url=f"json://{host}/notify",
+            group_id=unique_user.group_id,
+            household_id=household_id,
+            options=GroupEventNotifierOptions(recipe_created=True),
+        )
+    )
+    return host
+
+
+def dispatch_recipe_created(unique_user: TestUser, household_id: str | None, commit: bool = True) -> None:
+    EventBusService(unique_user.repos.session).dispatch(
+        integration_id=INTERNAL_INTEGRATION_ID,
+        group_id=unique_user.group_id,
+        household_id=household_id,
+        event_type=EventTypes.recipe_created,
+        document_data=EventRecipeData(operation=EventOperation.create, recipe_slug="my-recipe"),
+    )
+    if commit:
+        unique_user.repos.session.commit()
+
+
+def get_outbox(session: Session) -> list[EventBusOutboxModel]:
+    session.expire_all()
+    return list(session.scalars(select(EventBusOutboxModel)))
+
+
+def make_due(session: Session) -> None:
+    session.execute(update(EventBusOutboxModel).values(next_attempt_at=datetime.now(UTC) - timedelta(seconds=1)))
+    session.commit()
+
+
+def test_dispatch_enqueues_event(unique_user_fn_scoped: TestUser, published: PublishedHosts):
+    create_notifier(unique_user_fn_scoped)
+    dispatch_recipe_created(unique_user_fn_scoped, household_id=None)
+
+    # nothing is published until the worker delivers the event
+    assert published == []
+
+    [row] = get_outbox(unique_user_fn_scoped.repos.session)
+    assert str(row.group_id) == unique_user_fn_scoped.group_id
+    assert row.household_id is None
+    assert row.attempts == 0
+
+    event = load_event(row.payload, row.document_data_type)
+    assert isinstance(event.document_data, EventRecipeData)
+    assert event.document_data.recipe_slug == "my-recipe"
+    assert str(event.event_id) == row.payload["event_id"]
+
+
+def test_dispatch_is_committed_by_the_caller(unique_user_fn_scoped: TestUser, published: PublishedHosts):
+    session = unique_user_fn_scoped.repos.session
+    dispatch_recipe_created(unique_user_fn_scoped, household_id=None, commit=False)
+
+    # the event is part of the caller's transaction, so it's discarded with it
+    session.rollback()
+    assert get_outbox(session) == []
+
+
+def test_event_bus_worker_retries_failed_destinations(unique_user_fn_scoped: TestUser, published: PublishedHosts):
+    session = unique_user_fn_scoped.repos.session
+    working_host = create_notifier(unique_user_fn_scoped)
+    failing_host = create_notifier(unique_user_fn_scoped)
+    published.failing.add(failing_host)
+
+    dispatch_recipe_created(unique_user_fn_scoped, household_id=None)
+    worker = EventBusWorker(workers=2, batch_size=10, max_attempts=3)
+
+    assert asyncio.run(worker.run_once()) == 1
+    assert published == [working_host]
+
+    [row] = get_outbox(session)
+    assert row.attempts == 1
+    assert not row.failed
+    assert row.lease_id is None
+    assert row.next_attempt_at > datetime.now(UTC)
+    assert row.last_error and failing_host in row.last_error
+
+    # retries aren't due yet
+    assert asyncio.run(worker.run_once()) == 0
+
+    # the destination that already received the event isn't notified again
+    published.failing.clear()
+    make_due(session)
+    assert asyncio.run(worker.run_once()) == 1
+    assert published == [working_host, failing_host]
+    assert get_outbox(session) == []
+
+
+def test_event_bus_worker_marks_event_failed(unique_user_fn_scoped: TestUser, published: PublishedHosts):
+    session = unique_user_fn_scoped.repos.session
+    published.failing.add(create_notifier(unique_user_fn_scoped))
+
+    dispatch_recipe_created(unique_user_fn_scoped, household_id=unique_user_fn_scoped.household_id)
+    worker = EventBusWorker(workers=1, batch_size=10, max_attempts=2)
+
+    for _ in range(2):
+        make_due(session)
+        assert asyncio.run(worker.run_once()) == 1
+
+    [row] = get_outbox(session)
+    assert row.failed
+    assert row.attempts == 2
+
+    make_due(session)
+    assert asyncio.run(worker.run_once()) == 0
+
+
+def test_purge_failed_events(unique_user_fn_scoped: TestUser, published: PublishedHosts):
+    session = unique_user_fn_scoped.repos.session
+    for _ in range(3):
+        dispatch_recipe_created(unique_user_fn_scoped, household_id=None)
+
+    old_failed, recent_failed, pending = get_outbox(session)
+    old_failed.failed = recent_failed.failed = True
+    session.commit()
+
+    old_failed.update_at = datetime.now(UTC) - timedelta(days=MAX_DAYS_OLD + 1)
+    session.commit()
+
+    purge_failed_events()
+    assert {row.id for row in get_outbox(session)} == {recent_failed.id, pending.id}
+
+
+def test_event_bus_worker_delivers_to_every_household(unique_user_fn_scoped: TestUser, published: PublishedHosts):
+    other_household = unique_user_fn_scoped.repos.households.create(
+        HouseholdCreate(name=random_string(), group_id=unique_user_fn_scoped.group_id)
+    )
+    hosts = {create_notifier(unique_user_fn_scoped), create_notifier(unique_user_fn_scoped, str(other_household.id))}
+
+    dispatch_recipe_created(unique_user_fn_scoped, household_id=None)
+    assert asyncio.run(EventBusWorker().run_once()) == 1
+    assert set(published) == hosts
+
+
+def test_apprise_subscribers_are_cached(unique_user_fn_scoped: TestUser, published: PublishedHosts):
+    session = unique_user_fn_scoped.repos.session
+    host = create_notifier(unique_user_fn_scoped)
+
+    def get_hosts() -> list[str | None]:
+        subscribers = AppriseEventListener.get_group_subscribers(
+            session, unique_user_fn_scoped.group_id, EventTypes.recipe_created
+        )
+        return sorted(urlsplit(url).hostname for url in subscribers[unique_user_fn_scoped.household_id])
+
+    before = apprise_subscriber_cache.stats()
+    assert get_hosts() == [host]
+    assert get_hosts() == [host]
+
+    after = apprise_subscriber_cache.stats()
+    assert after.misses - before.misses == 1
+    assert after.hits - before.hits == 1
+
+    # adding a notifier invalidates the cached subscribers
+    other_host = create_notifier(unique_user_fn_scoped)
+    assert get_hosts() == sorted([host, other_host])
+    assert apprise_subscriber_cache.stats().invalidations > after.invalidations
+
+    # internal event types can't be subscribed to
+    assert (
+        AppriseEventListener.get_group_subscribers(session, unique_user_fn_scoped.group_id, EventTypes.test_message)
+        == {}
+    )
+
+
+def test_apprise_subscribers_expire_after_writes_from_other_processes(
+    unique_user_fn_scoped: TestUser, published: PublishedHosts, monkeypatch: pytest.MonkeyPatch
+):
+    session = unique_user_fn_scoped.repos.session
+    create_notifier(unique_user_fn_scoped)
+
+    def get_subscribers() -> dict[str, tuple[str, ...]]:
+        return AppriseEventListener.get_group_subscribers(
+            session, unique_user_fn_scoped.group_id, EventTypes.recipe_created
+        )
+
+    assert get_subscribers()
+
+    # writes made outside of an ORM session (like those made by another process) don't invalidate the cache
+    with session.get_bind().begin() as conn:
+        conn.execute(
+            update(GroupEventNotifierModel)
+            .where(GroupEventNotifierModel.group_id == unique_user_fn_scoped.group_id)
+            .values(enabled=False)
+        )
+    assert get_subscribers()
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + apprise_subscriber_cache.ttl_seconds + 1)
+    assert get_subscribers() == {}
@@ -0,0 +1,37 @@
+import asyncio
+import uuid
+
+from mealie.services.recipe.recipe_data_service import RecipeDataService
+from tests import data as test_data
+
+
+def test_write_image():
+    data_service = RecipeDataService(uuid.uuid4())
+    data_service.write_image(test_data.images_test_image_2.read_bytes(), "png")
+
+    for name in ["original.webp", "min-original.webp", "tiny-original.webp"]:
+        assert data_service.dir_image.joinpath(name).exists()
+    assert not data_service.dir_image.joinpath("original.png").exists()
+
+
+def test_write_image_async_does_not_block_event_loop():
+    data_service = RecipeDataService(uuid.uuid4())
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0)
+
+    async def write_image():
+        ticker = asyncio.create_task(tick())
+        await data_service.write_image_async(test_data.images_test_image_1.read_bytes(), "jpg")
+        ticker.cancel()
+
+    asyncio.run(write_image())
+
+    # the event loop kept running other tasks while the image was processed
+    assert ticks > 1
+    for name in ["original.webp", "min-original.webp", "tiny-original.webp"]:
+        assert data_service.dir_image.joinpath(name).exists()
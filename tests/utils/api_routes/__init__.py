@@ -29,6 +29,10 @@ admin_maintenance_clean_temp = "/api/admin/maintenance/clean/temp"
 """`/api/admin/maintenance/clean/temp`"""
 admin_maintenance_storage = "/api/admin/maintenance/storage"
 """`/api/admin/maintenance/storage`"""
+admin_maintenance_storage_reconcile = "/api/admin/maintenance/storage/reconcile"
+"""`/api/admin/maintenance/storage/reconcile`"""
+admin_scheduler_tasks = "/api/admin/scheduler/tasks"
+"""`/api/admin/scheduler/tasks`"""
 admin_users = "/api/admin/users"
 """`/api/admin/users`"""
 admin_users_password_reset_token = "/api/admin/users/password-reset-token"
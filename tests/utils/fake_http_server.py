@@ -0,0 +1,109 @@
+import contextlib
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Self
+
+
+@dataclass(slots=True)
+class FakeResponse:
+    body: bytes
+    content_type: str = "text/html; charset=utf-8"
+    status: int = 200
+    delay: float = 0
+    """Seconds to wait before responding"""
+    headers: dict[str, str] = field(default_factory=dict)
+    """Extra headers to send; if there's an `ETag`, requests with a matching `If-None-Match` get a 304"""
+
+
+class FakeHTTPServer:
+    """
+    A local HTTP server that serves canned responses by path, for testing code that makes outbound requests.
+    Every request is served from its own thread, and the server records how many requests were in flight at once,
+    both in total and to each host (from the `Host` header), so tests can use any hostname that resolves to it.
+    """
+
+    def __init__(self) -> None:
+        self.responses: dict[str, FakeResponse] = {}
+        self.requests: list[tuple[str, str]] = []
+        """The host and path of each request"""
+
+        self.max_in_flight = 0
+        self.max_in_flight_by_host: Counter[str] = Counter()
+
+        self._in_flight = 0
+        self._in_flight_by_host: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def url(self, host: str, path: str) -> str:
+        return f"http://{host}:{self.port}{path}"
+
+    def add(self, path: str, response: FakeResponse) -> None:
+        self.responses[path] = response
+
+    def _start_request(self, host: str, path: str) -> None:
+        with self._lock:
+            self.requests.append((host, path))
+            self._in_flight += 1
+            self._in_flight_by_host[host] += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+            self.max_in_flight_by_host[host] = max(self.max_in_flight_by_host[host], self._in_flight_by_host[host])
+
+    def _finish_request(self, host: str) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._in_flight_by_host[host] -= 1
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                host = self.headers.get("Host", "").split(":")[0]
+                server._start_request(host, self.path)
+                try:
+                    response = server.responses.get(self.path, FakeResponse(b"Not Found", "text/plain", 404))
+                    time.sleep(response.delay)
+
+                    etag = response.headers.get("ETag")
+                    if etag and self.headers.get("If-None-Match") == etag:
+                        self.send_response(304)
+                        self.send_header("ETag", etag)
+                        self.end_headers()
+                        return
+
+                    self.send_response(response.status)
+                    self.send_header("Content-Type", response.content_type)
+                    self.send_header("Content-Length", str(len(response.body)))
+                    for name, value in response.headers.items():
+                        self.send_header(name, value)
+                    self.end_headers()
+
+                    # clients may stop reading before the end of the body
+                    with contextlib.suppress(ConnectionError):
+                        self.wfile.write(response.body)
+                finally:
+                    server._finish_request(host)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        return Handler
+
+    def __enter__(self) -> Self:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self._server.shutdown()
+        self._server.server_close()
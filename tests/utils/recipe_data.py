@@ -1,3 +1,4 @@
+import json
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -142,3 +143,19 @@ def get_raw_no_image():
     raw["name"] = "Banana Bread No Image"
     raw["image"] = ""
     return raw
+
+
+def recipe_page(name: str, image_url: str) -> bytes:
+    ld_json = {
+        "@context": "https://schema.org",
+        "@type": "Recipe",
+        "name": name,
+        "image": image_url,
+        "recipeIngredient": ["1 cup flour", "2 eggs"],
+        "recipeInstructions": [{"@type": "HowToStep", "text": "Mix everything together"}],
+    }
+    return (
+        "<!DOCTYPE html><html><head>"
+        f'<script type="application/ld+json">{json.dumps(ld_json)}</script>'
+        "</head><body></body></html>"
+    ).encode()